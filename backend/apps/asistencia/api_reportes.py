@@ -13,6 +13,7 @@ from apps.asistencia.models import (
     HorarioCargo,
 )
 from apps.common.date_utils import format_date, format_datetime
+from apps.common.renderers import trusted_response
 from core.auth_ninja import JWTAuth
 from core.models import Docente, Estudiante
 
@@ -35,6 +36,7 @@ class ReporteDiarioDocenteItem(BaseModel):
 
 
 @router.get("/docentes/diario", response=list[ReporteDiarioDocenteItem])
+@trusted_response
 def reporte_diario_docentes(request: HttpRequest, fecha: date):
     """
     Devuelve todas las clases y cargos programados para la fecha dada,
@@ -159,6 +161,7 @@ class ReporteMateriaEstudianteItem(BaseModel):
 
 
 @router.get("/estudiantes/materia", response=list[ReporteMateriaEstudianteItem])
+@trusted_response
 def reporte_materia_estudiantes(request: HttpRequest, comision_id: int):
     """
     Devuelve el reporte de asistencia detallado por clase para todos los alumnos
@@ -1,10 +1,11 @@
 from django.core.management.base import BaseCommand, CommandParser
 
 from apps.asistencia.services import sync_course_snapshots
+from apps.common.metrics import TrackedCommandMixin
 from core.models import Comision
 
 
-class Command(BaseCommand):
+class Command(TrackedCommandMixin, BaseCommand):
     help = "Sincroniza los snapshots de asistencia (horarios y estudiantes) con las comisiones actuales."
 
     def add_arguments(self, parser: CommandParser) -> None:
@@ -11,11 +11,13 @@ from django.shortcuts import get_object_or_404
 from ninja import Router
 from ninja.errors import HttpError
 
+from apps.estudiantes.services.plan_catalogo import invalidar_catalogo_plan
 from core.auth_ninja import JWTAuth
 from core.models import Correlatividad, CorrelatividadVersion, CorrelatividadVersionDetalle, Materia, PlanDeEstudio
 from core.permissions import ensure_profesorado_access, require
 
 from .schemas import (
+    CorrelatividadMatrixIn,
     CorrelatividadSetIn,
     CorrelatividadSetOut,
     CorrelatividadVersionCreateIn,
@@ -41,26 +43,37 @@ def _ensure_edit(user, profesorado_id: int | None = None):
         ensure_profesorado_access(user, profesorado_id)
 
 
+_CAMPO_POR_TIPO = {
+    Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR: "regular_para_cursar",
+    Correlatividad.TipoCorrelatividad.APROBADA_PARA_CURSAR: "aprobada_para_cursar",
+    Correlatividad.TipoCorrelatividad.SIMULTANEA_PARA_CURSAR: "simultanea_para_cursar",
+    Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR: "aprobada_para_rendir",
+}
+
+
+def _set_vacio() -> dict[str, list[int]]:
+    return {campo: [] for campo in _CAMPO_POR_TIPO.values()}
+
+
 def _to_set_out(qs) -> dict[str, list[int]]:
     """Transforma un queryset de correlatividades en un diccionario categorizado por tipo."""
-    out = {
-        "regular_para_cursar": [],
-        "aprobada_para_cursar": [],
-        "simultanea_para_cursar": [],
-        "aprobada_para_rendir": [],
-    }
+    out = _set_vacio()
     for c in qs:
-        if c.tipo == Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR:
-            out["regular_para_cursar"].append(c.materia_correlativa_id)
-        elif c.tipo == Correlatividad.TipoCorrelatividad.APROBADA_PARA_CURSAR:
-            out["aprobada_para_cursar"].append(c.materia_correlativa_id)
-        elif c.tipo == Correlatividad.TipoCorrelatividad.SIMULTANEA_PARA_CURSAR:
-            out["simultanea_para_cursar"].append(c.materia_correlativa_id)
-        elif c.tipo == Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR:
-            out["aprobada_para_rendir"].append(c.materia_correlativa_id)
+        campo = _CAMPO_POR_TIPO.get(c.tipo)
+        if campo:
+            out[campo].append(c.materia_correlativa_id)
     return out
 
 
+def _aristas_de_fila(origen_id: int, fila) -> set[tuple[int, int, str]]:
+    """Aristas (origen, correlativa, tipo) declaradas en un set de correlatividades."""
+    return {
+        (origen_id, correlativa_id, tipo)
+        for tipo, campo in _CAMPO_POR_TIPO.items()
+        for correlativa_id in getattr(fila, campo)
+    }
+
+
 def _version_to_schema(version: CorrelatividadVersion) -> CorrelatividadVersionOut:
     """Serializa una versión de correlatividad a su esquema de salida JSON."""
     return CorrelatividadVersionOut(
@@ -254,6 +267,7 @@ def set_correlatividades(request, materia_id: int, payload: CorrelatividadSetIn,
                 Correlatividad.objects.bulk_create(
                     [Correlatividad(materia_origen_id=materia.id, materia_correlativa_id=mid, tipo=tipo) for mid in ids]
                 )
+        invalidar_catalogo_plan(materia.plan_de_estudio_id)
 
     qs = Correlatividad.objects.filter(materia_origen=materia)
     return _to_set_out(qs)
@@ -293,25 +307,23 @@ def _set_correlatividades_for_version(materia, version, payload):
     return _to_set_out(Correlatividad.objects.filter(materia_origen=materia, versiones__version=version))
 
 
-@router.get("/planes/{plan_id}/correlatividades_matrix", response=list[MateriaCorrelatividadRow], auth=JWTAuth())
-def correlatividades_matrix(request, plan_id: int, version_id: int | None = None, cohorte: int | None = None):
-    """
-    Genera la matriz curricular completa del plan para una versión o cohorte.
-    Retorna cada materia con su lista de requisitos, ideal para visualización de grafos o tablas.
-    """
-    plan = get_object_or_404(PlanDeEstudio, id=plan_id)
-    _ensure_view(request.user, plan.profesorado_id)
+def _matrix_rows(plan: PlanDeEstudio, version: CorrelatividadVersion | None) -> list[MateriaCorrelatividadRow]:
+    """Arma la matriz del plan con una consulta de materias y una de aristas, pivoteando en memoria."""
+    aristas = Correlatividad.objects.filter(materia_origen__plan_de_estudio=plan)
+    if version:
+        aristas = aristas.filter(versiones__version=version)
 
-    materias = plan.materias.all().order_by("anio_cursada", "nombre")
-    version = _resolve_version_for_plan(plan=plan, version_id=version_id, cohorte=cohorte)
+    por_materia: dict[int, dict[str, list[int]]] = {}
+    for origen_id, correlativa_id, tipo in aristas.order_by("id").values_list(
+        "materia_origen_id", "materia_correlativa_id", "tipo"
+    ):
+        campo = _CAMPO_POR_TIPO.get(tipo)
+        if campo:
+            por_materia.setdefault(origen_id, _set_vacio())[campo].append(correlativa_id)
 
     rows = []
-    for m in materias:
-        qs = Correlatividad.objects.filter(materia_origen=m)
-        if version:
-            qs = qs.filter(versiones__version=version)
-
-        v = _to_set_out(qs)
+    for m in plan.materias.all().order_by("anio_cursada", "nombre"):
+        v = por_materia.get(m.id) or _set_vacio()
         rows.append(
             MateriaCorrelatividadRow(
                 id=m.id,
@@ -326,3 +338,117 @@ def correlatividades_matrix(request, plan_id: int, version_id: int | None = None
             )
         )
     return rows
+
+
+@router.get("/planes/{plan_id}/correlatividades_matrix", response=list[MateriaCorrelatividadRow], auth=JWTAuth())
+def correlatividades_matrix(request, plan_id: int, version_id: int | None = None, cohorte: int | None = None):
+    """
+    Genera la matriz curricular completa del plan para una versión o cohorte.
+    Retorna cada materia con su lista de requisitos, ideal para visualización de grafos o tablas.
+    """
+    plan = get_object_or_404(PlanDeEstudio, id=plan_id)
+    _ensure_view(request.user, plan.profesorado_id)
+
+    version = _resolve_version_for_plan(plan=plan, version_id=version_id, cohorte=cohorte)
+    return _matrix_rows(plan, version)
+
+
+def _guardar_aristas_sin_version(origen_ids: list[int], deseadas: set[tuple[int, int, str]]) -> None:
+    """Modo sin versionado: las aristas del plan son directamente las filas de Correlatividad."""
+    existentes = {
+        (o, c, t): pk
+        for pk, o, c, t in Correlatividad.objects.filter(materia_origen_id__in=origen_ids).values_list(
+            "id", "materia_origen_id", "materia_correlativa_id", "tipo"
+        )
+    }
+    obsoletas = [pk for key, pk in existentes.items() if key not in deseadas]
+    if obsoletas:
+        Correlatividad.objects.filter(id__in=obsoletas).delete()
+    nuevas = deseadas - existentes.keys()
+    if nuevas:
+        Correlatividad.objects.bulk_create(
+            [Correlatividad(materia_origen_id=o, materia_correlativa_id=c, tipo=t) for o, c, t in nuevas]
+        )
+
+
+def _guardar_aristas_de_version(
+    version: CorrelatividadVersion, origen_ids: list[int], deseadas: set[tuple[int, int, str]]
+) -> None:
+    """Sincroniza los detalles de la versión; las reglas que quedan sin ninguna versión se eliminan."""
+    vinculadas = {
+        (o, c, t): (detalle_id, corr_id)
+        for detalle_id, corr_id, o, c, t in CorrelatividadVersionDetalle.objects.filter(
+            version=version, correlatividad__materia_origen_id__in=origen_ids
+        ).values_list(
+            "id",
+            "correlatividad_id",
+            "correlatividad__materia_origen_id",
+            "correlatividad__materia_correlativa_id",
+            "correlatividad__tipo",
+        )
+    }
+
+    obsoletas = [ids for key, ids in vinculadas.items() if key not in deseadas]
+    if obsoletas:
+        CorrelatividadVersionDetalle.objects.filter(id__in=[detalle_id for detalle_id, _ in obsoletas]).delete()
+        Correlatividad.objects.filter(id__in=[corr_id for _, corr_id in obsoletas], versiones__isnull=True).delete()
+
+    nuevas = deseadas - vinculadas.keys()
+    if not nuevas:
+        return
+
+    def _reglas() -> dict[tuple[int, int, str], int]:
+        return {
+            (o, c, t): pk
+            for pk, o, c, t in Correlatividad.objects.filter(materia_origen_id__in=origen_ids).values_list(
+                "id", "materia_origen_id", "materia_correlativa_id", "tipo"
+            )
+        }
+
+    reglas = _reglas()
+    faltantes = nuevas - reglas.keys()
+    if faltantes:
+        Correlatividad.objects.bulk_create(
+            [Correlatividad(materia_origen_id=o, materia_correlativa_id=c, tipo=t) for o, c, t in faltantes]
+        )
+        # bulk_create no devuelve PKs en todos los motores (MySQL): se releen.
+        reglas = _reglas()
+    CorrelatividadVersionDetalle.objects.bulk_create(
+        [CorrelatividadVersionDetalle(version=version, correlatividad_id=reglas[key]) for key in nuevas]
+    )
+
+
+@router.put("/planes/{plan_id}/correlatividades_matrix", response=list[MateriaCorrelatividadRow], auth=JWTAuth())
+def guardar_correlatividades_matrix(
+    request, plan_id: int, payload: CorrelatividadMatrixIn, version_id: int | None = None
+):
+    """
+    Guarda la matriz editada en un solo paso.
+    Compara las filas enviadas con las aristas almacenadas y aplica únicamente altas y bajas,
+    en una transacción. Las materias del plan que no vienen en el payload no se tocan.
+    """
+    plan = get_object_or_404(PlanDeEstudio, id=plan_id)
+    _ensure_edit(request.user, plan.profesorado_id)
+
+    version = _resolve_version_for_plan(plan=plan, version_id=version_id)
+
+    deseadas: set[tuple[int, int, str]] = set()
+    for fila in payload.materias:
+        deseadas |= _aristas_de_fila(fila.id, fila)
+    origen_ids = sorted({fila.id for fila in payload.materias})
+
+    referenciadas = set(origen_ids) | {correlativa_id for _, correlativa_id, _ in deseadas}
+    if referenciadas:
+        count = Materia.objects.filter(id__in=referenciadas, plan_de_estudio=plan).count()
+        if count != len(referenciadas):
+            raise HttpError(400, "Inconsistencia: se intentó vincular materias de distintos planes.")
+
+    with transaction.atomic():
+        if version:
+            _guardar_aristas_de_version(version, origen_ids, deseadas)
+        else:
+            _guardar_aristas_sin_version(origen_ids, deseadas)
+
+    # Las operaciones masivas no disparan señales: se invalida el catálogo explícitamente.
+    invalidar_catalogo_plan(plan.id)
+    return _matrix_rows(plan, version)
@@ -276,3 +276,15 @@ class MateriaCorrelatividadRow(Schema):
     aprobada_para_cursar: list[int]
     simultanea_para_cursar: list[int]
     aprobada_para_rendir: list[int]
+
+
+class MateriaCorrelatividadIn(CorrelatividadSetIn):
+    """Fila editada de la matriz: materia de origen y sus requisitos."""
+
+    id: int
+
+
+class CorrelatividadMatrixIn(Schema):
+    """Matriz completa (o parcial) enviada por coordinación para guardado masivo."""
+
+    materias: list[MateriaCorrelatividadIn]
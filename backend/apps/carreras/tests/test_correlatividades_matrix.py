@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import User
+
+from apps.carreras.correlatividades_api import correlatividades_matrix, guardar_correlatividades_matrix
+from apps.carreras.schemas import CorrelatividadMatrixIn
+from core.models import (
+    Correlatividad,
+    CorrelatividadVersion,
+    CorrelatividadVersionDetalle,
+    Materia,
+    PlanDeEstudio,
+    Profesorado,
+)
+
+pytestmark = pytest.mark.django_db
+
+RPC = Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR
+APR = Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR
+
+
+def _fake_request():
+    user = User.objects.create_superuser(username="admin_test", password="x")
+    return SimpleNamespace(user=user, headers={})
+
+
+def _plan_con_materias(cantidad):
+    profesorado = Profesorado.objects.create(nombre="Profesorado Test", duracion_anios=4)
+    plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion="R-TEST-1", anio_inicio=2020)
+    materias = [
+        Materia.objects.create(
+            plan_de_estudio=plan,
+            nombre=f"Materia {i:02d}",
+            anio_cursada=1 + i // 4,
+            formato=Materia.FormatoMateria.ASIGNATURA,
+            regimen=Materia.TipoCursada.ANUAL,
+        )
+        for i in range(cantidad)
+    ]
+    return plan, materias
+
+
+class TestCorrelatividadesMatrix:
+    def test_matriz_en_cantidad_fija_de_consultas(self, django_assert_max_num_queries):
+        plan, materias = _plan_con_materias(12)
+        for anterior, siguiente in zip(materias, materias[1:], strict=False):
+            Correlatividad.objects.create(materia_origen=siguiente, materia_correlativa=anterior, tipo=RPC)
+        request = _fake_request()
+
+        # plan + versión vigente + aristas + materias, sin importar el tamaño del plan
+        with django_assert_max_num_queries(4):
+            rows = correlatividades_matrix(request, plan.id)
+
+        por_id = {row.id: row for row in rows}
+        assert len(rows) == 12
+        assert por_id[materias[0].id].regular_para_cursar == []
+        assert por_id[materias[5].id].regular_para_cursar == [materias[4].id]
+
+    def test_guardado_masivo_aplica_solo_diferencias(self):
+        plan, (a, b, c) = _plan_con_materias(3)
+        conservada = Correlatividad.objects.create(materia_origen=c, materia_correlativa=a, tipo=RPC)
+        Correlatividad.objects.create(materia_origen=c, materia_correlativa=b, tipo=APR)
+        payload = CorrelatividadMatrixIn(
+            materias=[{"id": c.id, "regular_para_cursar": [a.id, b.id]}, {"id": b.id, "aprobada_para_rendir": [a.id]}]
+        )
+
+        rows = guardar_correlatividades_matrix(_fake_request(), plan.id, payload)
+
+        aristas = set(Correlatividad.objects.values_list("materia_origen_id", "materia_correlativa_id", "tipo"))
+        assert aristas == {(c.id, a.id, RPC), (c.id, b.id, RPC), (b.id, a.id, APR)}
+        assert Correlatividad.objects.filter(id=conservada.id).exists()
+        assert {row.id: row.regular_para_cursar for row in rows}[c.id] == [a.id, b.id]
+
+    def test_guardado_por_version_no_afecta_otras_versiones(self):
+        plan, (a, b, c) = _plan_con_materias(3)
+        v1 = CorrelatividadVersion.objects.create(
+            plan_de_estudio=plan, profesorado=plan.profesorado, nombre="2020", cohorte_desde=2020, cohorte_hasta=2023
+        )
+        v2 = CorrelatividadVersion.objects.create(
+            plan_de_estudio=plan, profesorado=plan.profesorado, nombre="2024", cohorte_desde=2024
+        )
+        compartida = Correlatividad.objects.create(materia_origen=c, materia_correlativa=a, tipo=RPC)
+        CorrelatividadVersionDetalle.objects.create(version=v1, correlatividad=compartida)
+        CorrelatividadVersionDetalle.objects.create(version=v2, correlatividad=compartida)
+
+        payload = CorrelatividadMatrixIn(materias=[{"id": c.id, "regular_para_cursar": [b.id]}])
+        guardar_correlatividades_matrix(_fake_request(), plan.id, payload, version_id=v2.id)
+
+        def aristas(version):
+            return set(version.detalles.values_list("correlatividad__materia_correlativa_id", "correlatividad__tipo"))
+
+        assert aristas(v1) == {(a.id, RPC)}
+        assert aristas(v2) == {(b.id, RPC)}
+        assert Correlatividad.objects.filter(id=compartida.id).exists()
@@ -11,6 +11,7 @@ from ninja import Router
 from ninja.errors import HttpError
 
 from apps.common.api_schemas import AuditLogItem, AuditLogList
+from apps.common.renderers import trusted_response
 from core.auth_ninja import JWTAuth
 from core.models import AuditLog
 from core.permissions import require
@@ -63,6 +64,7 @@ def _serialize_log(log: AuditLog, *, include_payload: bool) -> AuditLogItem:
 
 
 @router.get("/logs", response=AuditLogList)
+@trusted_response
 def listar_logs(
     request,
     usuario_id: int | None = None,
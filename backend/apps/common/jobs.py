@@ -0,0 +1,261 @@
+"""
+Cola de tareas en segundo plano respaldada por la base de datos.
+
+Un endpoint pesado registra la tarea con `enqueue()` y responde 202 con su id; el
+comando `run_worker` la reclama y ejecuta el manejador registrado con `@job_handler`.
+El reclamo usa `SELECT ... FOR UPDATE SKIP LOCKED` donde el motor lo soporta (MySQL 8)
+y, en SQLite, un UPDATE condicional sobre el estado. Los errores se reintentan con
+espera exponencial hasta `max_attempts`. Mientras el manejador corre, un latido renueva
+`locked_at` para que `requeue_stale` no devuelva a la cola una tarea que sigue viva.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+# Módulos que registran manejadores; se importan antes de ejecutar la primera tarea.
+HANDLER_MODULES = (
+    "apps.estudiantes.services.auditoria_academica",
+    "apps.estudiantes.services.exportaciones_pdf",
+    "apps.mensajeria.services",
+)
+
+JOB_HANDLERS: dict[str, Callable[[BackgroundJob], object]] = {}
+
+
+@dataclass
+class JobFile:
+    """Resultado descargable de una tarea: el contenido en memoria o, para archivos
+    grandes, la ruta de un temporal que se mueve al almacenamiento y luego se borra."""
+
+    filename: str
+    content: bytes = b""
+    content_type: str = "application/octet-stream"
+    path: str = ""
+
+
+def job_handler(kind: str):
+    """Registra la función que ejecuta las tareas de tipo `kind`. Recibe la tarea y devuelve
+    un dict serializable, un `JobFile` o None."""
+
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+
+    return decorator
+
+
+def load_handlers() -> None:
+    for module in getattr(settings, "JOBS_HANDLER_MODULES", HANDLER_MODULES):
+        import_module(module)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(
+    kind: str,
+    payload: dict | None = None,
+    *,
+    user=None,
+    run_after=None,
+    max_attempts: int = 3,
+) -> BackgroundJob:
+    """Registra la tarea. Dentro de una transacción solo se ve al confirmarla."""
+    return BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        run_after=run_after or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def set_progress(job: BackgroundJob, progress: int, message: str = "") -> None:
+    job.progress = max(0, min(100, int(progress)))
+    job.progress_message = message[:255]
+    job.locked_at = timezone.now()  # el avance también cuenta como latido
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        progress=job.progress, progress_message=job.progress_message, locked_at=job.locked_at
+    )
+
+
+def lock_timeout() -> timedelta:
+    """Tiempo sin latido tras el cual una tarea en ejecución se considera abandonada."""
+    return timedelta(seconds=getattr(settings, "JOBS_LOCK_TIMEOUT_SECONDS", 1800))
+
+
+@contextmanager
+def heartbeat(job: BackgroundJob):
+    """Renueva `locked_at` desde un hilo aparte mientras dura el bloque (cuatro veces por
+    período de `lock_timeout()`, como mucho una vez por minuto)."""
+    intervalo = min(60.0, lock_timeout().total_seconds() / 4)
+    detener = threading.Event()
+
+    def latir():
+        try:
+            while not detener.wait(intervalo):
+                BackgroundJob.objects.filter(
+                    pk=job.pk, status=BackgroundJob.Status.RUNNING, locked_by=job.locked_by
+                ).update(locked_at=timezone.now())
+        except Exception:
+            logger.exception("Falló el latido de la tarea %s", job.pk)
+        finally:
+            connection.close()
+
+    hilo = threading.Thread(target=latir, name=f"job-heartbeat-{job.pk}", daemon=True)
+    hilo.start()
+    try:
+        yield
+    finally:
+        detener.set()
+        hilo.join()
+
+
+def backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS))
+
+
+def _pendientes(kinds: Iterable[str] | None):
+    qs = BackgroundJob.objects.filter(status=BackgroundJob.Status.QUEUED, run_after__lte=timezone.now())
+    if kinds:
+        qs = qs.filter(kind__in=list(kinds))
+    return qs.order_by("run_after", "id")
+
+
+def claim_job(worker_id: str, kinds: Iterable[str] | None = None) -> BackgroundJob | None:
+    """Reclama la próxima tarea lista y la marca en ejecución."""
+    ahora = timezone.now()
+    cambios = {
+        "status": BackgroundJob.Status.RUNNING,
+        "locked_by": worker_id,
+        "locked_at": ahora,
+        "started_at": ahora,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _pendientes(kinds).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            BackgroundJob.objects.filter(pk=job.pk).update(attempts=F("attempts") + 1, **cambios)
+    else:
+        # Sin SKIP LOCKED: gana el worker cuyo UPDATE condicional encuentra la fila aún en cola.
+        job = None
+        for job_id in _pendientes(kinds).values_list("id", flat=True)[:10]:
+            if BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.Status.QUEUED).update(
+                attempts=F("attempts") + 1, **cambios
+            ):
+                job = BackgroundJob(pk=job_id)
+                break
+        if job is None:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job: BackgroundJob) -> BackgroundJob:
+    """Ejecuta una tarea reclamada y registra su resultado o el reintento."""
+    if job.kind not in JOB_HANDLERS:
+        load_handlers()
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No hay manejador registrado para '{job.kind}'.")
+        with heartbeat(job):
+            result = handler(job)
+    except Exception as exc:
+        logger.exception("Error ejecutando la tarea %s (%s)", job.pk, job.kind)
+        job.error = str(exc)[:2000]
+        job.locked_by = ""
+        if job.attempts < job.max_attempts:
+            job.status = BackgroundJob.Status.QUEUED
+            job.run_after = timezone.now() + backoff(job.attempts)
+        else:
+            job.status = BackgroundJob.Status.FAILED
+            job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "locked_by", "run_after", "finished_at"])
+        return job
+
+    if isinstance(result, JobFile):
+        if result.path:
+            try:
+                with open(result.path, "rb") as fh:
+                    job.result_file.save(result.filename, File(fh), save=False)
+                size = os.path.getsize(result.path)
+            finally:
+                os.remove(result.path)
+        else:
+            job.result_file.save(result.filename, ContentFile(result.content), save=False)
+            size = len(result.content)
+        job.result_filename = result.filename
+        job.result_content_type = result.content_type
+        job.result = {"filename": result.filename, "size": size}
+    else:
+        job.result = result
+    job.status = BackgroundJob.Status.DONE
+    job.progress = 100
+    job.error = ""
+    job.locked_by = ""
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "progress",
+            "result",
+            "result_file",
+            "result_filename",
+            "result_content_type",
+            "error",
+            "locked_by",
+            "finished_at",
+        ]
+    )
+    return job
+
+
+def requeue_stale(timeout: timedelta | None = None, exclude_workers: Iterable[str] = ()) -> int:
+    """Devuelve a la cola las tareas de un worker que murió sin terminarlas. `exclude_workers`
+    son los hilos vivos del proceso que llama: sus tareas no se tocan aunque falte el latido."""
+    timeout = timeout or lock_timeout()
+    vencidas = BackgroundJob.objects.filter(
+        status=BackgroundJob.Status.RUNNING, locked_at__lt=timezone.now() - timeout
+    ).exclude(locked_by__in=list(exclude_workers))
+    fallidas = vencidas.filter(attempts__gte=F("max_attempts")).update(
+        status=BackgroundJob.Status.FAILED,
+        locked_by="",
+        finished_at=timezone.now(),
+        error="El worker no terminó la tarea.",
+    )
+    return fallidas + vencidas.update(status=BackgroundJob.Status.QUEUED, locked_by="")
+
+
+def run_pending(worker_id: str | None = None, kinds: Iterable[str] | None = None) -> int:
+    """Ejecuta tareas hasta vaciar la cola lista. Devuelve cuántas procesó."""
+    worker_id = worker_id or default_worker_id()
+    procesadas = 0
+    while (job := claim_job(worker_id, kinds)) is not None:
+        run_job(job)
+        procesadas += 1
+    return procesadas
@@ -0,0 +1,85 @@
+"""
+Estado y resultado de las tareas en segundo plano.
+
+Los endpoints que encolan una tarea responden 202 con su id; el cliente consulta aquí
+el avance y, cuando la tarea deja un archivo, lo descarga sin ocupar un worker web
+durante la generación.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from django.http import FileResponse
+from ninja import Router, Schema
+
+from apps.common.api_schemas import ApiResponse
+from core.auth_ninja import JWTAuth
+from core.models import BackgroundJob
+from core.permissions import can
+
+router = Router(tags=["jobs"], auth=JWTAuth())
+
+
+class JobOut(Schema):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    progress_message: str
+    attempts: int
+    max_attempts: int
+    result: Any | None = None
+    error: str
+    has_file: bool
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+def _job_visible(request, job_id: int) -> BackgroundJob | None:
+    """Cada usuario ve sus tareas; el administrador del sistema, todas."""
+    job = BackgroundJob.objects.filter(pk=job_id).first()
+    if job and (job.created_by_id == request.user.id or can(request.user, "admin_sistema")):
+        return job
+    return None
+
+
+@router.get("/{job_id}", response={200: JobOut, 404: ApiResponse})
+def job_status(request, job_id: int):
+    """Estado, avance y resultado de una tarea."""
+    job = _job_visible(request, job_id)
+    if not job:
+        return 404, ApiResponse(ok=False, message="Tarea no encontrada.")
+    return 200, JobOut(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress,
+        progress_message=job.progress_message,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        result=job.result,
+        error=job.error if job.status == BackgroundJob.Status.FAILED else "",
+        has_file=bool(job.result_file),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.get("/{job_id}/resultado", response={404: ApiResponse, 409: ApiResponse})
+def job_result_download(request, job_id: int):
+    """Descarga el archivo generado por la tarea."""
+    job = _job_visible(request, job_id)
+    if not job:
+        return 404, ApiResponse(ok=False, message="Tarea no encontrada.")
+    if job.status != BackgroundJob.Status.DONE:
+        return 409, ApiResponse(ok=False, message="La tarea todavía no terminó.")
+    if not job.result_file:
+        return 404, ApiResponse(ok=False, message="La tarea no generó un archivo.")
+    return FileResponse(
+        job.result_file.open("rb"),
+        as_attachment=True,
+        filename=job.result_filename or None,
+        content_type=job.result_content_type or "application/octet-stream",
+    )
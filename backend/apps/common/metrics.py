@@ -0,0 +1,234 @@
+"""
+Métricas Prometheus para el endpoint `/metrics`.
+
+Latencia y códigos de estado de las requests, consultas SQL por ruta, tiempo de render
+de PDF, aciertos de caché y conexiones a la base de cada worker se registran en el
+proceso con `prometheus_client`. Con gunicorn, `PROMETHEUS_MULTIPROC_DIR` hace que cada
+worker escriba sus muestras en ese directorio y el scrape las sume todas (ver
+`config/gunicorn.py`, que vacía el directorio al arrancar y marca los workers muertos).
+
+La cola de tareas y la última corrida de cada comando de mantenimiento se leen de la
+base al momento del scrape, así que son correctas sin importar qué proceso hizo el
+trabajo.
+"""
+
+import glob
+import hmac
+import os
+import threading
+import time
+import weakref
+from collections import Counter as Tally
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import Count, Min
+from django.http import HttpResponse, HttpResponseNotFound
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "ipes_http_request_duration_seconds",
+    "Latencia de las requests por ruta.",
+    ["method", "route"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS = Counter("ipes_http_requests", "Requests por ruta y código de estado.", ["method", "route", "status"])
+DB_QUERIES = Counter("ipes_db_queries", "Consultas SQL ejecutadas por ruta.", ["route"])
+DB_SECONDS = Counter("ipes_db_query_seconds", "Tiempo en consultas SQL por ruta.", ["route"])
+PDF_RENDER = Histogram(
+    "ipes_pdf_render_duration_seconds",
+    "Tiempo de render de WeasyPrint por documento.",
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+CACHE_REQUESTS = Counter("ipes_cache_requests", "Búsquedas en caché por resultado (hit/miss).", ["cache", "result"])
+DB_CONNECTIONS_OPENED = Counter(
+    "ipes_db_connections_opened", "Conexiones nuevas a la base (con CONN_MAX_AGE no debería crecer).", ["alias"]
+)
+DB_CONNECTIONS_OPEN = Gauge(
+    "ipes_db_connections_open",
+    "Conexiones a la base abiertas en cada worker.",
+    ["alias"],
+    multiprocess_mode="liveall",
+)
+
+# Las conexiones son por hilo: se guardan referencias débiles para contar las abiertas.
+_wrappers = weakref.WeakSet()
+_wrappers_lock = threading.Lock()
+
+
+def _connection_created(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+    with _wrappers_lock:
+        _wrappers.add(connection)
+
+
+connection_created.connect(_connection_created, dispatch_uid="apps.common.metrics.connection_created")
+
+
+def update_connection_gauge() -> None:
+    with _wrappers_lock:
+        wrappers = list(_wrappers)
+    open_by_alias = Tally(w.alias for w in wrappers if w.connection is not None)
+    for alias in settings.DATABASES:
+        DB_CONNECTIONS_OPEN.labels(alias).set(open_by_alias.get(alias, 0))
+
+
+def observe_request(method: str, route: str | None, status: int, seconds: float, query_stats=None) -> None:
+    route = route or UNMATCHED_ROUTE
+    REQUEST_LATENCY.labels(method, route).observe(seconds)
+    REQUESTS.labels(method, route, str(status)).inc()
+    if query_stats is not None:
+        DB_QUERIES.labels(route).inc(query_stats.count)
+        DB_SECONDS.labels(route).inc(query_stats.duration)
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def descartar_multiproceso() -> None:
+    """
+    Para procesos auxiliares de un worker (el pool de PDF) que heredan
+    `PROMETHEUS_MULTIPROC_DIR` pero no registran métricas: borra los archivos que el
+    import ya creó con su pid, que gunicorn nunca marcaría, y deja de escribir en el
+    directorio compartido.
+    """
+    directorio = os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    if directorio:
+        for ruta in glob.glob(os.path.join(directorio, f"*_{os.getpid()}.db")):
+            os.remove(ruta)
+
+
+# --- Comandos de mantenimiento ---
+
+
+@contextmanager
+def track_command(name: str):
+    """Registra en `CommandRun` la duración y el resultado de una corrida del comando."""
+    from core.models import CommandRun
+
+    started_at = timezone.now()
+    start = time.perf_counter()
+    error = ""
+    try:
+        yield
+    except BaseException as exc:
+        error = repr(exc)[:2000]
+        raise
+    finally:
+        finished_at = timezone.now()
+        defaults = {
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "duration_seconds": time.perf_counter() - start,
+            "success": not error,
+            "error": error,
+        }
+        if not error:
+            defaults["last_success_at"] = finished_at
+        CommandRun.objects.update_or_create(command=name, defaults=defaults)
+
+
+class TrackedCommandMixin:
+    """Mixin para los comandos de cron: `class Command(TrackedCommandMixin, BaseCommand)`."""
+
+    def execute(self, *args, **options):
+        with track_command(self.__module__.rsplit(".", 1)[-1]):
+            return super().execute(*args, **options)
+
+
+# --- Colectores leídos al momento del scrape ---
+
+
+class DatabaseCollector:
+    """Profundidad de la cola de tareas y estado de los comandos de mantenimiento, leídos de la base."""
+
+    def collect(self):
+        from core.models import BackgroundJob, CommandRun
+
+        depth = GaugeMetricFamily(
+            "ipes_jobs", "Tareas en segundo plano en espera o en curso.", labels=["kind", "status"]
+        )
+        pendientes = (
+            BackgroundJob.objects.filter(status__in=[BackgroundJob.Status.QUEUED, BackgroundJob.Status.RUNNING])
+            .values("kind", "status")
+            .annotate(total=Count("id"), oldest=Min("run_after"))
+            .order_by("kind", "status")
+        )
+        oldest = GaugeMetricFamily(
+            "ipes_jobs_oldest_queued_age_seconds", "Antigüedad de la tarea lista más vieja.", labels=["kind"]
+        )
+        now = timezone.now()
+        for row in pendientes:
+            depth.add_metric([row["kind"], row["status"]], row["total"])
+            if row["status"] == BackgroundJob.Status.QUEUED:
+                oldest.add_metric([row["kind"]], max((now - row["oldest"]).total_seconds(), 0))
+        yield depth
+        yield oldest
+
+        last_run = GaugeMetricFamily(
+            "ipes_command_last_run_timestamp_seconds", "Fin de la última corrida de cada comando.", labels=["command"]
+        )
+        duration = GaugeMetricFamily(
+            "ipes_command_last_duration_seconds", "Duración de la última corrida de cada comando.", labels=["command"]
+        )
+        success = GaugeMetricFamily(
+            "ipes_command_last_success", "1 si la última corrida de cada comando fue exitosa.", labels=["command"]
+        )
+        last_success = GaugeMetricFamily(
+            "ipes_command_last_success_timestamp_seconds",
+            "Fin de la última corrida exitosa de cada comando.",
+            labels=["command"],
+        )
+        for run in CommandRun.objects.order_by("command"):
+            last_run.add_metric([run.command], _timestamp(run.finished_at))
+            duration.add_metric([run.command], run.duration_seconds)
+            success.add_metric([run.command], 1 if run.success else 0)
+            if run.last_success_at:
+                last_success.add_metric([run.command], _timestamp(run.last_success_at))
+        yield last_run
+        yield duration
+        yield success
+        yield last_success
+
+
+def _timestamp(value) -> float:
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value.timestamp()
+
+
+def render_metrics() -> bytes:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    database = CollectorRegistry()
+    database.register(DatabaseCollector())
+    return generate_latest(registry) + generate_latest(database)
+
+
+def metrics_view(request):
+    """Exposición en texto de Prometheus, protegida con `Authorization: Bearer <METRICS_TOKEN>`."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponseNotFound()
+    provided = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(provided.encode(), token.encode()):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,261 @@
+"""
+Generación de PDF con WeasyPrint en un pool de procesos precalentados.
+
+La vista renderiza la plantilla Django y envía el HTML a un proceso del pool, que ya
+tiene cargada la configuración de fuentes y, en su caché de imágenes, los logos
+institucionales. Cada render tiene un tiempo máximo y cada proceso un tope de
+memoria: un render colgado se corta reiniciando el pool, sin dejar bloqueado el hilo
+de gunicorn ni inflar la memoria del worker web.
+
+Con `PDF_RENDER_PROCESSES = 0` se renderiza en el mismo proceso (desarrollo y tests).
+
+`pdf_response()` además guarda cada PDF en `MEDIA_ROOT/pdf_cache/` con el hash de su
+HTML como nombre: una descarga repetida con los mismos datos cuesta un hash y la
+lectura del archivo (o un 304 si el navegador ya lo tiene).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from apps.common.constants import AppErrorCode
+from apps.common.errors import AppError
+from apps.common.metrics import PDF_RENDER, cache_result, descartar_multiproceso
+
+logger = logging.getLogger(__name__)
+
+LOGO_LEFT = "static/logos/escudo_ministerio_tdf.png"
+LOGO_RIGHT = "static/logos/logo_ipes.jpg"
+PDF_CACHE_DIR = "pdf_cache"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Estado de cada proceso renderizador (o del proceso web sin pool).
+_font_config = None
+_image_cache: dict = {}
+
+
+@lru_cache(maxsize=1)
+def logo_paths() -> tuple[str, str]:
+    """Rutas absolutas del escudo y del logo IPES para el encabezado de los PDF."""
+    left = os.path.join(settings.BASE_DIR, LOGO_LEFT)
+    right = os.path.join(settings.BASE_DIR, LOGO_RIGHT)
+    # En algunos despliegues BASE_DIR apunta a la raíz del repositorio.
+    if not os.path.exists(left):
+        left = os.path.join(settings.BASE_DIR, "backend", LOGO_LEFT)
+        right = os.path.join(settings.BASE_DIR, "backend", LOGO_RIGHT)
+    return left, right
+
+
+def _init_renderer(memoria_mb: int, assets: list[str]) -> None:
+    """Inicializa un proceso del pool: tope de memoria, fuentes e imágenes precargadas."""
+    global _font_config
+    if memoria_mb:
+        try:
+            import resource
+
+            limite = memoria_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+        except (ImportError, ValueError, OSError):
+            logger.warning("No se pudo fijar el tope de memoria del renderizador PDF")
+
+    from weasyprint import HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    _font_config = FontConfiguration()
+    # Render de calentamiento: carga fuentes y deja decodificadas las imágenes en la caché.
+    imagenes = "".join(f'<img src="file://{path}">' for path in assets if os.path.exists(path))
+    HTML(string=f"<p>IPES</p>{imagenes}").write_pdf(font_config=_font_config, cache=_image_cache)
+
+
+def _init_pool(memoria_mb: int, assets: list[str]) -> None:
+    # El tiempo de render lo mide el worker web; el proceso del pool no publica métricas.
+    descartar_multiproceso()
+    _init_renderer(memoria_mb, assets)
+
+
+def _write_pdf(html: str, base_url: str | None) -> bytes:
+    from weasyprint import HTML
+
+    if _font_config is None:
+        _init_renderer(0, list(logo_paths()))
+    return HTML(string=html, base_url=base_url).write_pdf(font_config=_font_config, cache=_image_cache)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: los procesos no heredan conexiones a la base ni hilos del worker web.
+            _pool = multiprocessing.get_context("spawn").Pool(
+                processes=settings.PDF_RENDER_PROCESSES,
+                initializer=_init_pool,
+                initargs=(settings.PDF_RENDER_MEMORY_MB, list(logo_paths())),
+                maxtasksperchild=settings.PDF_RENDER_MAX_TASKS,
+            )
+        return _pool
+
+
+def _reset_pool(pool) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.terminate()
+
+
+def html_to_pdf(html: str, *, base_url: str | None = None) -> bytes:
+    """Convierte HTML en PDF en el pool precalentado, con tiempo y memoria acotados."""
+    with PDF_RENDER.time():
+        return _html_to_pdf(html, base_url)
+
+
+def _html_to_pdf(html: str, base_url: str | None) -> bytes:
+    if not settings.PDF_RENDER_PROCESSES:
+        return _write_pdf(html, base_url)
+
+    pool = _get_pool()
+    resultado = pool.apply_async(_write_pdf, (html, base_url))
+    try:
+        return resultado.get(timeout=settings.PDF_RENDER_TIMEOUT)
+    except multiprocessing.TimeoutError as exc:
+        logger.error("Render PDF excedió %ss; se reinicia el pool", settings.PDF_RENDER_TIMEOUT)
+        _reset_pool(pool)
+        raise AppError(503, AppErrorCode.SERVICE_UNAVAILABLE, "La generación del PDF tardó demasiado.") from exc
+    except MemoryError as exc:
+        raise AppError(
+            503, AppErrorCode.SERVICE_UNAVAILABLE, "El PDF excede la memoria disponible para generarlo."
+        ) from exc
+
+
+def render_html(template_name: str, context: dict) -> str:
+    """Renderiza la plantilla con los logos del encabezado."""
+    left, right = logo_paths()
+    return render_to_string(template_name, {"logo_left_path": left, "logo_right_path": right, **context})
+
+
+def render_pdf(template_name: str, context: dict, *, base_url: str | None = None) -> bytes:
+    """Renderiza la plantilla y la convierte en PDF."""
+    return html_to_pdf(render_html(template_name, context), base_url=base_url)
+
+
+# --- Caché de PDF direccionada por contenido ---
+
+
+def _cache_dir() -> str:
+    return os.path.join(settings.MEDIA_ROOT, PDF_CACHE_DIR)
+
+
+def pdf_cache_key(template_name: str, html: str) -> str:
+    """Clave de la caché: plantilla, versión de las plantillas y hash del HTML ya renderizado
+    (que refleja todos los datos del contexto que el documento usa)."""
+    digest = hashlib.sha256()
+    for parte in (template_name, str(settings.PDF_TEMPLATE_VERSION), html):
+        digest.update(parte.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _evict(max_bytes: int) -> None:
+    """Borra los PDF usados hace más tiempo hasta quedar bajo el 90% del tope."""
+    archivos = []
+    total = 0
+    for raiz, _, nombres in os.walk(_cache_dir()):
+        for nombre in nombres:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                st = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            archivos.append((st.st_atime, st.st_size, ruta))
+            total += st.st_size
+    if total <= max_bytes:
+        return
+    for _, tamanio, ruta in sorted(archivos):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total -= tamanio
+        if total <= max_bytes * 0.9:
+            break
+
+
+def _cache_path(clave: str) -> str:
+    return os.path.join(_cache_dir(), clave[:2], f"{clave}.pdf")
+
+
+def cached_pdf(template_name: str, html: str, *, base_url: str | None = None) -> tuple[bytes, float]:
+    """Devuelve el PDF de la caché (y su fecha de creación), generándolo si no existe."""
+    ruta = _cache_path(pdf_cache_key(template_name, html))
+    try:
+        with open(ruta, "rb") as fh:
+            contenido = fh.read()
+        st = os.stat(ruta)
+        os.utime(ruta, (time.time(), st.st_mtime))  # marca de uso para el desalojo
+        cache_result("pdf", True)
+        return contenido, st.st_mtime
+    except FileNotFoundError:
+        pass
+
+    cache_result("pdf", False)
+
+    contenido = html_to_pdf(html, base_url=base_url)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, "wb") as fh:
+        fh.write(contenido)
+    os.replace(temporal, ruta)
+    _evict(settings.PDF_CACHE_MAX_MB * 1024 * 1024)
+    return contenido, time.time()
+
+
+def pdf_response(
+    request,
+    template_name: str,
+    context: dict,
+    *,
+    filename: str,
+    inline: bool = False,
+    base_url: str | None = None,
+) -> HttpResponse:
+    """
+    Respuesta PDF con caché por contenido. Lleva `ETag` y `Last-Modified`; si el cliente ya
+    tiene esa versión (`If-None-Match`) responde 304 sin generar ni leer el archivo.
+    No conviene para documentos que imprimen la hora de generación: cada minuto
+    sería una clave nueva.
+    """
+    html = render_html(template_name, context)
+    clave = pdf_cache_key(template_name, html)
+    etag = f'"{clave}"'
+    try:
+        last_modified = os.path.getmtime(_cache_path(clave))
+    except FileNotFoundError:
+        last_modified = None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        cache_result("pdf", True)  # 304: el navegador ya tiene el documento
+    else:
+        contenido, last_modified = cached_pdf(template_name, html, base_url=base_url)
+        response = HttpResponse(contenido, content_type="application/pdf")
+        disposicion = "inline" if inline else "attachment"
+        response["Content-Disposition"] = f'{disposicion}; filename="{filename}"'
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
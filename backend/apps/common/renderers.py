@@ -0,0 +1,64 @@
+"""
+Serialización JSON rápida para la API.
+
+`ORJSONRenderer` reemplaza al renderer por defecto de Ninja (json.dumps con
+NinjaJSONEncoder) por orjson, que serializa en C los dicts, listas, números y strings.
+Las fechas pasan por el encoder de Django para conservar el formato de siempre
+(milisegundos, `Z` en UTC) y lo que orjson no conoce (esquemas Pydantic, Decimal,
+textos traducibles) cae en NinjaJSONEncoder.
+
+`trusted_response` es el atajo opt-in por operación: lo que devuelve el view se
+serializa directamente, sin que Ninja lo vuelva a validar contra el esquema de
+respuesta ni lo convierta a dict. Solo para views que ya devuelven instancias del
+esquema (construidas a partir de querysets propios): el `response=` declarado sigue
+documentando la operación en OpenAPI pero deja de validarse, y las opciones
+`by_alias`/`exclude_none` de la operación no se aplican.
+"""
+
+import inspect
+from functools import wraps
+
+import orjson
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+_OPCIONES = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+_encoder = NinjaJSONEncoder()
+
+
+def dumps(data) -> bytes:
+    return orjson.dumps(data, default=_encoder.default, option=_OPCIONES)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+
+    def render(self, request, data, *, response_status):
+        return dumps(data)
+
+
+CONTENT_TYPE = f"{ORJSONRenderer.media_type}; charset={ORJSONRenderer.charset}"
+
+
+def trusted_response(view):
+    """
+    Decorador para endpoints Django Ninja que devuelven datos ya validados.
+    Uso (debajo del decorador del router): @trusted_response
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        result = view(request, *args, **kwargs)
+        if isinstance(result, HttpResponseBase):
+            return result
+        status = 200
+        if isinstance(result, tuple) and len(result) == 2:
+            status, result = result
+        return HttpResponse(dumps(result), status=status, content_type=CONTENT_TYPE)
+
+    # Ninja resuelve las anotaciones con los globals de la función que recibe: se fija la
+    # firma ya resuelta del view (que puede usar `from __future__ import annotations`).
+    wrapper.__signature__ = inspect.signature(view, eval_str=True)
+    return wrapper
@@ -0,0 +1,155 @@
+"""
+Captura de consultas SQL lentas para `QueryBudgetMiddleware`.
+
+Cada sentencia más lenta que `SLOW_QUERY_MS` se normaliza en una huella (literales,
+placeholders y listas `IN (...)` colapsados) y se acumula en un `SystemLog` de tipo
+`SLOW_QUERY` por huella: cantidad de ejecuciones, percentiles de duración sobre las
+últimas muestras, rutas que la ejecutaron y la última ruta, request_id y parámetros. A
+una muestra de los SELECT se les corre `EXPLAIN` (`EXPLAIN QUERY PLAN` en SQLite), para
+que los índices faltantes aparezcan con los parámetros reales. Los registros se listan
+en la API de logs del sistema (`/api/system/logs?tipo=SLOW_QUERY`); al resolver uno,
+la acumulación vuelve a empezar.
+"""
+
+import hashlib
+import logging
+import math
+import random
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+LOG_TYPE = "SLOW_QUERY"
+SAMPLES = 200  # últimas duraciones guardadas por huella para los percentiles
+MAX_PER_REQUEST = 5  # sentencias lentas registradas por request
+MAX_PARAMS = 20
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    params: object
+    ms: float
+    alias: str
+    many: bool = False
+
+
+def fingerprint(sql: str) -> tuple[str, str]:
+    """Sentencia normalizada y su digest: consultas que solo difieren en los valores comparten ambos."""
+    text = _STRING.sub("?", sql.replace("%s", "?"))
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("IN (...)", text)
+    text = _SPACES.sub(" ", text).strip()
+    return text, hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _plain(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return str(value)[:200]
+
+
+def _params(query: SlowQuery) -> list | None:
+    if query.many or query.params is None:
+        return None
+    if isinstance(query.params, dict):
+        return [f"{k}={_plain(v)}" for k, v in list(query.params.items())[:MAX_PARAMS]]
+    return [_plain(p) for p in list(query.params)[:MAX_PARAMS]]
+
+
+def explain(query: SlowQuery) -> list[dict] | None:
+    """Plan de ejecución de un SELECT con sus parámetros originales; None si no se puede obtener."""
+    if query.many or not query.sql.lstrip().upper().startswith("SELECT"):
+        return None
+    connection = connections[query.alias]
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + query.sql, query.params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, map(_plain, row), strict=False)) for row in cursor.fetchall()]
+    except Exception:
+        logger.warning("No se pudo obtener el EXPLAIN de una consulta lenta", exc_info=True)
+        return None
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def _open_log(digest: str):
+    from core.models import SystemLog
+
+    logs = SystemLog.objects.filter(tipo=LOG_TYPE, resuelto=False)
+    log_id = cache.get(f"slow_query:{digest}")
+    if log_id is not None:
+        log = logs.filter(id=log_id).first()
+        if log is not None:
+            return log
+    return logs.filter(metadata__fingerprint=digest).order_by("id").first()
+
+
+def record(request, route: str, query: SlowQuery) -> None:
+    from core.models import SystemLog
+
+    normalized, digest = fingerprint(query.sql)
+    log = _open_log(digest)
+    plan = None
+    if log is None or "explain" not in log.metadata or random.random() < settings.SLOW_QUERY_EXPLAIN_RATE:
+        plan = explain(query)
+
+    with transaction.atomic(using="default"):
+        if log is not None:
+            log = SystemLog.objects.select_for_update().filter(id=log.id).first()
+        if log is None:
+            log = SystemLog(
+                tipo=LOG_TYPE,
+                metadata={"fingerprint": digest, "sql": normalized[:4000], "count": 0, "samples": [], "routes": {}},
+            )
+        meta = log.metadata
+        meta["count"] += 1
+        meta["samples"] = (meta["samples"] + [round(query.ms, 1)])[-SAMPLES:]
+        ordered = sorted(meta["samples"])
+        meta["p50_ms"] = _percentile(ordered, 50)
+        meta["p95_ms"] = _percentile(ordered, 95)
+        meta["p99_ms"] = _percentile(ordered, 99)
+        meta["max_ms"] = max(meta.get("max_ms", 0), round(query.ms, 1))
+        meta["routes"][route] = meta["routes"].get(route, 0) + 1
+        meta["last"] = {
+            "route": route,
+            "path": request.path,
+            "request_id": getattr(request, "request_id", None),
+            "params": _params(query),
+            "ms": round(query.ms, 1),
+        }
+        if plan is not None:
+            meta["explain"] = plan
+        log.mensaje = f"{meta['count']} ejecuciones lentas (p95 {meta['p95_ms']} ms): {normalized[:200]}"
+        log.save()
+    cache.set(f"slow_query:{digest}", log.id, 24 * 3600)
+
+
+def record_slow_queries(request, route: str, queries: list[SlowQuery]) -> None:
+    for query in queries:
+        try:
+            record(request, route, query)
+        except Exception:
+            logger.exception("No se pudo registrar una consulta lenta de %s", route)
@@ -34,9 +34,11 @@ class SystemLogOut(Schema):
 
 @router.get("/", response=list[SystemLogOut])
 @requires("admin_sistema")
-def list_system_logs(request, resuelto: bool = False):
-    """Lista las alertas del sistema, filtrando por estado de resolución."""
+def list_system_logs(request, resuelto: bool = False, tipo: str | None = None):
+    """Lista las alertas del sistema, filtrando por estado de resolución y tipo (p. ej. SLOW_QUERY)."""
     qs = SystemLog.objects.filter(resuelto=resuelto).order_by("-created_at")
+    if tipo:
+        qs = qs.filter(tipo=tipo)
     return list(qs)
 
 
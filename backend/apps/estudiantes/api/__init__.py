@@ -17,6 +17,7 @@ from . import (
     curso_intro_api,  # noqa: F401
     equivalencias_api,  # noqa: F401
     equivalencias_disposiciones_api,  # noqa: F401
+    exportaciones_api,  # noqa: F401
     horarios_api,  # noqa: F401
     inscripciones_materias_api,  # noqa: F401
     mesas_api,  # noqa: F401
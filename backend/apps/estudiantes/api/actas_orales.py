@@ -1,7 +1,6 @@
 from datetime import date
 
 from django.http import HttpResponse
-from django.template.loader import render_to_string
 from ninja import Body, Router, Schema
 from ninja.errors import HttpError
 
@@ -361,10 +360,7 @@ def listar_actas_orales(request, mesa_id: int):
     auth=JWTAuth(),
 )
 def descargar_acta_oral_pdf(request, mesa_id: int, inscripcion_id: int):
-    import os
-
-    from django.conf import settings
-    from weasyprint import HTML
+    from apps.common.pdf import render_pdf
 
     try:
         inscripcion = _get_inscripcion_mesa_or_404(mesa_id, inscripcion_id)
@@ -390,14 +386,9 @@ def descargar_acta_oral_pdf(request, mesa_id: int, inscripcion_id: int):
             return ""
         return f"{d.persona.apellido.upper()}, {d.persona.nombre}" if d.persona else ""
 
-    logo_left = os.path.join(settings.BASE_DIR, "static/logos/escudo_ministerio_tdf.png")
-    logo_right = os.path.join(settings.BASE_DIR, "static/logos/logo_ipes.jpg")
-
     fecha_str = acta.fecha.strftime("%d/%m/%Y") if acta.fecha else ""
 
     context = {
-        "logo_left_path": logo_left,
-        "logo_right_path": logo_right,
         "acta_numero": acta.acta_numero or "",
         "folio_numero": acta.folio_numero or "",
         "fecha": fecha_str,
@@ -416,9 +407,8 @@ def descargar_acta_oral_pdf(request, mesa_id: int, inscripcion_id: int):
         "observaciones": acta.observaciones or "",
     }
 
-    html_string = render_to_string("core/acta_oral_pdf.html", context)
-    response = HttpResponse(content_type="application/pdf")
+    pdf = render_pdf("core/acta_oral_pdf.html", context, base_url=request.build_absolute_uri())
+    response = HttpResponse(pdf, content_type="application/pdf")
     safe_name = est_nombre.replace(" ", "_").replace(",", "")
     response["Content-Disposition"] = f'attachment; filename="acta_oral_{safe_name}.pdf"'
-    HTML(string=html_string, base_url=request.build_absolute_uri()).write_pdf(response)
     return response
@@ -13,6 +13,7 @@ from django.shortcuts import get_object_or_404
 from apps.common.api_schemas import ApiResponse
 from apps.common.audit import log_action_from_request, snapshot
 from apps.common.date_utils import format_datetime
+from apps.common.renderers import trusted_response
 from core.models import (
     EquivalenciaDisposicionDetalle,
     Estudiante,
@@ -94,6 +95,7 @@ def admin_buscar_estudiantes_global(request, q: str = ""):
     "/admin/estudiantes",
     response=EstudianteAdminListResponse,
 )
+@trusted_response
 def admin_list_estudiantes(
     request,
     q: str | None = None,
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
 from apps.common.api_schemas import ApiResponse
 from apps.common.date_utils import format_datetime
 from core.auth_ninja import JWTAuth
-from core.models import Estudiante, PedidoAnalitico, PlanDeEstudio, Profesorado, VentanaHabilitacion
+from core.models import (
+    Estudiante,
+    NotificacionPendiente,
+    PedidoAnalitico,
+    PlanDeEstudio,
+    Profesorado,
+    VentanaHabilitacion,
+)
 from core.permissions import can, require
 
 from ..schemas import PedidoAnaliticoIn, PedidoAnaliticoItem, PedidoAnaliticoOut
@@ -120,33 +128,24 @@ def descargar_pedidos_analitico_pdf(request, ventana_id: int, dni: str | None =
     if not (can(request.user, "ver_analiticos") or can(request.user, "ver_documentacion")):
         require(request.user, "ver_analiticos")
     import datetime
-    import os
 
-    from django.conf import settings
     from django.http import HttpResponse
-    from django.template.loader import render_to_string
-    from weasyprint import HTML
+
+    from apps.common.pdf import render_pdf
 
     ventana = get_object_or_404(VentanaHabilitacion, id=ventana_id)
     items = listar_pedidos_analitico(request, ventana_id, dni)
 
-    logo_left_path = os.path.join(settings.BASE_DIR, "static/logos/escudo_ministerio_tdf.png")
-    logo_right_path = os.path.join(settings.BASE_DIR, "static/logos/logo_ipes.jpg")
-    if not os.path.exists(logo_left_path):
-        logo_left_path = os.path.join(settings.BASE_DIR, "backend/static/logos/escudo_ministerio_tdf.png")
-        logo_right_path = os.path.join(settings.BASE_DIR, "backend/static/logos/logo_ipes.jpg")
-
     context = {
         "items": items,
         "ventana": ventana,
         "q": dni,
         "hoy": datetime.datetime.now(),
-        "logo_left_path": logo_left_path,
-        "logo_right_path": logo_right_path,
     }
 
-    html_string = render_to_string("estudiantes/listado_analiticos_pdf.html", context)
-    pdf = HTML(string=html_string, base_url=request.build_absolute_uri("/")).write_pdf()
+    # Sin la caché de pdf_response: el listado imprime la hora de generación, así que
+    # el HTML (y su hash) cambia en cada minuto y solo llenaría pdf_cache/.
+    pdf = render_pdf("estudiantes/listado_analiticos_pdf.html", context, base_url=request.build_absolute_uri("/"))
 
     response = HttpResponse(pdf, content_type="application/pdf")
     filename = f"analiticos_{ventana_id}"
@@ -163,7 +162,7 @@ def marcar_analitico_confeccionado(request, pedido_id: int):
     """Marca un pedido de analítico como confeccionado y notifica al estudiante y tutores."""
     from django.utils import timezone
 
-    from apps.estudiantes.services.notificaciones_service import NotificacionesService
+    from apps.estudiantes.services.notificaciones_service import encolar_notificacion
 
     require(request.user, "gestionar_analiticos")
 
@@ -174,12 +173,14 @@ def marcar_analitico_confeccionado(request, pedido_id: int):
     pedido.estado = PedidoAnalitico.Estado.CONFECCIONADO
     pedido.preparado_por = request.user
     pedido.preparado_en = timezone.now()
-    pedido.save()
-
-    try:
-        NotificacionesService.notificar_analitico_listo(pedido, accion="confeccionado")
-    except Exception as e:
-        print(f"Error enviando notificación de analítico: {e}")
+    with transaction.atomic():
+        pedido.save()
+        encolar_notificacion(
+            NotificacionPendiente.Tipo.ANALITICO,
+            pedido.id,
+            estudiante_id=pedido.estudiante_id,
+            variante="confeccionado",
+        )
 
     return 200, ApiResponse(ok=True, message="Pedido marcado como confeccionado. Se notificó al estudiante y tutores.")
 
@@ -191,7 +192,7 @@ def marcar_analitico_entregado(request, pedido_id: int):
     """Marca un pedido de analítico como entregado y notifica al estudiante y tutores."""
     from django.utils import timezone
 
-    from apps.estudiantes.services.notificaciones_service import NotificacionesService
+    from apps.estudiantes.services.notificaciones_service import encolar_notificacion
 
     require(request.user, "gestionar_analiticos")
 
@@ -203,11 +204,13 @@ def marcar_analitico_entregado(request, pedido_id: int):
         )
 
     pedido.estado = PedidoAnalitico.Estado.ENTREGADO
-    pedido.save(update_fields=["estado", "updated_at"])
-
-    try:
-        NotificacionesService.notificar_analitico_listo(pedido, accion="entregado")
-    except Exception as e:
-        print(f"Error enviando notificación de entrega de analítico: {e}")
+    with transaction.atomic():
+        pedido.save(update_fields=["estado", "updated_at"])
+        encolar_notificacion(
+            NotificacionPendiente.Tipo.ANALITICO,
+            pedido.id,
+            estudiante_id=pedido.estudiante_id,
+            variante="entregado",
+        )
 
     return 200, ApiResponse(ok=True, message="Pedido marcado como entregado. Se notificó al estudiante y tutores.")
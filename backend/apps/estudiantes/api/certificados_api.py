@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from django.conf import settings
 from django.http import HttpResponse
-from django.template.loader import render_to_string
-from weasyprint import HTML
 
+from apps.common.pdf import pdf_response
 from core.auth_ninja import JWTAuth
 from core.models import Estudiante, PlanDeEstudio, Profesorado
 
@@ -61,6 +61,30 @@ def descargar_certificado_estudiante_regular(
     if not profesorado or not plan:
         return 404, {"message": "Profesorado o Plan no encontrado."}
 
+    # Generar el PDF (o reutilizar el de la caché si los datos no cambiaron)
+    try:
+        return pdf_response(
+            request,
+            "core/certificado_alumno_regular_pdf.html",
+            contexto_certificado_regular(
+                est, profesorado, plan, anio_override=anio_override, destinatario=destinatario
+            ),
+            filename=f"Constancia_Regular_{est.dni}.pdf",
+            base_url=request.build_absolute_uri(),
+        )
+    except Exception as e:
+        return 500, {"message": f"Error al generar PDF: {str(e)}"}
+
+
+def contexto_certificado_regular(
+    est: Estudiante,
+    profesorado: Profesorado,
+    plan: PlanDeEstudio,
+    *,
+    anio_override: int | None = None,
+    destinatario: str | None = None,
+) -> dict:
+    """Contexto de la plantilla de constancia de estudiante regular."""
     # Calcular el año de estudio aproximado
     # Buscamos regularidades o inscripciones para ver el nivel
     anio_calculado = _calcular_anio_estudio(est, plan)
@@ -68,7 +92,7 @@ def descargar_certificado_estudiante_regular(
 
     # Determinar el destinatario según el estado del legajo o parámetro explícito
     if not destinatario:
-        carrera_det = est.carreras_detalle.filter(profesorado_id=profesorado_id).first()
+        carrera_det = est.carreras_detalle.filter(profesorado_id=profesorado.id).first()
         if carrera_det and carrera_det.estado_legajo == "COM":
             destinatario_text = "quien corresponda"
         else:
@@ -82,17 +106,7 @@ def descargar_certificado_estudiante_regular(
         else:
             destinatario_text = dest_clean
 
-    import os
-
-    from django.conf import settings
-
-    logo_left_path = os.path.join(settings.BASE_DIR, "static/logos/escudo_ministerio_tdf.png")
-    logo_right_path = os.path.join(settings.BASE_DIR, "static/logos/logo_ipes.jpg")
-    if not os.path.exists(logo_left_path):
-        logo_left_path = os.path.join(settings.BASE_DIR, "backend/static/logos/escudo_ministerio_tdf.png")
-        logo_right_path = os.path.join(settings.BASE_DIR, "backend/static/logos/logo_ipes.jpg")
-
-    context = {
+    return {
         "estudiante": est,
         "usuario": est.user,
         "profesorado": profesorado,
@@ -102,22 +116,4 @@ def descargar_certificado_estudiante_regular(
         "destinatario": destinatario_text,
         "fecha": datetime.now(),
         "base_dir": str(settings.BASE_DIR),
-        "logo_left_path": logo_left_path,
-        "logo_right_path": logo_right_path,
     }
-
-    # Renderizar el HTML
-    html_string = render_to_string("core/certificado_alumno_regular_pdf.html", context)
-
-    # Preparar la respuesta HTTP
-    response = HttpResponse(content_type="application/pdf")
-    filename = f"Constancia_Regular_{est.dni}.pdf"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-    # Generar el PDF
-    try:
-        HTML(string=html_string, base_url=request.build_absolute_uri()).write_pdf(response)
-    except Exception as e:
-        return 500, {"message": f"Error al generar PDF: {str(e)}"}
-
-    return response
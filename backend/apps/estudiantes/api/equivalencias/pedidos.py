@@ -32,6 +32,7 @@ from apps.estudiantes.schemas import (
 )
 from core.auth_ninja import JWTAuth
 from core.models import (
+    NotificacionPendiente,
     PedidoEquivalencia,
     PlanDeEstudio,
     Profesorado,
@@ -378,16 +379,14 @@ def registrar_documentos_titulos(
     pedido.titulos_observaciones = (payload.observaciones or "").strip()
     pedido.titulos_registrado_en = ahora
     pedido.titulos_registrado_por = request.user
-    pedido.save()
+    from apps.estudiantes.services.notificaciones_service import encolar_notificacion
 
-    # Notificación automática si ya tiene los datos mínimos
-    if pedido.titulos_disposicion_numero or pedido.titulos_nota_numero:
-        from apps.estudiantes.services.notificaciones_service import NotificacionesService
+    with transaction.atomic():
+        pedido.save()
 
-        try:
-            NotificacionesService.notificar_equivalencia_finalizada(pedido)
-        except Exception as e:
-            print(f"Error enviando notificación de equivalencia: {e}")
+        # Notificación automática si ya tiene los datos mínimos
+        if pedido.titulos_disposicion_numero or pedido.titulos_nota_numero:
+            encolar_notificacion(NotificacionPendiente.Tipo.EQUIVALENCIA, pedido.id, estudiante_id=pedido.estudiante_id)
 
     return _serialize_pedido_equivalencia(pedido, request.user)
 
@@ -0,0 +1,50 @@
+from ninja import Schema
+
+from apps.common.api_schemas import ApiResponse
+from apps.common.jobs import enqueue
+from core.auth_ninja import JWTAuth
+from core.permissions import require
+
+from ..services.exportaciones_pdf import JOB_EXPORTACION, preparar_exportacion
+from .router import estudiantes_router
+
+PERMISOS = {
+    "constancias_examen": "editar_estudiantes",
+    "certificados_regulares": "editar_estudiantes",
+    "actas_examen": "ver_actas",
+}
+
+
+class ExportacionPdfIn(Schema):
+    tipo: str
+    formato: str = "zip"
+    mesa_id: int | None = None
+    profesorado_id: int | None = None
+    plan_id: int | None = None
+    cohorte: int | None = None
+    comision_id: int | None = None
+    anio_academico: int | None = None
+    destinatario: str | None = None
+
+
+@estudiantes_router.post(
+    "/exportaciones/pdf",
+    response={202: ApiResponse, 400: ApiResponse, 403: ApiResponse, 404: ApiResponse},
+    auth=JWTAuth(),
+)
+def exportar_documentos_pdf(request, payload: ExportacionPdfIn):
+    """Encola la exportación de los documentos de una mesa, cohorte o comisión en un ZIP o un PDF único."""
+    require(request.user, PERMISOS.get(payload.tipo, "editar_estudiantes"))
+    filtros = payload.dict(exclude={"tipo", "formato"}, exclude_none=True)
+    total = preparar_exportacion(payload.tipo, payload.formato, filtros)
+    job = enqueue(
+        JOB_EXPORTACION,
+        {"tipo": payload.tipo, "formato": payload.formato, "filtros": filtros},
+        user=request.user,
+        max_attempts=1,
+    )
+    return 202, ApiResponse(
+        ok=True,
+        message=f"Exportación de {total} documentos iniciada.",
+        data={"job_id": job.id, "total": total},
+    )
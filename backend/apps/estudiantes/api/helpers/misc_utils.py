@@ -5,6 +5,7 @@ from __future__ import annotations
 from datetime import date, datetime, time
 
 from apps.common.date_utils import format_date, format_datetime, parse_date
+from apps.estudiantes.services.situacion_academica import vigencia_regularidad
 from core.models import (
     Correlatividad,
     CorrelatividadVersion,
@@ -48,23 +49,16 @@ def _calcular_vigencia_regularidad(estudiante: Estudiante, regularidad: Regulari
     - Si el estudiante re-cursó la materia y tiene una regularidad posterior, los intentos
       de este período solo cuentan hasta la fecha de esa nueva regularidad (no se mezclan).
     """
-    from datetime import timedelta
-
     from core.models import ActaExamenEstudiante
 
-    INTENTOS_MAX = 3
-
     if not regularidad.fecha_cierre:
-        from django.utils import timezone
-
-        limite = _add_years(timezone.now().date(), 2)
-        return limite, 0, INTENTOS_MAX
+        return vigencia_regularidad(None, [])
 
     fecha_base = _add_years(regularidad.fecha_cierre, 2)
 
     # Si existe una regularidad posterior para la misma materia, este período termina ahí.
     # Los intentos posteriores a esa fecha pertenecen al nuevo período.
-    prox_reg = (
+    fecha_tope_superior = (
         Regularidad.objects.filter(
             estudiante=regularidad.estudiante,
             materia=regularidad.materia,
@@ -72,26 +66,14 @@ def _calcular_vigencia_regularidad(estudiante: Estudiante, regularidad: Regulari
             fecha_cierre__gt=regularidad.fecha_cierre,
         )
         .order_by("fecha_cierre")
+        .values_list("fecha_cierre", flat=True)
         .first()
     )
-    fecha_tope_superior = prox_reg.fecha_cierre if prox_reg else None
 
-    if fecha_tope_superior:
-        # Con regularidad posterior: el período de vigencia termina en la nueva fecha_cierre.
-        # No hay prórroga más allá de eso.
-        limite_efectivo = min(fecha_base, fecha_tope_superior)
-        intentos = ActaExamenEstudiante.objects.filter(
-            dni=estudiante.dni,
-            acta__materia=regularidad.materia,
-            acta__fecha__gt=regularidad.fecha_cierre,
-            acta__fecha__lte=fecha_tope_superior,
-        ).count()
-        intentos_en_periodo = intentos
-    else:
-        # Sin regularidad posterior: lógica con prórroga.
+    primer_llamado_post_base = None
+    if not fecha_tope_superior:
         # Filtrar mesas por plan_de_estudio_id para no tomar fechas de otra carrera
         # que comparta el mismo objeto Materia.
-        limite_60d = fecha_base + timedelta(days=60)
         plan_id = getattr(regularidad.materia, "plan_de_estudio_id", None)
         mesa_qs = MesaExamen.objects.filter(
             materia=regularidad.materia,
@@ -101,29 +83,19 @@ def _calcular_vigencia_regularidad(estudiante: Estudiante, regularidad: Regulari
         if plan_id:
             mesa_qs = mesa_qs.filter(materia__plan_de_estudio_id=plan_id)
         primer_llamado_post_base = mesa_qs.order_by("fecha").values_list("fecha", flat=True).first()
-        limite_prorroga = (
-            primer_llamado_post_base
-            if primer_llamado_post_base and primer_llamado_post_base < limite_60d
-            else limite_60d
-        )
-        limite_efectivo = limite_prorroga
-        intentos = ActaExamenEstudiante.objects.filter(
-            dni=estudiante.dni,
-            acta__materia=regularidad.materia,
-            acta__fecha__gt=regularidad.fecha_cierre,
-            acta__fecha__lte=limite_prorroga,
-        ).count()
-        intentos_en_periodo = ActaExamenEstudiante.objects.filter(
-            dni=estudiante.dni,
-            acta__materia=regularidad.materia,
-            acta__fecha__gt=regularidad.fecha_cierre,
-            acta__fecha__lte=fecha_base,
-        ).count()
 
-    if intentos_en_periodo >= INTENTOS_MAX:
-        return fecha_base if not fecha_tope_superior else limite_efectivo, intentos_en_periodo, INTENTOS_MAX
-
-    return limite_efectivo, intentos, INTENTOS_MAX
+    fechas_actas = ActaExamenEstudiante.objects.filter(
+        dni=estudiante.dni,
+        acta__materia=regularidad.materia,
+        acta__fecha__gt=regularidad.fecha_cierre,
+    ).values_list("acta__fecha", flat=True)
+
+    return vigencia_regularidad(
+        regularidad.fecha_cierre,
+        fechas_actas,
+        fecha_proxima_regular=fecha_tope_superior,
+        primer_llamado_post_base=primer_llamado_post_base,
+    )
 
 
 def _to_iso(value):
@@ -2,13 +2,12 @@ from __future__ import annotations
 
 from django.db.models import Max, Q
 from django.utils import timezone
+from ninja import Query
 
 from apps.common.api_schemas import ApiResponse
 from core.models import (
-    Correlatividad,
-    Estudiante,
+    Bloque,
     HorarioCatedra,
-    HorarioCatedraDetalle,
     Materia,
     PlanDeEstudio,
     Profesorado,
@@ -16,10 +15,11 @@ from core.models import (
 from core.models.inscripciones import InscripcionMateriaEstudiante
 from core.permissions import ensure_profesorado_access, require
 
-from ..schemas import Horario, HorarioTabla, MateriaPlan
+from ..schemas import ComisionSuperposiciones, Horario, HorarioTabla, MateriaPlan, SuperposicionHorario
+from ..services.horarios_conflictos import IndiceHorarioSemanal, intervalos_de_comisiones
+from ..services.plan_catalogo import obtener_catalogo_plan, version_correlatividades_para
 from .helpers import (
     _construir_tablas_horario,
-    _correlatividades_qs,
     _ensure_estudiante_access,
     _listar_carreras_detalle,
     _resolve_estudiante,
@@ -42,7 +42,12 @@ def materias_plan(
     plan_id: int | None = None,
     dni: str | None = None,
 ):
-    """Devuelve las materias del plan de estudio elegido para el estudiante."""
+    """
+    Devuelve las materias del plan de estudio elegido para el estudiante.
+
+    Horarios y correlatividades salen del catálogo cacheado del plan (consultas fijas);
+    solo el filtrado por inscripciones del estudiante se resuelve en cada request.
+    """
     _ensure_estudiante_access(request, dni)
     est = _resolve_estudiante(request, dni)
     carreras_est = list(est.carreras.all()) if est else []
@@ -100,32 +105,6 @@ def materias_plan(
             else ("1C" if regimen == Materia.TipoCursada.PRIMER_CUATRIMESTRE else "2C")
         )
 
-    def horarios_para(m: Materia) -> list[Horario]:
-        hcs = (
-            HorarioCatedra.objects.filter(espacio=m)
-            .annotate(max_anio=Max("anio_academico"))
-            .order_by("-anio_academico")
-        )
-        if not hcs:
-            return []
-        detalles = HorarioCatedraDetalle.objects.filter(horario_catedra__in=hcs[:1]).select_related(
-            "bloque", "horario_catedra"
-        )
-        hs: list[Horario] = []
-        for d in detalles:
-            b = d.bloque
-            hs.append(
-                Horario(
-                    dia=b.get_dia_display(),
-                    desde=str(b.hora_desde)[:5],
-                    hasta=str(b.hora_hasta)[:5],
-                )
-            )
-        return sorted(hs, key=lambda x: (x.dia, x.desde))
-
-    def correlativas_ids(m: Materia, tipo: str, estudiante: Estudiante | None = None) -> list[int]:
-        return list(_correlatividades_qs(m, tipo, estudiante).values_list("materia_correlativa_id", flat=True))
-
     materias = []
     if not plan:
         return []
@@ -166,39 +145,40 @@ def materias_plan(
             .values_list("materia_id", flat=True)
         )
 
+    version = version_correlatividades_para(plan, est.id if est else None)
+    catalogo = obtener_catalogo_plan(plan, version.id if version else None)
+
     hoy = timezone.now().date()
-    for m in plan.materias.all().order_by("anio_cursada", "nombre"):
-        if m.fecha_inicio and m.fecha_inicio > hoy:
+    for m in catalogo:
+        if m["fecha_inicio"] and m["fecha_inicio"] > hoy:
             continue
         # Excluir si ya vencida (fecha_fin < hoy), salvo que esté inscripto
-        if m.fecha_fin and m.fecha_fin < hoy:
-            if m.id not in materias_inscriptas_ids:
+        if m["fecha_fin"] and m["fecha_fin"] < hoy:
+            if m["id"] not in materias_inscriptas_ids:
                 continue
         # Excluir si ya tiene cambio de comisión en trámite (mismo ID)
-        if m.id in materias_comisionadas:
+        if m["id"] in materias_comisionadas:
             continue
         # Excluir si ya tiene una materia con el mismo nombre comisionada (mismo profesorado)
-        if (m.nombre, plan_profesorado.id) in comisionadas_nombre_prof:
+        if (m["nombre"], plan_profesorado.id) in comisionadas_nombre_prof:
             continue
-        es_vigente = not (m.fecha_fin and m.fecha_fin < hoy)
+        es_vigente = not (m["fecha_fin"] and m["fecha_fin"] < hoy)
         materias.append(
             MateriaPlan(
-                id=m.id,
-                nombre=m.nombre,
-                anio=m.anio_cursada,
-                cuatrimestre=map_cuat(m.regimen),
-                horarios=horarios_para(m),
-                correlativas_regular=correlativas_ids(m, Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR, est),
-                correlativas_aprob=correlativas_ids(m, Correlatividad.TipoCorrelatividad.APROBADA_PARA_CURSAR, est),
-                correlativas_simultanea=correlativas_ids(
-                    m, Correlatividad.TipoCorrelatividad.SIMULTANEA_PARA_CURSAR, est
-                ),
+                id=m["id"],
+                nombre=m["nombre"],
+                anio=m["anio"],
+                cuatrimestre=map_cuat(m["regimen"]),
+                horarios=[Horario(**h) for h in m["horarios"]],
+                correlativas_regular=m["correlativas_regular"],
+                correlativas_aprob=m["correlativas_aprob"],
+                correlativas_simultanea=m["correlativas_simultanea"],
                 profesorado=plan_profesorado.nombre,
                 profesorado_id=plan_profesorado.id,
                 plan_id=plan.id,
-                tipo_formacion=m.tipo_formacion,
-                formato=m.formato,
-                horas_semana=m.horas_semana,
+                tipo_formacion=m["tipo_formacion"],
+                formato=m["formato"],
+                horas_semana=m["horas_semana"],
                 vigente=es_vigente,
             )
         )
@@ -354,3 +334,48 @@ def horarios_profesorado(
 
     tablas = _construir_tablas_horario(profesorado, plan, list(horarios_qs))
     return tablas
+
+
+@estudiantes_router.get(
+    "/horarios/superposiciones",
+    response={200: list[ComisionSuperposiciones], 400: ApiResponse},
+)
+def superposiciones_comisiones(
+    request,
+    comision_ids: list[int] = Query(...),
+    anio: int | None = None,
+    dni: str | None = None,
+):
+    """
+    Indica, para cada comisión candidata, con qué cursadas del estudiante se superpone.
+
+    Todas las comisiones se evalúan contra un único índice semanal del estudiante.
+    """
+    _ensure_estudiante_access(request, dni)
+    est = _resolve_estudiante(request, dni)
+    if not est:
+        return 400, ApiResponse(ok=False, message="Estudiante no identificado.")
+
+    anio = anio or timezone.now().year
+    indice = IndiceHorarioSemanal.para_estudiante(est.id, anio)
+    candidatos = [i for ints in intervalos_de_comisiones(comision_ids).values() for i in ints]
+    conflictos = indice.conflictos_por_comision(candidatos)
+
+    dias = dict(Bloque.DIA_CHOICES)
+    return [
+        ComisionSuperposiciones(
+            comision_id=comision_id,
+            superposiciones=[
+                SuperposicionHorario(
+                    dia=dias.get(cand.dia, str(cand.dia)),
+                    desde=cand.desde.strftime("%H:%M"),
+                    hasta=cand.hasta.strftime("%H:%M"),
+                    materia_id=existente.materia.id,
+                    materia_nombre=existente.materia.nombre,
+                    comision_id=existente.comision_id,
+                )
+                for cand, existente in conflictos.get(comision_id, [])
+            ],
+        )
+        for comision_id in dict.fromkeys(comision_ids)
+    ]
@@ -12,6 +12,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -23,10 +24,10 @@ from core.models import (
     Comision,
     Correlatividad,
     EquivalenciaDisposicionDetalle,
-    HorarioCatedraDetalle,
     InscripcionMateriaEstudiante,
     InscripcionMesa,
     Materia,
+    NotificacionPendiente,
     Regularidad,
     Turno,
     VentanaHabilitacion,
@@ -47,6 +48,7 @@ from ..schemas import (
     ResidenciaCondicionalPropuestaOut,
     SolicitudCambioComisionItem,
 )
+from ..services.horarios_conflictos import IndiceHorarioSemanal, intervalos_de_comisiones, intervalos_de_materias
 from .helpers import (
     _correlatividades_qs,
     _ensure_estudiante_access,
@@ -64,55 +66,6 @@ def _es_materia_residencia(materia) -> bool:
     return "RESIDENCIA" in nombre or nombre.startswith("PRÁCTICA IV") or nombre.startswith("PRACTICA IV")
 
 
-def _es_taller_o_practica_4_residencia(materia) -> bool:
-    """
-    Retorna True si la materia es un taller de residencia, residencia o práctica 4 (de 4° año)
-    con base en los 5 nombres exactos provistos.
-    """
-    if getattr(materia, "anio_cursada", None) != 4:
-        return False
-    nombre = getattr(materia, "nombre", "") or ""
-    nombre_norm = (
-        nombre.upper().replace("Á", "A").replace("É", "E").replace("Í", "I").replace("Ó", "O").replace("Ú", "U").strip()
-    )
-    nombres_validos = {
-        "PRACTICA IV: RESIDENCIA PEDAGOGICA",
-        "TALLER DE RESIDENCIA DE CIENCIAS NATURALES",
-        "TALLER DE RESIDENCIA DE CIENCIAS SOCIALES",
-        "TALLER DE RESIDENCIA DE MATEMATICA",
-        "TALLER DE RESIDENCIA DE PRACTICAS DEL LENGUAJE",
-    }
-    return any(nombre_norm.startswith(nv) for nv in nombres_validos)
-
-
-# TODO: BORRAR ESTO - Código temporal agregado para pruebas. Permitir superposición con CI Acompañamiento a las Trayectorias.
-def _es_ci_acompanamiento(materia) -> bool:
-    """Retorna True si la materia es CI Acompañamiento a las Trayectorias."""
-    nombre = getattr(materia, "nombre", "") or ""
-    nombre_norm = (
-        nombre.upper()
-        .replace("Á", "A")
-        .replace("É", "E")
-        .replace("Í", "I")
-        .replace("Ó", "O")
-        .replace("Ú", "U")
-        .replace("Ñ", "N")
-        .strip()
-    )
-    return "ACOMPANAMIENTO A LAS TRAYECTORIAS" in nombre_norm
-
-
-def _permite_superposicion_residencia(m1, m2) -> bool:
-    """
-    Permite superponer talleres de residencia y práctica 4 del 4° año entre sí.
-    También permite superponer cualquier materia con 'CI Acompañamiento a las Trayectorias'.
-    """
-    # TODO: BORRAR ESTO - Condición temporal para pruebas
-    if _es_ci_acompanamiento(m1) or _es_ci_acompanamiento(m2):
-        return True
-    return _es_taller_o_practica_4_residencia(m1) and _es_taller_o_practica_4_residencia(m2)
-
-
 def _comision_to_resumen(comision):
     """Auxiliar: Convierte una instancia de Comisión en un resumen para el frontend."""
     if not comision:
@@ -381,67 +334,17 @@ def inscripcion_materia(request, payload: InscripcionMateriaIn):
     # Ahora solo AVISA pero no bloquea la inscripción.
     # El estudiante puede continuar inscribiéndose a otras materias sin conflicto.
     # Luego irá a "Cambio de Comisión" para resolver las superposiciones.
-    superposicion_detectada = None
-    cand_qs = HorarioCatedraDetalle.objects.filter(horario_catedra__espacio=mat)
-    if cand_qs.filter(horario_catedra__anio_academico=anio_actual).exists():
-        cand_qs = cand_qs.filter(horario_catedra__anio_academico=anio_actual)
-
-    if cand_qs.exists():
-        cand = [
-            (
-                d.horario_catedra.turno_id,
-                d.bloque.dia,
-                d.bloque.hora_desde,
-                d.bloque.hora_hasta,
-                d.horario_catedra.cuatrimestre or (mat.regimen if mat.regimen in ["PCU", "SCU"] else None),
-            )
-            for d in cand_qs
-        ]
-
+    candidatos = intervalos_de_materias([mat.id], anio_actual).get(mat.id, [])
+    if candidatos:
         # Solo chocamos contra inscripciones que no estén anuladas, rechazadas o de baja
-        actuales = InscripcionMateriaEstudiante.objects.filter(estudiante=est, anio=anio_actual).exclude(
-            estado__in=[
-                InscripcionMateriaEstudiante.Estado.ANULADA,
-                InscripcionMateriaEstudiante.Estado.RECHAZADA,
-                InscripcionMateriaEstudiante.Estado.BAJA,
-            ]
-        )
-        if actuales.exists():
-            det_act = HorarioCatedraDetalle.objects.select_related(
-                "horario_catedra__turno", "horario_catedra__espacio", "bloque"
-            ).filter(horario_catedra__espacio_id__in=list(actuales.values_list("materia_id", flat=True)))
-            if det_act.filter(horario_catedra__anio_academico=anio_actual).exists():
-                det_act = det_act.filter(horario_catedra__anio_academico=anio_actual)
-
-            for d in det_act:
-                d_cuat = d.horario_catedra.cuatrimestre or (
-                    d.horario_catedra.espacio.regimen if d.horario_catedra.espacio.regimen in ["PCU", "SCU"] else None
-                )
-                for t, dia, desde, hasta, cand_cuat in cand:
-                    # Si coinciden en Turno y Día, verificamos solapamiento de horas
-                    if (
-                        t == d.horario_catedra.turno_id
-                        and dia == d.bloque.dia
-                        and not (hasta <= d.bloque.hora_desde or desde >= d.bloque.hora_hasta)
-                    ):
-                        # Omitir si son de cuatrimestres distintos
-                        if (cand_cuat == "PCU" and d_cuat == "SCU") or (cand_cuat == "SCU" and d_cuat == "PCU"):
-                            continue
-
-                        # Omitir si ambas materias permiten superposición (talleres/práctica 4 del 2C)
-                        if _permite_superposicion_residencia(mat, d.horario_catedra.espacio):
-                            continue
-                        colision_nombre = d.horario_catedra.espacio.nombre
-                        superposicion_detectada = colision_nombre
-                        break
-                if superposicion_detectada:
-                    break
+        indice = IndiceHorarioSemanal.para_estudiante(est.id, anio_actual)
+        colision = indice.primer_conflicto(candidatos)
 
         # Si detectamos superposición, retornamos código 409 (Conflict) pero NO bloqueamos
-        if superposicion_detectada:
+        if colision:
             return 409, ApiResponse(
                 ok=False,
-                message=f"Existe una superposición horaria con la materia '{superposicion_detectada}' del ciclo actual. "
+                message=f"Existe una superposición horaria con la materia '{colision.materia.nombre}' del ciclo actual. "
                 f"Continúa inscribiéndote a otras materias sin conflicto. "
                 f"Luego ve a 'Cambio de Comisión' para resolver esta superposición.",
             )
@@ -928,6 +831,22 @@ def cambio_comision(request, payload: CambioComisionIn):
         # Creamos la inscripción
         ins = InscripcionMateriaEstudiante(estudiante=est, materia=mat, anio=anio_actual)
 
+    # 4.6 SUPERPOSICIÓN: el cambio autogestionado por superposición debe resolverla,
+    # no trasladarla a otra materia del ciclo (se ignora la inscripción que se está cambiando).
+    if payload.motivo_cambio == "OVERLAP":
+        candidatos = intervalos_de_comisiones([com_dest.id]).get(com_dest.id, [])
+        if candidatos:
+            indice = IndiceHorarioSemanal.para_estudiante(
+                est.id, anio_actual, excluir_inscripciones=[ins.id] if ins.id else []
+            )
+            colision = indice.primer_conflicto(candidatos)
+            if colision:
+                return 400, ApiResponse(
+                    ok=False,
+                    message=f"La comisión {com_dest.codigo} también se superpone con '{colision.materia.nombre}'. "
+                    f"Elegí otra comisión para resolver la superposición.",
+                )
+
     # 5. ACTUALIZAR ESTADO Y GUARDAR METADATOS
     # Limpiar registros históricos inactivos de la materia de destino para evitar error de clave única duplicada (estudiante, materia, anio)
     InscripcionMateriaEstudiante.objects.filter(
@@ -1084,7 +1003,7 @@ def autorizar_cambio_comision(request, inscripcion_id: int, payload: AutorizarCa
     Autoriza o rechaza una solicitud de cambio de comisión.
     Solo accesible para admin, secretaria, bedel o tutor.
     """
-    from apps.estudiantes.services.notificaciones_service import NotificacionesService
+    from apps.estudiantes.services.notificaciones_service import encolar_notificacion
 
     require(request.user, "gestionar_cambio_comision")
 
@@ -1163,21 +1082,24 @@ def autorizar_cambio_comision(request, inscripcion_id: int, payload: AutorizarCa
         ins.cambio_comision_estado = InscripcionMateriaEstudiante.CambioComisionEstado.RECHAZADO
         msg_auditoria = f"Cambio de comisión rechazado. Motivo: {payload.observaciones or 'S/D'}."
 
-    ins.save()
+    with transaction.atomic():
+        ins.save()
 
-    # Registro de auditoría
-    InscripcionMateriaMovimiento.objects.create(
-        inscripcion=ins,
-        tipo=InscripcionMateriaMovimiento.Tipo.OTRO,
-        operador=request.user.username,
-        motivo_detalle=msg_auditoria,
-    )
+        # Registro de auditoría
+        InscripcionMateriaMovimiento.objects.create(
+            inscripcion=ins,
+            tipo=InscripcionMateriaMovimiento.Tipo.OTRO,
+            operador=request.user.username,
+            motivo_detalle=msg_auditoria,
+        )
 
-    # Notificación automática
-    try:
-        NotificacionesService.notificar_cambio_comision(ins)
-    except Exception as e:
-        print(f"Error enviando notificación de cambio comisión: {e}")
+        # Notificación automática (la entrega run_worker desde la bandeja de salida)
+        encolar_notificacion(
+            NotificacionPendiente.Tipo.CAMBIO_COMISION,
+            ins.id,
+            estudiante_id=ins.estudiante_id,
+            materia_id=ins.materia_id,
+        )
 
     return ApiResponse(ok=True, message="Trámite de cambio de comisión procesado y estudiante notificado.")
 
@@ -1,16 +1,13 @@
 from __future__ import annotations
 
-import os
 from datetime import datetime
 
-from django.conf import settings
 from django.http import HttpResponse
-from django.template.loader import render_to_string
 from django.utils import timezone
-from weasyprint import HTML
 
 from apps.common.api_schemas import ApiResponse
 from apps.common.date_utils import format_date, format_datetime
+from apps.common.pdf import pdf_response
 from core.auth_ninja import JWTAuth
 from core.models import InscripcionMesa, MesaExamen
 
@@ -408,6 +405,19 @@ def descargar_constancia_examen_pdf(
             content_type="application/json",
         )
 
+    return pdf_response(
+        request,
+        "core/constancia_examen_pdf.html",
+        contexto_constancia_examen(insc, destinatario),
+        filename=f"constancia_examen_{est.dni}.pdf",
+        inline=True,
+        base_url=request.build_absolute_uri("/"),
+    )
+
+
+def contexto_constancia_examen(insc: InscripcionMesa, destinatario: str = "A quien corresponda") -> dict:
+    """Contexto de la plantilla de constancia de examen para una inscripción con nota."""
+    est = insc.estudiante
     mesa = insc.mesa
     materia = mesa.materia if mesa else None
     plan = materia.plan_de_estudio if materia else None
@@ -415,13 +425,7 @@ def descargar_constancia_examen_pdf(
 
     hoy = datetime.now()
 
-    logo_left_path = os.path.join(settings.BASE_DIR, "static/logos/escudo_ministerio_tdf.png")
-    logo_right_path = os.path.join(settings.BASE_DIR, "static/logos/logo_ipes.jpg")
-    if not os.path.exists(logo_left_path):
-        logo_left_path = os.path.join(settings.BASE_DIR, "backend/static/logos/escudo_ministerio_tdf.png")
-        logo_right_path = os.path.join(settings.BASE_DIR, "backend/static/logos/logo_ipes.jpg")
-
-    context = {
+    return {
         "estudiante": f"{est.apellido}, {est.nombre}".strip(", ") or est.dni,
         "dni": est.dni,
         "materia": materia.nombre if materia else "Materia",
@@ -448,18 +452,8 @@ def descargar_constancia_examen_pdf(
         "hoy_dia": hoy.day,
         "hoy_mes": MESES_ES[hoy.month - 1],
         "hoy_anio": hoy.year,
-        "logo_left_path": logo_left_path,
-        "logo_right_path": logo_right_path,
     }
 
-    html = render_to_string("core/constancia_examen_pdf.html", context)
-    pdf_content = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
-
-    nombre_archivo = f"constancia_examen_{est.dni}.pdf"
-    response = HttpResponse(pdf_content, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{nombre_archivo}"'
-    return response
-
 
 def _calc_hora_hasta(insc, mesa) -> str | None:
     from datetime import date, datetime, timedelta
@@ -1,29 +1,33 @@
+import csv
+import logging
 from datetime import date
-from typing import List
 
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from ninja import Schema
 
 from apps.common.api_schemas import ApiResponse
+from apps.common.jobs import enqueue
 from core.auth_ninja import JWTAuth
 from core.models import (
-    ActaExamenEstudiante,
+    AuditoriaAcademicaItem,
+    AuditoriaAcademicaParticion,
     Correlatividad,
     Estudiante,
-    InscripcionMateriaEstudiante,
-    Materia,
-    MesaExamen,
-    Regularidad,
 )
 from core.permissions import require
 
-from .helpers import (
-    _acta_condicion,
-    _calcular_vigencia_regularidad,
-    _correlatividades_qs,
-    _resolve_estudiante,
+from ..services.auditoria_academica import JOB_RECALCULO, recalcular_auditoria_estudiante
+from ..services.correlatividades_caidas import (
+    COLUMNAS_CSV,
+    iterar_correlativas_caidas,
+    snapshot_correlativas_caidas,
 )
+from .helpers import _resolve_estudiante
 from .router import estudiantes_router
 
+logger = logging.getLogger(__name__)
+
 
 class CorrelativaCaidaItem(Schema):
     estudiante_id: int
@@ -37,6 +41,7 @@ class CorrelativaCaidaItem(Schema):
 class AuditoriaInconsistenciaItem(Schema):
     estudiante: str
     dni: str
+    carrera: str | None = None
     materia: str
     evento: str
     fecha: str
@@ -45,131 +50,53 @@ class AuditoriaInconsistenciaItem(Schema):
     motivo: str
 
 
-def _check_correlativas_caidas(
-    anio: int, estudiante: Estudiante | None = None, materia_id: int | None = None
-) -> list[dict]:
-    from core.models import EquivalenciaDisposicionDetalle, InscripcionMesa
+class AuditoriaParticionOut(Schema):
+    profesorado_id: int
+    profesorado: str
+    estado: str
+    total: int
+    calculado_en: str | None
 
-    qs = InscripcionMateriaEstudiante.objects.select_related("estudiante__persona", "materia__plan_de_estudio").filter(
-        anio=anio,
-        estado__in=[InscripcionMateriaEstudiante.Estado.CONFIRMADA, InscripcionMateriaEstudiante.Estado.PENDIENTE],
-    )
 
-    if estudiante:
-        qs = qs.filter(estudiante=estudiante)
-    if materia_id:
-        qs = qs.filter(materia_id=materia_id)
-
-    # Convertir a lista para evitar múltiples ejecuciones del QS base
-    inscripciones = list(qs)
-    if not inscripciones:
-        return []
+class AuditoriaAcademicaListResponse(Schema):
+    total: int
+    items: list[AuditoriaInconsistenciaItem]
+    particiones: list[AuditoriaParticionOut]
 
-    est_ids = [insc.estudiante_id for insc in inscripciones]
-    dnis = [insc.estudiante.dni for insc in inscripciones]
 
-    # --- BULK FETCHING ---
-    # 1. Aprobaciones por Actas
-    aprobadas_actas_qs = ActaExamenEstudiante.objects.filter(
-        dni__in=dnis, calificacion_definitiva__in=["6", "7", "8", "9", "10", "APR", "EQUI"]
-    ).values("dni", "acta__materia_id")
+COLUMNAS_AUDITORIA_CSV = [
+    "estudiante",
+    "dni",
+    "carrera",
+    "materia",
+    "evento",
+    "fecha",
+    "prerrequisito",
+    "tipo_corr",
+    "motivo",
+]
 
-    aprobadas_by_dni = {}
-    for item in aprobadas_actas_qs:
-        aprobadas_by_dni.setdefault(item["dni"], set()).add(item["acta__materia_id"])
 
-    # 2. Aprobaciones por Mesa (Pandemia)
-    aprobadas_mesas_qs = InscripcionMesa.objects.filter(
-        estudiante_id__in=est_ids, condicion=InscripcionMesa.Condicion.APROBADO
-    ).values("estudiante_id", "mesa__materia_id")
+def _check_correlativas_caidas(
+    anio: int, estudiante: Estudiante | None = None, materia_id: int | None = None
+) -> list[dict]:
+    return list(
+        iterar_correlativas_caidas(anio, estudiante_id=estudiante.id if estudiante else None, materia_id=materia_id)
+    )
 
-    aprobadas_by_est_id = {}
-    for item in aprobadas_mesas_qs:
-        aprobadas_by_est_id.setdefault(item["estudiante_id"], set()).add(item["mesa__materia_id"])
 
-    # 3. Aprobaciones por Equivalencias
-    aprobadas_equis_qs = EquivalenciaDisposicionDetalle.objects.filter(disposicion__estudiante_id__in=est_ids).values(
-        "disposicion__estudiante_id", "materia_id"
-    )
+class _Echo:
+    """Buffer mínimo para que csv.writer devuelva cada línea en lugar de acumularla."""
 
-    equis_by_est_id = {}
-    for item in aprobadas_equis_qs:
-        equis_by_est_id.setdefault(item["disposicion__estudiante_id"], set()).add(item["materia_id"])
+    def write(self, value):
+        return value
 
-    # 4. Regularidades (latest for each student/materia)
-    regs_qs = (
-        Regularidad.objects.filter(estudiante_id__in=est_ids)
-        .only("estudiante_id", "materia_id", "situacion", "fecha_cierre", "en_resguardo")
-        .order_by("estudiante_id", "materia_id", "-fecha_cierre")
-    )
 
-    # Cache manual de las últimas regularidades por [est_id][materia_id]
-    latest_regs_map = {}
-    for r in regs_qs:
-        latest_regs_map.setdefault(r.estudiante_id, {})
-        if r.materia_id not in latest_regs_map[r.estudiante_id]:
-            latest_regs_map[r.estudiante_id][r.materia_id] = r
-
-    # --- PROCESAMIENTO ---
-    reporte = []
-    materia_names_cache = {}
-
-    for insc in inscripciones:
-        est = insc.estudiante
-        materia = insc.materia
-
-        correlativas_qs = _correlatividades_qs(materia, Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR, est)
-        required_materia_ids = list(correlativas_qs.values_list("materia_correlativa_id", flat=True))
-
-        if not required_materia_ids:
-            continue
-
-        # Consolidar todas las aprobadas del estudiante
-        mis_aprobadas = set()
-        mis_aprobadas.update(aprobadas_by_dni.get(est.dni, set()))
-        mis_aprobadas.update(aprobadas_by_est_id.get(est.id, set()))
-        mis_aprobadas.update(equis_by_est_id.get(est.id, set()))
-
-        for req_id in required_materia_ids:
-            if req_id in mis_aprobadas:
-                continue
-
-            reg = latest_regs_map.get(est.id, {}).get(req_id)
-            is_ok = False
-            motivo = ""
-
-            if reg:
-                if reg.en_resguardo:
-                    motivo = "Regularidad en resguardo"
-                elif reg.situacion in [Regularidad.Situacion.APROBADO, Regularidad.Situacion.PROMOCIONADO]:
-                    is_ok = True
-                elif reg.situacion == Regularidad.Situacion.REGULAR:
-                    limite, intentos, max_intentos = _calcular_vigencia_regularidad(est, reg)
-                    if date.today() <= limite and intentos < max_intentos:
-                        is_ok = True
-                    else:
-                        motivo = "Regularidad vencida"
-                else:
-                    motivo = f"Situación no regular: {reg.get_situacion_display()}"
-            else:
-                motivo = "Sin regularidad registrada"
-
-            if not is_ok:
-                if req_id not in materia_names_cache:
-                    m_obj = Materia.objects.filter(id=req_id).only("nombre").first()
-                    materia_names_cache[req_id] = m_obj.nombre if m_obj else f"Materia {req_id}"
-
-                reporte.append(
-                    {
-                        "estudiante_id": est.id,
-                        "dni": est.dni,
-                        "apellido_nombre": f"{est.apellido}, {est.nombre}".strip(", ") or est.dni,
-                        "materia_actual": materia.nombre,
-                        "materia_correlativa": materia_names_cache[req_id],
-                        "motivo": motivo,
-                    }
-                )
-    return reporte
+def _csv_stream(filas, columnas: list[str]):
+    writer = csv.DictWriter(_Echo(), fieldnames=columnas)
+    yield writer.writeheader()
+    for fila in filas:
+        yield writer.writerow(fila)
 
 
 @estudiantes_router.get(
@@ -177,13 +104,38 @@ def _check_correlativas_caidas(
     response={200: list[CorrelativaCaidaItem], 403: ApiResponse},
     auth=JWTAuth(),
 )
-def reporte_correlativas_caidas(request, anio: int | None = None):
+def reporte_correlativas_caidas(request, anio: int | None = None, snapshot: bool = False, regenerar: bool = False):
+    """
+    Inscripciones del año con correlativas para cursar no cumplidas.
+    Con `snapshot=true` se sirve el resultado persistido del año (se calcula la primera
+    vez o cuando se pide `regenerar=true`).
+    """
     require(request.user, "ver_estudiantes")
     if not anio:
         anio = date.today().year
+    if snapshot or regenerar:
+        return snapshot_correlativas_caidas(anio, regenerar=regenerar, usuario=request.user).filas
     return _check_correlativas_caidas(anio)
 
 
+@estudiantes_router.get(
+    "/reportes/correlativas-caidas/download",
+    auth=JWTAuth(),
+)
+def download_correlativas_caidas(request, anio: int | None = None, snapshot: bool = False):
+    """Descarga el reporte en CSV, transmitiendo las filas a medida que se generan."""
+    require(request.user, "ver_estudiantes")
+    if not anio:
+        anio = date.today().year
+    filas = (
+        snapshot_correlativas_caidas(anio, usuario=request.user).filas if snapshot else iterar_correlativas_caidas(anio)
+    )
+
+    response = StreamingHttpResponse(_csv_stream(filas, COLUMNAS_CSV), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="correlativas_caidas_{anio}.csv"'
+    return response
+
+
 @estudiantes_router.get(
     "/me/alertas/",
     response={200: list[CorrelativaCaidaItem]},
@@ -197,165 +149,51 @@ def mis_alertas_academicas(request):
     return _check_correlativas_caidas(anio, estudiante=est)
 
 
-def _generar_auditoria_academica(
+def _auditoria_qs(
     profesorado_id: int | None = None,
     search: str | None = None,
     materia_id: int | None = None,
     solo_activos: bool = False,
-) -> list[dict]:
-    """
-    Genera un reporte de inconsistencias académicas (correlatividades no cumplidas).
-    Analiza aprobaciones y regularidades históricas.
-    """
-    estudiantes = Estudiante.objects.select_related("persona", "user")
-
+):
+    """Filtra las inconsistencias precalculadas (ver `calcular_auditoria_academica`)."""
+    qs = AuditoriaAcademicaItem.objects.all()
     if profesorado_id:
-        estudiantes = estudiantes.filter(carreras__id=profesorado_id)
-
+        qs = qs.filter(profesorado_id=profesorado_id)
+    if materia_id:
+        qs = qs.filter(materia_id=materia_id)
     if search:
-        from django.db.models import Q
-
-        estudiantes = estudiantes.filter(
-            Q(persona__dni__icontains=search)
-            | Q(persona__apellido__icontains=search)
-            | Q(persona__nombre__icontains=search)
-        )
-
+        qs = qs.filter(Q(dni__icontains=search) | Q(estudiante_nombre__icontains=search))
     if solo_activos:
-        estudiantes = estudiantes.filter(carreras_detalle__estado_academico="ACT")
-
-    estudiantes = estudiantes.distinct().all()
-
-    inconsistencies = []
-
-    # Pre-fetch para optimizar
-    # (En un futuro se podría optimizar aún más con queries dirigidas,
-    # pero dado el volumen actual de ~3k alumnos es manejable)
-
-    for est in estudiantes:
-        # 1. Recopilar estado académico del alumno
-        aprobadas = {}  # materia_id -> fecha_aprobacion
-
-        # Aprobaciones desde Actas
-        actas = ActaExamenEstudiante.objects.filter(dni=est.dni).select_related("acta")
-        for a in actas:
-            cond, _ = _acta_condicion(a.calificacion_definitiva)
-            if cond in ("APR", "EQUI"):
-                mid = a.acta.materia_id
-                fecha = a.acta.fecha
-                if mid not in aprobadas or (fecha and (mid not in aprobadas or fecha < aprobadas[mid])):
-                    aprobadas[mid] = fecha
-
-        # Aprobaciones desde Inscripciones a Mesa (incluye registros de Pandemia)
-        from core.models import InscripcionMesa
-
-        inscs_mesa = InscripcionMesa.objects.filter(
-            estudiante=est, condicion=InscripcionMesa.Condicion.APROBADO
-        ).select_related("mesa")
-        for i in inscs_mesa:
-            mid = i.mesa.materia_id
-            fecha = i.mesa.fecha
-            if mid not in aprobadas or (fecha and (mid not in aprobadas or fecha < aprobadas[mid])):
-                aprobadas[mid] = fecha
-
-        # Equivalencias (Disposiciones)
-        from core.models import EquivalenciaDisposicionDetalle
-
-        equis = EquivalenciaDisposicionDetalle.objects.filter(disposicion__estudiante=est).select_related("disposicion")
-        for eq in equis:
-            mid = eq.materia_id
-            fecha = eq.disposicion.fecha_disposicion
-            if mid not in aprobadas or (fecha and (mid not in aprobadas or fecha < aprobadas[mid])):
-                aprobadas[mid] = fecha
-
-        # Regularidades (incluyendo aprobaciones/promociones en cursada)
-        regs_raw = Regularidad.objects.filter(estudiante=est).select_related("materia")
-        regularizadas = {}  # materia_id -> [fecha_cierre, limite_vigencia, intentos]
-
-        for r in regs_raw:
-            if r.en_resguardo:
-                continue
-            if r.situacion in (Regularidad.Situacion.APROBADO, Regularidad.Situacion.PROMOCIONADO):
-                mid = r.materia_id
-                fecha = r.fecha_cierre
-                if mid not in aprobadas or fecha < aprobadas[mid]:
-                    aprobadas[mid] = fecha
-            elif r.situacion == Regularidad.Situacion.REGULAR:
-                limit, intentos, max_intentos = _calcular_vigencia_regularidad(est, r)
-                if limit >= date.today() and intentos < max_intentos:
-                    mid = r.materia_id
-                    if mid not in regularizadas or r.fecha_cierre > regularizadas[mid][0]:
-                        regularizadas[mid] = [r.fecha_cierre, limit, intentos]
-
-        # 2. Auditar Aprobaciones (Finales / Equivalencias)
-        for mid, fecha_aprob in aprobadas.items():
-            materia = Materia.objects.select_related("plan_de_estudio__profesorado").filter(id=mid).first()
-            if not materia:
-                continue
-
-            # Filtro por profesorado específico
-            if profesorado_id and materia.plan_de_estudio.profesorado_id != profesorado_id:
-                continue
-
-            # Obtener correlativas APR para este alumno (considerando su cohorte)
-            correlativas = _correlatividades_qs(materia, Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR, est)
-
-            for corr in correlativas:
-                req_id = corr.materia_correlativa_id
-                # Inconsistencia si no está aprobada actualmente
-                if req_id not in aprobadas:
-                    inconsistencies.append(
-                        {
-                            "estudiante": f"{est.apellido}, {est.nombre}",
-                            "dni": est.dni,
-                            "carrera": materia.plan_de_estudio.profesorado.nombre,
-                            "materia": materia.nombre,
-                            "evento": "Aprobación Final",
-                            "fecha": str(fecha_aprob),
-                            "prerrequisito": corr.materia_correlativa.nombre,
-                            "tipo_corr": "Aprobada para Rendir",
-                            "motivo": "Prerrequisito no aprobado",
-                        }
-                    )
-
-        for r in regs_raw:
-            if r.situacion != Regularidad.Situacion.REGULAR:
-                continue
-            if r.en_resguardo:
-                continue
-
-            materia = r.materia
-            # Filtro por profesorado específico
-            if profesorado_id and materia.plan_de_estudio.profesorado_id != profesorado_id:
-                continue
-
-            # Filtro por materia_id específico
-            if materia_id and materia.id != materia_id:
-                continue
-
-            correlativas = _correlatividades_qs(materia, Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR, est)
-            for corr in correlativas:
-                req_id = corr.materia_correlativa_id
-                has_req = False
-                if req_id in aprobadas or req_id in regularizadas:
-                    has_req = True
-
-                if not has_req:
-                    inconsistencies.append(
-                        {
-                            "estudiante": f"{est.apellido}, {est.nombre}",
-                            "dni": est.dni,
-                            "carrera": materia.plan_de_estudio.profesorado.nombre,
-                            "materia": materia.nombre,
-                            "evento": "Regularización",
-                            "fecha": str(r.fecha_cierre),
-                            "prerrequisito": corr.materia_correlativa.nombre,
-                            "tipo_corr": "Regular para Cursar",
-                            "motivo": "Prerrequisito no regularizado ni aprobado al cierre",
-                        }
-                    )
-
-    return inconsistencies
+        qs = qs.filter(estudiante_activo=True)
+    return qs
+
+
+def _auditoria_filas(qs):
+    """Convierte filas de la tabla de auditoría al formato de `AuditoriaInconsistenciaItem`."""
+    eventos = dict(AuditoriaAcademicaItem.Evento.choices)
+    tipos = dict(Correlatividad.TipoCorrelatividad.choices)
+    for row in qs.values(
+        "estudiante_nombre",
+        "dni",
+        "profesorado__nombre",
+        "materia_nombre",
+        "evento",
+        "fecha",
+        "prerrequisito_nombre",
+        "tipo_corr",
+        "motivo",
+    ).iterator(chunk_size=2000):
+        yield {
+            "estudiante": row["estudiante_nombre"],
+            "dni": row["dni"],
+            "carrera": row["profesorado__nombre"],
+            "materia": row["materia_nombre"],
+            "evento": eventos.get(row["evento"], row["evento"]),
+            "fecha": str(row["fecha"]) if row["fecha"] else "",
+            "prerrequisito": row["prerrequisito_nombre"],
+            "tipo_corr": tipos.get(row["tipo_corr"], row["tipo_corr"]),
+            "motivo": row["motivo"],
+        }
 
 
 @estudiantes_router.get(
@@ -375,9 +213,73 @@ def reporte_auditoria_inconsistencias(
     Detecta aprobaciones sin final o regularidades sin cursadas previas requeridas.
     """
     require(request.user, "ver_estudiantes")
-    return _generar_auditoria_academica(
-        profesorado_id=profesorado_id, search=search, materia_id=materia_id, solo_activos=solo_activos
-    )
+    qs = _auditoria_qs(profesorado_id=profesorado_id, search=search, materia_id=materia_id, solo_activos=solo_activos)
+    return list(_auditoria_filas(qs))
+
+
+@estudiantes_router.get(
+    "/reportes/auditoria-academica/",
+    response={200: AuditoriaAcademicaListResponse, 403: ApiResponse},
+    auth=JWTAuth(),
+)
+def listar_auditoria_academica(
+    request,
+    profesorado_id: int | None = None,
+    search: str | None = None,
+    materia_id: int | None = None,
+    solo_activos: bool = False,
+    limit: int = 50,
+    offset: int = 0,
+):
+    """Auditoría precalculada paginada, con el estado y la fecha de cálculo de cada profesorado."""
+    require(request.user, "ver_estudiantes")
+    limit = max(1, min(limit, 200))  # Tope de 200 filas por página
+    offset = max(0, offset)
+    qs = _auditoria_qs(profesorado_id=profesorado_id, search=search, materia_id=materia_id, solo_activos=solo_activos)
+    particiones = AuditoriaAcademicaParticion.objects.select_related("profesorado").order_by("profesorado__nombre")
+    if profesorado_id:
+        particiones = particiones.filter(profesorado_id=profesorado_id)
+    return {
+        "total": qs.count(),
+        "items": list(_auditoria_filas(qs[offset : offset + limit])),
+        "particiones": [
+            {
+                "profesorado_id": p.profesorado_id,
+                "profesorado": p.profesorado.nombre,
+                "estado": p.estado,
+                "total": p.total,
+                "calculado_en": p.calculado_en.isoformat() if p.calculado_en else None,
+            }
+            for p in particiones
+        ],
+    }
+
+
+@estudiantes_router.post(
+    "/reportes/auditoria-academica/recalcular",
+    response={202: ApiResponse, 403: ApiResponse},
+    auth=JWTAuth(),
+)
+def recalcular_auditoria_academica(request, profesorado_id: int | None = None):
+    """Encola el recálculo de la auditoría (todas las particiones o un profesorado)."""
+    require(request.user, "editar_estudiantes")
+    job = enqueue(JOB_RECALCULO, {"profesorado_id": profesorado_id}, user=request.user, max_attempts=1)
+    return 202, ApiResponse(ok=True, message="Recálculo de la auditoría iniciado.", data={"job_id": job.id})
+
+
+@estudiantes_router.post(
+    "/reportes/auditoria-academica/estudiantes/{dni}/recalcular",
+    response={200: ApiResponse, 403: ApiResponse, 404: ApiResponse},
+    auth=JWTAuth(),
+)
+def recalcular_auditoria_academica_estudiante(request, dni: str):
+    """Recalcula en el momento las inconsistencias de un único estudiante."""
+    require(request.user, "editar_estudiantes")
+    est = Estudiante.objects.filter(persona__dni=dni).first()
+    if not est:
+        return 404, ApiResponse(ok=False, message="Estudiante no encontrado.")
+    total = recalcular_auditoria_estudiante(est.id)
+    return 200, ApiResponse(ok=True, message=f"Auditoría recalculada: {total} inconsistencias.", data={"total": total})
 
 
 @estudiantes_router.get(
@@ -395,22 +297,8 @@ def download_auditoria_inconsistencias(
     Descarga el reporte de inconsistencias en formato CSV.
     """
     require(request.user, "ver_estudiantes")
-    import csv
-
-    from django.http import HttpResponse
-
-    data = _generar_auditoria_academica(
-        profesorado_id=profesorado_id, search=search, materia_id=materia_id, solo_activos=solo_activos
-    )
-
-    response = HttpResponse(content_type="text/csv")
+    qs = _auditoria_qs(profesorado_id=profesorado_id, search=search, materia_id=materia_id, solo_activos=solo_activos)
+    filas = _auditoria_filas(qs)
+    response = StreamingHttpResponse(_csv_stream(filas, COLUMNAS_AUDITORIA_CSV), content_type="text/csv")
     response["Content-Disposition"] = 'attachment; filename="auditoria_inconsistencias.csv"'
-
-    writer = csv.DictWriter(
-        response, fieldnames=["estudiante", "dni", "materia", "evento", "fecha", "prerrequisito", "tipo_corr", "motivo"]
-    )
-    writer.writeheader()
-    for row in data:
-        writer.writerow(row)
-
     return response
@@ -22,6 +22,7 @@ from django.utils import timezone
 
 from apps.common.api_schemas import ApiResponse
 from apps.common.date_utils import format_date, format_datetime
+from apps.common.renderers import trusted_response
 from core.auth_ninja import JWTAuth
 from core.models import (
     ActaExamenEstudiante,
@@ -143,6 +144,7 @@ def historial_estudiante(request, dni: str | None = None):
 
 
 @estudiantes_router.get("/trayectoria", response={200: TrayectoriaOut, 404: ApiResponse}, auth=JWTAuth())
+@trusted_response
 def trayectoria_estudiante(request, dni: str | None = None):
     """
     Construye la trayectoria académica integral ('Cartón del Alumno').
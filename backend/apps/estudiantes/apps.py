@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EstudiantesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.estudiantes"
+
+    def ready(self) -> None:
+        # Invalida el catálogo cacheado de materias-plan ante ediciones de horarios/correlatividades.
+        from . import signals  # noqa: F401
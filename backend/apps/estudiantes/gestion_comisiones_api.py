@@ -6,6 +6,7 @@ from django.db.models import Count, Q
 from ninja import Router, Schema
 
 from apps.common.api_schemas import ApiResponse
+from apps.estudiantes.services.horarios_conflictos import IndiceHorarioSemanal, intervalos_de_comisiones
 from core.auth_ninja import JWTAuth
 from core.models import Comision, Estudiante, InscripcionMateriaEstudiante, Materia, Turno
 from core.permissions import requires
@@ -200,8 +201,32 @@ def distribuir_estudiantes(request, payload: DistribuirEstudiantesIn):
 @router.post("/mover", response={200: ApiResponse, 400: ApiResponse}, auth=JWTAuth())
 @requires("editar_estructura")
 def mover_estudiantes(request, payload: MoverEstudiantesIn):
-    updated = InscripcionMateriaEstudiante.objects.filter(id__in=payload.inscripcion_ids).update(
-        comision_id=payload.comision_destino_id
-    )
+    destino = Comision.objects.filter(id=payload.comision_destino_id).first()
+    if not destino:
+        return 400, ApiResponse(ok=False, message="Comisión de destino no encontrada.")
+
+    # Superposiciones que el movimiento genera (no bloquean: se informan a bedelía)
+    superposiciones = []
+    candidatos = intervalos_de_comisiones([destino.id]).get(destino.id, [])
+    if candidatos:
+        inscripciones = list(
+            InscripcionMateriaEstudiante.objects.filter(id__in=payload.inscripcion_ids).values_list(
+                "estudiante_id", "estudiante__persona__dni"
+            )
+        )
+        indices = IndiceHorarioSemanal.para_estudiantes(
+            {est_id for est_id, _ in inscripciones},
+            destino.anio_lectivo,
+            excluir_inscripciones=payload.inscripcion_ids,
+        )
+        for est_id, dni in inscripciones:
+            colision = indices[est_id].primer_conflicto(candidatos)
+            if colision:
+                superposiciones.append({"dni": dni, "materia": colision.materia.nombre})
+
+    updated = InscripcionMateriaEstudiante.objects.filter(id__in=payload.inscripcion_ids).update(comision_id=destino.id)
 
-    return ApiResponse(ok=True, message=f"Se movieron {updated} estudiantes.")
+    message = f"Se movieron {updated} estudiantes."
+    if superposiciones:
+        message += f" {len(superposiciones)} quedaron con superposición horaria."
+    return ApiResponse(ok=True, message=message, data={"superposiciones": superposiciones})
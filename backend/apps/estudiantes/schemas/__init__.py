@@ -89,10 +89,12 @@ from apps.estudiantes.schemas.inscripciones import (
     SolicitudCambioComisionItem,
 )
 from apps.estudiantes.schemas.materias import (
+    ComisionSuperposiciones,
     Cuatrimestre,
     HistorialEstudiante,
     Horario,
     MateriaPlan,
+    SuperposicionHorario,
 )
 from apps.estudiantes.schemas.mesas import (
     BajaMesaIn,
@@ -148,6 +150,8 @@ __all__ = [
     "Horario",
     "Cuatrimestre",
     "MateriaPlan",
+    "SuperposicionHorario",
+    "ComisionSuperposiciones",
     "HistorialEstudiante",
     # inscripciones
     "InscripcionCarreraIn",
@@ -34,6 +34,20 @@ class MateriaPlan(Schema):
     vigente: bool = True
 
 
+class SuperposicionHorario(Schema):
+    dia: str
+    desde: str
+    hasta: str
+    materia_id: int
+    materia_nombre: str
+    comision_id: int | None = None
+
+
+class ComisionSuperposiciones(Schema):
+    comision_id: int
+    superposiciones: list[SuperposicionHorario] = Field(default_factory=list)
+
+
 class HistorialEstudiante(Schema):
     aprobadas: list[int] = Field(default_factory=list)
     regularizadas: list[int] = Field(default_factory=list)
@@ -0,0 +1,278 @@
+"""
+Auditoría académica precalculada.
+
+Detecta aprobaciones de final sin sus correlativas "aprobada para rendir" y
+regularizaciones sin sus correlativas "regular para cursar". El cálculo recorre a los
+estudiantes por lotes con un número fijo de consultas por lote y guarda el resultado en
+`AuditoriaAcademicaItem`, particionado por profesorado de la materia auditada; las
+pantallas de administración leen de esa tabla en lugar de recalcular.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from apps.common.jobs import job_handler
+from core.models import (
+    ActaExamenEstudiante,
+    AuditoriaAcademicaItem,
+    AuditoriaAcademicaParticion,
+    BackgroundJob,
+    Correlatividad,
+    EquivalenciaDisposicionDetalle,
+    Estudiante,
+    EstudianteCarrera,
+    InscripcionMesa,
+    Materia,
+    Profesorado,
+    Regularidad,
+)
+
+from .situacion_academica import (
+    ResolutorCorrelatividades,
+    cohortes_por_estudiante,
+    nota_aprobada,
+    regularidad_vigente,
+    vigencias_regularidades,
+)
+
+logger = logging.getLogger(__name__)
+
+LOTE_ESTUDIANTES = 500
+JOB_RECALCULO = "estudiantes.auditoria_academica"
+
+MOTIVO_FINAL = "Prerrequisito no aprobado"
+MOTIVO_REGULARIZACION = "Prerrequisito no regularizado ni aprobado al cierre"
+
+
+def _estudiantes(qs) -> list[dict]:
+    activo = EstudianteCarrera.objects.filter(
+        estudiante=OuterRef("pk"), estado_academico=EstudianteCarrera.EstadoAcademico.ACTIVO
+    )
+    return list(
+        qs.annotate(activo=Exists(activo))
+        .order_by("id")
+        .values("id", "persona__dni", "persona__apellido", "persona__nombre", "activo")
+    )
+
+
+def _registrar_aprobacion(aprobadas: dict[int, date | None], materia_id: int, fecha: date | None) -> None:
+    """Registra la aprobación conservando la fecha más temprana conocida."""
+    actual = aprobadas.get(materia_id)
+    if materia_id not in aprobadas or (fecha and (actual is None or fecha < actual)):
+        aprobadas[materia_id] = fecha
+
+
+def calcular_inconsistencias(estudiantes: list[dict], hoy: date | None = None) -> list[dict]:
+    """
+    Inconsistencias de un lote de estudiantes (dicts de `_estudiantes`).
+
+    Devuelve dicts con los campos de `AuditoriaAcademicaItem` listos para `bulk_create`.
+    """
+    if not estudiantes:
+        return []
+    hoy = hoy or date.today()
+    est_ids = [e["id"] for e in estudiantes]
+    dni_por_est = {e["id"]: e["persona__dni"] or "" for e in estudiantes}
+    est_por_dni = {dni: est_id for est_id, dni in dni_por_est.items() if dni}
+
+    # 1. Aprobaciones (fecha más temprana por materia): actas, mesas, equivalencias y cursadas.
+    aprobadas: dict[int, dict[int, date | None]] = defaultdict(dict)
+    for dni, mid, fecha, calificacion in ActaExamenEstudiante.objects.filter(dni__in=list(est_por_dni)).values_list(
+        "dni", "acta__materia_id", "acta__fecha", "calificacion_definitiva"
+    ):
+        if nota_aprobada(calificacion):
+            _registrar_aprobacion(aprobadas[est_por_dni[dni]], mid, fecha)
+    for est_id, mid, fecha in InscripcionMesa.objects.filter(
+        estudiante_id__in=est_ids, condicion=InscripcionMesa.Condicion.APROBADO
+    ).values_list("estudiante_id", "mesa__materia_id", "mesa__fecha"):
+        _registrar_aprobacion(aprobadas[est_id], mid, fecha)
+    for est_id, mid, fecha in EquivalenciaDisposicionDetalle.objects.filter(
+        disposicion__estudiante_id__in=est_ids
+    ).values_list("disposicion__estudiante_id", "materia_id", "disposicion__fecha_disposicion"):
+        _registrar_aprobacion(aprobadas[est_id], mid, fecha)
+
+    # 2. Regularidades: las aprobadas/promocionadas cuentan como aprobación; las regulares
+    #    vigentes habilitan como "regularizada".
+    regularidades = list(
+        Regularidad.objects.filter(estudiante_id__in=est_ids)
+        .order_by("id")
+        .values("id", "estudiante_id", "materia_id", "situacion", "fecha_cierre", "en_resguardo")
+    )
+    vigencias = vigencias_regularidades(regularidades, dni_por_est, hoy=hoy)
+    regularizadas: dict[int, set[int]] = defaultdict(set)
+    regulares: list[dict] = []
+    for reg in regularidades:
+        if reg["en_resguardo"]:
+            continue
+        if reg["situacion"] in (Regularidad.Situacion.APROBADO, Regularidad.Situacion.PROMOCIONADO):
+            _registrar_aprobacion(aprobadas[reg["estudiante_id"]], reg["materia_id"], reg["fecha_cierre"])
+        elif reg["situacion"] == Regularidad.Situacion.REGULAR:
+            regulares.append(reg)
+            if regularidad_vigente(vigencias[reg["id"]], hoy):
+                regularizadas[reg["estudiante_id"]].add(reg["materia_id"])
+
+    # 3. Correlatividades por cohorte para las materias involucradas.
+    materias_aprobadas = {mid for por_materia in aprobadas.values() for mid in por_materia}
+    para_rendir = ResolutorCorrelatividades(materias_aprobadas, Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR)
+    para_cursar = ResolutorCorrelatividades(
+        {reg["materia_id"] for reg in regulares}, Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR
+    )
+    cohortes = cohortes_por_estudiante(est_ids)
+    materias = {
+        m["id"]: m
+        for m in Materia.objects.filter(
+            id__in=materias_aprobadas
+            | {reg["materia_id"] for reg in regulares}
+            | para_rendir.materias_requeridas()
+            | para_cursar.materias_requeridas()
+        ).values("id", "nombre", "plan_de_estudio__profesorado_id")
+    }
+
+    calculado_en = timezone.now()
+    filas: list[dict] = []
+    por_id = {e["id"]: e for e in estudiantes}
+
+    def _fila(est_id, materia_id, evento, fecha, req_id, tipo, motivo) -> dict:
+        est = por_id[est_id]
+        return {
+            "profesorado_id": materias[materia_id]["plan_de_estudio__profesorado_id"],
+            "estudiante_id": est_id,
+            "dni": est["persona__dni"] or "",
+            "estudiante_nombre": f"{est['persona__apellido'] or ''}, {est['persona__nombre'] or ''}",
+            "estudiante_activo": est["activo"],
+            "materia_id": materia_id,
+            "materia_nombre": materias[materia_id]["nombre"],
+            "evento": evento,
+            "fecha": fecha,
+            "prerrequisito_id": req_id,
+            "prerrequisito_nombre": materias.get(req_id, {}).get("nombre", f"Materia {req_id}"),
+            "tipo_corr": tipo,
+            "motivo": motivo,
+            "calculado_en": calculado_en,
+        }
+
+    for est_id in est_ids:
+        mis_aprobadas = aprobadas.get(est_id, {})
+        for mid, fecha in mis_aprobadas.items():
+            if mid not in materias or not materias[mid]["plan_de_estudio__profesorado_id"]:
+                continue
+            cohorte = cohortes.get((est_id, para_rendir.profesorado_de(mid)))
+            for req_id in para_rendir.requeridas(mid, cohorte):
+                if req_id not in mis_aprobadas:
+                    filas.append(
+                        _fila(
+                            est_id,
+                            mid,
+                            AuditoriaAcademicaItem.Evento.APROBACION_FINAL,
+                            fecha,
+                            req_id,
+                            Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR,
+                            MOTIVO_FINAL,
+                        )
+                    )
+
+    for reg in regulares:
+        est_id, mid = reg["estudiante_id"], reg["materia_id"]
+        if mid not in materias or not materias[mid]["plan_de_estudio__profesorado_id"]:
+            continue
+        cohorte = cohortes.get((est_id, para_cursar.profesorado_de(mid)))
+        for req_id in para_cursar.requeridas(mid, cohorte):
+            if req_id not in aprobadas.get(est_id, {}) and req_id not in regularizadas.get(est_id, set()):
+                filas.append(
+                    _fila(
+                        est_id,
+                        mid,
+                        AuditoriaAcademicaItem.Evento.REGULARIZACION,
+                        reg["fecha_cierre"],
+                        req_id,
+                        Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR,
+                        MOTIVO_REGULARIZACION,
+                    )
+                )
+    return filas
+
+
+def _por_lotes(estudiantes: list[dict], hoy: date | None) -> Iterable[dict]:
+    for inicio in range(0, len(estudiantes), LOTE_ESTUDIANTES):
+        yield from calcular_inconsistencias(estudiantes[inicio : inicio + LOTE_ESTUDIANTES], hoy=hoy)
+
+
+def _marcar_en_curso(profesorado_ids: list[int]) -> None:
+    ahora = timezone.now()
+    for prof_id in profesorado_ids:
+        AuditoriaAcademicaParticion.objects.update_or_create(
+            profesorado_id=prof_id,
+            defaults={"estado": AuditoriaAcademicaParticion.Estado.EN_CURSO, "iniciado_en": ahora, "error": ""},
+        )
+
+
+def recalcular_auditoria(profesorado_id: int | None = None, hoy: date | None = None) -> dict[int, int]:
+    """
+    Recalcula la auditoría completa (o de un profesorado) y reemplaza sus particiones.
+
+    Cada partición se reemplaza en su propia transacción, de modo que los lectores ven
+    siempre el cálculo anterior completo o el nuevo completo. Devuelve el total por profesorado.
+    """
+    profesorado_ids = [profesorado_id] if profesorado_id else list(Profesorado.objects.values_list("id", flat=True))
+    _marcar_en_curso(profesorado_ids)
+
+    estudiantes_qs = Estudiante.objects.all()
+    if profesorado_id:
+        estudiantes_qs = estudiantes_qs.filter(carreras__id=profesorado_id).distinct()
+
+    try:
+        por_profesorado: dict[int, list[dict]] = defaultdict(list)
+        for fila in _por_lotes(_estudiantes(estudiantes_qs), hoy):
+            if fila["profesorado_id"] in profesorado_ids:
+                por_profesorado[fila["profesorado_id"]].append(fila)
+    except Exception as exc:
+        logger.exception("Error calculando la auditoría académica")
+        AuditoriaAcademicaParticion.objects.filter(profesorado_id__in=profesorado_ids).update(
+            estado=AuditoriaAcademicaParticion.Estado.ERROR, error=str(exc)[:2000]
+        )
+        raise
+
+    totales = {}
+    for prof_id in profesorado_ids:
+        filas = por_profesorado.get(prof_id, [])
+        with transaction.atomic():
+            AuditoriaAcademicaItem.objects.filter(profesorado_id=prof_id).delete()
+            AuditoriaAcademicaItem.objects.bulk_create(
+                [AuditoriaAcademicaItem(**fila) for fila in filas], batch_size=1000
+            )
+            AuditoriaAcademicaParticion.objects.filter(profesorado_id=prof_id).update(
+                estado=AuditoriaAcademicaParticion.Estado.COMPLETADA,
+                total=len(filas),
+                calculado_en=timezone.now(),
+            )
+        totales[prof_id] = len(filas)
+    return totales
+
+
+def recalcular_auditoria_estudiante(estudiante_id: int, hoy: date | None = None) -> int:
+    """Recalcula solo las filas de un estudiante en todas las particiones."""
+    filas = calcular_inconsistencias(_estudiantes(Estudiante.objects.filter(id=estudiante_id)), hoy=hoy)
+    anteriores = AuditoriaAcademicaItem.objects.filter(estudiante_id=estudiante_id)
+    with transaction.atomic():
+        afectados = set(anteriores.values_list("profesorado_id", flat=True)) | {f["profesorado_id"] for f in filas}
+        anteriores.delete()
+        AuditoriaAcademicaItem.objects.bulk_create([AuditoriaAcademicaItem(**fila) for fila in filas])
+        for prof_id in afectados:
+            AuditoriaAcademicaParticion.objects.filter(profesorado_id=prof_id).update(
+                total=AuditoriaAcademicaItem.objects.filter(profesorado_id=prof_id).count()
+            )
+    return len(filas)
+
+
+@job_handler(JOB_RECALCULO)
+def _tarea_recalculo(job: BackgroundJob) -> dict:
+    totales = recalcular_auditoria(profesorado_id=job.payload.get("profesorado_id"))
+    return {"profesorados": len(totales), "total": sum(totales.values())}
@@ -0,0 +1,171 @@
+"""
+Reporte de correlatividades caídas.
+
+Detecta inscripciones a cursar de un año cuya correlativa "regular para cursar" ya no
+está cumplida (sin regularidad, regularidad vencida, en resguardo, etc.). Toda la
+información se carga en un número fijo de consultas, independiente de la cantidad de
+estudiantes, y las filas se generan de a una para poder transmitirlas como CSV.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import date
+
+from django.db import transaction
+
+from core.models import (
+    ActaExamenEstudiante,
+    Correlatividad,
+    EquivalenciaDisposicionDetalle,
+    InscripcionMateriaEstudiante,
+    InscripcionMesa,
+    Materia,
+    Regularidad,
+    ReporteSnapshot,
+)
+
+from .situacion_academica import (
+    ResolutorCorrelatividades,
+    cohortes_por_estudiante,
+    regularidad_vigente,
+    vigencias_regularidades,
+)
+
+CALIFICACIONES_APROBADAS = ["6", "7", "8", "9", "10", "APR", "EQUI"]
+
+COLUMNAS_CSV = ["estudiante_id", "dni", "apellido_nombre", "materia_actual", "materia_correlativa", "motivo"]
+
+
+def _agrupar(filas) -> dict:
+    agrupado: dict = defaultdict(set)
+    for clave, valor in filas:
+        agrupado[clave].add(valor)
+    return agrupado
+
+
+def iterar_correlativas_caidas(
+    anio: int,
+    estudiante_id: int | None = None,
+    materia_id: int | None = None,
+    hoy: date | None = None,
+) -> Iterator[dict]:
+    """Genera una fila por (inscripción, correlativa no cumplida)."""
+    hoy = hoy or date.today()
+    qs = InscripcionMateriaEstudiante.objects.filter(
+        anio=anio,
+        estado__in=[InscripcionMateriaEstudiante.Estado.CONFIRMADA, InscripcionMateriaEstudiante.Estado.PENDIENTE],
+    )
+    if estudiante_id:
+        qs = qs.filter(estudiante_id=estudiante_id)
+    if materia_id:
+        qs = qs.filter(materia_id=materia_id)
+
+    inscripciones = list(
+        qs.order_by("id").values_list(
+            "estudiante_id",
+            "estudiante__persona__dni",
+            "estudiante__persona__apellido",
+            "estudiante__persona__nombre",
+            "materia_id",
+            "materia__nombre",
+        )
+    )
+    if not inscripciones:
+        return
+
+    dni_por_est = {est_id: dni or "" for est_id, dni, *_ in inscripciones}
+    est_ids = set(dni_por_est)
+    resolutor = ResolutorCorrelatividades(
+        {insc[4] for insc in inscripciones}, Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR
+    )
+    requeridas_ids = resolutor.materias_requeridas()
+    if not requeridas_ids:
+        return
+    cohortes = cohortes_por_estudiante(est_ids)
+
+    # Aprobaciones por actas (DNI), mesas (incluye registros de pandemia) y equivalencias.
+    aprobadas_por_dni = _agrupar(
+        ActaExamenEstudiante.objects.filter(
+            dni__in=set(dni_por_est.values()) - {""},
+            acta__materia_id__in=requeridas_ids,
+            calificacion_definitiva__in=CALIFICACIONES_APROBADAS,
+        ).values_list("dni", "acta__materia_id")
+    )
+    aprobadas_por_est = _agrupar(
+        InscripcionMesa.objects.filter(
+            estudiante_id__in=est_ids,
+            mesa__materia_id__in=requeridas_ids,
+            condicion=InscripcionMesa.Condicion.APROBADO,
+        ).values_list("estudiante_id", "mesa__materia_id")
+    )
+    for est_id, mid in EquivalenciaDisposicionDetalle.objects.filter(
+        disposicion__estudiante_id__in=est_ids, materia_id__in=requeridas_ids
+    ).values_list("disposicion__estudiante_id", "materia_id"):
+        aprobadas_por_est[est_id].add(mid)
+
+    regularidades = list(
+        Regularidad.objects.filter(estudiante_id__in=est_ids, materia_id__in=requeridas_ids)
+        .order_by("estudiante_id", "materia_id", "-fecha_cierre", "-id")
+        .values("id", "estudiante_id", "materia_id", "situacion", "fecha_cierre", "en_resguardo")
+    )
+    ultima_regularidad: dict[tuple[int, int], dict] = {}
+    for reg in regularidades:
+        ultima_regularidad.setdefault((reg["estudiante_id"], reg["materia_id"]), reg)
+    vigencias = vigencias_regularidades(regularidades, dni_por_est, hoy=hoy)
+
+    nombres = dict(Materia.objects.filter(id__in=requeridas_ids).values_list("id", "nombre"))
+    situaciones = dict(Regularidad.Situacion.choices)
+
+    for est_id, dni, apellido, nombre, mat_id, mat_nombre in inscripciones:
+        cohorte = cohortes.get((est_id, resolutor.profesorado_de(mat_id)))
+        requeridas = resolutor.requeridas(mat_id, cohorte)
+        if not requeridas:
+            continue
+        aprobadas = aprobadas_por_dni.get(dni, set()) | aprobadas_por_est.get(est_id, set())
+
+        for req_id in requeridas:
+            if req_id in aprobadas:
+                continue
+
+            reg = ultima_regularidad.get((est_id, req_id))
+            if not reg:
+                motivo = "Sin regularidad registrada"
+            elif reg["en_resguardo"]:
+                motivo = "Regularidad en resguardo"
+            elif reg["situacion"] in (Regularidad.Situacion.APROBADO, Regularidad.Situacion.PROMOCIONADO):
+                continue
+            elif reg["situacion"] == Regularidad.Situacion.REGULAR:
+                if regularidad_vigente(vigencias[reg["id"]], hoy):
+                    continue
+                motivo = "Regularidad vencida"
+            else:
+                motivo = f"Situación no regular: {situaciones.get(reg['situacion'], reg['situacion'])}"
+
+            yield {
+                "estudiante_id": est_id,
+                "dni": dni or "",
+                "apellido_nombre": f"{apellido or ''}, {nombre or ''}".strip(", ") or (dni or ""),
+                "materia_actual": mat_nombre,
+                "materia_correlativa": nombres.get(req_id, f"Materia {req_id}"),
+                "motivo": motivo,
+            }
+
+
+def snapshot_correlativas_caidas(anio: int, regenerar: bool = False, usuario=None) -> ReporteSnapshot:
+    """Snapshot persistido del reporte institucional del año; se calcula solo si no existe o se pide regenerar."""
+    clave = str(anio)
+    if not regenerar:
+        existente = ReporteSnapshot.objects.filter(tipo=ReporteSnapshot.Tipo.CORRELATIVAS_CAIDAS, clave=clave).first()
+        if existente:
+            return existente
+
+    filas = list(iterar_correlativas_caidas(anio))
+    with transaction.atomic():
+        snapshot, _ = ReporteSnapshot.objects.update_or_create(
+            tipo=ReporteSnapshot.Tipo.CORRELATIVAS_CAIDAS,
+            clave=clave,
+            defaults={"filas": filas, "total": len(filas), "generado_por": usuario},
+        )
+    return snapshot
@@ -0,0 +1,192 @@
+"""
+Exportación masiva de documentos PDF (constancias, certificados y actas).
+
+Secretaría pide los documentos de una mesa, una cohorte o una comisión completa en una
+sola descarga. La exportación corre en la cola de tareas: cada documento se genera de a
+uno (reutilizando la caché de PDF) y se escribe enseguida en un archivo temporal, de modo
+que la memoria no crece con la cantidad de documentos:
+
+- formato `zip`: un PDF por documento dentro de un ZIP escrito en disco a medida que avanza;
+- formato `pdf`: un único PDF unido con pypdf. La unión mantiene las páginas en memoria
+  hasta escribir el archivo, por eso tiene un tope de documentos (`EXPORTACION_PDF_MAX_DOCUMENTOS`);
+  para lotes mayores se usa el ZIP.
+
+El archivo queda en el resultado de la tarea y se descarga por `/system/jobs/{id}/resultado`,
+que lo envía desde el disco en bloques.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import zipfile
+from collections.abc import Iterator
+
+from django.conf import settings
+from pypdf import PdfWriter
+
+from apps.common.constants import AppErrorCode
+from apps.common.errors import AppError
+from apps.common.jobs import JobFile, job_handler, set_progress
+from apps.common.pdf import cached_pdf, render_html
+from core.models import (
+    ActaExamen,
+    BackgroundJob,
+    Estudiante,
+    InscripcionMateriaEstudiante,
+    InscripcionMesa,
+    PlanDeEstudio,
+    Profesorado,
+)
+
+JOB_EXPORTACION = "estudiantes.exportacion_pdf"
+
+TIPOS = ("constancias_examen", "certificados_regulares", "actas_examen")
+FORMATOS = ("zip", "pdf")
+
+PLANTILLA_CONSTANCIA = "core/constancia_examen_pdf.html"
+PLANTILLA_CERTIFICADO = "core/certificado_alumno_regular_pdf.html"
+
+
+def _error(message: str) -> AppError:
+    return AppError(400, AppErrorCode.VALIDATION_ERROR, message)
+
+
+def _constancias_examen(filtros: dict):
+    if not filtros.get("mesa_id"):
+        raise _error("Indicá la mesa de examen.")
+    return (
+        InscripcionMesa.objects.select_related(
+            "mesa__materia__plan_de_estudio__profesorado",
+            "mesa__docente_presidente",
+            "mesa__docente_vocal1",
+            "mesa__docente_vocal2",
+            "estudiante__persona",
+        )
+        .filter(
+            mesa_id=filtros["mesa_id"],
+            nota__isnull=False,
+            condicion__in=[InscripcionMesa.Condicion.APROBADO, InscripcionMesa.Condicion.DESAPROBADO],
+        )
+        .order_by("estudiante__persona__apellido", "estudiante__persona__nombre")
+    )
+
+
+def _certificados_regulares(filtros: dict):
+    if not filtros.get("profesorado_id") or not filtros.get("plan_id"):
+        raise _error("Indicá el profesorado y el plan de estudio.")
+    if not filtros.get("cohorte") and not filtros.get("comision_id"):
+        raise _error("Indicá la cohorte o la comisión.")
+    qs = Estudiante.objects.select_related("persona", "user")
+    if filtros.get("cohorte"):
+        qs = qs.filter(
+            carreras_detalle__profesorado_id=filtros["profesorado_id"],
+            carreras_detalle__anio_ingreso=filtros["cohorte"],
+        )
+    if filtros.get("comision_id"):
+        qs = qs.filter(
+            inscripciones_materia__comision_id=filtros["comision_id"],
+            inscripciones_materia__estado=InscripcionMateriaEstudiante.Estado.CONFIRMADA,
+        )
+    return qs.distinct().order_by("persona__apellido", "persona__nombre")
+
+
+def _actas_examen(filtros: dict):
+    qs = ActaExamen.objects.all()
+    if filtros.get("mesa_id"):
+        qs = qs.filter(mesa_id=filtros["mesa_id"])
+    elif filtros.get("profesorado_id") and filtros.get("anio_academico"):
+        qs = qs.filter(profesorado_id=filtros["profesorado_id"], anio_academico=filtros["anio_academico"])
+    else:
+        raise _error("Indicá la mesa, o el profesorado y el año académico.")
+    return qs.order_by("fecha", "numero", "id")
+
+
+FUENTES = {
+    "constancias_examen": _constancias_examen,
+    "certificados_regulares": _certificados_regulares,
+    "actas_examen": _actas_examen,
+}
+
+
+def preparar_exportacion(tipo: str, formato: str, filtros: dict) -> int:
+    """Valida el pedido y devuelve la cantidad de documentos que va a generar."""
+    if tipo not in TIPOS:
+        raise _error(f"Tipo de documento inválido: {tipo}.")
+    if formato not in FORMATOS:
+        raise _error(f"Formato inválido: {formato}.")
+    total = FUENTES[tipo](filtros).count()
+    if not total:
+        raise AppError(404, AppErrorCode.NOT_FOUND, "No hay documentos para exportar con ese filtro.")
+    maximo = settings.EXPORTACION_PDF_MAX_DOCUMENTOS
+    if formato == "pdf" and total > maximo:
+        raise _error(f"Son {total} documentos; el PDF único admite hasta {maximo}. Exportá en ZIP.")
+    return total
+
+
+def _documentos(tipo: str, filtros: dict) -> Iterator[tuple[str, bytes]]:
+    """Genera (nombre de archivo, PDF) de a un documento."""
+    qs = FUENTES[tipo](filtros)
+    if tipo == "constancias_examen":
+        from ..api.planillas_finales_api import contexto_constancia_examen
+
+        for insc in qs.iterator(chunk_size=100):
+            html = render_html(PLANTILLA_CONSTANCIA, contexto_constancia_examen(insc))
+            yield f"constancia_examen_{insc.estudiante.dni}.pdf", cached_pdf(PLANTILLA_CONSTANCIA, html)[0]
+    elif tipo == "certificados_regulares":
+        from ..api.certificados_api import contexto_certificado_regular
+
+        profesorado = Profesorado.objects.get(pk=filtros["profesorado_id"])
+        plan = PlanDeEstudio.objects.get(pk=filtros["plan_id"])
+        for est in qs.iterator(chunk_size=100):
+            contexto = contexto_certificado_regular(est, profesorado, plan, destinatario=filtros.get("destinatario"))
+            html = render_html(PLANTILLA_CERTIFICADO, contexto)
+            yield f"Constancia_Regular_{est.dni}.pdf", cached_pdf(PLANTILLA_CERTIFICADO, html)[0]
+    else:
+        from .actas_pdf import generar_acta_examen_pdf
+
+        for acta in qs.iterator(chunk_size=20):
+            yield f"ACTA_{acta.codigo}.pdf", generar_acta_examen_pdf(acta)
+
+
+def _escribir_zip(ruta: str, documentos, avance) -> None:
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as zf:
+        for n, (nombre, contenido) in enumerate(documentos, start=1):
+            zf.writestr(nombre, contenido)
+            avance(n)
+
+
+def _escribir_pdf(ruta: str, documentos, avance) -> None:
+    writer = PdfWriter()
+    for n, (_, contenido) in enumerate(documentos, start=1):
+        writer.append(io.BytesIO(contenido))
+        avance(n)
+    with open(ruta, "wb") as fh:
+        writer.write(fh)
+    writer.close()
+
+
+def exportar(tipo: str, formato: str, filtros: dict, *, job: BackgroundJob | None = None) -> JobFile:
+    """Genera el lote en un archivo temporal y lo devuelve como resultado de la tarea."""
+    total = preparar_exportacion(tipo, formato, filtros)
+
+    def avance(n: int) -> None:
+        if job is not None:
+            set_progress(job, n * 99 // total, f"{n} de {total} documentos")
+
+    fd, ruta = tempfile.mkstemp(suffix=f".{formato}")
+    os.close(fd)
+    try:
+        escribir = _escribir_zip if formato == "zip" else _escribir_pdf
+        escribir(ruta, _documentos(tipo, filtros), avance)
+    except BaseException:
+        os.remove(ruta)
+        raise
+    content_type = "application/zip" if formato == "zip" else "application/pdf"
+    return JobFile(f"{tipo}.{formato}", content_type=content_type, path=ruta)
+
+
+@job_handler(JOB_EXPORTACION)
+def _tarea_exportacion(job: BackgroundJob) -> JobFile:
+    return exportar(job.payload["tipo"], job.payload["formato"], job.payload.get("filtros") or {}, job=job)
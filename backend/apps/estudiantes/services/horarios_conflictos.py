@@ -0,0 +1,350 @@
+"""
+Detección de superposiciones horarias entre cursadas.
+
+Construye un índice semanal de intervalos (día -> bloques ordenados por hora) a partir
+de una sola consulta que une inscripción, comisión, horario, detalle y bloque. El índice
+responde consultas de superposición para una o varias comisiones candidatas sin
+comparar pares en bucles anidados sobre todas las inscripciones del estudiante.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import time
+
+from core.models import HorarioCatedraDetalle, InscripcionMateriaEstudiante, Materia
+
+ESTADOS_INSCRIPCION_INACTIVOS = (
+    InscripcionMateriaEstudiante.Estado.ANULADA,
+    InscripcionMateriaEstudiante.Estado.RECHAZADA,
+    InscripcionMateriaEstudiante.Estado.BAJA,
+)
+
+_CUATRIMESTRALES = (Materia.TipoCursada.PRIMER_CUATRIMESTRE, Materia.TipoCursada.SEGUNDO_CUATRIMESTRE)
+
+_CAMPOS_BLOQUE = (
+    "horario_catedra__turno_id",
+    "horario_catedra__cuatrimestre",
+    "bloque__dia",
+    "bloque__hora_desde",
+    "bloque__hora_hasta",
+)
+
+
+def _normalizar_nombre(nombre: str | None) -> str:
+    return (
+        (nombre or "")
+        .upper()
+        .replace("Á", "A")
+        .replace("É", "E")
+        .replace("Í", "I")
+        .replace("Ó", "O")
+        .replace("Ú", "U")
+        .replace("Ñ", "N")
+        .strip()
+    )
+
+
+def _es_taller_o_practica_4_residencia(materia) -> bool:
+    """
+    Retorna True si la materia es un taller de residencia, residencia o práctica 4 (de 4° año)
+    con base en los 5 nombres exactos provistos.
+    """
+    if getattr(materia, "anio_cursada", None) != 4:
+        return False
+    nombre_norm = _normalizar_nombre(getattr(materia, "nombre", ""))
+    nombres_validos = {
+        "PRACTICA IV: RESIDENCIA PEDAGOGICA",
+        "TALLER DE RESIDENCIA DE CIENCIAS NATURALES",
+        "TALLER DE RESIDENCIA DE CIENCIAS SOCIALES",
+        "TALLER DE RESIDENCIA DE MATEMATICA",
+        "TALLER DE RESIDENCIA DE PRACTICAS DEL LENGUAJE",
+    }
+    return any(nombre_norm.startswith(nv) for nv in nombres_validos)
+
+
+# TODO: BORRAR ESTO - Código temporal agregado para pruebas. Permitir superposición con CI Acompañamiento a las Trayectorias.
+def _es_ci_acompanamiento(materia) -> bool:
+    """Retorna True si la materia es CI Acompañamiento a las Trayectorias."""
+    return "ACOMPANAMIENTO A LAS TRAYECTORIAS" in _normalizar_nombre(getattr(materia, "nombre", ""))
+
+
+def _permite_superposicion_residencia(m1, m2) -> bool:
+    """
+    Permite superponer talleres de residencia y práctica 4 del 4° año entre sí.
+    También permite superponer cualquier materia con 'CI Acompañamiento a las Trayectorias'.
+    """
+    # TODO: BORRAR ESTO - Condición temporal para pruebas
+    if _es_ci_acompanamiento(m1) or _es_ci_acompanamiento(m2):
+        return True
+    return _es_taller_o_practica_4_residencia(m1) and _es_taller_o_practica_4_residencia(m2)
+
+
+@dataclass(frozen=True)
+class MateriaRef:
+    """Datos mínimos de la materia necesarios para evaluar excepciones de superposición."""
+
+    id: int
+    nombre: str
+    anio_cursada: int
+    regimen: str
+
+
+@dataclass(frozen=True)
+class IntervaloHorario:
+    """Un bloque semanal ocupado (turno, día, rango horario) asociado a una materia/comisión."""
+
+    materia: MateriaRef
+    turno_id: int
+    dia: int
+    desde: time
+    hasta: time
+    cuatrimestre: str | None = None
+    comision_id: int | None = None
+    inscripcion_id: int | None = None
+
+    def se_superpone(self, otro: IntervaloHorario) -> bool:
+        """Mismo turno y día, horas solapadas y no separados por cuatrimestres distintos."""
+        if self.turno_id != otro.turno_id or self.dia != otro.dia:
+            return False
+        if self.hasta <= otro.desde or self.desde >= otro.hasta:
+            return False
+        if {self.cuatrimestre, otro.cuatrimestre} == set(_CUATRIMESTRALES):
+            return False
+        return not _permite_superposicion_residencia(self.materia, otro.materia)
+
+
+def _cuatrimestre_efectivo(cuatrimestre: str | None, regimen: str | None) -> str | None:
+    """Cuatrimestre explícito del horario o, en su defecto, el régimen si la materia es cuatrimestral."""
+    return cuatrimestre or (regimen if regimen in _CUATRIMESTRALES else None)
+
+
+def _intervalo_desde_fila(row: dict, prefijo: str = "", **extra) -> IntervaloHorario:
+    materia = MateriaRef(
+        id=row[f"{prefijo}materia_id"],
+        nombre=row[f"{prefijo}materia__nombre"],
+        anio_cursada=row[f"{prefijo}materia__anio_cursada"],
+        regimen=row[f"{prefijo}materia__regimen"],
+    )
+    return IntervaloHorario(
+        materia=materia,
+        turno_id=row[f"{prefijo}horario_catedra__turno_id"],
+        dia=row[f"{prefijo}bloque__dia"],
+        desde=row[f"{prefijo}bloque__hora_desde"],
+        hasta=row[f"{prefijo}bloque__hora_hasta"],
+        cuatrimestre=_cuatrimestre_efectivo(row[f"{prefijo}horario_catedra__cuatrimestre"], materia.regimen),
+        **extra,
+    )
+
+
+class IndiceHorarioSemanal:
+    """
+    Índice de intervalos ocupados por día de la semana.
+
+    Los intervalos de cada día se mantienen ordenados por hora de inicio, de modo que una
+    consulta solo recorre los bloques que empiezan antes del fin del intervalo candidato.
+    """
+
+    def __init__(self, intervalos: Iterable[IntervaloHorario] = ()):
+        self._por_dia: dict[int, list[IntervaloHorario]] = defaultdict(list)
+        self._inicios: dict[int, list[time]] = defaultdict(list)
+        for intervalo in intervalos:
+            self.agregar(intervalo)
+
+    def agregar(self, intervalo: IntervaloHorario) -> None:
+        inicios = self._inicios[intervalo.dia]
+        pos = bisect.bisect_right(inicios, intervalo.desde)
+        inicios.insert(pos, intervalo.desde)
+        self._por_dia[intervalo.dia].insert(pos, intervalo)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._por_dia.values())
+
+    def conflicto(self, candidato: IntervaloHorario) -> IntervaloHorario | None:
+        """Primer intervalo del índice que se superpone con el candidato, o None."""
+        items = self._por_dia.get(candidato.dia)
+        if not items:
+            return None
+        # Solo pueden solaparse los bloques que empiezan antes de que termine el candidato.
+        limite = bisect.bisect_left(self._inicios[candidato.dia], candidato.hasta)
+        for existente in items[:limite]:
+            if existente.materia.id == candidato.materia.id:
+                continue
+            if existente.se_superpone(candidato):
+                return existente
+        return None
+
+    def primer_conflicto(self, candidatos: Iterable[IntervaloHorario]) -> IntervaloHorario | None:
+        for candidato in candidatos:
+            existente = self.conflicto(candidato)
+            if existente:
+                return existente
+        return None
+
+    def conflictos_por_comision(
+        self, candidatos: Iterable[IntervaloHorario]
+    ) -> dict[int, list[tuple[IntervaloHorario, IntervaloHorario]]]:
+        """Agrupa por comisión candidata los pares (candidato, existente) que colisionan."""
+        resultado: dict[int, list[tuple[IntervaloHorario, IntervaloHorario]]] = defaultdict(list)
+        for candidato in candidatos:
+            existente = self.conflicto(candidato)
+            if existente and candidato.comision_id is not None:
+                resultado[candidato.comision_id].append((candidato, existente))
+        return dict(resultado)
+
+    # --- Construcción ---
+
+    @classmethod
+    def para_estudiante(
+        cls,
+        estudiante_id: int,
+        anio: int,
+        excluir_inscripciones: Iterable[int] = (),
+    ) -> IndiceHorarioSemanal:
+        return cls.para_estudiantes([estudiante_id], anio, excluir_inscripciones).get(estudiante_id, cls())
+
+    @classmethod
+    def para_estudiantes(
+        cls,
+        estudiante_ids: Iterable[int],
+        anio: int,
+        excluir_inscripciones: Iterable[int] = (),
+    ) -> dict[int, IndiceHorarioSemanal]:
+        """
+        Construye el índice semanal de varios estudiantes a la vez.
+
+        Una consulta une inscripción -> comisión -> horario -> detalle -> bloque. Solo las
+        inscripciones cuya comisión no tiene horario asignado requieren una segunda consulta,
+        que recurre a los horarios de la materia (mismo criterio que la validación histórica).
+        """
+        estudiante_ids = list(estudiante_ids)
+        indices: dict[int, IndiceHorarioSemanal] = {eid: cls() for eid in estudiante_ids}
+        if not estudiante_ids:
+            return indices
+
+        prefijo = "comision__horario__detalles__"
+        rows = (
+            InscripcionMateriaEstudiante.objects.filter(estudiante_id__in=estudiante_ids, anio=anio)
+            .exclude(estado__in=ESTADOS_INSCRIPCION_INACTIVOS)
+            .exclude(id__in=list(excluir_inscripciones))
+            .values(
+                "id",
+                "estudiante_id",
+                "comision_id",
+                "materia_id",
+                "materia__nombre",
+                "materia__anio_cursada",
+                "materia__regimen",
+                "comision__horario__turno_id",
+                "comision__horario__cuatrimestre",
+                f"{prefijo}bloque__dia",
+                f"{prefijo}bloque__hora_desde",
+                f"{prefijo}bloque__hora_hasta",
+            )
+        )
+
+        sin_horario: dict[int, list[dict]] = defaultdict(list)
+        for row in rows:
+            if row[f"{prefijo}bloque__dia"] is None:
+                sin_horario[row["materia_id"]].append(row)
+                continue
+            materia = MateriaRef(
+                id=row["materia_id"],
+                nombre=row["materia__nombre"],
+                anio_cursada=row["materia__anio_cursada"],
+                regimen=row["materia__regimen"],
+            )
+            indices[row["estudiante_id"]].agregar(
+                IntervaloHorario(
+                    materia=materia,
+                    turno_id=row["comision__horario__turno_id"],
+                    dia=row[f"{prefijo}bloque__dia"],
+                    desde=row[f"{prefijo}bloque__hora_desde"],
+                    hasta=row[f"{prefijo}bloque__hora_hasta"],
+                    cuatrimestre=_cuatrimestre_efectivo(row["comision__horario__cuatrimestre"], materia.regimen),
+                    comision_id=row["comision_id"],
+                    inscripcion_id=row["id"],
+                )
+            )
+
+        if sin_horario:
+            por_materia = intervalos_de_materias(sin_horario.keys(), anio)
+            for materia_id, inscripciones in sin_horario.items():
+                for ins in inscripciones:
+                    for intervalo in por_materia.get(materia_id, []):
+                        indices[ins["estudiante_id"]].agregar(
+                            IntervaloHorario(
+                                materia=intervalo.materia,
+                                turno_id=intervalo.turno_id,
+                                dia=intervalo.dia,
+                                desde=intervalo.desde,
+                                hasta=intervalo.hasta,
+                                cuatrimestre=intervalo.cuatrimestre,
+                                comision_id=ins["comision_id"],
+                                inscripcion_id=ins["id"],
+                            )
+                        )
+        return indices
+
+
+def intervalos_de_materias(materia_ids: Iterable[int], anio: int) -> dict[int, list[IntervaloHorario]]:
+    """
+    Bloques de todos los horarios de cátedra de cada materia, en una sola consulta.
+
+    Para cada materia se usan los horarios del año indicado; si la materia no tiene
+    horarios cargados para ese año, se usan los de cualquier año disponible.
+    """
+    materia_ids = list(materia_ids)
+    if not materia_ids:
+        return {}
+    rows = HorarioCatedraDetalle.objects.filter(horario_catedra__espacio_id__in=materia_ids).values(
+        "horario_catedra__anio_academico",
+        "horario_catedra__espacio_id",
+        "horario_catedra__espacio__nombre",
+        "horario_catedra__espacio__anio_cursada",
+        "horario_catedra__espacio__regimen",
+        *_CAMPOS_BLOQUE,
+    )
+    del_anio: dict[int, list[IntervaloHorario]] = defaultdict(list)
+    otros: dict[int, list[IntervaloHorario]] = defaultdict(list)
+    for row in rows:
+        fila = {
+            "materia_id": row["horario_catedra__espacio_id"],
+            "materia__nombre": row["horario_catedra__espacio__nombre"],
+            "materia__anio_cursada": row["horario_catedra__espacio__anio_cursada"],
+            "materia__regimen": row["horario_catedra__espacio__regimen"],
+            **{campo: row[campo] for campo in _CAMPOS_BLOQUE},
+        }
+        destino = del_anio if row["horario_catedra__anio_academico"] == anio else otros
+        destino[fila["materia_id"]].append(_intervalo_desde_fila(fila))
+    return {mid: del_anio.get(mid) or otros.get(mid, []) for mid in materia_ids if mid in del_anio or mid in otros}
+
+
+def intervalos_de_comisiones(comision_ids: Iterable[int]) -> dict[int, list[IntervaloHorario]]:
+    """Bloques del horario asignado a cada comisión candidata, en una sola consulta."""
+    comision_ids = list(comision_ids)
+    if not comision_ids:
+        return {}
+    rows = HorarioCatedraDetalle.objects.filter(horario_catedra__comisiones__id__in=comision_ids).values(
+        "horario_catedra__comisiones__id",
+        "horario_catedra__espacio_id",
+        "horario_catedra__espacio__nombre",
+        "horario_catedra__espacio__anio_cursada",
+        "horario_catedra__espacio__regimen",
+        *_CAMPOS_BLOQUE,
+    )
+    resultado: dict[int, list[IntervaloHorario]] = defaultdict(list)
+    for row in rows:
+        comision_id = row["horario_catedra__comisiones__id"]
+        fila = {
+            "materia_id": row["horario_catedra__espacio_id"],
+            "materia__nombre": row["horario_catedra__espacio__nombre"],
+            "materia__anio_cursada": row["horario_catedra__espacio__anio_cursada"],
+            "materia__regimen": row["horario_catedra__espacio__regimen"],
+            **{campo: row[campo] for campo in _CAMPOS_BLOQUE},
+        }
+        resultado[comision_id].append(_intervalo_desde_fila(fila, comision_id=comision_id))
+    return dict(resultado)
@@ -1,9 +1,31 @@
+import logging
+from datetime import timedelta
+
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from core.models import Conversation, ConversationParticipant, Estudiante, Message, MessageTopic, StaffAsignacion
+from core.models import (
+    Conversation,
+    ConversationParticipant,
+    Estudiante,
+    InscripcionMateriaEstudiante,
+    Message,
+    MessageTopic,
+    NotificacionPendiente,
+    PedidoAnalitico,
+    PedidoEquivalencia,
+    StaffAsignacion,
+)
 from core.permissions import get_user_roles
 
+logger = logging.getLogger(__name__)
+
+LOTE_NOTIFICACIONES = 200
+INTENTOS_MAX = 5
+REINTENTO_BASE_SEGUNDOS = 60  # espera tras el primer error; se duplica en cada intento
+
 
 def _get_tutores_estudiante(estudiante: Estudiante, turno_nombre: str | None = None):
     """
@@ -100,8 +122,6 @@ class NotificacionesService:
         if conversation:
             # Reutilizar hilo: solo agregar nuevo mensaje
             Message.objects.create(conversation=conversation, author=sender, body=cuerpo)
-            conversation.last_message_at = now
-            conversation.save(update_fields=["last_message_at"])
             return conversation
 
         # Crear nueva conversación
@@ -130,11 +150,9 @@ class NotificacionesService:
         )
 
         # Mensaje inicial
+        # La señal de Message actualiza last_message_at y el resumen de la conversación.
         Message.objects.create(conversation=conversation, author=sender, body=cuerpo)
 
-        conversation.last_message_at = now
-        conversation.save(update_fields=["last_message_at"])
-
         return conversation
 
     @staticmethod
@@ -300,3 +318,130 @@ class NotificacionesService:
             NotificacionesService.enviar_notificacion(
                 tutor, asunto_staff, cuerpo, context_type="equivalencia", context_id=pedido.id
             )
+
+
+# --- Bandeja de salida (outbox) ---
+
+
+def encolar_notificacion(
+    tipo: str,
+    objeto_id: int,
+    *,
+    estudiante_id: int | None = None,
+    materia_id: int | None = None,
+    variante: str = "",
+) -> NotificacionPendiente:
+    """
+    Registra la notificación para entrega diferida: un único INSERT, dentro de la
+    transacción del evento que la origina.
+    """
+    return NotificacionPendiente.objects.create(
+        tipo=tipo,
+        objeto_id=objeto_id,
+        variante=variante,
+        estudiante_id=estudiante_id,
+        materia_id=materia_id,
+        clave=f"{tipo}:{estudiante_id or ''}:{materia_id or objeto_id}:{variante}",
+    )
+
+
+def _entregar_analitico(notificacion: NotificacionPendiente) -> None:
+    pedido = PedidoAnalitico.objects.select_related("estudiante__user", "estudiante__persona", "profesorado").get(
+        pk=notificacion.objeto_id
+    )
+    NotificacionesService.notificar_analitico_listo(pedido, accion=notificacion.variante or "confeccionado")
+
+
+def _entregar_cambio_comision(notificacion: NotificacionPendiente) -> None:
+    inscripcion = InscripcionMateriaEstudiante.objects.select_related(
+        "estudiante__user", "estudiante__persona", "comision__materia__plan_de_estudio__profesorado"
+    ).get(pk=notificacion.objeto_id)
+    NotificacionesService.notificar_cambio_comision(inscripcion)
+
+
+def _entregar_equivalencia(notificacion: NotificacionPendiente) -> None:
+    pedido = PedidoEquivalencia.objects.select_related("estudiante__user", "estudiante__persona").get(
+        pk=notificacion.objeto_id
+    )
+    NotificacionesService.notificar_equivalencia_finalizada(pedido)
+
+
+ENTREGAS = {
+    NotificacionPendiente.Tipo.ANALITICO: _entregar_analitico,
+    NotificacionPendiente.Tipo.CAMBIO_COMISION: _entregar_cambio_comision,
+    NotificacionPendiente.Tipo.EQUIVALENCIA: _entregar_equivalencia,
+}
+
+
+def procesar_notificaciones(lote: int = LOTE_NOTIFICACIONES, vistas: set[int] | None = None) -> dict[str, int]:
+    """
+    Entrega un lote de notificaciones pendientes. De varias con la misma clave
+    (tipo, estudiante, materia u objeto) solo se entrega la más reciente; como la
+    entrega relee el objeto, el mensaje refleja su estado actual. Las que fallaron
+    esperan hasta `reintentar_en` y no frenan a las más nuevas.
+
+    `vistas` acumula los ids tomados entre llamadas: si el lote solo trae notificaciones
+    ya vistas no se procesa (el llamador corta el ciclo).
+    """
+    resultado = {"enviadas": 0, "duplicadas": 0, "errores": 0}
+    ahora = timezone.now()
+    with transaction.atomic():
+        pendientes = list(
+            NotificacionPendiente.objects.select_for_update(skip_locked=True)
+            .filter(estado=NotificacionPendiente.Estado.PENDIENTE)
+            .filter(Q(reintentar_en__isnull=True) | Q(reintentar_en__lte=ahora))
+            .order_by("id")[:lote]
+        )
+        if vistas is not None:
+            ids = {n.id for n in pendientes}
+            if ids <= vistas:
+                return resultado
+            vistas |= ids
+        if not pendientes:
+            return resultado
+        ultimas = {n.clave: n for n in pendientes}
+
+        duplicadas = [n.id for n in pendientes if ultimas[n.clave] is not n]
+        if duplicadas:
+            NotificacionPendiente.objects.filter(id__in=duplicadas).update(
+                estado=NotificacionPendiente.Estado.DUPLICADA, procesado_en=ahora
+            )
+        resultado["duplicadas"] = len(duplicadas)
+
+        enviadas = []
+        for notificacion in ultimas.values():
+            try:
+                with transaction.atomic():
+                    ENTREGAS[notificacion.tipo](notificacion)
+            except Exception as exc:
+                logger.exception("Error entregando la notificación %s", notificacion.id)
+                notificacion.intentos += 1
+                notificacion.error = str(exc)[:2000]
+                espera = REINTENTO_BASE_SEGUNDOS * 2 ** (notificacion.intentos - 1)
+                notificacion.reintentar_en = ahora + timedelta(seconds=espera)
+                if notificacion.intentos >= INTENTOS_MAX:
+                    notificacion.estado = NotificacionPendiente.Estado.ERROR
+                    notificacion.procesado_en = ahora
+                notificacion.save(update_fields=["intentos", "error", "reintentar_en", "estado", "procesado_en"])
+                resultado["errores"] += 1
+            else:
+                enviadas.append(notificacion.id)
+        NotificacionPendiente.objects.filter(id__in=enviadas).update(
+            estado=NotificacionPendiente.Estado.ENVIADA, procesado_en=ahora
+        )
+        resultado["enviadas"] = len(enviadas)
+    return resultado
+
+
+def entregar_pendientes(lote: int = LOTE_NOTIFICACIONES) -> dict[str, int]:
+    """Procesa lotes hasta vaciar las notificaciones listas; devuelve los totales."""
+    totales = {"enviadas": 0, "duplicadas": 0, "errores": 0}
+    vistas: set[int] = set()
+    while True:
+        resultado = procesar_notificaciones(lote=lote, vistas=vistas)
+        for clave, valor in resultado.items():
+            totales[clave] += valor
+        # Sin pendientes, o solo las ya tomadas en esta pasada: las que fallan
+        # esperan su reintento en una pasada posterior.
+        if not any(resultado.values()):
+            return totales
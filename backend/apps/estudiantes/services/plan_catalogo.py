@@ -0,0 +1,195 @@
+"""
+Catálogo cacheable de materias de un plan de estudio.
+
+Reúne en un número fijo de consultas las materias del plan, el horario de cátedra más
+reciente de cada una (con sus bloques) y las aristas de correlatividad para cursar. El
+resultado es serializable y se cachea por (plan, año lectivo, versión de correlatividades);
+cualquier edición de horarios, materias o correlatividades del plan lo invalida cambiando
+la generación del plan, que se guarda sin vencimiento.
+
+La invalidación solo llega a todos los workers con un caché compartido (`CACHE_BACKEND`
+file o redis). Con locmem cada proceso tiene su copia y los demás workers no se enteran
+de la edición: por eso ahí el catálogo dura `CATALOGO_CACHE_TTL_LOCAL`.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.common.metrics import cache_result
+from core.models import (
+    Bloque,
+    Correlatividad,
+    CorrelatividadVersion,
+    EstudianteCarrera,
+    HorarioCatedra,
+    HorarioCatedraDetalle,
+    Materia,
+    PlanDeEstudio,
+)
+
+CATALOGO_CACHE_TTL = 60 * 60
+CATALOGO_CACHE_TTL_LOCAL = 60  # con caché por proceso (locmem)
+_CACHE_PREFIX = "materias_plan"
+
+TIPOS_CORRELATIVA_CURSADA = {
+    Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR: "correlativas_regular",
+    Correlatividad.TipoCorrelatividad.APROBADA_PARA_CURSAR: "correlativas_aprob",
+    Correlatividad.TipoCorrelatividad.SIMULTANEA_PARA_CURSAR: "correlativas_simultanea",
+}
+
+
+def _generacion_key(plan_id: int) -> str:
+    return f"{_CACHE_PREFIX}:gen:{plan_id}"
+
+
+def _generacion(plan_id: int) -> int:
+    key = _generacion_key(plan_id)
+    generacion = cache.get(key)
+    if generacion is None:
+        # Sin generación (primer uso o desalojada): una nueva, nunca una ya usada.
+        cache.add(key, time.time_ns(), None)
+        generacion = cache.get(key, 0)
+    return generacion
+
+
+def _catalogo_key(plan_id: int, anio_lectivo: int, version_id: int | None) -> str:
+    return f"{_CACHE_PREFIX}:{plan_id}:{anio_lectivo}:{version_id or 'base'}:g{_generacion(plan_id)}"
+
+
+def _catalogo_ttl() -> int:
+    if settings.CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+        return CATALOGO_CACHE_TTL_LOCAL
+    return CATALOGO_CACHE_TTL
+
+
+def invalidar_catalogo_plan(plan_id: int | None) -> None:
+    """Descarta todas las variantes cacheadas del plan (todos los años y versiones)."""
+    if not plan_id:
+        return
+    # Sin vencimiento y sin `incr`: en el backend file, `incr` vuelve a guardar la clave
+    # con el timeout por defecto y la generación terminaría volviendo a una anterior.
+    cache.set(_generacion_key(plan_id), time.time_ns(), None)
+
+
+def version_correlatividades_para(plan: PlanDeEstudio, estudiante_id: int | None) -> CorrelatividadVersion | None:
+    """Versión de correlatividades aplicable a la cohorte del estudiante (None sin estudiante)."""
+    if not estudiante_id or not plan.profesorado_id:
+        return None
+    cohorte = (
+        EstudianteCarrera.objects.filter(estudiante_id=estudiante_id, profesorado_id=plan.profesorado_id)
+        .order_by("-updated_at")
+        .values_list("anio_ingreso", flat=True)
+        .first()
+    )
+    return CorrelatividadVersion.vigente_para(
+        plan_id=plan.id,
+        profesorado_id=plan.profesorado_id,
+        cohorte=cohorte,
+    )
+
+
+def _cargar_horarios(materia_ids: list[int]) -> dict[int, list[dict]]:
+    """Bloques del horario de cátedra más reciente de cada materia (dos consultas en total)."""
+    elegido: dict[int, int] = {}
+    for hc in (
+        HorarioCatedra.objects.filter(espacio_id__in=materia_ids)
+        .order_by("espacio_id", "-anio_academico", "id")
+        .values("id", "espacio_id")
+    ):
+        elegido.setdefault(hc["espacio_id"], hc["id"])
+
+    por_horario: dict[int, list[dict]] = defaultdict(list)
+    dias = dict(Bloque.DIA_CHOICES)
+    for det in HorarioCatedraDetalle.objects.filter(horario_catedra_id__in=elegido.values()).values(
+        "horario_catedra_id", "bloque__dia", "bloque__hora_desde", "bloque__hora_hasta"
+    ):
+        por_horario[det["horario_catedra_id"]].append(
+            {
+                "dia": dias.get(det["bloque__dia"], str(det["bloque__dia"])),
+                "desde": str(det["bloque__hora_desde"])[:5],
+                "hasta": str(det["bloque__hora_hasta"])[:5],
+            }
+        )
+    return {
+        materia_id: sorted(por_horario.get(hc_id, []), key=lambda h: (h["dia"], h["desde"]))
+        for materia_id, hc_id in elegido.items()
+    }
+
+
+def _cargar_correlativas(materia_ids: list[int], version_id: int | None) -> dict[int, dict[str, list[int]]]:
+    qs = Correlatividad.objects.filter(materia_origen_id__in=materia_ids, tipo__in=list(TIPOS_CORRELATIVA_CURSADA))
+    if version_id:
+        qs = qs.filter(versiones__version_id=version_id)
+    resultado: dict[int, dict[str, list[int]]] = defaultdict(
+        lambda: {campo: [] for campo in TIPOS_CORRELATIVA_CURSADA.values()}
+    )
+    for origen_id, correlativa_id, tipo in qs.order_by("id").values_list(
+        "materia_origen_id", "materia_correlativa_id", "tipo"
+    ):
+        resultado[origen_id][TIPOS_CORRELATIVA_CURSADA[tipo]].append(correlativa_id)
+    return resultado
+
+
+def cargar_catalogo_plan(plan: PlanDeEstudio, version_id: int | None = None) -> list[dict]:
+    """
+    Materias del plan con horarios y correlatividades, en cuatro consultas fijas.
+
+    Cada elemento es un dict plano (apto para caché) con los campos de `MateriaPlan`
+    más `fecha_inicio`/`fecha_fin`, que el endpoint usa para filtrar por vigencia.
+    """
+    materias = list(
+        Materia.objects.filter(plan_de_estudio=plan)
+        .order_by("anio_cursada", "nombre")
+        .values(
+            "id",
+            "nombre",
+            "anio_cursada",
+            "regimen",
+            "tipo_formacion",
+            "formato",
+            "horas_semana",
+            "fecha_inicio",
+            "fecha_fin",
+        )
+    )
+    materia_ids = [m["id"] for m in materias]
+    horarios = _cargar_horarios(materia_ids)
+    correlativas = _cargar_correlativas(materia_ids, version_id)
+
+    catalogo = []
+    for m in materias:
+        item = {
+            "id": m["id"],
+            "nombre": m["nombre"],
+            "anio": m["anio_cursada"],
+            "regimen": m["regimen"],
+            "tipo_formacion": m["tipo_formacion"],
+            "formato": m["formato"],
+            "horas_semana": m["horas_semana"],
+            "fecha_inicio": m["fecha_inicio"],
+            "fecha_fin": m["fecha_fin"],
+            "horarios": horarios.get(m["id"], []),
+        }
+        item.update(correlativas.get(m["id"], {campo: [] for campo in TIPOS_CORRELATIVA_CURSADA.values()}))
+        catalogo.append(item)
+    return catalogo
+
+
+def obtener_catalogo_plan(
+    plan: PlanDeEstudio, version_id: int | None = None, anio_lectivo: int | None = None
+) -> list[dict]:
+    """Catálogo del plan desde caché; si no está, se carga y se guarda."""
+    anio_lectivo = anio_lectivo or timezone.now().year
+    key = _catalogo_key(plan.id, anio_lectivo, version_id)
+    catalogo = cache.get(key)
+    cache_result("plan_catalogo", catalogo is not None)
+    if catalogo is None:
+        catalogo = cargar_catalogo_plan(plan, version_id)
+        cache.set(key, catalogo, _catalogo_ttl())
+    return catalogo
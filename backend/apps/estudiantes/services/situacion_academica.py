@@ -0,0 +1,231 @@
+"""
+Cálculos de situación académica en lote.
+
+Permite evaluar correlatividades y vigencia de regularidades de muchos estudiantes con
+un número fijo de consultas: los datos se cargan agrupados con `values_list()` y las
+reglas (versión de correlatividades por cohorte, intentos y prórroga de la
+regularidad) se aplican en memoria.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+from core.models import (
+    ActaExamenEstudiante,
+    Correlatividad,
+    CorrelatividadVersion,
+    EstudianteCarrera,
+    Materia,
+    MesaExamen,
+    Regularidad,
+)
+
+INTENTOS_MAX = 3
+
+
+def _sumar_anios(base: date, anios: int) -> date:
+    try:
+        return base.replace(year=base.year + anios)
+    except ValueError:
+        return base.replace(month=2, day=28, year=base.year + anios)
+
+
+def nota_aprobada(calificacion: str | None) -> bool:
+    """Misma regla que `_acta_condicion`: aprueba una nota numérica mayor o igual a 6."""
+    if not calificacion:
+        return False
+    try:
+        return Decimal(calificacion.strip().upper().replace(",", ".")) >= 6
+    except InvalidOperation:
+        return False
+
+
+def vigencia_regularidad(
+    fecha_cierre: date | None,
+    fechas_actas: Iterable[date],
+    *,
+    fecha_proxima_regular: date | None = None,
+    primer_llamado_post_base: date | None = None,
+    hoy: date | None = None,
+) -> tuple[date, int, int]:
+    """
+    Retorna (vigencia_limite, intentos_usados, intentos_max) a partir de datos ya cargados.
+
+    Aplica las mismas reglas que `_calcular_vigencia_regularidad`: 3 intentos en 2 años,
+    prórroga hasta 60 días o el siguiente llamado, y corte del período si existe una
+    regularidad posterior de la misma materia.
+    """
+    if not fecha_cierre:
+        return _sumar_anios(hoy or timezone.now().date(), 2), 0, INTENTOS_MAX
+
+    fechas = [f for f in fechas_actas if f and f > fecha_cierre]
+    fecha_base = _sumar_anios(fecha_cierre, 2)
+
+    if fecha_proxima_regular:
+        limite_efectivo = min(fecha_base, fecha_proxima_regular)
+        intentos = sum(1 for f in fechas if f <= fecha_proxima_regular)
+        intentos_en_periodo = intentos
+    else:
+        limite_60d = fecha_base + timedelta(days=60)
+        limite_efectivo = (
+            primer_llamado_post_base
+            if primer_llamado_post_base and primer_llamado_post_base < limite_60d
+            else limite_60d
+        )
+        intentos = sum(1 for f in fechas if f <= limite_efectivo)
+        intentos_en_periodo = sum(1 for f in fechas if f <= fecha_base)
+
+    if intentos_en_periodo >= INTENTOS_MAX:
+        return fecha_base if not fecha_proxima_regular else limite_efectivo, intentos_en_periodo, INTENTOS_MAX
+
+    return limite_efectivo, intentos, INTENTOS_MAX
+
+
+def cohortes_por_estudiante(estudiante_ids: Iterable[int]) -> dict[tuple[int, int], int | None]:
+    """Año de ingreso por (estudiante, profesorado), tomando la carrera actualizada más recientemente."""
+    cohortes: dict[tuple[int, int], int | None] = {}
+    for est_id, prof_id, anio_ingreso in (
+        EstudianteCarrera.objects.filter(estudiante_id__in=set(estudiante_ids))
+        .order_by("-updated_at")
+        .values_list("estudiante_id", "profesorado_id", "anio_ingreso")
+    ):
+        cohortes.setdefault((est_id, prof_id), anio_ingreso)
+    return cohortes
+
+
+class ResolutorCorrelatividades:
+    """
+    Requisitos de un tipo de correlatividad para un conjunto de materias.
+
+    Carga materias, versiones y aristas en tres consultas y resuelve en memoria la
+    versión vigente para cada cohorte, con la misma semántica que
+    `CorrelatividadVersion.vigente_para` y `_correlatividades_qs`.
+    """
+
+    def __init__(self, materia_ids: Iterable[int], tipo: str):
+        materia_ids = set(materia_ids)
+        self._plan_de: dict[int, tuple[int, int | None]] = {
+            mid: (plan_id, prof_id)
+            for mid, plan_id, prof_id in Materia.objects.filter(id__in=materia_ids).values_list(
+                "id", "plan_de_estudio_id", "plan_de_estudio__profesorado_id"
+            )
+        }
+
+        self._versiones: dict[tuple[int, int], list[tuple[int, int | None, int]]] = defaultdict(list)
+        plan_ids = {plan_id for plan_id, _ in self._plan_de.values()}
+        for vid, plan_id, prof_id, desde, hasta in (
+            CorrelatividadVersion.objects.filter(plan_de_estudio_id__in=plan_ids, activo=True)
+            .order_by("cohorte_desde", "id")
+            .values_list("id", "plan_de_estudio_id", "profesorado_id", "cohorte_desde", "cohorte_hasta")
+        ):
+            self._versiones[(plan_id, prof_id)].append((desde, hasta, vid))
+
+        self._todas: dict[int, list[int]] = defaultdict(list)
+        self._por_version: dict[tuple[int, int], list[int]] = defaultdict(list)
+        for origen_id, correlativa_id, version_id in (
+            Correlatividad.objects.filter(materia_origen_id__in=materia_ids, tipo=tipo)
+            .order_by("id")
+            .values_list("materia_origen_id", "materia_correlativa_id", "versiones__version_id")
+        ):
+            if correlativa_id not in self._todas[origen_id]:
+                self._todas[origen_id].append(correlativa_id)
+            if version_id is not None:
+                self._por_version[(origen_id, version_id)].append(correlativa_id)
+
+    def version_vigente(self, materia_id: int, cohorte: int | None) -> int | None:
+        plan_id, prof_id = self._plan_de.get(materia_id, (None, None))
+        if not prof_id:
+            return None
+        versiones = self._versiones.get((plan_id, prof_id), [])
+        if cohorte is None:
+            return versiones[-1][2] if versiones else None
+        vigente = None
+        for desde, hasta, vid in versiones:
+            if desde <= cohorte and (hasta is None or hasta >= cohorte):
+                vigente = vid
+        return vigente
+
+    def profesorado_de(self, materia_id: int) -> int | None:
+        return self._plan_de.get(materia_id, (None, None))[1]
+
+    def requeridas(self, materia_id: int, cohorte: int | None, con_estudiante: bool = True) -> list[int]:
+        """IDs de materias correlativas; sin estudiante se devuelven todas las aristas."""
+        if con_estudiante:
+            version_id = self.version_vigente(materia_id, cohorte)
+            if version_id is not None:
+                return list(self._por_version.get((materia_id, version_id), []))
+        return list(self._todas.get(materia_id, []))
+
+    def materias_requeridas(self) -> set[int]:
+        return {mid for ids in self._todas.values() for mid in ids}
+
+
+def vigencias_regularidades(
+    regularidades: Iterable[dict], dni_por_estudiante: dict[int, str], hoy: date | None = None
+) -> dict[int, tuple[date, int, int]]:
+    """
+    Vigencia de cada regularidad REGULAR recibida, indexada por id de regularidad.
+
+    `regularidades` son dicts con id, estudiante_id, materia_id, fecha_cierre y situacion;
+    deben incluir todas las regularidades REGULAR de cada (estudiante, materia) para
+    detectar re-cursadas. Resuelve intentos y llamados en dos consultas.
+    """
+    regulares = [r for r in regularidades if r["situacion"] == Regularidad.Situacion.REGULAR]
+    if not regulares:
+        return {}
+    materia_ids = {r["materia_id"] for r in regulares}
+    dnis = {dni_por_estudiante.get(r["estudiante_id"]) for r in regulares} - {None, ""}
+
+    actas: dict[tuple[str, int], list[date]] = defaultdict(list)
+    if dnis:
+        for dni, mid, fecha in ActaExamenEstudiante.objects.filter(
+            dni__in=dnis, acta__materia_id__in=materia_ids
+        ).values_list("dni", "acta__materia_id", "acta__fecha"):
+            actas[(dni, mid)].append(fecha)
+
+    llamados: dict[int, list[date]] = defaultdict(list)
+    for mid, fecha in (
+        MesaExamen.objects.filter(
+            materia_id__in=materia_ids, tipo__in=(MesaExamen.Tipo.FINAL, MesaExamen.Tipo.ESPECIAL)
+        )
+        .order_by("fecha")
+        .values_list("materia_id", "fecha")
+    ):
+        llamados[mid].append(fecha)
+
+    cierres: dict[tuple[int, int], list[date]] = defaultdict(list)
+    for r in regulares:
+        cierres[(r["estudiante_id"], r["materia_id"])].append(r["fecha_cierre"])
+    for fechas in cierres.values():
+        fechas.sort()
+
+    resultado = {}
+    for r in regulares:
+        clave = (r["estudiante_id"], r["materia_id"])
+        fecha_cierre = r["fecha_cierre"]
+        posteriores = cierres[clave][bisect_right(cierres[clave], fecha_cierre) :]
+        primer_llamado = None
+        if fecha_cierre:
+            fechas_llamados = llamados.get(r["materia_id"], [])
+            idx = bisect_right(fechas_llamados, _sumar_anios(fecha_cierre, 2))
+            primer_llamado = fechas_llamados[idx] if idx < len(fechas_llamados) else None
+        resultado[r["id"]] = vigencia_regularidad(
+            fecha_cierre,
+            actas.get((dni_por_estudiante.get(r["estudiante_id"]), r["materia_id"]), []),
+            fecha_proxima_regular=posteriores[0] if posteriores else None,
+            primer_llamado_post_base=primer_llamado,
+            hoy=hoy,
+        )
+    return resultado
+
+
+def regularidad_vigente(vigencia: tuple[date, int, int], hoy: date) -> bool:
+    limite, intentos, max_intentos = vigencia
+    return hoy <= limite and intentos < max_intentos
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import (
+    Correlatividad,
+    CorrelatividadVersion,
+    CorrelatividadVersionDetalle,
+    HorarioCatedra,
+    HorarioCatedraDetalle,
+    Materia,
+)
+
+from .services.plan_catalogo import invalidar_catalogo_plan
+
+
+@receiver([post_save, post_delete], sender=Materia, dispatch_uid="catalogo_plan_materia")
+def _invalidar_por_materia(sender, instance: Materia, **kwargs) -> None:
+    invalidar_catalogo_plan(instance.plan_de_estudio_id)
+
+
+@receiver([post_save, post_delete], sender=HorarioCatedra, dispatch_uid="catalogo_plan_horario")
+def _invalidar_por_horario(sender, instance: HorarioCatedra, **kwargs) -> None:
+    plan_id = Materia.objects.filter(id=instance.espacio_id).values_list("plan_de_estudio_id", flat=True).first()
+    invalidar_catalogo_plan(plan_id)
+
+
+@receiver([post_save, post_delete], sender=HorarioCatedraDetalle, dispatch_uid="catalogo_plan_horario_detalle")
+def _invalidar_por_horario_detalle(sender, instance: HorarioCatedraDetalle, **kwargs) -> None:
+    plan_id = (
+        HorarioCatedra.objects.filter(id=instance.horario_catedra_id)
+        .values_list("espacio__plan_de_estudio_id", flat=True)
+        .first()
+    )
+    invalidar_catalogo_plan(plan_id)
+
+
+@receiver([post_save, post_delete], sender=Correlatividad, dispatch_uid="catalogo_plan_correlatividad")
+def _invalidar_por_correlatividad(sender, instance: Correlatividad, **kwargs) -> None:
+    plan_id = Materia.objects.filter(id=instance.materia_origen_id).values_list("plan_de_estudio_id", flat=True).first()
+    invalidar_catalogo_plan(plan_id)
+
+
+@receiver([post_save, post_delete], sender=CorrelatividadVersion, dispatch_uid="catalogo_plan_corr_version")
+def _invalidar_por_version(sender, instance: CorrelatividadVersion, **kwargs) -> None:
+    invalidar_catalogo_plan(instance.plan_de_estudio_id)
+
+
+@receiver([post_save, post_delete], sender=CorrelatividadVersionDetalle, dispatch_uid="catalogo_plan_corr_detalle")
+def _invalidar_por_version_detalle(sender, instance: CorrelatividadVersionDetalle, **kwargs) -> None:
+    plan_id = (
+        CorrelatividadVersion.objects.filter(id=instance.version_id)
+        .values_list("plan_de_estudio_id", flat=True)
+        .first()
+    )
+    invalidar_catalogo_plan(plan_id)
@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth.models import User
+
+from apps.estudiantes.api.reportes_api import listar_auditoria_academica
+from apps.estudiantes.services.auditoria_academica import recalcular_auditoria, recalcular_auditoria_estudiante
+from core.models import (
+    AuditoriaAcademicaItem,
+    AuditoriaAcademicaParticion,
+    Correlatividad,
+    Estudiante,
+    Materia,
+    Persona,
+    PlanDeEstudio,
+    Profesorado,
+    Regularidad,
+)
+
+pytestmark = pytest.mark.django_db
+
+HOY = date(2026, 8, 1)
+
+
+def _materia(plan, nombre, anio):
+    return Materia.objects.create(
+        plan_de_estudio=plan,
+        nombre=nombre,
+        anio_cursada=anio,
+        formato=Materia.FormatoMateria.ASIGNATURA,
+        regimen=Materia.TipoCursada.ANUAL,
+    )
+
+
+def _regularidad(est, materia, situacion, cierre=date(2025, 12, 1)):
+    return Regularidad.objects.create(estudiante=est, materia=materia, fecha_cierre=cierre, situacion=situacion)
+
+
+class TestAuditoriaAcademica:
+    def _setup(self):
+        profesorado = Profesorado.objects.create(nombre="Profesorado Test", duracion_anios=4)
+        plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion="R-TEST-1", anio_inicio=2020)
+        base = _materia(plan, "Pedagogía", 1)
+        final = _materia(plan, "Didáctica", 2)
+        cursada = _materia(plan, "Práctica II", 2)
+        Correlatividad.objects.create(
+            materia_origen=final,
+            materia_correlativa=base,
+            tipo=Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR,
+        )
+        Correlatividad.objects.create(
+            materia_origen=cursada,
+            materia_correlativa=base,
+            tipo=Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR,
+        )
+        persona = Persona.objects.create(dni="40111222", nombre="Ana", apellido="Test")
+        est = Estudiante.objects.create(user=User.objects.create_user(username="40111222"), persona=persona)
+        est.carreras.add(profesorado)
+        _regularidad(est, final, Regularidad.Situacion.APROBADO)
+        _regularidad(est, cursada, Regularidad.Situacion.REGULAR)
+        return profesorado, est, base
+
+    def test_recalculo_completo_llena_la_particion(self):
+        profesorado, est, _ = self._setup()
+
+        totales = recalcular_auditoria(hoy=HOY)
+
+        assert totales == {profesorado.id: 2}
+        eventos = set(AuditoriaAcademicaItem.objects.values_list("evento", "materia_nombre", "prerrequisito_nombre"))
+        assert eventos == {
+            (AuditoriaAcademicaItem.Evento.APROBACION_FINAL, "Didáctica", "Pedagogía"),
+            (AuditoriaAcademicaItem.Evento.REGULARIZACION, "Práctica II", "Pedagogía"),
+        }
+        particion = AuditoriaAcademicaParticion.objects.get(profesorado=profesorado)
+        assert particion.estado == AuditoriaAcademicaParticion.Estado.COMPLETADA
+        assert particion.total == 2
+        assert particion.calculado_en is not None
+
+    def test_recalculo_por_estudiante_reemplaza_sus_filas(self):
+        profesorado, est, base = self._setup()
+        recalcular_auditoria(hoy=HOY)
+
+        _regularidad(est, base, Regularidad.Situacion.PROMOCIONADO, cierre=date(2024, 12, 1))
+        assert recalcular_auditoria_estudiante(est.id, hoy=HOY) == 0
+
+        assert not AuditoriaAcademicaItem.objects.exists()
+        assert AuditoriaAcademicaParticion.objects.get(profesorado=profesorado).total == 0
+
+    def test_listado_acota_la_paginacion(self, rf):
+        self._setup()
+        recalcular_auditoria(hoy=HOY)
+        request = rf.get("/")
+        request.user = User.objects.create_superuser(username="admin", password="x")
+
+        pagina = listar_auditoria_academica(request, limit=0, offset=-10)
+
+        assert pagina["total"] == 2
+        assert len(pagina["items"]) == 1
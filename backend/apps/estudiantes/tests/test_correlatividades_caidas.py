@@ -0,0 +1,105 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth.models import User
+
+from apps.estudiantes.services.correlatividades_caidas import (
+    iterar_correlativas_caidas,
+    snapshot_correlativas_caidas,
+)
+from apps.estudiantes.services.situacion_academica import vigencia_regularidad
+from core.models import (
+    Correlatividad,
+    Estudiante,
+    InscripcionMateriaEstudiante,
+    Materia,
+    Persona,
+    PlanDeEstudio,
+    Profesorado,
+    Regularidad,
+    ReporteSnapshot,
+)
+
+HOY = date(2026, 8, 1)
+
+
+class TestVigenciaRegularidad:
+    def test_vigente_dentro_de_los_dos_anios(self):
+        limite, intentos, maximo = vigencia_regularidad(date(2025, 7, 1), [date(2025, 12, 1)])
+        assert limite == date(2027, 8, 30)
+        assert (intentos, maximo) == (1, 3)
+
+    def test_tres_intentos_agotan_la_regularidad(self):
+        fechas = [date(2025, 12, 1), date(2026, 2, 1), date(2026, 3, 1)]
+        limite, intentos, _ = vigencia_regularidad(date(2025, 7, 1), fechas)
+        assert limite == date(2027, 7, 1)
+        assert intentos == 3
+
+    def test_recursada_corta_el_periodo(self):
+        limite, intentos, _ = vigencia_regularidad(
+            date(2024, 7, 1), [date(2024, 12, 1), date(2026, 2, 1)], fecha_proxima_regular=date(2025, 7, 1)
+        )
+        assert limite == date(2025, 7, 1)
+        assert intentos == 1
+
+
+@pytest.mark.django_db
+class TestCorrelativasCaidas:
+    def _setup(self):
+        profesorado = Profesorado.objects.create(nombre="Profesorado Test", duracion_anios=4)
+        plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion="R-TEST-1", anio_inicio=2020)
+
+        def materia(nombre, anio):
+            return Materia.objects.create(
+                plan_de_estudio=plan,
+                nombre=nombre,
+                anio_cursada=anio,
+                formato=Materia.FormatoMateria.ASIGNATURA,
+                regimen=Materia.TipoCursada.ANUAL,
+            )
+
+        previa = materia("Pedagogía", 1)
+        actual = materia("Didáctica", 2)
+        Correlatividad.objects.create(
+            materia_origen=actual,
+            materia_correlativa=previa,
+            tipo=Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR,
+        )
+        return previa, actual
+
+    def _estudiante(self, dni, actual, previa=None, cierre=None):
+        persona = Persona.objects.create(dni=dni, nombre="Ana", apellido=f"Test {dni}")
+        est = Estudiante.objects.create(user=User.objects.create_user(username=dni), persona=persona)
+        InscripcionMateriaEstudiante.objects.create(estudiante=est, materia=actual, anio=2026)
+        if previa and cierre:
+            Regularidad.objects.create(
+                estudiante=est, materia=previa, fecha_cierre=cierre, situacion=Regularidad.Situacion.REGULAR
+            )
+        return est
+
+    def test_detecta_motivos_en_consultas_fijas(self, django_assert_max_num_queries):
+        previa, actual = self._setup()
+        self._estudiante("40000001", actual, previa, cierre=date(2025, 7, 1))
+        vencida = self._estudiante("40000002", actual, previa, cierre=date(2023, 7, 1))
+        sin_reg = self._estudiante("40000003", actual)
+        for i in range(10):
+            self._estudiante(f"4100000{i}", actual, previa, cierre=date(2025, 7, 1))
+
+        with django_assert_max_num_queries(12):
+            filas = list(iterar_correlativas_caidas(2026, hoy=HOY))
+
+        motivos = {fila["estudiante_id"]: fila["motivo"] for fila in filas}
+        assert motivos == {vencida.id: "Regularidad vencida", sin_reg.id: "Sin regularidad registrada"}
+        assert {fila["materia_correlativa"] for fila in filas} == {"Pedagogía"}
+
+    def test_snapshot_se_reutiliza_hasta_regenerar(self):
+        previa, actual = self._setup()
+        self._estudiante("40000003", actual)
+
+        snapshot = snapshot_correlativas_caidas(2026)
+        assert snapshot.total == 1
+
+        self._estudiante("40000004", actual)
+        assert snapshot_correlativas_caidas(2026).total == 1
+        assert snapshot_correlativas_caidas(2026, regenerar=True).total == 2
+        assert ReporteSnapshot.objects.count() == 1
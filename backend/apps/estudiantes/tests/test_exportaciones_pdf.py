@@ -0,0 +1,61 @@
+import io
+import zipfile
+
+import pytest
+from django.contrib.auth.models import User
+from pypdf import PdfReader, PdfWriter
+
+from apps.common import pdf
+from apps.common.errors import AppError
+from apps.common.jobs import enqueue, run_pending
+from apps.estudiantes.services.exportaciones_pdf import JOB_EXPORTACION, preparar_exportacion
+from core.models import BackgroundJob, Estudiante, EstudianteCarrera, Persona, PlanDeEstudio, Profesorado
+
+pytestmark = pytest.mark.django_db
+
+
+def _pdf_de_una_pagina(html, base_url=None):
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class TestExportacionesPdf:
+    def _setup(self):
+        profesorado = Profesorado.objects.create(nombre="Profesorado Test", duracion_anios=4)
+        plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion="R-TEST-1", anio_inicio=2020)
+        for dni, cohorte in (("40111222", 2024), ("40111333", 2024), ("40111444", 2025)):
+            persona = Persona.objects.create(dni=dni, nombre="Ana", apellido=f"Test {dni}")
+            est = Estudiante.objects.create(user=User.objects.create_user(username=dni), persona=persona)
+            est.carreras.add(profesorado)
+            EstudianteCarrera.objects.filter(estudiante=est).update(anio_ingreso=cohorte)
+        filtros = {"profesorado_id": profesorado.id, "plan_id": plan.id, "cohorte": 2024}
+        return filtros
+
+    def _exportar(self, formato, filtros):
+        job = enqueue(JOB_EXPORTACION, {"tipo": "certificados_regulares", "formato": formato, "filtros": filtros})
+        assert run_pending("w1") == 1
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.DONE, job.error
+        assert job.progress_message == "2 de 2 documentos"
+        return job.result_file.read()
+
+    def test_zip_y_pdf_unido_por_cohorte(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = tmp_path
+        monkeypatch.setattr(pdf, "html_to_pdf", _pdf_de_una_pagina)
+        filtros = self._setup()
+
+        with zipfile.ZipFile(io.BytesIO(self._exportar("zip", filtros))) as zf:
+            assert sorted(zf.namelist()) == ["Constancia_Regular_40111222.pdf", "Constancia_Regular_40111333.pdf"]
+
+        assert len(PdfReader(io.BytesIO(self._exportar("pdf", filtros))).pages) == 2
+
+    def test_pdf_unico_respeta_el_tope(self, settings):
+        settings.EXPORTACION_PDF_MAX_DOCUMENTOS = 1
+        filtros = self._setup()
+
+        with pytest.raises(AppError):
+            preparar_exportacion("certificados_regulares", "pdf", filtros)
+        assert preparar_exportacion("certificados_regulares", "zip", filtros) == 2
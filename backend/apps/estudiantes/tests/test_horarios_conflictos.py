@@ -0,0 +1,140 @@
+from datetime import time
+
+import pytest
+from django.contrib.auth.models import User
+
+from apps.estudiantes.services.horarios_conflictos import (
+    IndiceHorarioSemanal,
+    IntervaloHorario,
+    MateriaRef,
+    intervalos_de_comisiones,
+)
+from core.models import (
+    Bloque,
+    Comision,
+    Estudiante,
+    HorarioCatedra,
+    HorarioCatedraDetalle,
+    InscripcionMateriaEstudiante,
+    Materia,
+    Persona,
+    PlanDeEstudio,
+    Profesorado,
+    Turno,
+)
+
+
+def _intervalo(materia_id, dia, desde, hasta, turno_id=1, cuatrimestre=None, nombre=None, comision_id=None):
+    materia = MateriaRef(id=materia_id, nombre=nombre or f"Materia {materia_id}", anio_cursada=1, regimen="ANU")
+    return IntervaloHorario(
+        materia=materia,
+        turno_id=turno_id,
+        dia=dia,
+        desde=time(*desde),
+        hasta=time(*hasta),
+        cuatrimestre=cuatrimestre,
+        comision_id=comision_id,
+    )
+
+
+class TestIndiceHorarioSemanal:
+    def test_detecta_solapamiento_mismo_turno_y_dia(self):
+        indice = IndiceHorarioSemanal([_intervalo(1, 1, (8, 0), (10, 0))])
+        colision = indice.conflicto(_intervalo(2, 1, (9, 0), (11, 0)))
+        assert colision is not None
+        assert colision.materia.id == 1
+
+    def test_bloques_contiguos_no_se_superponen(self):
+        indice = IndiceHorarioSemanal([_intervalo(1, 1, (8, 0), (10, 0))])
+        assert indice.conflicto(_intervalo(2, 1, (10, 0), (12, 0))) is None
+        assert indice.conflicto(_intervalo(2, 1, (6, 0), (8, 0))) is None
+
+    def test_distinto_dia_o_turno_no_colisiona(self):
+        indice = IndiceHorarioSemanal([_intervalo(1, 1, (8, 0), (10, 0))])
+        assert indice.conflicto(_intervalo(2, 2, (8, 0), (10, 0))) is None
+        assert indice.conflicto(_intervalo(2, 1, (8, 0), (10, 0), turno_id=2)) is None
+
+    def test_cuatrimestres_opuestos_no_colisionan(self):
+        indice = IndiceHorarioSemanal([_intervalo(1, 1, (8, 0), (10, 0), cuatrimestre="PCU")])
+        assert indice.conflicto(_intervalo(2, 1, (8, 0), (10, 0), cuatrimestre="SCU")) is None
+        assert indice.conflicto(_intervalo(2, 1, (8, 0), (10, 0), cuatrimestre="PCU")) is not None
+
+    def test_misma_materia_no_colisiona_consigo_misma(self):
+        indice = IndiceHorarioSemanal([_intervalo(1, 1, (8, 0), (10, 0))])
+        assert indice.conflicto(_intervalo(1, 1, (8, 0), (10, 0))) is None
+
+    def test_ci_acompanamiento_permite_superposicion(self):
+        indice = IndiceHorarioSemanal(
+            [_intervalo(1, 1, (8, 0), (10, 0), nombre="CI Acompañamiento a las Trayectorias")]
+        )
+        assert indice.conflicto(_intervalo(2, 1, (8, 0), (10, 0))) is None
+
+    def test_conflictos_por_comision_agrupa_varias_candidatas(self):
+        indice = IndiceHorarioSemanal([_intervalo(1, 1, (8, 0), (10, 0)), _intervalo(3, 3, (18, 0), (20, 0))])
+        candidatos = [
+            _intervalo(2, 1, (9, 0), (10, 0), comision_id=10),
+            _intervalo(2, 3, (19, 0), (21, 0), comision_id=10),
+            _intervalo(2, 2, (9, 0), (10, 0), comision_id=11),
+        ]
+        conflictos = indice.conflictos_por_comision(candidatos)
+        assert set(conflictos) == {10}
+        assert [existente.materia.id for _, existente in conflictos[10]] == [1, 3]
+
+
+@pytest.mark.django_db
+class TestIndiceDesdeBaseDeDatos:
+    def _setup(self):
+        profesorado = Profesorado.objects.create(nombre="Profesorado Test", duracion_anios=4)
+        plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion="R-TEST-1", anio_inicio=2020)
+        turno = Turno.objects.create(nombre="Turno Test")
+        lunes_8 = Bloque.objects.create(turno=turno, dia=1, hora_desde=time(8, 0), hora_hasta=time(9, 0))
+        lunes_9 = Bloque.objects.create(turno=turno, dia=1, hora_desde=time(9, 0), hora_hasta=time(10, 0))
+
+        def materia_con_comision(nombre, bloque, codigo="A"):
+            materia = Materia.objects.create(
+                plan_de_estudio=plan,
+                nombre=nombre,
+                anio_cursada=1,
+                formato=Materia.FormatoMateria.ASIGNATURA,
+                regimen=Materia.TipoCursada.ANUAL,
+            )
+            horario = HorarioCatedra.objects.create(espacio=materia, turno=turno, anio_academico=2026)
+            HorarioCatedraDetalle.objects.create(horario_catedra=horario, bloque=bloque)
+            comision = Comision.objects.create(
+                materia=materia, anio_lectivo=2026, codigo=codigo, turno=turno, horario=horario
+            )
+            return materia, comision
+
+        persona = Persona.objects.create(dni="40111222", nombre="Ana", apellido="Test")
+        est = Estudiante.objects.create(user=User.objects.create_user(username="40111222"), persona=persona)
+        return est, lunes_8, lunes_9, materia_con_comision
+
+    def test_indice_resuelve_superposicion_por_comision(self, django_assert_num_queries):
+        est, lunes_8, lunes_9, materia_con_comision = self._setup()
+        inscripta, com_inscripta = materia_con_comision("Pedagogía", lunes_8)
+        _, com_choca = materia_con_comision("Didáctica", lunes_8)
+        _, com_libre = materia_con_comision("Psicología", lunes_9)
+        InscripcionMateriaEstudiante.objects.create(
+            estudiante=est, materia=inscripta, comision=com_inscripta, anio=2026
+        )
+
+        with django_assert_num_queries(1):
+            indice = IndiceHorarioSemanal.para_estudiante(est.id, 2026)
+        with django_assert_num_queries(1):
+            candidatos = intervalos_de_comisiones([com_choca.id, com_libre.id])
+
+        conflictos = indice.conflictos_por_comision([i for ints in candidatos.values() for i in ints])
+        assert set(conflictos) == {com_choca.id}
+        assert conflictos[com_choca.id][0][1].materia.nombre == "Pedagogía"
+
+    def test_inscripciones_de_baja_no_ocupan_horario(self):
+        est, lunes_8, _, materia_con_comision = self._setup()
+        inscripta, com_inscripta = materia_con_comision("Pedagogía", lunes_8)
+        InscripcionMateriaEstudiante.objects.create(
+            estudiante=est,
+            materia=inscripta,
+            comision=com_inscripta,
+            anio=2026,
+            estado=InscripcionMateriaEstudiante.Estado.BAJA,
+        )
+        assert len(IndiceHorarioSemanal.para_estudiante(est.id, 2026)) == 0
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.estudiantes.services import notificaciones_service
+from apps.estudiantes.services.notificaciones_service import encolar_notificacion, procesar_notificaciones
+from core.management.commands.run_worker import Command as RunWorker
+from core.models import (
+    CommandRun,
+    Conversation,
+    Estudiante,
+    Message,
+    NotificacionPendiente,
+    PedidoAnalitico,
+    Persona,
+    Profesorado,
+    VentanaHabilitacion,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class TestNotificacionesOutbox:
+    def _pedido(self):
+        User.objects.create_superuser(username="sistema", password="x")
+        persona = Persona.objects.create(dni="40111333", nombre="Ana", apellido="Test")
+        est = Estudiante.objects.create(user=User.objects.create_user(username="40111333"), persona=persona)
+        ventana = VentanaHabilitacion.objects.create(
+            tipo=VentanaHabilitacion.Tipo.ANALITICOS, desde=date(2026, 1, 1), hasta=date(2026, 12, 31)
+        )
+        profesorado = Profesorado.objects.create(nombre="Profesorado Test", duracion_anios=4)
+        return PedidoAnalitico.objects.create(
+            estudiante=est, ventana=ventana, profesorado=profesorado, motivo=PedidoAnalitico.Motivo.EQUIVALENCIA
+        )
+
+    def test_encolar_es_un_solo_insert(self, django_assert_num_queries):
+        pedido = self._pedido()
+
+        with django_assert_num_queries(1):
+            encolar_notificacion(NotificacionPendiente.Tipo.ANALITICO, pedido.id, estudiante_id=pedido.estudiante_id)
+
+        assert not Message.objects.exists()
+
+    def test_entrega_solo_el_ultimo_evento_repetido(self):
+        pedido = self._pedido()
+        for _ in range(2):
+            encolar_notificacion(
+                NotificacionPendiente.Tipo.ANALITICO,
+                pedido.id,
+                estudiante_id=pedido.estudiante_id,
+                variante="confeccionado",
+            )
+
+        assert procesar_notificaciones() == {"enviadas": 1, "duplicadas": 1, "errores": 0}
+        assert procesar_notificaciones() == {"enviadas": 0, "duplicadas": 0, "errores": 0}
+
+        conversacion = Conversation.objects.get(context_type="analitico", context_id=pedido.id)
+        assert conversacion.messages.count() == 1
+        estados = list(NotificacionPendiente.objects.values_list("estado", flat=True))
+        assert estados == [NotificacionPendiente.Estado.DUPLICADA, NotificacionPendiente.Estado.ENVIADA]
+
+    def test_error_espera_su_reintento_sin_frenar_las_nuevas(self):
+        pedido = self._pedido()
+        fallida = encolar_notificacion(NotificacionPendiente.Tipo.ANALITICO, 999_999)
+        encolar_notificacion(NotificacionPendiente.Tipo.ANALITICO, pedido.id, estudiante_id=pedido.estudiante_id)
+
+        assert procesar_notificaciones(lote=1) == {"enviadas": 0, "duplicadas": 0, "errores": 1}
+        assert procesar_notificaciones(lote=1) == {"enviadas": 1, "duplicadas": 0, "errores": 0}
+        assert procesar_notificaciones(lote=1) == {"enviadas": 0, "duplicadas": 0, "errores": 0}
+
+        fallida.refresh_from_db()
+        assert fallida.estado == NotificacionPendiente.Estado.PENDIENTE
+        assert fallida.intentos == 1
+        assert fallida.reintentar_en > timezone.now() + timedelta(seconds=50)
+
+    def test_comando_no_reintenta_en_la_misma_ejecucion(self, monkeypatch):
+        monkeypatch.setattr(notificaciones_service, "REINTENTO_BASE_SEGUNDOS", 0)
+        pedido = self._pedido()
+        fallida = encolar_notificacion(NotificacionPendiente.Tipo.ANALITICO, 999_999)
+        encolar_notificacion(NotificacionPendiente.Tipo.ANALITICO, pedido.id, estudiante_id=pedido.estudiante_id)
+
+        call_command("procesar_notificaciones", "--lote", "2", stdout=StringIO())
+
+        fallida.refresh_from_db()
+        assert fallida.estado == NotificacionPendiente.Estado.PENDIENTE
+        assert fallida.intentos == 1
+
+    def test_el_worker_entrega_la_bandeja_y_registra_la_corrida(self):
+        pedido = self._pedido()
+        encolar_notificacion(NotificacionPendiente.Tipo.ANALITICO, pedido.id, estudiante_id=pedido.estudiante_id)
+
+        RunWorker(stdout=StringIO()).entregar_notificaciones()
+
+        assert NotificacionPendiente.objects.get().estado == NotificacionPendiente.Estado.ENVIADA
+        corrida = CommandRun.objects.get(command="procesar_notificaciones")
+        assert corrida.success and corrida.last_success_at is not None
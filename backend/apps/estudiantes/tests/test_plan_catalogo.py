@@ -0,0 +1,108 @@
+import time as reloj
+from datetime import time
+
+import pytest
+from django.core.cache import cache
+
+from apps.estudiantes.services import plan_catalogo
+from apps.estudiantes.services.plan_catalogo import cargar_catalogo_plan, obtener_catalogo_plan
+from core.models import (
+    Bloque,
+    Correlatividad,
+    HorarioCatedra,
+    HorarioCatedraDetalle,
+    Materia,
+    PlanDeEstudio,
+    Profesorado,
+    Turno,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _plan_con_materias(cantidad, sufijo="1"):
+    profesorado = Profesorado.objects.create(nombre=f"Profesorado Test {sufijo}", duracion_anios=4)
+    plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion=f"R-TEST-{sufijo}", anio_inicio=2020)
+    turno = Turno.objects.create(nombre=f"Turno Test {sufijo}")
+    bloque = Bloque.objects.create(turno=turno, dia=1, hora_desde=time(8, 0), hora_hasta=time(9, 0))
+    materias = []
+    for i in range(cantidad):
+        materia = Materia.objects.create(
+            plan_de_estudio=plan,
+            nombre=f"Materia {i:02d}",
+            anio_cursada=1 + i % 4,
+            formato=Materia.FormatoMateria.ASIGNATURA,
+            regimen=Materia.TipoCursada.ANUAL,
+        )
+        viejo = HorarioCatedra.objects.create(espacio=materia, turno=turno, anio_academico=2024)
+        HorarioCatedraDetalle.objects.create(horario_catedra=viejo, bloque=bloque)
+        HorarioCatedra.objects.create(espacio=materia, turno=turno, anio_academico=2026)
+        if materias:
+            Correlatividad.objects.create(
+                materia_origen=materia,
+                materia_correlativa=materias[-1],
+                tipo=Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR,
+            )
+        materias.append(materia)
+    return plan, turno, materias
+
+
+def test_consultas_fijas_sin_importar_tamanio_del_plan(django_assert_num_queries):
+    plan_chico, _, _ = _plan_con_materias(3)
+    with django_assert_num_queries(4):
+        cargar_catalogo_plan(plan_chico)
+
+    plan_grande, _, _ = _plan_con_materias(12, sufijo="2")
+    with django_assert_num_queries(4):
+        catalogo = cargar_catalogo_plan(plan_grande)
+    assert len(catalogo) == 12
+
+
+def test_usa_el_horario_mas_reciente_y_correlativas():
+    plan, _, materias = _plan_con_materias(2)
+    catalogo = {m["id"]: m for m in cargar_catalogo_plan(plan)}
+
+    # El horario 2026 no tiene bloques: igual es el vigente (mismo criterio que horarios_para)
+    assert catalogo[materias[0].id]["horarios"] == []
+    assert catalogo[materias[1].id]["correlativas_regular"] == [materias[0].id]
+    assert catalogo[materias[1].id]["correlativas_aprob"] == []
+
+
+def test_cache_se_invalida_al_editar_horarios(django_assert_num_queries):
+    plan, turno, materias = _plan_con_materias(2)
+    obtener_catalogo_plan(plan, anio_lectivo=2026)
+    with django_assert_num_queries(0):
+        obtener_catalogo_plan(plan, anio_lectivo=2026)
+
+    hc = HorarioCatedra.objects.get(espacio=materias[0], anio_academico=2026)
+    bloque = Bloque.objects.create(turno=turno, dia=2, hora_desde=time(10, 0), hora_hasta=time(11, 0))
+    HorarioCatedraDetalle.objects.create(horario_catedra=hc, bloque=bloque)
+
+    catalogo = {m["id"]: m for m in obtener_catalogo_plan(plan, anio_lectivo=2026)}
+    assert catalogo[materias[0].id]["horarios"] == [{"dia": "Martes", "desde": "10:00", "hasta": "11:00"}]
+
+
+def test_generacion_no_vence_con_el_backend_file(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+            "TIMEOUT": 1,
+        }
+    }
+    clave = plan_catalogo._catalogo_key(7, 2026, None)
+
+    plan_catalogo.invalidar_catalogo_plan(7)
+    plan_catalogo.invalidar_catalogo_plan(7)
+    despues = plan_catalogo._catalogo_key(7, 2026, None)
+    reloj.sleep(1.1)
+
+    assert despues != clave
+    assert plan_catalogo._catalogo_key(7, 2026, None) == despues
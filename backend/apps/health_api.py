@@ -1,8 +1,40 @@
-from django.db import connection
+"""
+Salud del servicio.
+
+`/api/system/health/health` (liveness) solo verifica que la base responda.
+`/api/system/health/ready` (readiness) mide la saturación real: latencia de la base y
+retraso de las réplicas, ida y vuelta al cache, escritura y lectura en el volumen de
+media y su espacio libre, atraso de la cola de tareas y antigüedad de la última corrida
+exitosa de cada comando de mantenimiento.
+Cada chequeo queda `ok`, `degradado` o `falla` según los umbrales `HEALTH_*` de
+settings; una réplica caída solo degrada (afecta reportes y tableros, no a la
+primaria). Con alguna falla responde 503; con `?estricto=true` también si está
+degradado, para que nginx o el orquestador saquen la instancia antes de que se caiga.
+"""
+
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Count, Min
+from django.utils import timezone
 from ninja import Router
 
+from core.models import BackgroundJob, CommandRun
+
 router = Router(tags=["health"], auth=None)
 
+OK, DEGRADADO, FALLA = "ok", "degradado", "falla"
+_GRAVEDAD = {OK: 0, DEGRADADO: 1, FALLA: 2}
+
+# Último resultado de readiness de este proceso: el endpoint es público y escribe en disco.
+_ultimo: dict = {}
+
 
 @router.get("/health")
 def health(request):
@@ -20,3 +52,173 @@ def health(request):
         "service": "IPES API",
         "version": "1.0.0",  # si tenés versionado, reemplaza
     }
+
+
+def _ms(inicio: float) -> float:
+    return round((time.perf_counter() - inicio) * 1000, 1)
+
+
+def _peor(*estados: str) -> str:
+    return max(estados, key=_GRAVEDAD.__getitem__, default=OK)
+
+
+def _retraso_replica(conn) -> int | None:
+    """Segundos de retraso de una réplica MySQL; None si no replica o no corresponde."""
+    if conn.vendor != "mysql":
+        return None
+    with conn.cursor() as c:
+        try:
+            c.execute("SHOW REPLICA STATUS")
+        except Exception:
+            c.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+        fila = c.fetchone()
+        if fila is None:
+            return None
+        datos = dict(zip([col[0] for col in c.description], fila, strict=False))
+    retraso = datos.get("Seconds_Behind_Source", datos.get("Seconds_Behind_Master"))
+    return -1 if retraso is None else int(retraso)
+
+
+def chequear_base() -> dict:
+    resultado = {}
+    for alias in connections:
+        conn = connections[alias]
+        inicio = time.perf_counter()
+        try:
+            with conn.cursor() as c:
+                c.execute("SELECT 1")
+                c.fetchone()
+            ms = _ms(inicio)
+            chequeo = {"estado": DEGRADADO if ms > settings.HEALTH_DB_MS else OK, "ms": ms}
+            if alias != DEFAULT_DB_ALIAS:
+                retraso = _retraso_replica(conn)
+                if retraso is not None:
+                    # -1: la replicación está detenida.
+                    chequeo["retraso_s"] = retraso
+                    if retraso < 0 or retraso > settings.HEALTH_REPLICA_LAG_SECONDS:
+                        chequeo["estado"] = DEGRADADO
+        except Exception as exc:
+            # Réplica caída o sin permiso REPLICATION CLIENT: la primaria sigue atendiendo.
+            estado = FALLA if alias == DEFAULT_DB_ALIAS else DEGRADADO
+            chequeo = {"estado": estado, "detalle": f"{type(exc).__name__}: {str(exc)[:200]}"}
+        resultado[alias] = chequeo
+    return {"estado": _peor(*(c["estado"] for c in resultado.values())), "conexiones": resultado}
+
+
+def chequear_cache() -> dict:
+    clave, valor = f"health:{uuid.uuid4().hex}", uuid.uuid4().hex
+    inicio = time.perf_counter()
+    cache.set(clave, valor, 10)
+    leido = cache.get(clave)
+    cache.delete(clave)
+    ms = _ms(inicio)
+    if leido != valor:
+        return {"estado": FALLA, "ms": ms, "detalle": "El cache no devolvió el valor escrito."}
+    return {"estado": DEGRADADO if ms > settings.HEALTH_CACHE_MS else OK, "ms": ms}
+
+
+def chequear_media() -> dict:
+    raiz = Path(settings.MEDIA_ROOT)
+    directorio = raiz / ".health"
+    directorio.mkdir(parents=True, exist_ok=True)
+    archivo = directorio / f"{os.getpid()}.probe"
+    contenido = os.urandom(4096)
+    inicio = time.perf_counter()
+    try:
+        with open(archivo, "wb") as fh:
+            fh.write(contenido)
+            fh.flush()
+            os.fsync(fh.fileno())
+        escritura = _ms(inicio)
+        inicio = time.perf_counter()
+        leido = archivo.read_bytes()
+        lectura = _ms(inicio)
+    finally:
+        archivo.unlink(missing_ok=True)
+    uso = shutil.disk_usage(raiz)
+    libre_pct = round(uso.free / uso.total * 100, 1) if uso.total else 0.0
+
+    estado = OK
+    if escritura > settings.HEALTH_MEDIA_MS or lectura > settings.HEALTH_MEDIA_MS:
+        estado = DEGRADADO
+    if libre_pct < settings.HEALTH_MEDIA_MIN_FREE_PCT:
+        estado = DEGRADADO
+    if libre_pct < settings.HEALTH_MEDIA_CRITICAL_FREE_PCT or leido != contenido:
+        estado = FALLA
+    return {
+        "estado": estado,
+        "escritura_ms": escritura,
+        "lectura_ms": lectura,
+        "libre_mb": uso.free // (1024 * 1024),
+        "libre_pct": libre_pct,
+    }
+
+
+def chequear_tareas() -> dict:
+    ahora = timezone.now()
+    listas = BackgroundJob.objects.filter(status=BackgroundJob.Status.QUEUED, run_after__lte=ahora).aggregate(
+        pendientes=Count("id"), mas_vieja=Min("run_after")
+    )
+    pendientes = listas["pendientes"]
+    en_curso = BackgroundJob.objects.filter(status=BackgroundJob.Status.RUNNING).count()
+    antiguedad = int((ahora - listas["mas_vieja"]).total_seconds()) if listas["mas_vieja"] else 0
+    atrasada = pendientes > settings.HEALTH_JOBS_BACKLOG or antiguedad > settings.HEALTH_JOBS_MAX_AGE_SECONDS
+    return {
+        "estado": DEGRADADO if atrasada else OK,
+        "pendientes": pendientes,
+        "en_curso": en_curso,
+        "antiguedad_s": antiguedad,
+    }
+
+
+def chequear_comandos() -> dict:
+    ahora = timezone.now()
+    corridas = {c.command: c for c in CommandRun.objects.filter(command__in=settings.HEALTH_COMMAND_MAX_AGE)}
+    resultado = {}
+    for nombre, maximo in settings.HEALTH_COMMAND_MAX_AGE.items():
+        corrida = corridas.get(nombre)
+        if corrida is None or corrida.last_success_at is None:
+            resultado[nombre] = {"estado": DEGRADADO, "detalle": "Sin corridas exitosas registradas."}
+            continue
+        antiguedad = int((ahora - corrida.last_success_at).total_seconds())
+        chequeo = {"estado": DEGRADADO if antiguedad > maximo else OK, "ultima_exitosa_s": antiguedad}
+        if not corrida.success:
+            chequeo["ultimo_error"] = corrida.error[:300]
+        resultado[nombre] = chequeo
+    return {"estado": _peor(*(c["estado"] for c in resultado.values())), "comandos": resultado}
+
+
+CHEQUEOS = {
+    "base": chequear_base,
+    "cache": chequear_cache,
+    "media": chequear_media,
+    "tareas": chequear_tareas,
+    "comandos": chequear_comandos,
+}
+
+
+def evaluar() -> dict:
+    inicio = time.perf_counter()
+    chequeos = {}
+    for nombre, chequear in CHEQUEOS.items():
+        try:
+            chequeos[nombre] = chequear()
+        except Exception as exc:
+            chequeos[nombre] = {"estado": FALLA, "detalle": f"{type(exc).__name__}: {str(exc)[:200]}"}
+    estado = _peor(*(c["estado"] for c in chequeos.values()))
+    return {"estado": estado, "ms": _ms(inicio), "chequeos": chequeos}
+
+
+@router.get("/ready")
+def readiness(request, estricto: bool = False):
+    """Readiness con chequeos de saturación; 503 si algo falla (o si está degradado, con `estricto`)."""
+    ahora = time.monotonic()
+    if _ultimo and ahora - _ultimo["en"] < settings.HEALTH_READY_CACHE_SECONDS:
+        resultado = _ultimo["resultado"]
+    else:
+        resultado = evaluar()
+        _ultimo.update(en=ahora, resultado=resultado)
+
+    limite = DEGRADADO if estricto else FALLA
+    listo = _GRAVEDAD[resultado["estado"]] < _GRAVEDAD[limite]
+    return (200 if listo else 503), {"ok": listo, **resultado}
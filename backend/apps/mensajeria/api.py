@@ -8,6 +8,9 @@ Incluye soporte para:
 - Auditoría de cierres y solicitudes de cierre de tickets/consultas.
 """
 
+import threading
+import time
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import transaction
@@ -22,15 +25,19 @@ from apps.common.api_schemas import ApiResponse
 from apps.common.date_utils import format_datetime
 from core.auth_ninja import JWTAuth
 from core.models import (
+    Broadcast,
     Conversation,
     ConversationAudit,
     ConversationParticipant,
     Docente,
     Estudiante,
     Message,
+    MessageCounter,
     MessageTopic,
+    SearchDocument,
     StaffAsignacion,
 )
+from core.models.mensajeria import SLA_DANGER_DAYS, SLA_WARNING_DAYS
 from core.permissions import (
     allowed_profesorados,
     ensure_profesorado_access,
@@ -38,6 +45,7 @@ from core.permissions import (
 )
 
 from .schemas import (
+    BroadcastOut,
     ConversationCountsOut,
     ConversationCreateIn,
     ConversationCreateOut,
@@ -45,18 +53,15 @@ from .schemas import (
     ConversationListQuery,
     ConversationParticipantOut,
     ConversationSummaryOut,
+    MessageEventsOut,
     MessageOut,
     MessageTopicOut,
     SimpleUserOut,
 )
+from .services import encolar_difusion, primary_role
 
 router = Router(tags=["Mensajería"])
 
-# --- CONFIGURACIÓN DE RESPUESTA (SLA) ---
-# Días permitidos antes de marcar una conversación como atrasada (Warning/Danger)
-SLA_WARNING_DAYS = getattr(settings, "MESSAGES_SLA_WARNING_DAYS", 3)
-SLA_DANGER_DAYS = getattr(settings, "MESSAGES_SLA_DANGER_DAYS", 6)
-
 # REGLAS DE PERMISOS: Define quién puede enviar mensajes masivos a quién.
 # Actualmente restringido a Bedeles hacia sus Estudiantes por carrera.
 ROLE_MASS_RULES: dict[str, set[str] | None] = {
@@ -72,6 +77,14 @@ ROLE_STAFF_ASSIGNMENT = {
 
 ROLES_FORBIDDEN_SENDER = set()
 
+# --- NOVEDADES EN ESPERA (LONG-POLL) ---
+# Cada espera ocupa un hilo del worker: se limita la cantidad por proceso y, sin lugar
+# libre, se responde de inmediato indicando cuándo reintentar.
+LONG_POLL_TIMEOUT = getattr(settings, "MESSAGES_LONG_POLL_TIMEOUT", 25)
+LONG_POLL_INTERVAL = getattr(settings, "MESSAGES_LONG_POLL_INTERVAL", 1)
+LONG_POLL_RETRY_AFTER = 60
+_long_poll_slots = threading.BoundedSemaphore(getattr(settings, "MESSAGES_LONG_POLL_SLOTS", 4))
+
 
 # --- HELPERS DE PERMISOS Y TERRITORIALIDAD ---
 
@@ -144,13 +157,14 @@ def _compute_sla_indicator(conversation: Conversation, participant: Conversation
     """
     Calcula el indicador de urgencia basado en el tiempo transcurrido desde el último mensaje
     no leído por el participante actual (siempre que el último mensaje no sea propio).
+    Usa el resumen desnormalizado de la conversación, sin consultar los mensajes.
     """
-    last_msg = getattr(conversation, "_last_message", None) or conversation.messages.order_by("-created_at").first()
-    if not last_msg or last_msg.author_id == participant.user_id:
+    last_at = conversation.last_message_at
+    if not last_at or conversation.last_message_author_id == participant.user_id:
         return None
-    if participant.last_read_at and participant.last_read_at >= last_msg.created_at:
+    if participant.last_read_at and participant.last_read_at >= last_at:
         return None
-    delta_days = (timezone.now() - last_msg.created_at).days
+    delta_days = (timezone.now() - last_at).days
     if delta_days >= SLA_DANGER_DAYS:
         return "danger"
     if delta_days >= SLA_WARNING_DAYS:
@@ -158,25 +172,23 @@ def _compute_sla_indicator(conversation: Conversation, participant: Conversation
     return None
 
 
+def _summary_participants(conversation: Conversation, participant: ConversationParticipant):
+    """
+    Participantes desde la caché de la conversación. Solo se informa la lectura del
+    usuario actual; el detalle de la conversación expone la de todos.
+    """
+    cache = conversation.participants_cache or conversation.refresh_participants_cache()
+    return [
+        ConversationParticipantOut(
+            **item, last_read_at=format_datetime(participant.last_read_at) if item["id"] == participant.id else None
+        )
+        for item in cache
+    ]
+
+
 def _primary_role(user: User) -> str | None:
     """Retorna el rol principal del usuario según jerarquía institucional."""
-    roles = get_user_roles(user)
-    PRIORITY = [
-        "admin",
-        "secretaria",
-        "jefa_aaee",
-        "jefes",
-        "coordinador",
-        "tutor",
-        "bedel",
-        "consulta",
-        "docente",
-        "estudiante",
-    ]
-    for role in PRIORITY:
-        if role in roles:
-            return role
-    return sorted(roles)[0] if roles else None
+    return primary_role(get_user_roles(user))
 
 
 def _create_conversation(
@@ -206,10 +218,8 @@ def _create_conversation(
     ConversationParticipant.objects.create(
         conversation=conversation, user=recipient, role_snapshot=_primary_role(recipient) or "", can_reply=r_can_reply
     )
-    msg = Message.objects.create(conversation=conversation, author=sender, body=body)
-    conversation.last_message_at = msg.created_at
-    conversation.updated_at = msg.created_at
-    conversation.save(update_fields=["last_message_at", "updated_at"])
+    # La señal de Message actualiza el resumen de la conversación y de sus participantes.
+    Message.objects.create(conversation=conversation, author=sender, body=body)
     return conversation
 
 
@@ -231,7 +241,7 @@ def search_users(request, q: str):
     """
     if len(q) < 3:
         return []
-    query = Q(first_name__icontains=q) | Q(last_name__icontains=q) | Q(username__icontains=q)
+    query = Q(id__in=SearchDocument.objects.matching(q).filter(kind=SearchDocument.Kind.USER).values("object_id"))
     q_low = q.lower()
     if "bedel" in q_low or q_low in "bedel":
         query |= Q(asignaciones_profesorado__rol="bedel")
@@ -266,34 +276,40 @@ def list_conversations(request, filters: Query[ConversationListQuery]):
     """
     Lista las conversaciones del usuario actual.
     Soporta filtros por estado, tema, no leídos y búsqueda global de texto.
+    Paginación por cursor: pasar `before`/`before_id` con el `last_message_at`/`id` del
+    último elemento recibido para obtener la página siguiente.
     """
     participant_qs = ConversationParticipant.objects.filter(user=request.user).select_related(
-        "conversation__topic", "conversation__created_by"
+        "conversation__topic", "conversation__closed_by"
     )
     if filters.status and not filters.q:
         participant_qs = participant_qs.filter(conversation__status=filters.status)
     if filters.topic_id:
         participant_qs = participant_qs.filter(conversation__topic_id=filters.topic_id)
     if filters.unread:
+        participant_qs = participant_qs.filter(Q(last_read_at__isnull=True) | Q(last_read_at__lt=F("last_message_at")))
+    if filters.q:
+        # Índice de texto completo: asuntos y mensajes por conversación, difusiones por id.
+        docs = SearchDocument.objects.matching(filters.q)
         participant_qs = participant_qs.filter(
-            Q(last_read_at__isnull=True) | Q(last_read_at__lt=F("conversation__last_message_at"))
+            Q(
+                conversation_id__in=docs.filter(
+                    kind__in=[SearchDocument.Kind.CONVERSATION, SearchDocument.Kind.MESSAGE]
+                ).values("conversation_id")
+            )
+            | Q(conversation__broadcast_id__in=docs.filter(kind=SearchDocument.Kind.BROADCAST).values("object_id"))
         )
-    if filters.q:
+    if filters.before:
         participant_qs = participant_qs.filter(
-            Q(conversation__subject__icontains=filters.q) | Q(conversation__messages__body__icontains=filters.q)
-        ).distinct()
+            Q(last_message_at__lt=filters.before)
+            | Q(last_message_at=filters.before, conversation_id__lt=filters.before_id or 0)
+        )
 
+    limit = max(1, min(filters.limit, 100))
     res = []
-    for p in participant_qs.order_by("-conversation__last_message_at")[:100]:
+    for p in participant_qs.order_by("-last_message_at", "-conversation_id")[:limit]:
         c = p.conversation
         unread = not p.last_read_at or p.last_read_at < (c.last_message_at or c.created_at)
-        last_msg = c.messages.order_by("-created_at").first()
-        excerpt = (
-            (last_msg.body[:50] + "...")
-            if last_msg and len(last_msg.body) > 50
-            else (last_msg.body if last_msg else None)
-        )
-
         res.append(
             ConversationSummaryOut(
                 id=c.id,
@@ -305,18 +321,8 @@ def list_conversations(request, filters: Query[ConversationListQuery]):
                 last_message_at=c.last_message_at.isoformat() if c.last_message_at else None,
                 unread=unread,
                 sla=_compute_sla_indicator(c, p),
-                participants=[
-                    ConversationParticipantOut(
-                        id=pp.id,
-                        user_id=pp.user_id,
-                        name=pp.user.get_full_name() or pp.user.username,
-                        roles=list(get_user_roles(pp.user)),
-                        can_reply=pp.can_reply,
-                        last_read_at=format_datetime(pp.last_read_at),
-                    )
-                    for pp in c.participants.all().select_related("user")
-                ],
-                last_message_excerpt=excerpt,
+                participants=_summary_participants(c, p),
+                last_message_excerpt=c.last_message_excerpt if c.last_message_at else None,
                 closed_by_name=c.closed_by.get_full_name() or c.closed_by.username if c.closed_by else None,
                 closed_at=c.closed_at.isoformat() if c.closed_at else None,
             )
@@ -354,6 +360,26 @@ def create_conversation_view(request, payload: ConversationCreateIn):
     is_massive = len(recipients) > 1
     allow_reply = payload.allow_student_reply if payload.allow_student_reply is not None else not is_massive
 
+    if is_massive:
+        # El cuerpo se guarda una vez y la entrega a cada destinatario se hace en segundo plano.
+        with transaction.atomic():
+            broadcast = encolar_difusion(
+                sender=sender,
+                recipients=recipients,
+                subject=payload.subject,
+                topic=topic,
+                body=payload.body,
+                allow_student_reply=allow_reply,
+                context_type=payload.context_type,
+                context_id=payload.context_id,
+            )
+        return {
+            "created_ids": [],
+            "total_recipients": broadcast.total,
+            "broadcast_id": broadcast.id,
+            "status": broadcast.status,
+        }
+
     created_ids = []
     with transaction.atomic():
         for r in set(recipients):
@@ -375,21 +401,33 @@ def create_conversation_view(request, payload: ConversationCreateIn):
     return {"created_ids": created_ids, "total_recipients": len(created_ids)}
 
 
+@router.get("/difusiones/{broadcast_id}", response=BroadcastOut, auth=JWTAuth())
+def get_broadcast(request, broadcast_id: int):
+    """Progreso de la entrega de un mensaje masivo (solo para su remitente)."""
+    b = get_object_or_404(Broadcast, id=broadcast_id, sender=request.user)
+    return BroadcastOut(
+        id=b.id,
+        status=b.status,
+        total=b.total,
+        delivered=b.delivered,
+        created_at=b.created_at.isoformat(),
+        finished_at=b.finished_at.isoformat() if b.finished_at else None,
+        error=b.error or None,
+    )
+
+
 @router.get("/conversaciones/{conversation_id}", response=ConversationDetailOut, auth=JWTAuth())
 def get_conversation(request, conversation_id: int):
     """Detalle de una conversación incluyendo todo el historial de mensajes."""
     participant = get_object_or_404(ConversationParticipant, conversation_id=conversation_id, user=request.user)
     c = participant.conversation
-    messages = c.messages.all().order_by("created_at")
+    messages = c.messages.select_related("author", "broadcast").order_by("created_at")
 
     # Marcado automático de lectura al abrir el detalle
     participant.last_read_at = timezone.now()
     participant.save(update_fields=["last_read_at"])
 
-    last_msg = messages.last()
-    excerpt = (
-        (last_msg.body[:50] + "...") if last_msg and len(last_msg.body) > 50 else (last_msg.body if last_msg else None)
-    )
+    excerpt = c.last_message_excerpt if c.last_message_at else None
 
     return ConversationDetailOut(
         id=c.id,
@@ -420,7 +458,7 @@ def get_conversation(request, conversation_id: int):
                 id=m.id,
                 author_id=m.author_id,
                 author_name=m.author.get_full_name() or m.author.username,
-                body=m.body,
+                body=m.text,
                 created_at=m.created_at.isoformat(),
                 attachment_url=m.attachment.url if m.attachment else None,
                 attachment_name=m.attachment.name if m.attachment else None,
@@ -440,9 +478,6 @@ def post_message(request, conversation_id: int, body: str = Form(...), attachmen
     msg = Message.objects.create(
         conversation=participant.conversation, author=request.user, body=body, attachment=attachment
     )
-    participant.conversation.last_message_at = msg.created_at
-    participant.conversation.updated_at = msg.created_at
-    participant.conversation.save(update_fields=["last_message_at", "updated_at"])
 
     participant.last_read_at = msg.created_at
     participant.save(update_fields=["last_read_at"])
@@ -460,21 +495,47 @@ def post_message(request, conversation_id: int, body: str = Form(...), attachmen
 
 @router.get("/resumen/", response=ConversationCountsOut, auth=JWTAuth())
 def get_message_counts(request):
-    """Resumen de contadores (Global no leídos, Warnings, Dangers) para el header/notificaciones."""
-    participants = ConversationParticipant.objects.filter(
-        user=request.user, conversation__status=Conversation.Status.OPEN
-    )
-    unread, warning, danger = 0, 0, 0
-    for p in participants.select_related("conversation"):
-        c = p.conversation
-        if not p.last_read_at or p.last_read_at < c.last_message_at:
-            unread += 1
-        sla = _compute_sla_indicator(c, p)
-        if sla == "warning":
-            warning += 1
-        elif sla == "danger":
-            danger += 1
-    return {"unread": unread, "sla_warning": warning, "sla_danger": danger}
+    """
+    Resumen de contadores (Global no leídos, Warnings, Dangers) para el header/notificaciones.
+    Lee la fila de `MessageCounter` del usuario, mantenida al enviar, leer o cerrar.
+    """
+    counter = MessageCounter.for_user(request.user.id)
+    return {"unread": counter.unread, "sla_warning": counter.sla_warning, "sla_danger": counter.sla_danger}
+
+
+@router.get("/novedades", response=MessageEventsOut, auth=JWTAuth())
+def wait_message_events(request, version: int | None = None, timeout: int = LONG_POLL_TIMEOUT):
+    """
+    Long-poll de novedades para reemplazar el polling del header y la bandeja.
+    Mantiene la solicitud abierta hasta que la versión de contadores del usuario difiere
+    de `version` o pasan `timeout` segundos; sin `version` responde de inmediato.
+    """
+    user_id = request.user.id
+    timeout = max(0, min(timeout, LONG_POLL_TIMEOUT))
+    retry_after = 0
+    actual = MessageCounter.current_version(user_id)
+    # La versión solo crece: un valor menor en caché (de otro worker) no cuenta como cambio.
+    if version is not None and actual <= version and timeout:
+        if _long_poll_slots.acquire(blocking=False):
+            try:
+                limite = time.monotonic() + timeout
+                while actual <= version and time.monotonic() < limite:
+                    time.sleep(LONG_POLL_INTERVAL)
+                    actual = MessageCounter.current_version(user_id)
+            finally:
+                _long_poll_slots.release()
+        else:
+            retry_after = LONG_POLL_RETRY_AFTER
+
+    counter = MessageCounter.for_user(user_id)
+    return {
+        "unread": counter.unread,
+        "sla_warning": counter.sla_warning,
+        "sla_danger": counter.sla_danger,
+        "version": counter.version,
+        "changed": counter.version != version,
+        "retry_after": retry_after,
+    }
 
 
 @router.post("/conversaciones/{conversation_id}/cerrar", auth=JWTAuth())
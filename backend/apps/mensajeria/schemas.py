@@ -57,6 +57,18 @@ class ConversationCreateIn(Schema):
 class ConversationCreateOut(Schema):
     created_ids: list[int]
     total_recipients: int
+    broadcast_id: int | None = None
+    status: str | None = None
+
+
+class BroadcastOut(Schema):
+    id: int
+    status: str
+    total: int
+    delivered: int
+    created_at: str
+    finished_at: str | None
+    error: str | None
 
 
 class ConversationListQuery(Schema):
@@ -64,6 +76,9 @@ class ConversationListQuery(Schema):
     topic_id: int | None = None
     unread: bool | None = False
     q: str | None = None
+    before: datetime | None = None
+    before_id: int | None = None
+    limit: int = 100
 
 
 class ConversationCountsOut(Schema):
@@ -72,6 +87,12 @@ class ConversationCountsOut(Schema):
     sla_danger: int
 
 
+class MessageEventsOut(ConversationCountsOut):
+    version: int
+    changed: bool
+    retry_after: int = 0
+
+
 class MessageTopicOut(Schema):
     id: int
     slug: str
@@ -0,0 +1,217 @@
+"""
+Difusión de mensajes masivos.
+
+Un mensaje masivo se guarda una vez en `Broadcast` y la respuesta al remitente es
+inmediata. La entrega es una tarea de la cola (`apps.common.jobs`) que crea, por lotes
+con `bulk_create`, la conversación, los participantes y el mensaje de cada destinatario,
+con el resumen de bandeja y los contadores ya calculados, de modo que los destinatarios
+lo leen por la misma API.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from apps.common.jobs import enqueue, job_handler
+from core.models import BackgroundJob, Broadcast, Conversation, ConversationParticipant, Message, MessageCounter
+from core.models.mensajeria import SLA_WARNING_DAYS
+from core.permissions import get_user_roles, roles_from_group_names
+
+logger = logging.getLogger(__name__)
+
+LOTE_DIFUSION = 500
+JOB_DIFUSION = "mensajeria.difusion"
+
+ROLE_PRIORITY = [
+    "admin",
+    "secretaria",
+    "jefa_aaee",
+    "jefes",
+    "coordinador",
+    "tutor",
+    "bedel",
+    "consulta",
+    "docente",
+    "estudiante",
+]
+
+
+def primary_role(roles: set[str]) -> str | None:
+    """Rol principal según jerarquía institucional."""
+    for role in ROLE_PRIORITY:
+        if role in roles:
+            return role
+    return sorted(roles)[0] if roles else None
+
+
+def _participante_cache(participant_id: int, user: User, roles: set[str], can_reply: bool) -> dict:
+    return {
+        "id": participant_id,
+        "user_id": user.id,
+        "name": user.get_full_name() or user.username,
+        "roles": sorted(roles),
+        "can_reply": can_reply,
+    }
+
+
+def encolar_difusion(
+    *, sender, recipients, subject, topic, body, allow_student_reply, context_type, context_id
+) -> Broadcast:
+    """Registra la difusión y encola su entrega en la misma transacción."""
+    recipient_ids = sorted({r.id for r in recipients if r.id != sender.id})
+    broadcast = Broadcast.objects.create(
+        sender=sender,
+        topic=topic,
+        subject=subject or "",
+        body=body,
+        allow_student_reply=allow_student_reply,
+        context_type=context_type,
+        context_id=context_id,
+        recipient_ids=recipient_ids,
+        total=len(recipient_ids),
+    )
+    enqueue(JOB_DIFUSION, {"broadcast_id": broadcast.id}, user=sender)
+    return broadcast
+
+
+@job_handler(JOB_DIFUSION)
+def _tarea_difusion(job: BackgroundJob) -> dict:
+    broadcast = entregar_difusion(job.payload["broadcast_id"])
+    return {"broadcast_id": broadcast.id, "delivered": broadcast.delivered, "total": broadcast.total}
+
+
+def entregar_difusion(broadcast_id: int) -> Broadcast:
+    """
+    Entrega la difusión a los destinatarios pendientes. Es reanudable: quienes ya tienen
+    su conversación de esta difusión se omiten.
+    """
+    broadcast = Broadcast.objects.select_related("sender").get(pk=broadcast_id)
+    Broadcast.objects.filter(pk=broadcast.pk).update(status=Broadcast.Status.RUNNING, started_at=timezone.now())
+    try:
+        entregados = set(
+            ConversationParticipant.objects.filter(conversation__broadcast=broadcast).values_list("user_id", flat=True)
+        )
+        pendientes = [uid for uid in broadcast.recipient_ids if uid not in entregados]
+        sender = broadcast.sender
+        sender_roles = get_user_roles(sender) if sender else set()
+        for inicio in range(0, len(pendientes), LOTE_DIFUSION):
+            _entregar_lote(broadcast, sender_roles, pendientes[inicio : inicio + LOTE_DIFUSION])
+    except Exception as exc:
+        logger.exception("Error entregando la difusión %s", broadcast_id)
+        Broadcast.objects.filter(pk=broadcast.pk).update(status=Broadcast.Status.ERROR, error=str(exc)[:2000])
+        raise
+
+    Broadcast.objects.filter(pk=broadcast.pk).update(status=Broadcast.Status.DONE, finished_at=timezone.now())
+    if broadcast.sender_id:
+        MessageCounter.refresh(broadcast.sender_id)
+    broadcast.refresh_from_db()
+    return broadcast
+
+
+def _entregar_lote(broadcast: Broadcast, sender_roles: set[str], user_ids: list[int]) -> None:
+    sender = broadcast.sender
+    usuarios = User.objects.in_bulk(user_ids)
+    grupos: dict[int, list[str]] = defaultdict(list)
+    for uid, nombre in User.groups.through.objects.filter(user_id__in=user_ids).values_list("user_id", "group__name"):
+        grupos[uid].append(nombre)
+    destinatarios = [usuarios[uid] for uid in user_ids if uid in usuarios]
+    if not destinatarios:
+        return
+    roles = {u.id: roles_from_group_names(grupos[u.id], u.is_superuser) for u in destinatarios}
+    puede_responder = {
+        u.id: not ("estudiante" in roles[u.id] and not broadcast.allow_student_reply) for u in destinatarios
+    }
+    ahora = timezone.now()
+
+    with transaction.atomic():
+        conversaciones = Conversation.objects.bulk_create(
+            [
+                Conversation(
+                    topic_id=broadcast.topic_id,
+                    created_by=sender,
+                    subject=broadcast.subject,
+                    context_type=broadcast.context_type,
+                    context_id=broadcast.context_id,
+                    status=Conversation.Status.OPEN,
+                    is_massive=True,
+                    allow_student_reply=broadcast.allow_student_reply,
+                    last_message_at=ahora,
+                    last_message_excerpt=Conversation.excerpt_for(broadcast.body),
+                    last_message_author=sender,
+                    broadcast=broadcast,
+                )
+                for _ in destinatarios
+            ]
+        )
+        if conversaciones[0].pk is None:
+            # MySQL no devuelve las PK de bulk_create: las del lote son las de esta difusión
+            # aún sin participantes, en orden de inserción.
+            ids = Conversation.objects.filter(broadcast=broadcast, participants__isnull=True).order_by("id")
+            for conv, pk in zip(conversaciones, ids.values_list("id", flat=True), strict=True):
+                conv.pk = pk
+
+        participantes = []
+        for conv, user in zip(conversaciones, destinatarios, strict=True):
+            if sender:
+                participantes.append(
+                    ConversationParticipant(
+                        conversation=conv,
+                        user=sender,
+                        role_snapshot=primary_role(sender_roles) or "",
+                        can_reply=True,
+                        last_read_at=ahora,
+                        last_message_at=ahora,
+                    )
+                )
+            participantes.append(
+                ConversationParticipant(
+                    conversation=conv,
+                    user=user,
+                    role_snapshot=primary_role(roles[user.id]) or "",
+                    can_reply=puede_responder[user.id],
+                    last_message_at=ahora,
+                    pending_since=ahora,
+                )
+            )
+        ConversationParticipant.objects.bulk_create(participantes)
+        Message.objects.bulk_create(
+            [Message(conversation=conv, author=sender, body="", broadcast=broadcast) for conv in conversaciones]
+        )
+
+        # Caché de participantes para la bandeja, con las PK releídas en una consulta.
+        por_conversacion: dict[int, list[dict]] = defaultdict(list)
+        for pid, conv_id, uid in (
+            ConversationParticipant.objects.filter(conversation__in=conversaciones)
+            .order_by("id")
+            .values_list("id", "conversation_id", "user_id")
+        ):
+            if sender and uid == sender.id:
+                por_conversacion[conv_id].append(_participante_cache(pid, sender, sender_roles, True))
+            else:
+                user = usuarios[uid]
+                por_conversacion[conv_id].append(_participante_cache(pid, user, roles[uid], puede_responder[uid]))
+        for conv in conversaciones:
+            conv.participants_cache = por_conversacion[conv.pk]
+        Conversation.objects.bulk_update(conversaciones, ["participants_cache"], batch_size=LOTE_DIFUSION)
+
+        # Contadores: una conversación nueva sin leer y un plazo de SLA que empieza ahora.
+        vence_warning = Value(ahora + timedelta(days=SLA_WARNING_DAYS), output_field=DateTimeField())
+        ids_destinatarios = [u.id for u in destinatarios]
+        MessageCounter.objects.filter(user_id__in=ids_destinatarios).update(
+            unread=F("unread") + 1,
+            version=F("version") + 1,
+            sla_recalc_at=Least(Coalesce("sla_recalc_at", vence_warning), vence_warning),
+        )
+        Broadcast.objects.filter(pk=broadcast.pk).update(delivered=F("delivered") + len(destinatarios))
+        transaction.on_commit(
+            lambda: cache.delete_many([MessageCounter.version_cache_key(uid) for uid in ids_destinatarios])
+        )
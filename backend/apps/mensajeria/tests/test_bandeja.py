@@ -0,0 +1,102 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from apps.mensajeria.api import _create_conversation, get_message_counts, list_conversations, wait_message_events
+from apps.mensajeria.schemas import ConversationListQuery
+from core.models import Conversation, ConversationParticipant, Message, MessageCounter
+
+pytestmark = pytest.mark.django_db
+
+
+def _conversaciones(sender, cantidad):
+    return [
+        _create_conversation(
+            sender=sender,
+            recipient=User.objects.create_user(username=f"dest{i}", first_name="Dest", last_name=str(i)),
+            subject=f"Consulta {i}",
+            topic=None,
+            body=f"Mensaje inicial {i}",
+            allow_student_reply=True,
+            context_type=None,
+            context_id=None,
+            is_massive=False,
+        )
+        for i in range(cantidad)
+    ]
+
+
+class TestBandeja:
+    def test_mensaje_actualiza_el_resumen(self):
+        sender = User.objects.create_user(username="bedel", first_name="Ana", last_name="Bedel")
+        (conv,) = _conversaciones(sender, 1)
+        destinatario = conv.participants.exclude(user=sender).get().user
+
+        Message.objects.create(conversation=conv, author=destinatario, body="x" * 80)
+
+        conv = Conversation.objects.get(pk=conv.pk)
+        assert conv.last_message_excerpt == "x" * 50 + "..."
+        assert conv.last_message_author_id == destinatario.id
+        assert {p["name"] for p in conv.participants_cache} == {"Ana Bedel", "Dest 0"}
+        assert set(conv.participants.values_list("last_message_at", flat=True)) == {conv.last_message_at}
+
+    def test_listado_paginado_en_una_consulta(self, django_assert_num_queries):
+        sender = User.objects.create_user(username="bedel")
+        _conversaciones(sender, 5)
+        request = SimpleNamespace(user=sender)
+
+        with django_assert_num_queries(1):
+            primera = list_conversations(request, ConversationListQuery(limit=3))
+        ultimo = primera[-1]
+        segunda = list_conversations(
+            request, ConversationListQuery(limit=3, before=ultimo.last_message_at, before_id=ultimo.id)
+        )
+
+        ids = [c.id for c in primera + segunda]
+        assert len(ids) == 5 and len(set(ids)) == 5
+        assert primera[0].last_message_excerpt == "Mensaje inicial 4"
+
+    def test_contadores_por_usuario(self, django_assert_num_queries):
+        sender = User.objects.create_user(username="bedel")
+        conv, otra = _conversaciones(sender, 2)
+        destinatario = conv.participants.exclude(user=sender).get().user
+        request = SimpleNamespace(user=destinatario)
+
+        with django_assert_num_queries(1):
+            assert get_message_counts(request) == {"unread": 1, "sla_warning": 0, "sla_danger": 0}
+
+        # El paso del tiempo mueve el pendiente a danger al vencer `sla_recalc_at`.
+        hace_una_semana = timezone.now() - timedelta(days=7)
+        ConversationParticipant.objects.filter(user=destinatario).update(pending_since=hace_una_semana)
+        MessageCounter.objects.filter(pk=destinatario.id).update(sla_recalc_at=hace_una_semana)
+        assert get_message_counts(request) == {"unread": 1, "sla_warning": 0, "sla_danger": 1}
+
+        conv.participants.get(user=destinatario).mark_read()
+        assert get_message_counts(request)["unread"] == 0
+        assert get_message_counts(request)["sla_danger"] == 0
+
+        Message.objects.create(conversation=conv, author=sender, body="Recordatorio")
+        assert get_message_counts(request)["unread"] == 1
+        conv.status = Conversation.Status.CLOSED
+        conv.save(update_fields=["status"])
+        assert get_message_counts(request)["unread"] == 0
+        assert otra.participants.get(user=sender).pending_since is None
+
+    def test_novedades_responden_al_cambiar_la_version(self, django_capture_on_commit_callbacks):
+        sender = User.objects.create_user(username="bedel")
+        (conv,) = _conversaciones(sender, 1)
+        destinatario = conv.participants.exclude(user=sender).get().user
+        request = SimpleNamespace(user=destinatario)
+
+        inicial = wait_message_events(request)
+        assert inicial["changed"] and inicial["unread"] == 1
+        sin_cambios = wait_message_events(request, version=inicial["version"], timeout=0)
+        assert not sin_cambios["changed"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Message.objects.create(conversation=conv, author=sender, body="Otro mensaje")
+        nuevo = wait_message_events(request, version=inicial["version"], timeout=5)
+        assert nuevo["changed"] and nuevo["version"] > inicial["version"]
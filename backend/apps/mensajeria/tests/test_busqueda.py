@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLWrapper
+
+from apps.mensajeria.api import _create_conversation, list_conversations
+from apps.mensajeria.schemas import ConversationListQuery
+from core.models import Message, Persona, SearchDocument, UserProfile, busqueda
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=["fts", "contains"])
+def indice(request):
+    """Ejecuta cada prueba con el índice FTS5 de SQLite y con el filtro de respaldo."""
+    if request.param == "fts":
+        busqueda.ensure_fulltext_index(connection)
+        assert busqueda.fulltext_available(connection)
+    yield request.param
+    busqueda._fulltext_disponible.clear()
+
+
+class TestBusqueda:
+    def test_conversaciones_por_mensaje_sin_acentos(self, indice):
+        sender = User.objects.create_user(username="bedel")
+        conv = _create_conversation(
+            sender=sender,
+            recipient=User.objects.create_user(username="alumno"),
+            subject="Consulta",
+            topic=None,
+            body="Hola",
+            allow_student_reply=True,
+            context_type=None,
+            context_id=None,
+            is_massive=False,
+        )
+        Message.objects.create(conversation=conv, author=sender, body="La inscripción a Didáctica cierra el viernes")
+        request = SimpleNamespace(user=sender)
+
+        assert [c.id for c in list_conversations(request, ConversationListQuery(q="didactica inscrip"))] == [conv.id]
+        assert list_conversations(request, ConversationListQuery(q="matemática")) == []
+
+    def test_directorio_por_nombre_de_persona(self, indice):
+        persona = Persona.objects.create(dni="30111222", nombre="María José", apellido="Núñez")
+        user = User.objects.create_user(username="30111222")
+        UserProfile.objects.create(user=user, persona=persona)
+        persona.apellido = "Núñez Pérez"
+        persona.save()
+
+        doc = SearchDocument.objects.get(kind=SearchDocument.Kind.USER, object_id=user.id)
+        assert "nunez perez" in doc.text
+        usuarios = SearchDocument.objects.matching("perez maria").filter(kind=SearchDocument.Kind.USER)
+        assert list(usuarios.values_list("object_id", flat=True)) == [user.id]
+
+
+class TestFullTextMySQL:
+    def test_subconsulta_no_depende_del_alias_externo(self, monkeypatch):
+        mysql = MySQLWrapper({**connections.settings["default"], "ENGINE": "django.db.backends.mysql"}, alias="default")
+        monkeypatch.setattr(busqueda, "connections", {"default": mysql})
+        monkeypatch.setitem(busqueda._fulltext_disponible, "default", True)
+
+        docs = SearchDocument.objects.matching("didáctica").values("object_id")
+        sql, params = User.objects.filter(id__in=docs).query.get_compiler(connection=mysql).as_sql()
+
+        assert "FROM `core_searchdocument` U0 WHERE U0.`id` IN (SELECT id FROM core_searchdocument WHERE MATCH" in sql
+        assert "core_searchdocument.text" not in sql
+        assert params == ("+didactica*",)
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import Group, User
+
+from apps.mensajeria import services
+from apps.mensajeria.api import get_conversation, get_message_counts, list_conversations
+from apps.mensajeria.schemas import ConversationListQuery
+from apps.mensajeria.services import encolar_difusion, entregar_difusion
+from core.models import Broadcast, Message, MessageCounter
+
+pytestmark = pytest.mark.django_db
+
+
+class TestDifusion:
+    def _difusion(self, cantidad):
+        sender = User.objects.create_user(username="bedel", first_name="Ana", last_name="Bedel")
+        estudiantes = Group.objects.create(name="estudiantes")
+        recipients = []
+        for i in range(cantidad):
+            user = User.objects.create_user(username=f"est{i}", first_name="Est", last_name=str(i))
+            user.groups.add(estudiantes)
+            recipients.append(user)
+        broadcast = encolar_difusion(
+            sender=sender,
+            recipients=recipients,
+            subject="Aviso",
+            topic=None,
+            body="Mañana no hay clases en el turno noche por corte de luz programado en el edificio.",
+            allow_student_reply=False,
+            context_type=None,
+            context_id=None,
+        )
+        return sender, recipients, broadcast
+
+    def test_entrega_por_lotes_en_consultas_fijas(self, monkeypatch, django_assert_max_num_queries):
+        monkeypatch.setattr(services, "LOTE_DIFUSION", 10)
+        sender, recipients, broadcast = self._difusion(25)
+        MessageCounter.refresh(recipients[0].id)
+
+        with django_assert_max_num_queries(50):
+            broadcast = entregar_difusion(broadcast.id)
+
+        assert broadcast.status == Broadcast.Status.DONE
+        assert broadcast.delivered == broadcast.total == 25
+        assert Message.objects.filter(broadcast=broadcast, body="").count() == 25
+        # Reanudar no duplica entregas.
+        assert entregar_difusion(broadcast.id).delivered == 25
+
+        alumno = SimpleNamespace(user=recipients[0])
+        assert get_message_counts(alumno)["unread"] == 1
+        (resumen,) = list_conversations(alumno, ConversationListQuery())
+        assert resumen.last_message_excerpt.startswith("Mañana no hay clases")
+        assert {p.name: p.can_reply for p in resumen.participants} == {"Ana Bedel": True, "Est 0": False}
+        detalle = get_conversation(alumno, resumen.id)
+        assert detalle.messages[0].body == broadcast.body
+
+    def test_busqueda_en_el_cuerpo_de_la_difusion(self):
+        sender, recipients, broadcast = self._difusion(2)
+        entregar_difusion(broadcast.id)
+
+        encontradas = list_conversations(SimpleNamespace(user=sender), ConversationListQuery(q="corte de luz"))
+        assert len(encontradas) == 2
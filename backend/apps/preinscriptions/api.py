@@ -320,16 +320,11 @@ def preview_pdf(request, payload: PreinscripcionIn):
     Genera una vista previa del PDF con datos no guardados.
     Permite al aspirante revisar el diseño antes de confirmar datos sensibles.
     """
-    import os
-
-    from django.conf import settings
     from django.http import HttpResponse
-    from weasyprint import HTML
 
+    from apps.common.pdf import render_pdf
     from core.models import Persona, Profesorado
 
-    from .views_pdf import render_to_string
-
     carrera = Profesorado.objects.filter(id=payload.carrera_id).first()
     carrera_nombre = carrera.nombre if carrera else "Carrera no especificada"
 
@@ -416,25 +411,14 @@ def preview_pdf(request, payload: PreinscripcionIn):
             {"label": "3 Folios Oficio", "checked": False},
         ]
 
-    # Rutas para recursos estáticos (Encabezado Universal)
-    logo_left_path = os.path.join(settings.BASE_DIR, "static/logos/escudo_ministerio_tdf.png")
-    logo_right_path = os.path.join(settings.BASE_DIR, "static/logos/logo_ipes.jpg")
-
-    if not os.path.exists(logo_left_path):
-        logo_left_path = os.path.join(settings.BASE_DIR, "backend/static/logos/escudo_ministerio_tdf.png")
-        logo_right_path = os.path.join(settings.BASE_DIR, "backend/static/logos/logo_ipes.jpg")
-
     context = {
         "v": v,
         "carrera_nombre": carrera_nombre,
         "checklist_items": checklist_items,
-        "logo_left_path": logo_left_path,
-        "logo_right_path": logo_right_path,
         "photo_url": raw.get("foto_4x4_dataurl") or raw.get("foto_dataUrl"),
     }
 
-    html = render_to_string("core/preinscripcion_premium.html", context)
-    pdf_content = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
+    pdf_content = render_pdf("core/preinscripcion_premium.html", context, base_url=request.build_absolute_uri("/"))
 
     response = HttpResponse(pdf_content, content_type="application/pdf")
     response["Content-Disposition"] = 'inline; filename="Vista_Previa_Preinscripcion.pdf"'
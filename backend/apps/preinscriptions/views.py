@@ -1,10 +1,32 @@
+"""
+Entrega de archivos de `MEDIA_ROOT` con control de acceso.
+
+Django solo decide si el usuario puede ver el archivo; la decisión se guarda en caché
+por (usuario, ruta) durante `MEDIA_AUTH_CACHE_SECONDS`. Con `MEDIA_ACCEL_REDIRECT`
+configurado (p. ej. `/protected-media/`), la respuesta es un `X-Accel-Redirect` a esa
+location interna de nginx, que envía el archivo (con Range y peticiones condicionales)
+sin ocupar un worker de gunicorn. Sin esa variable, Django envía el archivo él mismo.
+"""
+
+import hashlib
+import mimetypes
 import os
+import re
+from urllib.parse import quote
 
 from django.conf import settings
-from django.http import FileResponse, Http404, HttpResponse
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from apps.common.metrics import cache_result
 
 PUBLIC_PREFIXES = ()
 
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
 
 def serve_media(request, path):
     media_root = os.path.realpath(settings.MEDIA_ROOT)
@@ -21,6 +43,73 @@ def serve_media(request, path):
     if not os.path.isfile(file_path):
         raise Http404
 
+    cache_key = f"media_auth:{request.user.id}:{hashlib.sha1(path.encode()).hexdigest()}"
+    status = cache.get(cache_key)
+    cache_result("media_auth", status is not None)
+    if status is None:
+        status = _media_access_status(request, path) or 200
+        cache.set(cache_key, status, settings.MEDIA_AUTH_CACHE_SECONDS)
+    if status != 200:
+        return HttpResponse(status=status)
+
+    content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    if settings.MEDIA_ACCEL_REDIRECT:
+        # nginx resuelve Range, If-Modified-Since y el envío del archivo.
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT.rstrip("/") + "/" + quote(path)
+        response["Cache-Control"] = "private"
+        return response
+
+    return _file_response(request, file_path, content_type)
+
+
+def _file_response(request, file_path, content_type):
+    """Envía el archivo desde Django con ETag/Last-Modified y un único rango de bytes."""
+    st = os.stat(file_path)
+    etag = f'"{int(st.st_mtime):x}-{st.st_size:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=st.st_mtime)
+    if response is not None:
+        return response
+
+    match = RANGE_RE.match(request.headers.get("Range", ""))
+    if_range = request.headers.get("If-Range")
+    if match and (not if_range or if_range == etag) and (match.group(1) or match.group(2)):
+        start, end = match.groups()
+        if start:
+            start, end = int(start), min(int(end) if end else st.st_size - 1, st.st_size - 1)
+        else:
+            start, end = max(st.st_size - int(end), 0), st.st_size - 1
+        if start > end:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{st.st_size}"
+            return response
+        response = StreamingHttpResponse(
+            _read_range(file_path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+        response["Content-Length"] = str(end - start + 1)
+    else:
+        response = FileResponse(open(file_path, "rb"), content_type=content_type)  # noqa: SIM115 (lo cierra la respuesta)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(st.st_mtime)
+    response["Cache-Control"] = "private"
+    return response
+
+
+def _read_range(file_path, start, length):
+    with open(file_path, "rb") as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _media_access_status(request, path):
+    """Devuelve None si el usuario puede ver el archivo o el código HTTP de rechazo."""
     # Import authorization helpers and models locally to avoid any potential circular imports
     from core.models import ConversationParticipant, Message, PlanillaRegularidad, Preinscripcion
     from core.permissions import allowed_profesorados, get_user_roles
@@ -53,9 +142,9 @@ def serve_media(request, path):
             elif roles.intersection({"bedel", "coordinador"}):
                 allowed = allowed_profesorados(request.user)
                 if allowed is not None and preins.carrera_id not in allowed:
-                    return HttpResponse(status=403)
+                    return 403
             else:
-                return HttpResponse(status=403)
+                return 403
 
     elif path.startswith("planillas_regularidad/"):
         planilla = PlanillaRegularidad.objects.filter(pdf=path).first()
@@ -74,7 +163,7 @@ def serve_media(request, path):
             ):
                 pass
             else:
-                return HttpResponse(status=403)
+                return 403
 
     elif path.startswith("mensajes/"):
         msg = Message.objects.filter(attachment=path).first()
@@ -94,7 +183,7 @@ def serve_media(request, path):
             ):
                 pass
             else:
-                return HttpResponse(status=403)
+                return 403
 
     elif path.startswith("personas/fotos/"):
         # Foto de perfil: el propio estudiante puede ver la suya; staff tienen acceso total
@@ -112,11 +201,11 @@ def serve_media(request, path):
                 try:
                     dni = filename.split("_", 1)[1].rsplit(".", 1)[0]
                 except IndexError:
-                    return HttpResponse(status=403)
+                    return 403
 
                 persona = Persona.objects.filter(dni=dni).first()
                 if not persona:
-                    return HttpResponse(status=403)
+                    return 403
 
                 # Camino 1: estudiante (Persona → Estudiante → User)
                 estudiante_perfil = getattr(persona, "estudiante_perfil", None)
@@ -128,12 +217,12 @@ def serve_media(request, path):
                 ):
                     pass  # OK
                 else:
-                    return HttpResponse(status=403)
+                    return 403
 
     else:
         # Default Fail-Close: Only superusers and admin/secretaria can access other paths
         roles = get_user_roles(request.user)
         if not (request.user.is_superuser or roles.intersection({"admin", "secretaria"})):
-            return HttpResponse(status=403)
+            return 403
 
-    return FileResponse(open(file_path, "rb"))
+    return None
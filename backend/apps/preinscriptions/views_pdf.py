@@ -7,8 +7,8 @@ from datetime import datetime
 
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.template.loader import render_to_string
 
+from apps.common.pdf import pdf_response
 from core.models import Persona, Preinscripcion
 
 from .models_uploads import PreinscripcionArchivo
@@ -53,12 +53,6 @@ def _build_foto_dataurl(pre: Preinscripcion) -> str | None:
     return f"data:{mimetype};base64,{encoded}"
 
 
-import os
-
-from django.conf import settings
-from weasyprint import HTML
-
-
 def preinscripcion_pdf(request, preinscripcion_id: int | None = None, pk: int | None = None, **kwargs):
     """Genera el PDF de la preinscripción usando WeasyPrint y la plantilla premium."""
     pid = preinscripcion_id or pk or kwargs.get("preinscripcion_id") or kwargs.get("pk")
@@ -149,30 +143,19 @@ def preinscripcion_pdf(request, preinscripcion_id: int | None = None, pk: int |
             {"label": "3 Folios Oficio", "checked": cl.folios_oficio if cl else False},
         ]
 
-    # Rutas para recursos estáticos (Encabezado Universal)
-    logo_left_path = os.path.join(settings.BASE_DIR, "static/logos/escudo_ministerio_tdf.png")
-    logo_right_path = os.path.join(settings.BASE_DIR, "static/logos/logo_ipes.jpg")  # O logo_ipes11.png si se prefiere
-
-    # Si la ruta base no funciona (Docker etc), intentamos alternativa
-    if not os.path.exists(logo_left_path):
-        logo_left_path = os.path.join(settings.BASE_DIR, "backend/static/logos/escudo_ministerio_tdf.png")
-        logo_right_path = os.path.join(settings.BASE_DIR, "backend/static/logos/logo_ipes.jpg")
-
     context = {
         "v": v,
         "carrera_nombre": pre.carrera.nombre if pre.carrera else "Carrera no especificada",
         "checklist_items": checklist_items,
-        "logo_left_path": logo_left_path,
-        "logo_right_path": logo_right_path,
         "photo_url": _build_foto_dataurl(pre),
     }
 
-    html = render_to_string("core/preinscripcion_premium.html", context)
-
-    # Generación del PDF con WeasyPrint
-    pdf_content = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
-
-    response = HttpResponse(pdf_content, content_type="application/pdf")
-    filename = f"Preinscripcion_{v['apellido']}_{v['dni']}.pdf".replace(" ", "_")
-    response["Content-Disposition"] = f'inline; filename="{filename}"'
-    return response
+    # Generación del PDF con WeasyPrint (pool precalentado y caché por contenido)
+    return pdf_response(
+        request,
+        "core/preinscripcion_premium.html",
+        context,
+        filename=f"Preinscripcion_{v['apellido']}_{v['dni']}.pdf".replace(" ", "_"),
+        inline=True,
+        base_url=request.build_absolute_uri("/"),
+    )
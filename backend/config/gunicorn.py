@@ -0,0 +1,26 @@
+"""
+Configuración de gunicorn: `gunicorn config.wsgi:application -c config/gunicorn.py ...`.
+
+Con `PROMETHEUS_MULTIPROC_DIR` definido, cada worker escribe sus métricas en ese
+directorio y `/metrics` las suma. Al arrancar se vacía el directorio (las series de
+una ejecución anterior no deben sumarse) y al morir un worker se marcan sus archivos
+para que los gauges en vivo no lo cuenten. Los comandos de `manage.py` y los procesos
+del pool de PDF no escriben en el directorio (nadie marcaría sus archivos).
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    directorio = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -116,6 +116,7 @@ if ENABLE_PROFILING:
 
 # === Middleware =========================================================
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -125,12 +126,54 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.AuditRequestMiddleware",
+    "core.middleware.QueryBudgetMiddleware",
 ]
 
 # Profiling middleware
 if ENABLE_PROFILING:
     MIDDLEWARE.insert(0, "silk.middleware.SilkyMiddleware")
 
+# Métricas Prometheus en /metrics (apps.common.metrics). Sin token el endpoint responde 404.
+# Con varios workers de gunicorn definir PROMETHEUS_MULTIPROC_DIR (ver config/gunicorn.py).
+METRICS_ENABLED = env_bool("METRICS_ENABLED", default=True)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Presupuesto SQL por request (core.middleware.QueryBudgetMiddleware)
+SQL_BUDGET_ENABLED = env_bool("SQL_BUDGET_ENABLED", default=True)
+SQL_BUDGET_SERVER_TIMING = env_bool("SQL_BUDGET_SERVER_TIMING", default=True)
+SQL_BUDGET_QUERIES = int(os.getenv("SQL_BUDGET_QUERIES", "60"))  # consultas por request
+SQL_BUDGET_MS = int(os.getenv("SQL_BUDGET_MS", "500"))  # tiempo total en base por request
+SQL_BUDGET_DUPLICATES = int(os.getenv("SQL_BUDGET_DUPLICATES", "20"))  # repeticiones de una misma consulta
+SQL_BUDGET_LOG_INTERVAL = int(os.getenv("SQL_BUDGET_LOG_INTERVAL", "300"))  # segundos entre avisos por ruta
+# Sentencias más lentas que SLOW_QUERY_MS (0 = no capturar) se agrupan por huella en SystemLog
+# (tipo SLOW_QUERY); a una fracción se le corre EXPLAIN con sus parámetros reales.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+# Presupuestos por prefijo de ruta (gana el más largo); reemplazan los valores de arriba.
+SQL_BUDGETS = {
+    "api/estudiantes/trayectoria": {"queries": 80},
+    "api/estudiantes/reportes/": {"queries": 120, "ms": 2000},
+    "api/admin/primera-carga/": {"queries": 500, "ms": 5000},
+}
+
+# Readiness (/api/system/health/ready, apps.health_api): a partir de estos valores un chequeo
+# queda degradado; con menos de HEALTH_MEDIA_CRITICAL_FREE_PCT de disco libre, en falla.
+HEALTH_DB_MS = float(os.getenv("HEALTH_DB_MS", "100"))
+HEALTH_REPLICA_LAG_SECONDS = int(os.getenv("HEALTH_REPLICA_LAG_SECONDS", "30"))
+HEALTH_CACHE_MS = float(os.getenv("HEALTH_CACHE_MS", "50"))
+HEALTH_MEDIA_MS = float(os.getenv("HEALTH_MEDIA_MS", "200"))
+HEALTH_MEDIA_MIN_FREE_PCT = float(os.getenv("HEALTH_MEDIA_MIN_FREE_PCT", "10"))
+HEALTH_MEDIA_CRITICAL_FREE_PCT = float(os.getenv("HEALTH_MEDIA_CRITICAL_FREE_PCT", "2"))
+HEALTH_JOBS_BACKLOG = int(os.getenv("HEALTH_JOBS_BACKLOG", "200"))  # tareas listas sin tomar
+HEALTH_JOBS_MAX_AGE_SECONDS = int(os.getenv("HEALTH_JOBS_MAX_AGE_SECONDS", "600"))  # espera de la más vieja
+HEALTH_READY_CACHE_SECONDS = float(os.getenv("HEALTH_READY_CACHE_SECONDS", "5"))
+# Antigüedad máxima (segundos) de la última corrida exitosa de cada comando, según su cron sugerido.
+HEALTH_COMMAND_MAX_AGE = {
+    "procesar_notificaciones": 15 * 60,
+    "calcular_auditoria_academica": 26 * 3600,
+    "recalcular_resguardo": 8 * 24 * 3600,
+}
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -172,6 +215,57 @@ else:
             "HOST": os.getenv("DB_HOST", "127.0.0.1"),
             "PORT": os.getenv("DB_PORT", "3306"),
             "OPTIONS": {"charset": "utf8mb4"},
+            # Conexiones persistentes: cada hilo de gunicorn reutiliza la suya hasta
+            # DB_CONN_MAX_AGE segundos (0 = una conexión por request) y, con health checks,
+            # la verifica antes de reutilizarla. Conexiones abiertas ≈ workers × threads.
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": env_bool("DB_CONN_HEALTH_CHECKS", default=True),
+        }
+    }
+    # Réplica de lectura opcional para reportes, tableros y exportaciones (core.db_router).
+    if os.getenv("DB_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": os.getenv("DB_REPLICA_HOST"),
+            "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+            "USER": os.getenv("DB_REPLICA_USER", DATABASES["default"]["USER"]),
+            "PASSWORD": os.getenv("DB_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]),
+            "TEST": {"MIRROR": "default"},
+        }
+
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+# GET de solo lectura que pueden leer de la réplica (prefijos de path); sin réplica no hacen nada.
+DB_REPLICA_ROUTES = [
+    "/api/reportes/",
+    "/api/overview/",
+    "/api/estudiantes/reportes/",
+    "/api/asistencia/reportes/",
+    "/api/estudiantes/equivalencias/export",
+]
+
+
+# === Caché ================================================================
+# Por defecto, memoria local de cada proceso. Con varios workers de gunicorn conviene un
+# backend compartido (file/redis) para que las invalidaciones lleguen a todos los workers.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").lower()
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         }
     }
 
@@ -192,11 +286,25 @@ STATICFILES_DIRS = [BASE_DIR / "static"]  # opcional (para assets locales)
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"  # aquí se guardan las fotos/documentos
+# Location interna de nginx para /media (p. ej. "/protected-media/"); vacío = Django envía el archivo
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", "")
+MEDIA_AUTH_CACHE_SECONDS = int(os.getenv("MEDIA_AUTH_CACHE_SECONDS", "60"))  # caché del permiso (usuario, archivo)
 
 # Límite de subida (10 MB de ejemplo)
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 
+# === Generación de PDF (apps.common.pdf) ================================
+# Procesos WeasyPrint precalentados por worker web; 0 = renderizar en el propio proceso.
+PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", "0" if DEBUG else "2"))
+PDF_RENDER_TIMEOUT = int(os.getenv("PDF_RENDER_TIMEOUT", "60"))  # segundos por render
+PDF_RENDER_MEMORY_MB = int(os.getenv("PDF_RENDER_MEMORY_MB", "1024"))  # tope de memoria por proceso
+PDF_RENDER_MAX_TASKS = int(os.getenv("PDF_RENDER_MAX_TASKS", "200"))  # renders antes de reciclar el proceso
+PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "512"))  # tope de MEDIA_ROOT/pdf_cache
+PDF_TEMPLATE_VERSION = os.getenv("PDF_TEMPLATE_VERSION", "1")  # cambiarla invalida la caché de PDF
+# Documentos por exportación en un único PDF unido (los lotes mayores se exportan en ZIP)
+EXPORTACION_PDF_MAX_DOCUMENTOS = int(os.getenv("EXPORTACION_PDF_MAX_DOCUMENTOS", "300"))
+
 # === CORS ===============================================================
 
 
@@ -2,6 +2,7 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from apps.common.metrics import metrics_view
 from apps.preinscriptions.views import serve_media
 from core.api_root import api  # ← importa la NinjaAPI
 
@@ -10,6 +11,7 @@ urlpatterns = [
     path("api/", api.urls),  # ← EXPOne /api/*
     path("", include("apps.preinscriptions.urls")),  # ← tus vistas clásicas (PDF, etc.)
     path("media/<path:path>", serve_media),
+    path("metrics", metrics_view),
 ]
 
 # Panel de profiling
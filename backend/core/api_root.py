@@ -28,6 +28,8 @@ from apps.carreras.comisiones_api import router as comisiones_router
 from apps.carreras.correlatividades_api import router as correlatividades_router
 from apps.common.audit_api import router as audit_router
 from apps.common.errors import register_error_handlers
+from apps.common.jobs_api import router as jobs_router
+from apps.common.renderers import ORJSONRenderer
 from apps.common.system_log_api import router as system_log_router
 from apps.docentes.api import router as docentes_router
 from apps.estudiantes.api import estudiantes_router as estudiantes_api_router
@@ -52,6 +54,7 @@ if "api" not in locals():
         title="IPES6 API",
         version="1.0.0",
         auth=JWTAuth(),  # SEGURIDAD: TODA la API requiere JWT por defecto.
+        renderer=ORJSONRenderer(),  # orjson en lugar de json.dumps (listados de varios MB)
     )
     register_error_handlers(api)
 
@@ -74,6 +77,7 @@ if "api" not in locals():
     safe_add_router("/auditoria", audit_router)
     safe_add_router("/system/logs", system_log_router)
     safe_add_router("/system/health", health_router)
+    safe_add_router("/system/jobs", jobs_router)
     safe_add_router("/", management_router)
 
     # Profesorados y Planes (Estructura Académica)
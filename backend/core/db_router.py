@@ -0,0 +1,55 @@
+"""
+Router de bases de datos: réplica de lectura opcional.
+
+Si `DATABASES` define el alias `replica` (variable `DB_REPLICA_HOST`), las lecturas de
+los GET cuyo path empieza con alguno de `DB_REPLICA_ROUTES` (reportes, tableros,
+métricas y exportaciones) van a la réplica, para que no compitan con las escrituras de
+inscripciones en la primaria. Todo lo demás, y cualquier lectura dentro de una
+transacción de la primaria, sigue en `default`. Las escrituras siempre van a `default`,
+incluso las de objetos leídos de la réplica.
+
+La request sale del thread local de `AuditRequestMiddleware`; sin request (comandos,
+worker de tareas) se usa la primaria.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.middleware import get_current_request
+
+REPLICA = "replica"
+
+
+def usa_replica(request) -> bool:
+    """Si las lecturas de la request pueden ir a la réplica (se calcula una vez por request)."""
+    usar = getattr(request, "_usa_replica", None)
+    if usar is None:
+        usar = (
+            REPLICA in settings.DATABASES
+            and request.method in ("GET", "HEAD")
+            and request.path.startswith(tuple(settings.DB_REPLICA_ROUTES))
+        )
+        request._usa_replica = usar
+    return usar
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        request = get_current_request()
+        if request is None or not usa_replica(request):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplica tienen los mismos datos.
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA else None
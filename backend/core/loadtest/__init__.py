@@ -0,0 +1 @@
+"""Pruebas de carga por escenarios: ver `python manage.py loadtest --help`."""
@@ -0,0 +1,165 @@
+"""
+Cliente HTTP/1.1 asíncrono mínimo y estadísticas para las pruebas de carga.
+
+Solo usa la biblioteca estándar: cada usuario virtual mantiene su propia conexión
+keep-alive (como un navegador), de modo que miles de usuarios concurrentes corren en
+un único hilo sin depender de un pool de threads.
+"""
+
+import asyncio
+import json
+import math
+import ssl
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+class Conexion:
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        url = urlsplit(base_url)
+        self.host = url.hostname or "localhost"
+        self.https = url.scheme == "https"
+        self.port = url.port or (443 if self.https else 80)
+        self.prefijo = url.path.rstrip("/")
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _conectar(self) -> None:
+        contexto = ssl.create_default_context() if self.https else None
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=contexto)
+
+    async def cerrar(self) -> None:
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def request(
+        self, metodo: str, ruta: str, *, token: str | None = None, cuerpo: dict | None = None
+    ) -> tuple[int, dict[str, str], bytes]:
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+        cabeceras = [
+            f"{metodo} {self.prefijo}{ruta} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Accept: application/json",
+            f"Content-Length: {len(datos)}",
+        ]
+        if cuerpo is not None:
+            cabeceras.append("Content-Type: application/json")
+        if token:
+            cabeceras.append(f"Authorization: Bearer {token}")
+        pedido = ("\r\n".join(cabeceras) + "\r\n\r\n").encode() + datos
+
+        # Una conexión keep-alive cerrada por el servidor se reintenta una vez.
+        for intento in range(2):
+            if self._writer is None:
+                await self._conectar()
+            try:
+                self._writer.write(pedido)
+                await self._writer.drain()
+                return await asyncio.wait_for(self._respuesta(), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.cerrar()
+                if intento:
+                    raise
+        raise AssertionError("inalcanzable")
+
+    async def _respuesta(self) -> tuple[int, dict[str, str], bytes]:
+        linea = await self._reader.readuntil(b"\r\n")
+        estado = int(linea.split()[1])
+        cabeceras = {}
+        while (linea := await self._reader.readuntil(b"\r\n")) != b"\r\n":
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+
+        if cabeceras.get("transfer-encoding", "").lower() == "chunked":
+            partes = []
+            while tamaño := int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                partes.append(await self._reader.readexactly(tamaño))
+                await self._reader.readexactly(2)
+            while await self._reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            cuerpo = b"".join(partes)
+        elif "content-length" in cabeceras:
+            cuerpo = await self._reader.readexactly(int(cabeceras["content-length"]))
+        else:
+            cuerpo = await self._reader.read()
+            cabeceras["connection"] = "close"
+
+        if cabeceras.get("connection", "").lower() == "close":
+            await self.cerrar()
+        return estado, cabeceras, cuerpo
+
+
+def server_timing(valor: str) -> dict[str, float]:
+    """Duraciones de un header `Server-Timing` (`db;dur=12.5;desc=".."`) por métrica."""
+    duraciones = {}
+    for metrica in valor.split(","):
+        nombre, *params = (p.strip() for p in metrica.split(";"))
+        for param in params:
+            if param.startswith("dur="):
+                duraciones[nombre] = float(param[4:])
+    return duraciones
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not valores:
+        return 0.0
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+@dataclass
+class Estadisticas:
+    escenario: str
+    latencias: list[float] = field(default_factory=list)
+    db_ms: list[float] = field(default_factory=list)
+    estados: dict[int, int] = field(default_factory=dict)
+    excepciones: dict[str, int] = field(default_factory=dict)
+    inicio: float = field(default_factory=time.perf_counter)
+    fin: float = 0.0
+
+    def registrar(self, ms: float, estado: int, cabeceras: dict[str, str]) -> None:
+        self.latencias.append(ms)
+        self.estados[estado] = self.estados.get(estado, 0) + 1
+        if "server-timing" in cabeceras:
+            db = server_timing(cabeceras["server-timing"]).get("db")
+            if db is not None:
+                self.db_ms.append(db)
+
+    def registrar_error(self, exc: BaseException) -> None:
+        nombre = type(exc).__name__
+        self.excepciones[nombre] = self.excepciones.get(nombre, 0) + 1
+
+    @property
+    def total(self) -> int:
+        return len(self.latencias) + sum(self.excepciones.values())
+
+    def resumen(self) -> dict:
+        """Percentiles de latencia, tasa de error (5xx y fallas de red) y de rechazo (4xx)."""
+        latencias = sorted(self.latencias)
+        db = sorted(self.db_ms)
+        total = self.total or 1
+        errores = sum(n for estado, n in self.estados.items() if estado >= 500) + sum(self.excepciones.values())
+        rechazos = sum(n for estado, n in self.estados.items() if 400 <= estado < 500)
+        duracion = max((self.fin or time.perf_counter()) - self.inicio, 1e-9)
+        return {
+            "escenario": self.escenario,
+            "requests": self.total,
+            "rps": round(self.total / duracion, 1),
+            "p50_ms": round(percentil(latencias, 50), 1),
+            "p90_ms": round(percentil(latencias, 90), 1),
+            "p95_ms": round(percentil(latencias, 95), 1),
+            "p99_ms": round(percentil(latencias, 99), 1),
+            "max_ms": round(latencias[-1], 1) if latencias else 0.0,
+            "db_p95_ms": round(percentil(db, 95), 1),
+            "error_rate": round(errores / total, 4),
+            "reject_rate": round(rechazos / total, 4),
+            "estados": dict(sorted(self.estados.items())),
+            "excepciones": self.excepciones,
+        }
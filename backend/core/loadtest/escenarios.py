@@ -0,0 +1,251 @@
+"""
+Escenarios de carga de los picos conocidos, sobre el dataset de `seed_perf_dataset`.
+
+Cada escenario prepara con el ORM la lista de pedidos de cada usuario virtual (con su
+token JWT) y, si corresponde, deja la base lista para repetirlo: libera inscripciones,
+fija cupos o genera PINs. `verificar()` revisa invariantes después de la corrida.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.asistencia.models import ClaseProgramada, CursoEstudianteSnapshot
+from apps.asistencia.utils import INSTITUTE_LATITUDE, INSTITUTE_LONGITUDE
+from core.authentication.jwt_service import JWTService
+from core.management.commands.seed_perf_dataset import CONTEXTO, DOMINIO, MARCA
+from core.models import (
+    ConversationParticipant,
+    EstudianteCarrera,
+    InscripcionMateriaEstudiante,
+    InscripcionMesa,
+    MesaExamen,
+    PlanDeEstudio,
+    Regularidad,
+    VentanaHabilitacion,
+)
+
+# Mesas que reciben toda la demanda del escenario y su cupo.
+MESAS_CON_CUPO = 5
+CUPO_MESA = 10
+# Consultas de bandeja de cada usuario virtual, separadas por la pausa del escenario.
+CONSULTAS_BANDEJA = 5
+
+
+@dataclass
+class Peticion:
+    metodo: str
+    ruta: str
+    token: str
+    cuerpo: dict | None = None
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    descripcion: str
+    preparar: Callable[[int], list[list[Peticion]]]
+    pausa: float = 0.0
+    verificar: Callable[[], list[str]] | None = None
+
+
+ESCENARIOS: dict[str, Escenario] = {}
+
+
+def escenario(nombre: str, descripcion: str, pausa: float = 0.0, verificar=None):
+    def registrar(preparar):
+        ESCENARIOS[nombre] = Escenario(nombre, descripcion, preparar, pausa, verificar)
+        return preparar
+
+    return registrar
+
+
+def _tokens(user_ids) -> dict[int, str]:
+    return {uid: JWTService.create_access_token(uid) for uid in set(user_ids)}
+
+
+def _abrir_ventana(tipo: str) -> None:
+    hoy = timezone.now().date()
+    if not VentanaHabilitacion.objects.filter(tipo=tipo, activo=True, desde__lte=hoy, hasta__gte=hoy).exists():
+        VentanaHabilitacion.objects.create(
+            tipo=tipo, desde=hoy - timedelta(days=1), hasta=hoy + timedelta(days=14), activo=True
+        )
+
+
+# --- día de inscripción a materias -----------------------------------------------------
+
+
+@escenario("inscripcion_materia", "Día de inscripción: cada estudiante consulta su plan y se inscribe a una materia.")
+def preparar_inscripcion_materia(usuarios: int) -> list[list[Peticion]]:
+    _abrir_ventana(VentanaHabilitacion.Tipo.MATERIAS)
+    elegidas = {}
+    for pk, est_id, user_id, materia_id, comision_id in (
+        InscripcionMateriaEstudiante.objects.filter(
+            estudiante__persona__email__endswith=DOMINIO, anio=timezone.now().year
+        )
+        .order_by("estudiante_id", "materia_id")
+        .values_list("id", "estudiante_id", "estudiante__user_id", "materia_id", "comision_id")
+    ):
+        if est_id not in elegidas:
+            elegidas[est_id] = (pk, user_id, materia_id, comision_id)
+            if len(elegidas) == usuarios:
+                break
+    # La inscripción liberada es la que cada estudiante vuelve a pedir.
+    InscripcionMateriaEstudiante.objects.filter(id__in=[e[0] for e in elegidas.values()]).delete()
+    tokens = _tokens(e[1] for e in elegidas.values())
+    return [
+        [
+            Peticion("GET", "/estudiantes/materias-plan", tokens[user_id]),
+            Peticion(
+                "POST",
+                "/estudiantes/inscripcion-materia",
+                tokens[user_id],
+                {"materia_id": materia_id, "comision_id": comision_id},
+            ),
+        ]
+        for _, user_id, materia_id, comision_id in elegidas.values()
+    ]
+
+
+# --- apertura de mesas con cupo ---------------------------------------------------------
+
+
+def _mesas_con_cupo():
+    return MesaExamen.objects.filter(codigo__startswith="PERF-MESA-", cupo=CUPO_MESA)
+
+
+def verificar_cupos() -> list[str]:
+    inscriptas = Q(inscripciones__estado=InscripcionMesa.Estado.INSCRIPTO)
+    return [
+        f"Mesa {mesa.codigo}: {mesa.inscriptos} inscriptos con cupo {mesa.cupo}."
+        for mesa in _mesas_con_cupo().annotate(inscriptos=Count("inscripciones", filter=inscriptas))
+        if mesa.inscriptos > mesa.cupo
+    ]
+
+
+@escenario(
+    "inscribir_mesa",
+    f"Apertura de mesas: la demanda se concentra en {MESAS_CON_CUPO} mesas con cupo {CUPO_MESA}.",
+    verificar=verificar_cupos,
+)
+def preparar_inscribir_mesa(usuarios: int) -> list[list[Peticion]]:
+    _abrir_ventana(VentanaHabilitacion.Tipo.MESAS_FINALES)
+    MesaExamen.objects.filter(codigo__startswith="PERF-MESA-").update(cupo=0)
+    mesas = dict(MesaExamen.objects.filter(codigo__startswith="PERF-MESA-").values_list("materia_id", "id"))
+    candidatos = defaultdict(list)
+    for materia_id, user_id in (
+        Regularidad.objects.filter(
+            estudiante__persona__email__endswith=DOMINIO,
+            materia_id__in=mesas,
+            situacion=Regularidad.Situacion.REGULAR,
+        )
+        .order_by("materia_id", "estudiante_id")
+        .values_list("materia_id", "estudiante__user_id")
+    ):
+        candidatos[mesas[materia_id]].append(user_id)
+    elegidas = sorted(candidatos, key=lambda mesa_id: (-len(candidatos[mesa_id]), mesa_id))[:MESAS_CON_CUPO]
+    InscripcionMesa.objects.filter(mesa_id__in=elegidas).delete()
+    MesaExamen.objects.filter(id__in=elegidas).update(cupo=CUPO_MESA)
+
+    pares = [(mesa_id, user_id) for mesa_id in elegidas for user_id in candidatos[mesa_id]][:usuarios]
+    tokens = _tokens(user_id for _, user_id in pares)
+    return [
+        [Peticion("POST", "/estudiantes/inscribir_mesa", tokens[user_id], {"mesa_id": mesa_id})]
+        for mesa_id, user_id in pares
+    ]
+
+
+# --- inicio del turno vespertino: PIN de asistencia -----------------------------------------
+
+
+@escenario("pin_asistencia", "Inicio de turno: ráfaga de estudiantes registrando el presente con el PIN de su clase.")
+def preparar_pin_asistencia(usuarios: int) -> list[list[Peticion]]:
+    hoy = timezone.now().date()
+    clases = {}
+    for clase_id, comision_id in (
+        ClaseProgramada.objects.filter(
+            comision__materia__plan_de_estudio__profesorado__nombre__endswith=MARCA,
+            estado=ClaseProgramada.Estado.PROGRAMADA,
+            fecha__gte=hoy,
+        )
+        .order_by("comision_id", "fecha")
+        .values_list("id", "comision_id")
+    ):
+        clases.setdefault(comision_id, clase_id)
+    # PINs de seis dígitos: no chocan con los de cuatro que generan los docentes.
+    vence = timezone.now() + timedelta(minutes=30)
+    pines = {}
+    for n, (comision_id, clase_id) in enumerate(sorted(clases.items())):
+        pines[comision_id] = str(100000 + n)
+        ClaseProgramada.objects.filter(id=clase_id).update(pin_asistencia=pines[comision_id], pin_expira_en=vence)
+
+    pares = list(
+        CursoEstudianteSnapshot.objects.filter(comision_id__in=pines, estudiante__isnull=False)
+        .order_by("comision_id", "dni")
+        .values_list("comision_id", "estudiante__user_id")[:usuarios]
+    )
+    tokens = _tokens(user_id for _, user_id in pares)
+    ubicacion = {"latitud": INSTITUTE_LATITUDE, "longitud": INSTITUTE_LONGITUDE}
+    return [
+        [
+            Peticion(
+                "POST",
+                "/asistencia/estudiantes/registrar-pin",
+                tokens[user_id],
+                {"pin": pines[comision_id], **ubicacion},
+            )
+        ]
+        for comision_id, user_id in pares
+    ]
+
+
+# --- bandeja de mensajes ---------------------------------------------------------------------
+
+
+@escenario("bandeja", "Polling de la bandeja: contadores, listado y novedades cada segundo.", pausa=1.0)
+def preparar_bandeja(usuarios: int) -> list[list[Peticion]]:
+    user_ids = list(
+        ConversationParticipant.objects.filter(conversation__context_type=CONTEXTO)
+        .values_list("user_id", flat=True)
+        .distinct()
+        .order_by("user_id")[:usuarios]
+    )
+    tokens = _tokens(user_ids)
+    return [
+        [
+            Peticion("GET", ruta, tokens[user_id])
+            for _ in range(CONSULTAS_BANDEJA)
+            for ruta in ("/mensajes/resumen/", "/mensajes/conversaciones", "/mensajes/novedades")
+        ]
+        for user_id in user_ids
+    ]
+
+
+# --- descarga de constancias en PDF ------------------------------------------------------------
+
+
+@escenario("pdf", "Descarga de constancias de alumno regular en PDF.")
+def preparar_pdf(usuarios: int) -> list[list[Peticion]]:
+    vigentes = dict(PlanDeEstudio.objects.filter(vigente=True).values_list("profesorado_id", "id"))
+    filas = list(
+        EstudianteCarrera.objects.filter(
+            estudiante__persona__email__endswith=DOMINIO, estado_academico=EstudianteCarrera.EstadoAcademico.ACTIVO
+        )
+        .order_by("estudiante_id")
+        .values_list("estudiante__user_id", "profesorado_id")[:usuarios]
+    )
+    tokens = _tokens(user_id for user_id, _ in filas)
+    return [
+        [
+            Peticion(
+                "GET",
+                f"/estudiantes/certificados/estudiante-regular?profesorado_id={prof_id}&plan_id={vigentes[prof_id]}",
+                tokens[user_id],
+            )
+        ]
+        for user_id, prof_id in filas
+    ]
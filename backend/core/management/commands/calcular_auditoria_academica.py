@@ -0,0 +1,48 @@
+"""
+Management command: precalcula la auditoría académica de correlatividades.
+
+Guarda las inconsistencias (finales aprobados sin sus correlativas y regularizaciones
+sin los requisitos de cursada) en la tabla de auditoría, reemplazando la partición de
+cada profesorado. Los reportes de administración leen de esa tabla.
+
+Usar:
+    python manage.py calcular_auditoria_academica
+    python manage.py calcular_auditoria_academica --profesorado 3
+    python manage.py calcular_auditoria_academica --dni 12345678
+
+Cron sugerido (todas las noches):
+    30 2 * * * cd /app && python manage.py calcular_auditoria_academica
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.metrics import TrackedCommandMixin
+from apps.estudiantes.services.auditoria_academica import recalcular_auditoria, recalcular_auditoria_estudiante
+from core.models import Estudiante
+
+
+class Command(TrackedCommandMixin, BaseCommand):
+    help = "Precalcula la auditoría académica de correlatividades por profesorado."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profesorado", type=int, default=None, help="Recalcular solo un profesorado por ID.")
+        parser.add_argument("--dni", type=str, default=None, help="Recalcular solo un estudiante por DNI.")
+
+    def handle(self, *args, **options):
+        dni = options["dni"]
+        if dni:
+            est = Estudiante.objects.filter(persona__dni=dni).first()
+            if not est:
+                raise CommandError(f"No existe un estudiante con DNI {dni}.")
+            total = recalcular_auditoria_estudiante(est.id)
+            self.stdout.write(self.style.SUCCESS(f"Auditoría de {dni} recalculada: {total} inconsistencias."))
+            return
+
+        totales = recalcular_auditoria(profesorado_id=options["profesorado"])
+        for prof_id, total in sorted(totales.items()):
+            self.stdout.write(f"  Profesorado {prof_id}: {total} inconsistencias")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Auditoría completada: {sum(totales.values())} inconsistencias en {len(totales)} profesorados."
+            )
+        )
@@ -12,10 +12,11 @@ Configuración sugerida en cron (ejecutar cada noche a las 2am):
 
 from django.core.management.base import BaseCommand
 
+from apps.common.metrics import TrackedCommandMixin
 from core.models import MesaExamen
 
 
-class Command(BaseCommand):
+class Command(TrackedCommandMixin, BaseCommand):
     help = "Elimina mesas de examen sin inscriptos activos que superaron el período de gracia post-ventana."
 
     def add_arguments(self, parser):
@@ -0,0 +1,151 @@
+"""
+Management command: pruebas de carga por escenarios contra un servidor levantado.
+
+Reproduce los picos que ya causaron caídas: día de inscripción a materias, apertura
+de mesas con cupo, ráfaga de PIN de asistencia al inicio del turno, polling de la
+bandeja y descarga de constancias en PDF (ver `core.loadtest.escenarios`). Cada
+escenario prepara sus datos sobre el dataset de `seed_perf_dataset` y luego lanza
+los usuarios virtuales a la vez (o repartidos con `--ramp`). Informa percentiles de
+latencia, tiempo de base (del header Server-Timing), tasa de error (5xx y fallas de
+red) y de rechazo (4xx) por escenario.
+
+Modifica la base (libera inscripciones, fija cupos y PINs): usar solo contra una base
+de prueba, la misma que usa el servidor.
+
+Usar:
+    python manage.py seed_perf_dataset --scale 0.5
+    gunicorn config.wsgi:application --bind 127.0.0.1:8000 --workers 3 --worker-class gthread --threads 8
+    python manage.py loadtest
+    python manage.py loadtest inscribir_mesa pin_asistencia --usuarios 500 --ramp 5
+    python manage.py loadtest --json /tmp/loadtest.json --max-error-rate 0.01
+
+No es para cron: se corre a mano o en un pipeline de performance.
+"""
+
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest.cliente import Conexion, Estadisticas
+from core.loadtest.escenarios import ESCENARIOS, Peticion
+from core.management.commands.seed_perf_dataset import DOMINIO
+from core.models import Persona
+
+ERRORES_DE_RED = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError)
+
+
+async def _usuario_virtual(url, peticiones: list[Peticion], pausa, espera, timeout, limite, stats: Estadisticas):
+    await asyncio.sleep(espera)
+    async with limite:
+        conexion = Conexion(url, timeout=timeout)
+        try:
+            for n, peticion in enumerate(peticiones):
+                if n and pausa:
+                    await asyncio.sleep(pausa)
+                inicio = time.perf_counter()
+                try:
+                    estado, cabeceras, _ = await conexion.request(
+                        peticion.metodo, peticion.ruta, token=peticion.token, cuerpo=peticion.cuerpo
+                    )
+                except ERRORES_DE_RED as exc:
+                    stats.registrar_error(exc)
+                    await conexion.cerrar()
+                    continue
+                stats.registrar((time.perf_counter() - inicio) * 1000, estado, cabeceras)
+        finally:
+            await conexion.cerrar()
+
+
+async def ejecutar(url, usuarios: list[list[Peticion]], *, pausa, ramp, concurrencia, timeout, stats: Estadisticas):
+    limite = asyncio.Semaphore(concurrencia or max(len(usuarios), 1))
+    stats.inicio = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _usuario_virtual(url, peticiones, pausa, ramp * n / len(usuarios), timeout, limite, stats)
+            for n, peticiones in enumerate(usuarios)
+        )
+    )
+    stats.fin = time.perf_counter()
+    return stats
+
+
+class Command(BaseCommand):
+    help = "Corre escenarios de carga (inscripciones, mesas, PIN, bandeja, PDF) y reporta percentiles y errores."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "escenarios", nargs="*", help=f"Escenarios a correr (todos si se omite): {', '.join(ESCENARIOS)}."
+        )
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api", help="Base de la API bajo prueba.")
+        parser.add_argument("--usuarios", type=int, default=200, help="Usuarios virtuales por escenario.")
+        parser.add_argument(
+            "--ramp", type=float, default=0.0, help="Segundos para lanzar todos los usuarios (0 = ráfaga)."
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=0, help="Máximo de usuarios activos a la vez (0 = todos)."
+        )
+        parser.add_argument("--timeout", type=float, default=30.0, help="Segundos de espera por respuesta.")
+        parser.add_argument("--json", type=str, default="", help="Archivo donde guardar el reporte en JSON.")
+        parser.add_argument(
+            "--max-error-rate", type=float, default=None, help="Falla si algún escenario supera esta tasa de error."
+        )
+
+    def handle(self, *args, **options):
+        if settings.IS_PROD:
+            raise CommandError("loadtest modifica datos: no se ejecuta en producción.")
+        nombres = options["escenarios"] or list(ESCENARIOS)
+        desconocidos = [n for n in nombres if n not in ESCENARIOS]
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(desconocidos)}.")
+        if not Persona.objects.filter(email__endswith=DOMINIO).exists():
+            raise CommandError("No hay dataset de prueba: correr antes `python manage.py seed_perf_dataset`.")
+
+        reporte, fallas = [], []
+        for nombre in nombres:
+            escenario = ESCENARIOS[nombre]
+            usuarios = escenario.preparar(options["usuarios"])
+            self.stdout.write(self.style.WARNING(f"{nombre}: {escenario.descripcion} ({len(usuarios)} usuarios)"))
+            if not usuarios:
+                self.stdout.write("  Sin datos para este escenario; se omite.")
+                continue
+            stats = asyncio.run(
+                ejecutar(
+                    options["url"],
+                    usuarios,
+                    pausa=escenario.pausa,
+                    ramp=options["ramp"],
+                    concurrencia=options["concurrency"],
+                    timeout=options["timeout"],
+                    stats=Estadisticas(nombre),
+                )
+            )
+            resumen = stats.resumen()
+            resumen["invariantes"] = escenario.verificar() if escenario.verificar else []
+            reporte.append(resumen)
+            self._imprimir(resumen)
+            if resumen["invariantes"] or (
+                options["max_error_rate"] is not None and resumen["error_rate"] > options["max_error_rate"]
+            ):
+                fallas.append(nombre)
+
+        if options["json"]:
+            with open(options["json"], "w", encoding="utf-8") as fh:
+                json.dump(reporte, fh, indent=2)
+        if fallas:
+            raise CommandError(f"Escenarios fuera de umbral: {', '.join(fallas)}.")
+        self.stdout.write(self.style.SUCCESS("Pruebas de carga terminadas."))
+
+    def _imprimir(self, r: dict) -> None:
+        self.stdout.write(
+            f"  {r['requests']} requests, {r['rps']} req/s | p50 {r['p50_ms']} ms, p90 {r['p90_ms']} ms, "
+            f"p95 {r['p95_ms']} ms, p99 {r['p99_ms']} ms, máx {r['max_ms']} ms | base p95 {r['db_p95_ms']} ms"
+        )
+        self.stdout.write(
+            f"  errores {r['error_rate']:.2%}, rechazos {r['reject_rate']:.2%} | estados {r['estados']}"
+            + (f" | excepciones {r['excepciones']}" if r["excepciones"] else "")
+        )
+        for problema in r["invariantes"]:
+            self.stdout.write(self.style.ERROR(f"  {problema}"))
@@ -0,0 +1,38 @@
+"""
+Management command: entrega las notificaciones pendientes de la bandeja de salida.
+
+Los endpoints de analíticos, cambios de comisión y equivalencias solo registran la
+notificación; este comando las envía como mensajes internos por lotes y descarta los
+eventos repetidos de un mismo estudiante y materia.
+
+Usar:
+    python manage.py procesar_notificaciones
+    python manage.py procesar_notificaciones --lote 500
+
+`run_worker` ya entrega la bandeja cada `REVISION_NOTIFICACIONES` segundos; el comando
+queda para vaciarla a mano o desde cron donde no corra el worker:
+    * * * * * cd /app && python manage.py procesar_notificaciones
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.common.metrics import TrackedCommandMixin
+from apps.estudiantes.services.notificaciones_service import LOTE_NOTIFICACIONES, entregar_pendientes
+
+
+class Command(TrackedCommandMixin, BaseCommand):
+    help = "Entrega por lotes las notificaciones pendientes a estudiantes y tutores."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote", type=int, default=LOTE_NOTIFICACIONES, help="Notificaciones a tomar por transacción."
+        )
+
+    def handle(self, *args, **options):
+        totales = entregar_pendientes(lote=options["lote"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Notificaciones: {totales['enviadas']} enviadas, {totales['duplicadas']} duplicadas, "
+                f"{totales['errores']} con error."
+            )
+        )
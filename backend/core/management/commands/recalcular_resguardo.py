@@ -19,6 +19,7 @@ from datetime import date
 
 from django.core.management.base import BaseCommand
 
+from apps.common.metrics import TrackedCommandMixin
 from core.models import EquivalenciaDisposicionDetalle, Estudiante, Regularidad
 
 SITUACIONES_POSITIVAS = (
@@ -28,7 +29,7 @@ SITUACIONES_POSITIVAS = (
 )
 
 
-class Command(BaseCommand):
+class Command(TrackedCommandMixin, BaseCommand):
     help = "Recalcula en_resguardo en Regularidades y Equivalencias según correlativas."
 
     def add_arguments(self, parser):
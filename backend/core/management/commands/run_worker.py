@@ -0,0 +1,131 @@
+"""
+Management command: worker de la cola de tareas en segundo plano.
+
+Reclama tareas de `BackgroundJob` (PDF, importaciones, difusiones, reportes) y las
+ejecuta con N hilos. Cada hilo usa su propia conexión a la base; el reclamo con
+SKIP LOCKED permite correr varios workers en paralelo. Al arrancar y después cada
+`REVISION_ABANDONADAS` segundos devuelve a la cola las tareas de workers que murieron
+sin terminarlas, y cada `REVISION_NOTIFICACIONES` segundos entrega la bandeja de
+notificaciones pendientes (registrada como corrida de `procesar_notificaciones`).
+
+Usar:
+    python manage.py run_worker
+    python manage.py run_worker --concurrency 4
+    python manage.py run_worker --kinds mensajeria.difusion
+    python manage.py run_worker --once
+
+Cron sugerido (si no se corre como servicio, vaciar la cola cada minuto):
+    * * * * * cd /app && python manage.py run_worker --once
+"""
+
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from apps.common.jobs import claim_job, default_worker_id, load_handlers, requeue_stale, run_job, run_pending
+from apps.common.metrics import track_command
+from apps.estudiantes.services.notificaciones_service import entregar_pendientes
+
+REVISION_ABANDONADAS = 60  # segundos entre búsquedas de tareas abandonadas
+REVISION_NOTIFICACIONES = 60  # segundos entre entregas de la bandeja de notificaciones
+
+
+class Command(BaseCommand):
+    help = "Ejecuta las tareas en segundo plano encoladas en la base de datos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "JOBS_WORKER_CONCURRENCY", 2),
+            help="Hilos que ejecutan tareas en paralelo.",
+        )
+        parser.add_argument(
+            "--kinds", type=str, default="", help="Tipos de tarea separados por coma (todos si se omite)."
+        )
+        parser.add_argument("--sleep", type=float, default=2.0, help="Segundos de espera cuando la cola está vacía.")
+        parser.add_argument("--once", action="store_true", help="Vaciar la cola lista y salir.")
+
+    def handle(self, *args, **options):
+        kinds = [k.strip() for k in options["kinds"].split(",") if k.strip()] or None
+        worker_id = default_worker_id()
+        load_handlers()
+        self.recuperar_abandonadas()
+        self.entregar_notificaciones()
+
+        if options["once"]:
+            total = run_pending(worker_id, kinds)
+            self.stdout.write(self.style.SUCCESS(f"Tareas procesadas: {total}."))
+            return
+
+        detener = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: detener.set())
+
+        def bucle(n: int):
+            hilo_id = f"{worker_id}:{n}"
+            try:
+                while not detener.is_set():
+                    close_old_connections()
+                    job = claim_job(hilo_id, kinds)
+                    if job is None:
+                        detener.wait(options["sleep"])
+                        continue
+                    run_job(job)
+            finally:
+                connection.close()
+
+        hilos = [
+            threading.Thread(target=bucle, args=(n,), name=f"job-worker-{n}", daemon=True)
+            for n in range(max(options["concurrency"], 1))
+        ]
+        for hilo in hilos:
+            hilo.start()
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} con {len(hilos)} hilos."))
+        proxima_revision = time.monotonic() + REVISION_ABANDONADAS
+        proxima_entrega = time.monotonic() + REVISION_NOTIFICACIONES
+        while any(h.is_alive() for h in hilos):
+            for hilo in hilos:
+                hilo.join(timeout=1)
+            if not detener.is_set() and time.monotonic() >= proxima_revision:
+                self.recuperar_abandonadas([f"{worker_id}:{n}" for n, h in enumerate(hilos) if h.is_alive()])
+                proxima_revision = time.monotonic() + REVISION_ABANDONADAS
+            if not detener.is_set() and time.monotonic() >= proxima_entrega:
+                self.entregar_notificaciones()
+                proxima_entrega = time.monotonic() + REVISION_NOTIFICACIONES
+        proxima_entrega = time.monotonic() + REVISION_NOTIFICACIONES
+        connection.close()
+        self.stdout.write("Worker detenido.")
+
+    def recuperar_abandonadas(self, hilos_vivos: list[str] | None = None) -> None:
+        # Un worker que murió con tareas tomadas (OOM, deploy) no las libera: sin esta
+        # revisión quedarían RUNNING hasta el próximo reinicio de algún worker. Las tareas
+        # vivas renuevan `locked_at` con su latido; las de los hilos propios se excluyen igual.
+        close_old_connections()
+        try:
+            recuperadas = requeue_stale(exclude_workers=hilos_vivos or ())
+        except Exception as exc:
+            self.stderr.write(f"No se pudieron revisar las tareas abandonadas: {exc}")
+            return
+        if recuperadas:
+            self.stdout.write(self.style.WARNING(f"{recuperadas} tareas abandonadas devueltas a la cola."))
+
+    def entregar_notificaciones(self) -> None:
+        # Los endpoints solo encolan la notificación; el worker es el proceso que siempre
+        # está desplegado, así que la entrega corre acá y no depende de un cron aparte.
+        close_old_connections()
+        try:
+            with track_command("procesar_notificaciones"):
+                totales = entregar_pendientes()
+        except Exception as exc:
+            self.stderr.write(f"No se pudieron entregar las notificaciones: {exc}")
+            return
+        if any(totales.values()):
+            self.stdout.write(
+                f"Notificaciones: {totales['enviadas']} enviadas, {totales['duplicadas']} duplicadas, "
+                f"{totales['errores']} con error."
+            )
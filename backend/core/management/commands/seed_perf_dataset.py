@@ -0,0 +1,790 @@
+"""
+Management command: genera un dataset sintético del tamaño de la institución.
+
+Arma profesorados con plan vigente y plan anterior, materias en cadena de
+correlativas con dos versiones de correlatividades, docentes, estudiantes por cohorte
+con su historia académica (regularidades, actas de finales, inscripciones a materias
+y a mesas), padrones de comisión, clases con asistencia, conversaciones de mensajería
+y auditoría. Todo se inserta con `bulk_create` por lotes, así que no corren las
+señales: los campos desnormalizados (resumen de conversaciones, caché de
+participantes, índice de búsqueda, contadores) se completan acá.
+
+Con la misma semilla y la misma escala genera los mismos datos; las fechas de mesas,
+clases y mensajes se ubican alrededor del día en que se corre. Los registros quedan
+marcados (emails `@perf.invalid`, profesorados "(PERF)", códigos `PERF-`) para poder
+borrarlos con `--reset`. Los usuarios entran con su DNI (estudiantes) o `perf_*`
+(staff) y la contraseña de `--password`.
+
+Escala 1: 8 profesorados, 4000 estudiantes, ~640 comisiones con 16 clases cada una,
+2000 conversaciones y 50000 registros de auditoría.
+
+Usar:
+    python manage.py seed_perf_dataset
+    python manage.py seed_perf_dataset --seed 7 --scale 0.25
+    python manage.py seed_perf_dataset --reset --scale 2
+
+No es para cron: solo para entornos de desarrollo, benchmarks y pruebas de carga.
+"""
+
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.asistencia.models import AsistenciaEstudiante, ClaseProgramada, CursoEstudianteSnapshot
+from apps.common.name_utils import normalizar_apellido
+from core.models import (
+    ActaExamen,
+    ActaExamenEstudiante,
+    AuditLog,
+    Comision,
+    Conversation,
+    ConversationParticipant,
+    Correlatividad,
+    CorrelatividadVersion,
+    CorrelatividadVersionDetalle,
+    Docente,
+    Estudiante,
+    EstudianteCarrera,
+    InscripcionMateriaEstudiante,
+    InscripcionMesa,
+    Materia,
+    MesaExamen,
+    Message,
+    MessageCounter,
+    Persona,
+    PlanDeEstudio,
+    Profesorado,
+    Regularidad,
+    SearchDocument,
+    Turno,
+    VentanaHabilitacion,
+)
+from core.models.busqueda import normalize_search_text
+
+DOMINIO = "@perf.invalid"
+MARCA = " (PERF)"
+CONTEXTO = "seed_perf"
+
+PROFESORADOS = [
+    "Profesorado de Educación Primaria",
+    "Profesorado de Educación Inicial",
+    "Profesorado de Historia",
+    "Profesorado de Geografía",
+    "Profesorado de Matemática",
+    "Profesorado de Lengua y Literatura",
+    "Profesorado de Biología",
+    "Profesorado de Inglés",
+]
+ESPACIOS = [
+    "Pedagogía",
+    "Didáctica General",
+    "Psicología Educacional",
+    "Historia de la Educación",
+    "Sujetos de la Educación",
+    "Práctica Docente",
+    "Taller de Lectura y Escritura",
+    "Tecnologías Educativas",
+    "Filosofía",
+    "Sociología de la Educación",
+]
+APELLIDOS = [
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez",
+    "García", "Sánchez", "Romero", "Sosa", "Torres", "Álvarez", "Ruiz", "Ramírez",
+    "Flores", "Benítez", "Acosta", "Medina", "Herrera", "Suárez", "Aguirre", "Giménez",
+]  # fmt: skip
+NOMBRES = [
+    "Sofía", "Martina", "Lucía", "Valentina", "Camila", "Julieta", "Agustina", "Florencia",
+    "Mateo", "Santiago", "Benjamín", "Joaquín", "Tomás", "Facundo", "Lautaro", "Nicolás",
+]  # fmt: skip
+ASUNTOS = [
+    "Consulta por inscripción",
+    "Certificado de alumno regular",
+    "Cambio de comisión",
+    "Equivalencias",
+    "Mesa de examen",
+    "Documentación pendiente",
+]
+TURNOS = ["Mañana", "Tarde", "Vespertino"]
+ROMANOS = ["I", "II", "III", "IV"]
+
+AÑOS_CARRERA = 4
+MATERIAS_POR_AÑO = 10
+CLASES_POR_COMISION = 16
+
+# Cantidades con escala 1.
+ESTUDIANTES = 4000
+DOCENTES = 200
+STAFF = 20
+CONVERSACIONES = 2000
+AUDITORIA = 50000
+
+SITUACIONES = [
+    (Regularidad.Situacion.REGULAR, 55),
+    (Regularidad.Situacion.PROMOCIONADO, 15),
+    (Regularidad.Situacion.APROBADO, 10),
+    (Regularidad.Situacion.LIBRE_I, 10),
+    (Regularidad.Situacion.DESAPROBADO_PA, 10),
+]
+ASISTENCIAS = [
+    (AsistenciaEstudiante.Estado.PRESENTE, 80),
+    (AsistenciaEstudiante.Estado.AUSENTE, 12),
+    (AsistenciaEstudiante.Estado.TARDE, 5),
+    (AsistenciaEstudiante.Estado.AUSENTE_JUSTIFICADA, 3),
+]
+ACCIONES = [
+    (AuditLog.Accion.LOGIN, AuditLog.TipoAccion.AUTH, "Inicio de sesión", "User"),
+    (AuditLog.Accion.UPDATE, AuditLog.TipoAccion.CRUD, "Edición de estudiante", "Estudiante"),
+    (AuditLog.Accion.CREATE, AuditLog.TipoAccion.CRUD, "Inscripción a materia", "InscripcionMateriaEstudiante"),
+    (AuditLog.Accion.CREATE, AuditLog.TipoAccion.CRUD, "Inscripción a mesa", "InscripcionMesa"),
+    (AuditLog.Accion.UPDATE, AuditLog.TipoAccion.CRUD, "Carga de acta", "ActaExamen"),
+    (AuditLog.Accion.OTHER, AuditLog.TipoAccion.SYSTEM, "Descarga de constancia", "Estudiante"),
+]
+
+
+@contextmanager
+def _fechas_explicitas(*campos):
+    """Permite fijar en `bulk_create` los campos `auto_now`/`auto_now_add`."""
+    originales = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originales:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Genera un dataset sintético determinístico (semilla + escala) para pruebas de carga y benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42, help="Semilla del generador.")
+        parser.add_argument("--scale", type=float, default=1.0, help="Factor de escala (1 = tamaño institucional).")
+        parser.add_argument("--chunk", type=int, default=1000, help="Filas por lote de bulk_create.")
+        parser.add_argument("--password", type=str, default="perf1234", help="Contraseña de los usuarios generados.")
+        parser.add_argument("--reset", action="store_true", help="Borra un dataset generado antes de crear el nuevo.")
+
+    def handle(self, *args, **options):
+        if settings.IS_PROD:
+            raise CommandError("seed_perf_dataset no se ejecuta en producción.")
+        if options["scale"] <= 0:
+            raise CommandError("--scale debe ser mayor a cero.")
+        self.rng = random.Random(options["seed"])
+        self.escala = options["scale"]
+        self.chunk = options["chunk"]
+        self.hoy = date.today()
+        self.anio = self.hoy.year
+        self.totales: dict[str, int] = defaultdict(int)
+
+        existente = Persona.objects.filter(email__endswith=DOMINIO).exists()
+        if existente and not options["reset"]:
+            raise CommandError("Ya hay un dataset generado. Use --reset para reemplazarlo.")
+        if options["reset"]:
+            self._borrar()
+
+        with transaction.atomic():
+            self._estructura()
+            self._personas(make_password(options["password"]))
+            self._cursada()
+            self._historia()
+            self._asistencia()
+        with transaction.atomic():
+            self._mensajeria()
+            self._auditoria()
+
+        for modelo, total in self.totales.items():
+            self.stdout.write(f"- {modelo}: {total}")
+        self.stdout.write(self.style.SUCCESS("Dataset generado."))
+
+    # --- utilidades ---------------------------------------------------------------
+
+    def _n(self, base: int) -> int:
+        return max(1, round(base * self.escala))
+
+    def _elegir(self, pesos):
+        valores, ponderaciones = zip(*pesos, strict=True)
+        return self.rng.choices(valores, ponderaciones)[0]
+
+    def _insertar(self, modelo, filas) -> None:
+        """Inserta `filas` (iterable, se consume por lotes) con `bulk_create`."""
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= self.chunk:
+                modelo.objects.bulk_create(lote, batch_size=self.chunk)
+                self.totales[modelo.__name__] += len(lote)
+                lote = []
+        if lote:
+            modelo.objects.bulk_create(lote, batch_size=self.chunk)
+            self.totales[modelo.__name__] += len(lote)
+
+    def _etapa(self, mensaje: str) -> None:
+        self.stdout.write(self.style.WARNING(mensaje))
+
+    # --- borrado ------------------------------------------------------------------
+
+    def _borrar(self) -> None:
+        self._etapa("Borrando el dataset anterior...")
+        conversaciones = list(Conversation.objects.filter(context_type=CONTEXTO).values_list("id", flat=True))
+        usuarios = list(User.objects.filter(email__endswith=DOMINIO).values_list("id", flat=True))
+        with transaction.atomic():
+            SearchDocument.objects.filter(conversation_id__in=conversaciones).delete()
+            SearchDocument.objects.filter(kind=SearchDocument.Kind.USER, object_id__in=usuarios).delete()
+            Conversation.objects.filter(id__in=conversaciones).delete()
+            AuditLog.objects.filter(request_id=CONTEXTO).delete()
+            ActaExamen.objects.filter(codigo__startswith="PERF-").delete()
+            # Estudiantes antes que comisiones: las inscripciones protegen la comisión.
+            User.objects.filter(id__in=usuarios).delete()
+            Persona.objects.filter(email__endswith=DOMINIO).delete()
+            Profesorado.objects.filter(nombre__endswith=MARCA).delete()
+
+    # --- estructura académica -----------------------------------------------------
+
+    def _estructura(self) -> None:
+        self._etapa("Profesorados, planes, materias y correlativas...")
+        cantidad = self._n(len(PROFESORADOS))
+        nombres = [
+            PROFESORADOS[i % len(PROFESORADOS)] + (f" {i // len(PROFESORADOS) + 1}" if i >= len(PROFESORADOS) else "")
+            for i in range(cantidad)
+        ]
+        self._insertar(Profesorado, (Profesorado(nombre=n + MARCA, duracion_anios=AÑOS_CARRERA) for n in nombres))
+        profesorados = list(Profesorado.objects.filter(nombre__endswith=MARCA).order_by("id"))
+
+        planes = []
+        for i, prof in enumerate(profesorados):
+            planes.append(
+                PlanDeEstudio(
+                    profesorado=prof, resolucion=f"PERF-{i}-2015", anio_inicio=2015, anio_fin=2018, vigente=False
+                )
+            )
+            planes.append(PlanDeEstudio(profesorado=prof, resolucion=f"PERF-{i}-2019", anio_inicio=2019))
+        self._insertar(PlanDeEstudio, planes)
+        planes = list(PlanDeEstudio.objects.filter(profesorado__in=profesorados).order_by("id"))
+
+        materias = []
+        for plan in planes:
+            for anio_cursada in range(1, AÑOS_CARRERA + 1):
+                for j in range(MATERIAS_POR_AÑO):
+                    materias.append(
+                        Materia(
+                            plan_de_estudio=plan,
+                            nombre=f"{ESPACIOS[j]} {ROMANOS[anio_cursada - 1]}",
+                            anio_cursada=anio_cursada,
+                            horas_semana=self.rng.choice([2, 3, 4, 6]),
+                            formato=Materia.FormatoMateria.TALLER if j == 6 else Materia.FormatoMateria.ASIGNATURA,
+                            regimen=Materia.TipoCursada.ANUAL,
+                            tipo_formacion=(
+                                Materia.TipoFormacion.PRACTICA_DOCENTE
+                                if j == 5
+                                else Materia.TipoFormacion.FORMACION_GENERAL
+                            ),
+                        )
+                    )
+        self._insertar(Materia, materias)
+
+        # Por plan, las materias en orden (año, posición): el índice vale para todos los planes.
+        self.materias: dict[int, list[int]] = defaultdict(list)
+        for pk, plan_id in (
+            Materia.objects.filter(plan_de_estudio__in=planes).order_by("id").values_list("id", "plan_de_estudio_id")
+        ):
+            self.materias[plan_id].append(pk)
+
+        correlativas = []
+        for plan in planes:
+            ids = self.materias[plan.id]
+            for idx in range(MATERIAS_POR_AÑO, len(ids)):
+                previa = ids[idx - MATERIAS_POR_AÑO]
+                for tipo in (
+                    Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR,
+                    Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR,
+                ):
+                    correlativas.append(
+                        Correlatividad(materia_origen_id=ids[idx], materia_correlativa_id=previa, tipo=tipo)
+                    )
+        self._insertar(Correlatividad, correlativas)
+
+        versiones = []
+        for plan in planes:
+            if plan.vigente:
+                versiones.append(
+                    CorrelatividadVersion(
+                        plan_de_estudio=plan,
+                        profesorado_id=plan.profesorado_id,
+                        nombre="Cohortes 2019-2022",
+                        cohorte_desde=2019,
+                        cohorte_hasta=2022,
+                    )
+                )
+                versiones.append(
+                    CorrelatividadVersion(
+                        plan_de_estudio=plan,
+                        profesorado_id=plan.profesorado_id,
+                        nombre="Default 2023+",
+                        cohorte_desde=2023,
+                    )
+                )
+        self._insertar(CorrelatividadVersion, versiones)
+        detalles = []
+        correlativas_por_plan = defaultdict(list)
+        for pk, plan_id, tipo in Correlatividad.objects.filter(materia_origen__plan_de_estudio__in=planes).values_list(
+            "id", "materia_origen__plan_de_estudio_id", "tipo"
+        ):
+            correlativas_por_plan[plan_id].append((pk, tipo))
+        for version in CorrelatividadVersion.objects.filter(plan_de_estudio__in=planes).order_by("id"):
+            for pk, tipo in correlativas_por_plan[version.plan_de_estudio_id]:
+                # La versión anterior solo exigía regularidad para cursar.
+                if version.cohorte_hasta and tipo != Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR:
+                    continue
+                detalles.append(CorrelatividadVersionDetalle(version=version, correlatividad_id=pk))
+        self._insertar(CorrelatividadVersionDetalle, detalles)
+
+        self.profesorados = profesorados
+        self.plan_vigente = {p.profesorado_id: p.id for p in planes if p.vigente}
+
+    def _personas(self, password: str) -> None:
+        self._etapa("Docentes, staff y estudiantes...")
+        grupos = {nombre: Group.objects.get_or_create(name=nombre)[0] for nombre in ("estudiante", "bedel", "docente")}
+        cantidad = self._n(ESTUDIANTES)
+        # Docentes y estudiantes comparten el rango de DNI sintético (9xxxxxxx).
+        docentes = [
+            (str(91000000 + i), self.rng.choice(NOMBRES), self.rng.choice(APELLIDOS)) for i in range(self._n(DOCENTES))
+        ]
+        estudiantes = [
+            (str(90000000 + i), self.rng.choice(NOMBRES), self.rng.choice(APELLIDOS)) for i in range(cantidad)
+        ]
+        self._insertar(
+            Persona,
+            (
+                Persona(dni=dni, nombre=nombre, apellido=normalizar_apellido(apellido), email=f"{dni}{DOMINIO}")
+                for dni, nombre, apellido in docentes + estudiantes
+            ),
+        )
+        personas = dict(Persona.objects.filter(email__endswith=DOMINIO).values_list("dni", "id"))
+        self._insertar(Docente, (Docente(persona_id=personas[dni]) for dni, _, _ in docentes))
+        self.docentes = list(
+            Docente.objects.filter(persona__email__endswith=DOMINIO)
+            .order_by("persona__dni")
+            .values_list("id", flat=True)
+        )
+
+        staff = [f"perf_bedel_{i:02d}" for i in range(self._n(STAFF))]
+        usuarios = [
+            User(
+                username=username, email=f"{username}{DOMINIO}", password=password, first_name="Bedel", last_name=f"{i}"
+            )
+            for i, username in enumerate(staff)
+        ]
+        usuarios += [
+            User(
+                username=dni,
+                email=f"{dni}{DOMINIO}",
+                password=password,
+                first_name=nombre,
+                last_name=normalizar_apellido(apellido),
+            )
+            for dni, nombre, apellido in estudiantes
+        ]
+        self._insertar(User, usuarios)
+        ids = dict(User.objects.filter(email__endswith=DOMINIO).values_list("username", "id"))
+        self.staff = [ids[u] for u in staff]
+        self._insertar(
+            User.groups.through,
+            [User.groups.through(user_id=uid, group_id=grupos["bedel"].id) for uid in self.staff]
+            + [User.groups.through(user_id=ids[dni], group_id=grupos["estudiante"].id) for dni, _, _ in estudiantes],
+        )
+        self._insertar(
+            SearchDocument,
+            (
+                SearchDocument(
+                    kind=SearchDocument.Kind.USER,
+                    object_id=u.id,
+                    text=normalize_search_text(u.username, u.first_name, u.last_name),
+                )
+                for u in User.objects.filter(email__endswith=DOMINIO).only("id", "username", "first_name", "last_name")
+            ),
+        )
+
+        self._insertar(
+            Estudiante,
+            (
+                Estudiante(
+                    user_id=ids[dni],
+                    persona_id=personas[dni],
+                    legajo=f"PERF-{dni}",
+                    estado_legajo=Estudiante.EstadoLegajo.COMPLETO,
+                )
+                for dni, _, _ in estudiantes
+            ),
+        )
+        self.estudiantes = list(
+            Estudiante.objects.filter(persona__email__endswith=DOMINIO)
+            .order_by("persona__dni")
+            .values_list("id", "user_id", "persona__dni", "persona__apellido", "persona__nombre")
+        )
+
+        # Cohorte y profesorado de cada estudiante; los años cursados definen su historia.
+        self.carreras = []
+        filas = []
+        for est_id, *_ in self.estudiantes:
+            prof = self.rng.choice(self.profesorados)
+            cohorte = self.rng.randint(self.anio - 5, self.anio)
+            estado = self._elegir(
+                [(EstudianteCarrera.EstadoAcademico.ACTIVO, 90), (EstudianteCarrera.EstadoAcademico.BAJA, 10)]
+            )
+            self.carreras.append((prof.id, cohorte, estado))
+            filas.append(
+                EstudianteCarrera(
+                    estudiante_id=est_id,
+                    profesorado=prof,
+                    anio_ingreso=cohorte,
+                    cohorte=str(cohorte),
+                    estado_academico=estado,
+                )
+            )
+        self._insertar(EstudianteCarrera, filas)
+
+    def _cursada(self) -> None:
+        self._etapa("Comisiones e inscripciones del año...")
+        turnos = [Turno.objects.get_or_create(nombre=nombre)[0] for nombre in TURNOS]
+        comisiones = []
+        for plan_id in self.plan_vigente.values():
+            for idx, materia_id in enumerate(self.materias[plan_id]):
+                comisiones.append(
+                    Comision(
+                        materia_id=materia_id,
+                        anio_lectivo=self.anio,
+                        codigo="A",
+                        turno=turnos[idx % len(turnos)],
+                        docente_id=self.rng.choice(self.docentes),
+                    )
+                )
+        self._insertar(Comision, comisiones)
+        self.comisiones = dict(
+            Comision.objects.filter(materia__plan_de_estudio__in=self.plan_vigente.values(), anio_lectivo=self.anio)
+            .order_by("id")
+            .values_list("materia_id", "id")
+        )
+
+        self.inscriptos: dict[int, list[int]] = defaultdict(list)
+        filas = []
+        for (est_id, *_), (prof_id, cohorte, estado) in zip(self.estudiantes, self.carreras, strict=True):
+            anio_actual = self.anio - cohorte + 1
+            if estado != EstudianteCarrera.EstadoAcademico.ACTIVO or anio_actual > AÑOS_CARRERA:
+                continue
+            materias = self.materias[self.plan_vigente[prof_id]]
+            for materia_id in materias[(anio_actual - 1) * MATERIAS_POR_AÑO : anio_actual * MATERIAS_POR_AÑO]:
+                comision_id = self.comisiones[materia_id]
+                self.inscriptos[comision_id].append(est_id)
+                filas.append(
+                    InscripcionMateriaEstudiante(
+                        estudiante_id=est_id,
+                        materia_id=materia_id,
+                        comision_id=comision_id,
+                        anio=self.anio,
+                        estado=InscripcionMateriaEstudiante.Estado.CONFIRMADA,
+                    )
+                )
+        self._insertar(InscripcionMateriaEstudiante, filas)
+
+        # Padrón de cada comisión que usa el registro de asistencia (kiosco y PIN).
+        datos = {est_id: (dni, apellido, nombre) for est_id, _, dni, apellido, nombre in self.estudiantes}
+        self._insertar(
+            CursoEstudianteSnapshot,
+            (
+                CursoEstudianteSnapshot(
+                    comision_id=comision_id,
+                    estudiante_id=est_id,
+                    dni=datos[est_id][0],
+                    apellido=datos[est_id][1],
+                    nombre=datos[est_id][2],
+                )
+                for comision_id, inscriptos in self.inscriptos.items()
+                for est_id in inscriptos
+            ),
+        )
+
+    def _historia(self) -> None:
+        self._etapa("Regularidades, actas y mesas...")
+        regularidades, aprobaciones, pendientes = [], defaultdict(list), []
+        for (est_id, _, dni, apellido, nombre), (prof_id, cohorte, _) in zip(
+            self.estudiantes, self.carreras, strict=True
+        ):
+            cursados = min(self.anio - cohorte, AÑOS_CARRERA)
+            materias = self.materias[self.plan_vigente[prof_id]]
+            for idx, materia_id in enumerate(materias[: cursados * MATERIAS_POR_AÑO]):
+                cierre = date(cohorte + idx // MATERIAS_POR_AÑO, 12, 1)
+                situacion = self._elegir(SITUACIONES)
+                regularidades.append(
+                    Regularidad(
+                        estudiante_id=est_id,
+                        materia_id=materia_id,
+                        fecha_cierre=cierre,
+                        situacion=situacion,
+                        nota_final_cursada=self.rng.randint(6, 10)
+                        if situacion != Regularidad.Situacion.LIBRE_I
+                        else None,
+                        asistencia_porcentaje=self.rng.randint(60, 100),
+                    )
+                )
+                if situacion != Regularidad.Situacion.REGULAR:
+                    continue
+                if cierre.year + 1 < self.anio and self.rng.random() < 0.7:
+                    aprobaciones[(prof_id, materia_id, cierre.year + 1)].append(
+                        (dni, f"{apellido}, {nombre}", self.rng.randint(4, 10))
+                    )
+                elif self.rng.random() < 0.3:
+                    pendientes.append((est_id, materia_id))
+        self._insertar(Regularidad, regularidades)
+
+        # Un acta por materia y año con todos los que la aprobaron.
+        numeros = defaultdict(int)
+        plan_de = {materia_id: plan_id for plan_id, ids in self.materias.items() for materia_id in ids}
+        actas = []
+        for prof_id, materia_id, anio in sorted(aprobaciones):
+            numeros[(prof_id, anio)] += 1
+            notas = aprobaciones[(prof_id, materia_id, anio)]
+            actas.append(
+                ActaExamen(
+                    codigo=f"PERF-ACTA-{prof_id}-{anio}-{numeros[(prof_id, anio)]}",
+                    numero=numeros[(prof_id, anio)],
+                    anio_academico=anio,
+                    tipo=ActaExamen.Tipo.REGULAR,
+                    profesorado_id=prof_id,
+                    materia_id=materia_id,
+                    plan_id=plan_de[materia_id],
+                    fecha=date(anio, 3, 1),
+                    total_alumnos=len(notas),
+                    total_aprobados=len(notas),
+                )
+            )
+        self._insertar(ActaExamen, actas)
+        acta_de = {
+            (prof_id, materia_id, anio): pk
+            for pk, prof_id, materia_id, anio in ActaExamen.objects.filter(codigo__startswith="PERF-ACTA-").values_list(
+                "id", "profesorado_id", "materia_id", "anio_academico"
+            )
+        }
+        self._insertar(
+            ActaExamenEstudiante,
+            (
+                ActaExamenEstudiante(
+                    acta_id=acta_de[clave],
+                    numero_orden=orden,
+                    dni=dni,
+                    apellido_nombre=apellido_nombre,
+                    calificacion_definitiva=str(nota),
+                    calificacion_numerica=nota,
+                )
+                for clave in sorted(aprobaciones)
+                for orden, (dni, apellido_nombre, nota) in enumerate(aprobaciones[clave], start=1)
+            ),
+        )
+
+        ventana = VentanaHabilitacion.objects.filter(
+            tipo=VentanaHabilitacion.Tipo.MESAS_FINALES, activo=True, desde__lte=self.hoy, hasta__gte=self.hoy
+        ).first() or VentanaHabilitacion.objects.create(
+            tipo=VentanaHabilitacion.Tipo.MESAS_FINALES,
+            desde=self.hoy - timedelta(days=7),
+            hasta=self.hoy + timedelta(days=21),
+            activo=True,
+        )
+        self._insertar(
+            MesaExamen,
+            (
+                MesaExamen(
+                    materia_id=materia_id,
+                    tipo=MesaExamen.Tipo.FINAL,
+                    fecha=self.hoy + timedelta(days=7 + idx % 14),
+                    hora_desde=time(9),
+                    hora_hasta=time(13),
+                    cupo=60,
+                    ventana=ventana,
+                    codigo=f"PERF-MESA-{materia_id}",
+                    docente_presidente_id=self.rng.choice(self.docentes),
+                )
+                for plan_id in self.plan_vigente.values()
+                for idx, materia_id in enumerate(self.materias[plan_id])
+            ),
+        )
+        mesa_de = dict(MesaExamen.objects.filter(codigo__startswith="PERF-MESA-").values_list("materia_id", "id"))
+        self._insertar(
+            InscripcionMesa,
+            (InscripcionMesa(mesa_id=mesa_de[materia_id], estudiante_id=est_id) for est_id, materia_id in pendientes),
+        )
+
+    def _asistencia(self) -> None:
+        self._etapa("Clases y asistencia...")
+        lunes = self.hoy - timedelta(days=self.hoy.weekday())
+        clases = []
+        for idx, comision_id in enumerate(self.comisiones.values()):
+            dia = lunes + timedelta(days=idx % 5)
+            inicio = time(8 + 2 * (idx % 5))
+            for semana in range(CLASES_POR_COMISION):
+                fecha = dia - timedelta(weeks=CLASES_POR_COMISION - 2 - semana)
+                clases.append(
+                    ClaseProgramada(
+                        comision_id=comision_id,
+                        fecha=fecha,
+                        hora_inicio=inicio,
+                        hora_fin=time(inicio.hour + 1, 20),
+                        estado=(
+                            ClaseProgramada.Estado.IMPARTIDA if fecha < self.hoy else ClaseProgramada.Estado.PROGRAMADA
+                        ),
+                    )
+                )
+        self._insertar(ClaseProgramada, clases)
+        impartidas = ClaseProgramada.objects.filter(
+            comision_id__in=self.comisiones.values(), estado=ClaseProgramada.Estado.IMPARTIDA
+        ).order_by("id")
+        self._insertar(
+            AsistenciaEstudiante,
+            (
+                AsistenciaEstudiante(clase_id=clase_id, estudiante_id=est_id, estado=self._elegir(ASISTENCIAS))
+                for clase_id, comision_id in impartidas.values_list("id", "comision_id").iterator()
+                for est_id in self.inscriptos[comision_id]
+            ),
+        )
+
+    # --- mensajería y auditoría -----------------------------------------------------
+
+    def _mensajeria(self) -> None:
+        self._etapa("Conversaciones y mensajes...")
+        ahora = timezone.now()
+        nombres = {user_id: f"{nombre} {apellido}" for _, user_id, _, apellido, nombre in self.estudiantes}
+        nombres.update({uid: f"Bedel {i}" for i, uid in enumerate(self.staff)})
+        hilos = []
+        for n in range(self._n(CONVERSACIONES)):
+            bedel = self.rng.choice(self.staff)
+            estudiante = self.rng.choice(self.estudiantes)[1]
+            momento = ahora - timedelta(minutes=self.rng.randint(60, 180 * 24 * 60))
+            mensajes = []
+            for m in range(self.rng.randint(1, 6)):
+                autor = bedel if m % 2 == 0 else estudiante
+                mensajes.append((autor, momento, f"{self.rng.choice(ASUNTOS)}: mensaje {m + 1} de la consulta {n}."))
+                momento += timedelta(minutes=self.rng.randint(5, 3 * 24 * 60))
+            hilos.append((n, bedel, estudiante, self.rng.choice(ASUNTOS), mensajes))
+
+        campos = [Conversation._meta.get_field(f) for f in ("created_at", "updated_at")]
+        with _fechas_explicitas(*campos, Message._meta.get_field("created_at")):
+            self._insertar(
+                Conversation,
+                (
+                    Conversation(
+                        created_by_id=bedel,
+                        subject=asunto,
+                        context_type=CONTEXTO,
+                        context_id=str(n),
+                        created_at=mensajes[0][1],
+                        updated_at=mensajes[-1][1],
+                        last_message_at=mensajes[-1][1],
+                        last_message_excerpt=Conversation.excerpt_for(mensajes[-1][2]),
+                        last_message_author_id=mensajes[-1][0],
+                    )
+                    for n, bedel, _, asunto, mensajes in hilos
+                ),
+            )
+            conv_de = {
+                int(ctx): pk
+                for pk, ctx in Conversation.objects.filter(context_type=CONTEXTO).values_list("id", "context_id")
+            }
+            self._insertar(
+                Message,
+                (
+                    Message(conversation_id=conv_de[n], author_id=autor, body=cuerpo, created_at=fecha)
+                    for n, _, _, _, mensajes in hilos
+                    for autor, fecha, cuerpo in mensajes
+                ),
+            )
+
+        participantes = []
+        for n, bedel, estudiante, _, mensajes in hilos:
+            autor, ultimo, _ = mensajes[-1]
+            for user_id, rol in ((bedel, "bedel"), (estudiante, "estudiante")):
+                participantes.append(
+                    ConversationParticipant(
+                        conversation_id=conv_de[n],
+                        user_id=user_id,
+                        role_snapshot=rol,
+                        last_read_at=ultimo if user_id == autor else None,
+                        last_message_at=ultimo,
+                        pending_since=None if user_id == autor else ultimo,
+                    )
+                )
+        self._insertar(ConversationParticipant, participantes)
+
+        cache = defaultdict(list)
+        for pk, conv_id, user_id, rol in (
+            ConversationParticipant.objects.filter(conversation_id__in=conv_de.values())
+            .order_by("id")
+            .values_list("id", "conversation_id", "user_id", "role_snapshot")
+        ):
+            cache[conv_id].append(
+                {"id": pk, "user_id": user_id, "name": nombres[user_id], "roles": [rol], "can_reply": True}
+            )
+        conversaciones = list(Conversation.objects.filter(id__in=conv_de.values()).only("id"))
+        for conv in conversaciones:
+            conv.participants_cache = cache[conv.id]
+        Conversation.objects.bulk_update(conversaciones, ["participants_cache"], batch_size=self.chunk)
+
+        self._insertar(
+            SearchDocument,
+            (
+                SearchDocument(
+                    kind=SearchDocument.Kind.CONVERSATION,
+                    object_id=conv_de[n],
+                    conversation_id=conv_de[n],
+                    text=normalize_search_text(asunto),
+                )
+                for n, _, _, asunto, _ in hilos
+            ),
+        )
+        self._insertar(
+            SearchDocument,
+            (
+                SearchDocument(
+                    kind=SearchDocument.Kind.MESSAGE,
+                    object_id=pk,
+                    conversation_id=conv_id,
+                    text=normalize_search_text(body),
+                )
+                for pk, conv_id, body in Message.objects.filter(conversation_id__in=conv_de.values())
+                .values_list("id", "conversation_id", "body")
+                .iterator()
+            ),
+        )
+        for user_id in sorted({uid for _, bedel, est, _, _ in hilos for uid in (bedel, est)}):
+            MessageCounter.refresh(user_id)
+
+    def _auditoria(self) -> None:
+        self._etapa("Auditoría...")
+        ahora = timezone.now()
+        usuarios = [(user_id, dni) for _, user_id, dni, _, _ in self.estudiantes]
+        usuarios += [(uid, f"perf_bedel_{i:02d}") for i, uid in enumerate(self.staff)]
+
+        def filas():
+            for _ in range(self._n(AUDITORIA)):
+                user_id, username = self.rng.choice(usuarios)
+                accion, tipo, detalle, entidad = self.rng.choice(ACCIONES)
+                yield AuditLog(
+                    timestamp=ahora - timedelta(seconds=self.rng.randint(0, 365 * 24 * 3600)),
+                    usuario_id=user_id,
+                    nombre_usuario=username,
+                    accion=accion,
+                    tipo_accion=tipo,
+                    detalle_accion=detalle,
+                    entidad_afectada=entidad,
+                    id_entidad=str(self.rng.randint(1, 5000)),
+                    ip_origen=f"10.0.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}",
+                    request_id=CONTEXTO,
+                )
+
+        with _fechas_explicitas(AuditLog._meta.get_field("timestamp")):
+            self._insertar(AuditLog, filas())
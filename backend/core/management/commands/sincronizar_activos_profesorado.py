@@ -23,11 +23,12 @@ import sys
 
 from django.core.management.base import BaseCommand, CommandError
 
+from apps.common.metrics import TrackedCommandMixin
 from core.models.carreras import Profesorado
 from core.models.estudiantes import EstudianteCarrera
 
 
-class Command(BaseCommand):
+class Command(TrackedCommandMixin, BaseCommand):
     help = "Marca como ACTIVO a los estudiantes de la lista y como INACTIVO al resto en un profesorado."
 
     def add_arguments(self, parser):
@@ -18,11 +18,12 @@ from datetime import date
 
 from django.core.management.base import BaseCommand
 
+from apps.common.metrics import TrackedCommandMixin
 from apps.estudiantes.api.helpers.misc_utils import _tiene_aprobacion_valida
 from core.models import Regularidad, ResidenciaCondicional
 
 
-class Command(BaseCommand):
+class Command(TrackedCommandMixin, BaseCommand):
     help = "Verifica residencias condicionales: resuelve las aprobadas, hace caer las vencidas."
 
     def add_arguments(self, parser):
@@ -1,5 +1,17 @@
+import logging
 import threading
+import time
 import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from apps.common.metrics import UNMATCHED_ROUTE, observe_request, update_connection_gauge
+from apps.common.slow_queries import MAX_PER_REQUEST, SlowQuery, record_slow_queries
+
+logger = logging.getLogger(__name__)
 
 _thread_locals = threading.local()
 
@@ -53,3 +65,148 @@ class AuditRequestMiddleware:
             ips = [ip.strip() for ip in x_forwarded_for.split(",")]
             return ips[-1]
         return request.META.get("REMOTE_ADDR")
+
+
+class QueryStats:
+    """
+    Contador de consultas de una request; se instala con `connection.execute_wrapper`.
+    Con `slow_ms` guarda además las sentencias que superan ese tiempo, con sus parámetros.
+    """
+
+    def __init__(self, slow_ms: float = 0):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: dict[str, int] = {}
+        self.slow_ms = slow_ms
+        self.slow: list[SlowQuery] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.duration += elapsed
+            self.count += 1
+            if self.slow_ms and elapsed * 1000 >= self.slow_ms and len(self.slow) < MAX_PER_REQUEST:
+                self.slow.append(SlowQuery(sql, params, elapsed * 1000, context["connection"].alias, many))
+            # El SQL llega con placeholders: el texto es la "forma" de la consulta.
+            self.shapes[sql] = self.shapes.get(sql, 0) + 1
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def duplicates(self) -> list[tuple[str, int]]:
+        """Formas repetidas, de la más repetida a la menos (síntoma típico de N+1)."""
+        return sorted(((sql, n) for sql, n in self.shapes.items() if n > 1), key=lambda item: -item[1])
+
+
+class QueryBudgetMiddleware:
+    """
+    Mide las consultas SQL de cada request: cantidad, tiempo en base y consultas repetidas.
+
+    Agrega un header `Server-Timing` (visible en las DevTools del navegador) y, si la ruta
+    supera su presupuesto (`SQL_BUDGETS`, o los valores por defecto), lo registra en
+    `SystemLog` con el `request_id`, como mucho una vez cada `SQL_BUDGET_LOG_INTERVAL`
+    segundos por ruta. Solo envuelve la ejecución de consultas, sin el costo de silk.
+    Las sentencias que superan `SLOW_QUERY_MS` se acumulan por huella en
+    `apps.common.slow_queries`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SQL_BUDGET_ENABLED:
+            return self.get_response(request)
+
+        stats = QueryStats(slow_ms=settings.SLOW_QUERY_MS)
+        request.query_stats = stats  # lo lee MetricsMiddleware
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(stats))
+            started = time.perf_counter()
+            response = self.get_response(request)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if settings.SQL_BUDGET_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}'
+            )
+        # Patrón de URL, como en SQL_BUDGETS; los paths sin ruta comparten una sola etiqueta
+        # (un path arbitrario no coincidiría con ningún presupuesto y no acotaría las claves).
+        route = getattr(getattr(request, "resolver_match", None), "route", None) or UNMATCHED_ROUTE
+        budget = self.budget_for(route)
+        duplicates = stats.duplicates()
+        max_repeated = duplicates[0][1] if duplicates else 0
+        if stats.count > budget["queries"] or stats.duration_ms > budget["ms"] or max_repeated > budget["duplicates"]:
+            self.report(request, route, stats, duplicates, budget, elapsed_ms)
+        if stats.slow:
+            record_slow_queries(request, route, stats.slow)
+        return response
+
+    @staticmethod
+    def budget_for(route: str) -> dict:
+        """Presupuesto de la ruta: el prefijo más largo de `SQL_BUDGETS` que coincida."""
+        budget = {
+            "queries": settings.SQL_BUDGET_QUERIES,
+            "ms": settings.SQL_BUDGET_MS,
+            "duplicates": settings.SQL_BUDGET_DUPLICATES,
+        }
+        matches = [prefix for prefix in settings.SQL_BUDGETS if route.startswith(prefix)]
+        if matches:
+            budget.update(settings.SQL_BUDGETS[max(matches, key=len)])
+        return budget
+
+    @staticmethod
+    def report(request, route, stats, duplicates, budget, elapsed_ms):
+        if not cache.add(f"sql_budget:{route}", 1, settings.SQL_BUDGET_LOG_INTERVAL):
+            return
+        try:
+            from core.models import SystemLog
+
+            SystemLog.objects.create(
+                tipo="SQL_BUDGET",
+                mensaje=f"{request.method} {route}: {stats.count} consultas en {stats.duration_ms:.0f} ms",
+                metadata={
+                    "request_id": getattr(request, "request_id", None),
+                    "path": request.path,
+                    "queries": stats.count,
+                    "db_ms": round(stats.duration_ms, 1),
+                    "total_ms": round(elapsed_ms, 1),
+                    "budget": budget,
+                    "duplicates": [{"sql": sql[:500], "count": n} for sql, n in duplicates[:5]],
+                },
+            )
+        except Exception:
+            logger.exception("No se pudo registrar el exceso de presupuesto SQL de %s", route)
+
+
+class MetricsMiddleware:
+    """
+    Registra latencia y código de estado de cada request por ruta (patrón de URL, no la
+    ruta concreta, para acotar la cantidad de series) y las consultas SQL que midió
+    `QueryBudgetMiddleware`. Va primero en `MIDDLEWARE` para medir la request completa.
+    Al final actualiza las conexiones a la base que tiene abiertas el worker.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED or request.path == "/metrics":
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        route = getattr(getattr(request, "resolver_match", None), "route", None)
+        observe_request(
+            request.method,
+            route,
+            response.status_code,
+            time.perf_counter() - started,
+            getattr(request, "query_stats", None),
+        )
+        update_connection_gauge()
+        return response
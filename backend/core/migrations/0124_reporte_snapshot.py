@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0123_alter_ventanahabilitacion_tipo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReporteSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('CORR_CAIDAS', 'Correlatividades caídas')], max_length=20)),
+                ('clave', models.CharField(help_text='Parámetros del reporte (p. ej. el año lectivo).', max_length=64)),
+                ('filas', models.JSONField(blank=True, default=list)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('generado_en', models.DateTimeField(auto_now=True)),
+                ('generado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reportes_generados', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Snapshot de reporte',
+                'verbose_name_plural': 'Snapshots de reportes',
+                'unique_together': {('tipo', 'clave')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0124_reporte_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditoriaAcademicaParticion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('RUN', 'En curso'), ('OK', 'Completada'), ('ERR', 'Con error')], default='RUN', max_length=3)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True)),
+                ('calculado_en', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('profesorado', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='auditoria_academica_particion', to='core.profesorado')),
+            ],
+            options={
+                'verbose_name': 'Partición de auditoría académica',
+                'verbose_name_plural': 'Particiones de auditoría académica',
+            },
+        ),
+        migrations.CreateModel(
+            name='AuditoriaAcademicaItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dni', models.CharField(db_index=True, max_length=20)),
+                ('estudiante_nombre', models.CharField(max_length=255)),
+                ('estudiante_activo', models.BooleanField(default=False)),
+                ('materia_nombre', models.CharField(max_length=255)),
+                ('evento', models.CharField(choices=[('FIN', 'Aprobación Final'), ('REG', 'Regularización')], max_length=3)),
+                ('fecha', models.DateField(blank=True, null=True)),
+                ('prerrequisito_nombre', models.CharField(max_length=255)),
+                ('tipo_corr', models.CharField(max_length=3)),
+                ('motivo', models.CharField(max_length=255)),
+                ('calculado_en', models.DateTimeField()),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auditoria_academica_items', to='core.estudiante')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.materia')),
+                ('prerrequisito', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.materia')),
+                ('profesorado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auditoria_academica_items', to='core.profesorado')),
+            ],
+            options={
+                'ordering': ['estudiante_nombre', 'materia_nombre', 'id'],
+                'indexes': [models.Index(fields=['profesorado', 'estudiante'], name='core_audito_profeso_392be0_idx'), models.Index(fields=['materia'], name='core_audito_materia_bba5a9_idx')],
+            },
+        ),
+    ]
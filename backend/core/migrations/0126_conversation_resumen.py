@@ -0,0 +1,71 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_resumen(apps, schema_editor):
+    """Completa extracto, autor y fecha del último mensaje; la caché de participantes se arma al listar."""
+    Conversation = apps.get_model('core', 'Conversation')
+    ConversationParticipant = apps.get_model('core', 'ConversationParticipant')
+    Message = apps.get_model('core', 'Message')
+
+    ultimo = Message.objects.filter(conversation=OuterRef('pk')).order_by('-created_at', '-id')
+    pendientes = []
+    for conv in Conversation.objects.annotate(
+        ultimo_cuerpo=Subquery(ultimo.values('body')[:1]),
+        ultimo_autor=Subquery(ultimo.values('author_id')[:1]),
+    ).filter(ultimo_cuerpo__isnull=False).iterator(chunk_size=500):
+        cuerpo = conv.ultimo_cuerpo
+        conv.last_message_excerpt = cuerpo[:50] + '...' if len(cuerpo) > 50 else cuerpo
+        conv.last_message_author_id = conv.ultimo_autor
+        pendientes.append(conv)
+        if len(pendientes) >= 500:
+            Conversation.objects.bulk_update(pendientes, ['last_message_excerpt', 'last_message_author'])
+            pendientes = []
+    if pendientes:
+        Conversation.objects.bulk_update(pendientes, ['last_message_excerpt', 'last_message_author'])
+
+    ConversationParticipant.objects.update(
+        last_message_at=Subquery(
+            Conversation.objects.filter(pk=OuterRef('conversation_id')).values('last_message_at')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0125_auditoria_academica'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_author',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_excerpt',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participants_cache',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', '-last_message_at', '-conversation'], name='participant_inbox_idx'),
+        ),
+        migrations.RunPython(backfill_resumen, migrations.RunPython.noop),
+    ]
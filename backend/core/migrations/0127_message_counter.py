@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Q
+
+
+def backfill_pending_since(apps, schema_editor):
+    """Marca como pendientes los mensajes ajenos sin leer; los contadores se crean al consultarlos."""
+    ConversationParticipant = apps.get_model('core', 'ConversationParticipant')
+    ConversationParticipant.objects.filter(last_message_at__isnull=False).filter(
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=F('last_message_at'))
+    ).exclude(user_id=F('conversation__last_message_author_id')).update(pending_since=F('last_message_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0126_conversation_resumen'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='message_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+                ('sla_warning', models.PositiveIntegerField(default=0)),
+                ('sla_danger', models.PositiveIntegerField(default=0)),
+                ('sla_recalc_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='pending_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', 'pending_since'], name='participant_sla_idx'),
+        ),
+        migrations.RunPython(backfill_pending_since, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0127_message_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagecounter',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:02
+
+import unicodedata
+
+from django.db import migrations, models
+
+# Copia de los valores y helpers de core.models.busqueda al momento de esta migración.
+TABLE = 'core_searchdocument'
+FTS_TABLE = 'core_searchdocument_fts'
+MYSQL_FULLTEXT_INDEX = 'searchdocument_text_ft'
+
+
+def normalize_search_text(*parts):
+    text = unicodedata.normalize('NFKD', ' '.join(p for p in parts if p))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def backfill_search_documents(apps, schema_editor):
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    Message = apps.get_model('core', 'Message')
+    Conversation = apps.get_model('core', 'Conversation')
+    Broadcast = apps.get_model('core', 'Broadcast')
+    User = apps.get_model('auth', 'User')
+    Persona = apps.get_model('core', 'Persona')
+
+    def guardar(filas):
+        docs = [
+            SearchDocument(kind=kind, object_id=pk, conversation_id=conv_id, text=normalize_search_text(*parts).strip())
+            for kind, pk, conv_id, parts in filas
+        ]
+        SearchDocument.objects.bulk_create([d for d in docs if d.text], batch_size=1000)
+
+    guardar(
+        ('message', pk, conv_id, [body])
+        for pk, conv_id, body in Message.objects.values_list('id', 'conversation_id', 'body').iterator()
+    )
+    guardar(
+        ('conversation', pk, pk, [subject])
+        for pk, subject in Conversation.objects.values_list('id', 'subject').iterator()
+    )
+    guardar(
+        ('broadcast', pk, None, [subject, body])
+        for pk, subject, body in Broadcast.objects.values_list('id', 'subject', 'body').iterator()
+    )
+    personas = {}
+    for campo in ('user_profile__user_id', 'estudiante_perfil__user_id'):
+        for user_id, apellido, nombre, dni in Persona.objects.filter(**{f'{campo}__isnull': False}).values_list(
+            campo, 'apellido', 'nombre', 'dni'
+        ):
+            personas.setdefault(user_id, [apellido, nombre, dni])
+    guardar(
+        ('user', pk, None, [username, first, last, *personas.get(pk, [])])
+        for pk, username, first, last in User.objects.values_list('id', 'username', 'first_name', 'last_name').iterator()
+    )
+
+
+def borrar_search_documents(apps, schema_editor):
+    apps.get_model('core', 'SearchDocument').objects.all().delete()
+
+
+def crear_indice_fulltext(apps, schema_editor):
+    """Índice FULLTEXT en MySQL; en SQLite, tabla FTS5 sincronizada por triggers."""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f'ALTER TABLE {TABLE} ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (text)')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"text, content='{TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN '
+                f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN '
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {TABLE} BEGIN '
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+                f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END'
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def eliminar_indice_fulltext(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f'ALTER TABLE {TABLE} DROP INDEX {MYSQL_FULLTEXT_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for sufijo in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{sufijo}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0129_broadcast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('message', 'Mensaje'), ('conversation', 'Asunto de conversación'), ('broadcast', 'Difusión'), ('user', 'Usuario')], max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('conversation_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('text', models.TextField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'conversation_id'], name='searchdocument_conv_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='searchdocument_kind_object_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_search_documents, borrar_search_documents),
+        migrations.RunPython(crear_indice_fulltext, eliminar_indice_fulltext),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0130_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacionPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ANALITICO', 'Analítico'), ('CAMBIO_COMISION', 'Cambio de comisión'), ('EQUIVALENCIA', 'Equivalencias')], max_length=32)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('variante', models.CharField(blank=True, default='', max_length=32)),
+                ('clave', models.CharField(max_length=128)),
+                ('estado', models.CharField(choices=[('PEND', 'Pendiente'), ('ENV', 'Enviada'), ('DUP', 'Duplicada'), ('ERR', 'Con error')], default='PEND', max_length=4)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('procesado_en', models.DateTimeField(blank=True, null=True)),
+                ('estudiante', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notificaciones_pendientes', to='core.estudiante')),
+                ('materia', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.materia')),
+            ],
+            options={
+                'verbose_name': 'Notificación pendiente',
+                'verbose_name_plural': 'Notificaciones pendientes',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['estado', 'id'], name='notif_pendiente_estado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0133_systemlog_sql_budget'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(max_length=100, unique=True)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('duration_seconds', models.FloatField()),
+                ('success', models.BooleanField()),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0134_commandrun'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='systemlog',
+            name='tipo',
+            field=models.CharField(choices=[('REGULARIDAD_MISMATCH', 'Discrepancia Regularidad'), ('ACTA_MISMATCH', 'Discrepancia Acta Examen'), ('EQUIVALENCIA_MISMATCH', 'Discrepancia Equivalencia'), ('IMPORT_ERROR', 'Error de Importación'), ('SYSTEM_ERROR', 'Error del Sistema'), ('SECURITY_ALERT', 'Alerta de Seguridad'), ('SQL_BUDGET', 'Presupuesto SQL excedido'), ('SLOW_QUERY', 'Consulta SQL lenta')], default='SYSTEM_ERROR', max_length=50),
+        ),
+    ]
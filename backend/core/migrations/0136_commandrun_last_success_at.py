@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0135_systemlog_slow_query'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commandrun',
+            name='last_success_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0136_commandrun_last_success_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacionpendiente',
+            name='reintentar_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
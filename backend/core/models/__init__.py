@@ -2,6 +2,7 @@ from . import signals  # noqa: F401 — conecta las señales
 from .actas import ActaExamen, ActaExamenDocente, ActaExamenEstudiante
 from .auditoria import AuditLog, SystemLog
 from .base import Docente, Persona, UserProfile
+from .busqueda import SearchDocument
 from .carreras import (
     Correlatividad,
     CorrelatividadVersion,
@@ -24,15 +25,19 @@ from .horarios import (
     VentanaHabilitacion,
 )
 from .inscripciones import EquivalenciaCurricular, InscripcionMateriaEstudiante, InscripcionMateriaMovimiento
+from .jobs import BackgroundJob, CommandRun
 from .mensajeria import (
+    Broadcast,
     Conversation,
     ConversationAudit,
     ConversationParticipant,
     Message,
+    MessageCounter,
     MessageTopic,
     validate_pdf_attachment,
 )
 from .mesas import InscripcionMesa, MesaActaOral, MesaExamen, SolicitudMesa
+from .notificaciones import NotificacionPendiente
 from .pedidos import (
     EquivalenciaDisposicion,
     EquivalenciaDisposicionDetalle,
@@ -58,6 +63,7 @@ from .regularidades import (
     RegularidadPlanillaLock,
     RegularidadPlantilla,
 )
+from .reportes import AuditoriaAcademicaItem, AuditoriaAcademicaParticion, ReporteSnapshot
 
 __all__ = [
     # base
@@ -125,11 +131,24 @@ __all__ = [
     # mensajeria
     "validate_pdf_attachment",
     "MessageTopic",
+    "Broadcast",
     "Conversation",
     "ConversationParticipant",
     "Message",
+    "MessageCounter",
     "ConversationAudit",
+    # busqueda
+    "SearchDocument",
+    # notificaciones
+    "NotificacionPendiente",
+    # jobs
+    "BackgroundJob",
+    "CommandRun",
     # auditoria
     "AuditLog",
     "SystemLog",
+    # reportes
+    "ReporteSnapshot",
+    "AuditoriaAcademicaParticion",
+    "AuditoriaAcademicaItem",
 ]
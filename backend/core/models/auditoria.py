@@ -59,6 +59,8 @@ class SystemLog(models.Model):
         ("IMPORT_ERROR", "Error de Importación"),
         ("SYSTEM_ERROR", "Error del Sistema"),
         ("SECURITY_ALERT", "Alerta de Seguridad"),
+        ("SQL_BUDGET", "Presupuesto SQL excedido"),
+        ("SLOW_QUERY", "Consulta SQL lenta"),
     )
 
     tipo = models.CharField(max_length=50, choices=TIPOS, default="SYSTEM_ERROR")
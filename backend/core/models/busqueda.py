@@ -0,0 +1,151 @@
+"""
+Índice de búsqueda de texto completo para mensajería y directorio de usuarios.
+
+Cada documento guarda el texto normalizado (minúsculas y sin acentos) de un mensaje,
+un asunto de conversación, una difusión o un usuario. En MySQL se consulta con un
+índice FULLTEXT y en SQLite con una tabla FTS5 sincronizada por triggers; si ninguno
+está disponible se filtra con `contains` sobre el texto normalizado.
+"""
+
+import re
+import unicodedata
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "core_searchdocument_fts"
+MYSQL_FULLTEXT_INDEX = "searchdocument_text_ft"
+# innodb_ft_min_token_size: términos más cortos no se indexan en MySQL.
+MYSQL_MIN_TOKEN = 3
+
+_TOKEN_RE = re.compile(r"\w+")
+_fulltext_disponible: dict[str, bool] = {}
+
+
+def normalize_search_text(*parts: str | None) -> str:
+    text = unicodedata.normalize("NFKD", " ".join(p for p in parts if p))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def search_terms(query: str | None) -> list[str]:
+    return _TOKEN_RE.findall(normalize_search_text(query))
+
+
+def fulltext_available(connection) -> bool:
+    if connection.alias not in _fulltext_disponible:
+        disponible = False
+        if connection.vendor == "mysql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SHOW INDEX FROM {SearchDocument._meta.db_table} WHERE Key_name = %s", [MYSQL_FULLTEXT_INDEX]
+                )
+                disponible = cursor.fetchone() is not None
+        elif connection.vendor == "sqlite":
+            disponible = FTS_TABLE in connection.introspection.table_names()
+        _fulltext_disponible[connection.alias] = disponible
+    return _fulltext_disponible[connection.alias]
+
+
+def ensure_fulltext_index(connection) -> None:
+    """Crea el índice FULLTEXT (MySQL) o la tabla FTS5 con sus triggers (SQLite)."""
+    _fulltext_disponible.pop(connection.alias, None)
+    if fulltext_available(connection):
+        return
+    table = SearchDocument._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (text)")
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"text, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+                f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fulltext_disponible.pop(connection.alias, None)
+
+
+class SearchDocumentQuerySet(models.QuerySet):
+    def matching(self, query: str | None) -> "SearchDocumentQuerySet":
+        """Documentos que contienen todos los términos (como prefijo), sin distinguir acentos."""
+        terms = search_terms(query)
+        if not terms:
+            return self.none()
+        connection = connections[self.db]
+        table = self.model._meta.db_table
+        # Subconsultas con tabla propia: `matching()` se usa dentro de `__in` y ahí Django
+        # renombra la tabla externa (U0), algo que no hace con el SQL de `.extra()`.
+        if fulltext_available(connection):
+            if connection.vendor == "mysql" and all(len(t) >= MYSQL_MIN_TOKEN for t in terms):
+                return self.filter(
+                    id__in=RawSQL(
+                        f"SELECT id FROM {table} WHERE MATCH (text) AGAINST (%s IN BOOLEAN MODE)",
+                        [" ".join(f"+{t}*" for t in terms)],
+                    )
+                )
+            if connection.vendor == "sqlite":
+                return self.filter(
+                    id__in=RawSQL(
+                        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                        [" ".join(f'"{t}"*' for t in terms)],
+                    )
+                )
+        qs = self
+        for term in terms:
+            qs = qs.filter(text__contains=term)
+        return qs
+
+
+class SearchDocument(models.Model):
+    class Kind(models.TextChoices):
+        MESSAGE = "message", "Mensaje"
+        CONVERSATION = "conversation", "Asunto de conversación"
+        BROADCAST = "broadcast", "Difusión"
+        USER = "user", "Usuario"
+
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    conversation_id = models.PositiveBigIntegerField(null=True, blank=True)
+    text = models.TextField()
+
+    objects = SearchDocumentQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["kind", "object_id"], name="searchdocument_kind_object_uniq")]
+        indexes = [models.Index(fields=["kind", "conversation_id"], name="searchdocument_conv_idx")]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+    @classmethod
+    def index(cls, kind: str, object_id: int, *parts: str | None, conversation_id: int | None = None) -> None:
+        text = normalize_search_text(*parts).strip()
+        if not text:
+            cls.objects.filter(kind=kind, object_id=object_id).delete()
+            return
+        cls.objects.update_or_create(
+            kind=kind, object_id=object_id, defaults={"text": text, "conversation_id": conversation_id}
+        )
+
+    @classmethod
+    def user_text(cls, user) -> list[str | None]:
+        from .base import Persona
+
+        persona = (
+            Persona.objects.filter(models.Q(user_profile__user=user) | models.Q(estudiante_perfil__user=user))
+            .values_list("apellido", "nombre", "dni")
+            .first()
+        )
+        return [user.username, user.first_name, user.last_name, *(persona or ())]
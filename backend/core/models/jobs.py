@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundJob(models.Model):
+    """
+    Tarea en segundo plano de la cola de `apps.common.jobs`.
+
+    Los endpoints pesados encolan una fila y responden 202; el comando `run_worker`
+    la reclama, ejecuta el manejador registrado para `kind` y guarda el resultado
+    (JSON y, opcionalmente, un archivo descargable).
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "En cola"
+        RUNNING = "running", "En ejecución"
+        DONE = "done", "Completada"
+        FAILED = "failed", "Con error"
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    result_file = models.FileField(upload_to="jobs/%Y/%m/", null=True, blank=True)
+    result_filename = models.CharField(max_length=255, blank=True, default="")
+    result_content_type = models.CharField(max_length=100, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["status", "run_after", "id"], name="backgroundjob_claim_idx"),
+            models.Index(fields=["created_by", "-created_at"], name="backgroundjob_owner_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+
+class CommandRun(models.Model):
+    """
+    Última ejecución de cada comando de mantenimiento (cron), para las métricas y el
+    readiness (`apps.health_api`).
+
+    Una fila por comando, que se sobrescribe al terminar cada corrida; los comandos la
+    registran con `apps.common.metrics.TrackedCommandMixin`.
+    """
+
+    command = models.CharField(max_length=100, unique=True)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration_seconds = models.FloatField()
+    success = models.BooleanField()
+    error = models.TextField(blank=True, default="")
+    # Se conserva aunque fallen las corridas siguientes: mide hace cuánto no anda (readiness).
+    last_success_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.command} ({'ok' if self.success else 'error'})"
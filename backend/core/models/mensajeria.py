@@ -1,7 +1,11 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Q, Value, When
 from django.utils import timezone
 
 
@@ -20,6 +24,17 @@ def validate_pdf_attachment(file):
         raise ValidationError(f"El archivo supera el limite permitido de {max_size // 1024} KB.")
 
 
+EXCERPT_LENGTH = 50
+
+# Días permitidos antes de marcar una conversación como atrasada (Warning/Danger)
+SLA_WARNING_DAYS = getattr(settings, "MESSAGES_SLA_WARNING_DAYS", 3)
+SLA_DANGER_DAYS = getattr(settings, "MESSAGES_SLA_DANGER_DAYS", 6)
+
+# Con caché local por proceso (LocMem) un worker puede no ver la versión escrita por
+# otro; el vencimiento acota ese retraso.
+VERSION_CACHE_SECONDS = getattr(settings, "MESSAGES_VERSION_CACHE_SECONDS", 5)
+
+
 class MessageTopic(models.Model):
     slug = models.SlugField(max_length=64, unique=True)
     name = models.CharField(max_length=128)
@@ -35,6 +50,53 @@ class MessageTopic(models.Model):
         return self.name
 
 
+class Broadcast(models.Model):
+    """
+    Mensaje masivo: el cuerpo se guarda una sola vez y la entrega a cada destinatario
+    (conversación, participantes y mensaje) se escribe en segundo plano por lotes.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "En cola"
+        RUNNING = "running", "Enviando"
+        DONE = "done", "Enviada"
+        ERROR = "error", "Con error"
+
+    sender = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="broadcasts_sent",
+    )
+    topic = models.ForeignKey(
+        MessageTopic,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="broadcasts",
+    )
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    allow_student_reply = models.BooleanField(default=False)
+    context_type = models.CharField(max_length=64, blank=True, null=True)
+    context_id = models.CharField(max_length=64, blank=True, null=True)
+    recipient_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    total = models.PositiveIntegerField(default=0)
+    delivered = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Difusion #{self.pk} ({self.get_status_display()})"
+
+
 class Conversation(models.Model):
     class Status(models.TextChoices):
         OPEN = "open", "Abierta"
@@ -62,6 +124,24 @@ class Conversation(models.Model):
     is_massive = models.BooleanField(default=False)
     allow_student_reply = models.BooleanField(default=True)
     last_message_at = models.DateTimeField(null=True, blank=True)
+    # Resumen desnormalizado para la bandeja; lo mantienen las señales de Message y
+    # ConversationParticipant (ver core.models.signals).
+    last_message_excerpt = models.CharField(max_length=64, blank=True, default="")
+    last_message_author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    participants_cache = models.JSONField(default=list, blank=True)
+    broadcast = models.ForeignKey(
+        Broadcast,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="conversations",
+    )
     close_requested_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -97,6 +177,52 @@ class Conversation(models.Model):
         self.updated_at = self.last_message_at
         self.save(update_fields=["last_message_at", "updated_at"])
 
+    @staticmethod
+    def excerpt_for(body: str | None) -> str:
+        body = body or ""
+        return body[:EXCERPT_LENGTH] + "..." if len(body) > EXCERPT_LENGTH else body
+
+    def apply_message(self, message: "Message") -> None:
+        """Actualiza el resumen (y la copia en cada participante) con un mensaje nuevo."""
+        self.last_message_at = message.created_at
+        self.updated_at = message.created_at
+        self.last_message_excerpt = self.excerpt_for(message.text)
+        self.last_message_author_id = message.author_id
+        Conversation.objects.filter(pk=self.pk).update(
+            last_message_at=self.last_message_at,
+            updated_at=self.updated_at,
+            last_message_excerpt=self.last_message_excerpt,
+            last_message_author_id=self.last_message_author_id,
+        )
+        self.participants.update(
+            last_message_at=self.last_message_at,
+            pending_since=Case(
+                When(user_id=message.author_id, then=Value(None)),
+                default=Value(self.last_message_at),
+            ),
+        )
+        MessageCounter.refresh_for_conversation(self.pk)
+
+    def refresh_participants_cache(self) -> list[dict]:
+        """Recalcula nombres y roles de los participantes que muestra la bandeja."""
+        from core.permissions import get_user_roles
+
+        cache = [
+            {
+                "id": p.id,
+                "user_id": p.user_id,
+                "name": p.user.get_full_name() or p.user.username,
+                "roles": sorted(get_user_roles(p.user)),
+                "can_reply": p.can_reply,
+            }
+            for p in self.participants.select_related("user").order_by("id")
+        ]
+        self.participants_cache = cache
+        Conversation.objects.filter(pk=self.pk).update(participants_cache=cache)
+        if self.last_message_at:
+            self.participants.filter(last_message_at__isnull=True).update(last_message_at=self.last_message_at)
+        return cache
+
 
 class ConversationParticipant(models.Model):
     conversation = models.ForeignKey(
@@ -112,12 +238,18 @@ class ConversationParticipant(models.Model):
     role_snapshot = models.CharField(max_length=64, blank=True, null=True)
     can_reply = models.BooleanField(default=True)
     last_read_at = models.DateTimeField(null=True, blank=True)
+    # Copia de Conversation.last_message_at para ordenar la bandeja con un único índice.
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Fecha del último mensaje ajeno sin leer: base de los plazos de respuesta (SLA).
+    pending_since = models.DateTimeField(null=True, blank=True)
     added_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("conversation", "user")
         indexes = [
             models.Index(fields=["user", "last_read_at"]),
+            models.Index(fields=["user", "-last_message_at", "-conversation"], name="participant_inbox_idx"),
+            models.Index(fields=["user", "pending_since"], name="participant_sla_idx"),
         ]
 
     def mark_read(self):
@@ -128,6 +260,103 @@ class ConversationParticipant(models.Model):
         return f"{self.user} en conversacion {self.conversation_id}"
 
 
+class MessageCounter(models.Model):
+    """
+    Contadores de mensajería por usuario para los badges del encabezado.
+
+    Se recalculan dentro de la misma transacción que envía, lee o cierra una
+    conversación. Los cambios de SLA que dependen solo del paso del tiempo se aplican
+    al leer el contador cuando se alcanza `sla_recalc_at`.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="message_counter",
+    )
+    unread = models.PositiveIntegerField(default=0)
+    sla_warning = models.PositiveIntegerField(default=0)
+    sla_danger = models.PositiveIntegerField(default=0)
+    sla_recalc_at = models.DateTimeField(null=True, blank=True)
+    # Se incrementa en cada recálculo; los clientes en espera comparan contra este valor.
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Contadores de {self.user_id}"
+
+    @staticmethod
+    def version_cache_key(user_id: int) -> str:
+        return f"mensajeria:version:{user_id}"
+
+    @classmethod
+    def current_version(cls, user_id: int) -> int:
+        """Versión vigente desde la caché compartida; ante un fallo de caché se lee la fila."""
+        key = cls.version_cache_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            version = cls.objects.filter(pk=user_id).values_list("version", flat=True).first() or 0
+            cache.set(key, version, VERSION_CACHE_SECONDS)
+        return version
+
+    @property
+    def is_stale(self) -> bool:
+        return bool(self.sla_recalc_at and self.sla_recalc_at <= timezone.now())
+
+    @classmethod
+    def refresh(cls, user_id: int) -> "MessageCounter":
+        """Recalcula los contadores del usuario con consultas sobre sus índices de participación."""
+        now = timezone.now()
+        warning_delta = timedelta(days=SLA_WARNING_DAYS)
+        danger_delta = timedelta(days=SLA_DANGER_DAYS)
+        abiertas = ConversationParticipant.objects.filter(
+            user_id=user_id, conversation__status=Conversation.Status.OPEN
+        )
+
+        unread = (
+            abiertas.filter(last_message_at__isnull=False)
+            .filter(Q(last_read_at__isnull=True) | Q(last_read_at__lt=F("last_message_at")))
+            .count()
+        )
+        danger = abiertas.filter(pending_since__lte=now - danger_delta).count()
+        recientes = list(abiertas.filter(pending_since__gt=now - danger_delta).values_list("pending_since", flat=True))
+        warning = sum(1 for since in recientes if since <= now - warning_delta)
+        # Próximo instante en que algún pendiente pasa a warning o a danger.
+        transiciones = [since + (warning_delta if since > now - warning_delta else danger_delta) for since in recientes]
+
+        valores = {
+            "unread": unread,
+            "sla_warning": warning,
+            "sla_danger": danger,
+            "sla_recalc_at": min(transiciones, default=None),
+        }
+        if not cls.objects.filter(user_id=user_id).update(version=F("version") + 1, **valores):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id, version=1, **valores)
+            except IntegrityError:
+                cls.objects.filter(user_id=user_id).update(version=F("version") + 1, **valores)
+        counter = cls.objects.get(pk=user_id)
+        transaction.on_commit(lambda: cache.set(cls.version_cache_key(user_id), counter.version, VERSION_CACHE_SECONDS))
+        return counter
+
+    @classmethod
+    def refresh_for_conversation(cls, conversation_id: int) -> None:
+        for user_id in ConversationParticipant.objects.filter(conversation_id=conversation_id).values_list(
+            "user_id", flat=True
+        ):
+            cls.refresh(user_id)
+
+    @classmethod
+    def for_user(cls, user_id: int) -> "MessageCounter":
+        """Lectura por clave primaria; recalcula solo si falta o venció un plazo de SLA."""
+        counter = cls.objects.filter(pk=user_id).first()
+        if counter is None or counter.is_stale:
+            counter = cls.refresh(user_id)
+        return counter
+
+
 class Message(models.Model):
     conversation = models.ForeignKey(
         Conversation,
@@ -141,7 +370,15 @@ class Message(models.Model):
         blank=True,
         related_name="messages_authored",
     )
-    body = models.TextField()
+    # Vacío en las entregas de una difusión: el texto está en `broadcast.body`.
+    body = models.TextField(blank=True)
+    broadcast = models.ForeignKey(
+        Broadcast,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="messages",
+    )
     attachment = models.FileField(
         upload_to="mensajes/%Y/%m/%d",
         null=True,
@@ -157,6 +394,12 @@ class Message(models.Model):
         author = self.author or "Sistema"
         return f"Mensaje #{self.pk} por {author}"
 
+    @property
+    def text(self) -> str:
+        if not self.body and self.broadcast_id:
+            return self.broadcast.body
+        return self.body
+
 
 class ConversationAudit(models.Model):
     class Action(models.TextChoices):
@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class NotificacionPendiente(models.Model):
+    """
+    Bandeja de salida (outbox) de notificaciones a estudiantes y tutores.
+
+    El endpoint que origina el evento solo inserta una fila; `run_worker` (o el comando
+    `procesar_notificaciones`) la entrega como mensaje interno por lotes y descarta los
+    eventos repetidos de un mismo estudiante y materia (u objeto), conservando el último.
+    Una entrega fallida se reintenta recién a partir de `reintentar_en`, con espera
+    exponencial.
+    """
+
+    class Tipo(models.TextChoices):
+        ANALITICO = "ANALITICO", "Analítico"
+        CAMBIO_COMISION = "CAMBIO_COMISION", "Cambio de comisión"
+        EQUIVALENCIA = "EQUIVALENCIA", "Equivalencias"
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "PEND", "Pendiente"
+        ENVIADA = "ENV", "Enviada"
+        DUPLICADA = "DUP", "Duplicada"
+        ERROR = "ERR", "Con error"
+
+    tipo = models.CharField(max_length=32, choices=Tipo.choices)
+    objeto_id = models.PositiveBigIntegerField()
+    variante = models.CharField(max_length=32, blank=True, default="")
+    estudiante = models.ForeignKey(
+        "Estudiante", on_delete=models.SET_NULL, null=True, blank=True, related_name="notificaciones_pendientes"
+    )
+    materia = models.ForeignKey("Materia", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    clave = models.CharField(max_length=128)
+    estado = models.CharField(max_length=4, choices=Estado.choices, default=Estado.PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    reintentar_en = models.DateTimeField(null=True, blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    procesado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["estado", "id"], name="notif_pendiente_estado_idx")]
+        verbose_name = "Notificación pendiente"
+        verbose_name_plural = "Notificaciones pendientes"
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id} ({self.get_estado_display()})"
@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class ReporteSnapshot(models.Model):
+    """Resultado materializado de un reporte costoso, servido tal cual hasta que se regenera."""
+
+    class Tipo(models.TextChoices):
+        CORRELATIVAS_CAIDAS = "CORR_CAIDAS", "Correlatividades caídas"
+
+    tipo = models.CharField(max_length=20, choices=Tipo.choices)
+    clave = models.CharField(max_length=64, help_text="Parámetros del reporte (p. ej. el año lectivo).")
+    filas = models.JSONField(default=list, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    generado_por = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="reportes_generados"
+    )
+    generado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("tipo", "clave")
+        verbose_name = "Snapshot de reporte"
+        verbose_name_plural = "Snapshots de reportes"
+
+    def __str__(self) -> str:
+        return f"{self.get_tipo_display()} [{self.clave}] ({self.total})"
+
+
+class AuditoriaAcademicaParticion(models.Model):
+    """Estado del último cálculo de la auditoría académica de un profesorado."""
+
+    class Estado(models.TextChoices):
+        EN_CURSO = "RUN", "En curso"
+        COMPLETADA = "OK", "Completada"
+        ERROR = "ERR", "Con error"
+
+    profesorado = models.OneToOneField(
+        "Profesorado", on_delete=models.CASCADE, related_name="auditoria_academica_particion"
+    )
+    estado = models.CharField(max_length=3, choices=Estado.choices, default=Estado.EN_CURSO)
+    total = models.PositiveIntegerField(default=0)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    calculado_en = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Partición de auditoría académica"
+        verbose_name_plural = "Particiones de auditoría académica"
+
+    def __str__(self) -> str:
+        return f"{self.profesorado} - {self.get_estado_display()} ({self.total})"
+
+
+class AuditoriaAcademicaItem(models.Model):
+    """Inconsistencia de correlatividades precalculada (una fila por evento y prerrequisito faltante)."""
+
+    class Evento(models.TextChoices):
+        APROBACION_FINAL = "FIN", "Aprobación Final"
+        REGULARIZACION = "REG", "Regularización"
+
+    profesorado = models.ForeignKey("Profesorado", on_delete=models.CASCADE, related_name="auditoria_academica_items")
+    estudiante = models.ForeignKey("Estudiante", on_delete=models.CASCADE, related_name="auditoria_academica_items")
+    dni = models.CharField(max_length=20, db_index=True)
+    estudiante_nombre = models.CharField(max_length=255)
+    estudiante_activo = models.BooleanField(default=False)
+    materia = models.ForeignKey("Materia", on_delete=models.CASCADE, related_name="+")
+    materia_nombre = models.CharField(max_length=255)
+    evento = models.CharField(max_length=3, choices=Evento.choices)
+    fecha = models.DateField(null=True, blank=True)
+    prerrequisito = models.ForeignKey("Materia", on_delete=models.CASCADE, related_name="+")
+    prerrequisito_nombre = models.CharField(max_length=255)
+    tipo_corr = models.CharField(max_length=3)
+    motivo = models.CharField(max_length=255)
+    calculado_en = models.DateTimeField()
+
+    class Meta:
+        ordering = ["estudiante_nombre", "materia_nombre", "id"]
+        indexes = [
+            models.Index(fields=["profesorado", "estudiante"]),
+            models.Index(fields=["materia"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.estudiante_nombre} - {self.materia_nombre}: {self.prerrequisito_nombre}"
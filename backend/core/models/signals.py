@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from .base import Persona
+from .busqueda import SearchDocument
+from .mensajeria import Broadcast, Conversation, ConversationParticipant, Message, MessageCounter
 
 
 @receiver(post_save, sender=Persona)
@@ -86,3 +90,77 @@ def sync_checklists_from_estudiante(sender, instance, **kwargs):
     La documentación ahora se maneja de forma independiente por carrera.
     """
     return
+
+
+@receiver(post_save, sender=Message)
+def actualizar_resumen_conversacion(sender, instance, created, **kwargs):
+    """Mantiene el resumen desnormalizado de la conversación al insertar un mensaje."""
+    if created:
+        instance.conversation.apply_message(instance)
+
+
+@receiver(post_save, sender=ConversationParticipant)
+@receiver(post_delete, sender=ConversationParticipant)
+def actualizar_participantes_conversacion(sender, instance, update_fields=None, **kwargs):
+    """Recalcula la caché de participantes; una lectura solo actualiza los contadores del usuario."""
+    if update_fields and "last_read_at" in update_fields:
+        if instance.pending_since and instance.last_read_at and instance.last_read_at >= instance.pending_since:
+            ConversationParticipant.objects.filter(pk=instance.pk).update(pending_since=None)
+            instance.pending_since = None
+        MessageCounter.refresh(instance.user_id)
+    if update_fields and set(update_fields) <= {"last_read_at", "last_message_at", "pending_since"}:
+        return
+    conversation = Conversation.objects.filter(pk=instance.conversation_id).first()
+    if conversation:
+        conversation.refresh_participants_cache()
+    if kwargs.get("signal") is post_delete:
+        MessageCounter.refresh(instance.user_id)
+
+
+@receiver(post_save, sender=Conversation)
+def actualizar_contadores_por_estado(sender, instance, created, update_fields=None, **kwargs):
+    """Cerrar o reabrir una conversación cambia los contadores de sus participantes."""
+    if not created and (update_fields is None or "status" in update_fields):
+        MessageCounter.refresh_for_conversation(instance.pk)
+
+
+# --- Índice de búsqueda ---
+
+
+@receiver(post_save, sender=Message)
+def indexar_mensaje(sender, instance, **kwargs):
+    SearchDocument.index(
+        SearchDocument.Kind.MESSAGE, instance.pk, instance.body, conversation_id=instance.conversation_id
+    )
+
+
+@receiver(post_delete, sender=Message)
+def desindexar_mensaje(sender, instance, **kwargs):
+    SearchDocument.objects.filter(kind=SearchDocument.Kind.MESSAGE, object_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Conversation)
+def indexar_asunto_conversacion(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "subject" in update_fields:
+        SearchDocument.index(
+            SearchDocument.Kind.CONVERSATION, instance.pk, instance.subject, conversation_id=instance.pk
+        )
+
+
+@receiver(post_save, sender=Broadcast)
+def indexar_difusion(sender, instance, created, **kwargs):
+    if created:
+        SearchDocument.index(SearchDocument.Kind.BROADCAST, instance.pk, instance.subject, instance.body)
+
+
+@receiver(post_save, sender=User)
+def indexar_usuario(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login", "password"}:
+        return
+    SearchDocument.index(SearchDocument.Kind.USER, instance.pk, *SearchDocument.user_text(instance))
+
+
+@receiver(post_save, sender=Persona)
+def indexar_usuario_de_persona(sender, instance, **kwargs):
+    for user in User.objects.filter(Q(profile__persona=instance) | Q(estudiante__persona=instance)):
+        SearchDocument.index(SearchDocument.Kind.USER, user.pk, *SearchDocument.user_text(user))
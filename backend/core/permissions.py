@@ -284,12 +284,9 @@ def _ensure_authenticated(user: User | None) -> User:
     return user
 
 
-def get_user_roles(user: User) -> set[str]:
-    """
-    Extrae y normaliza los roles del usuario basado en sus Grupos de Django.
-    Conserva la lógica de mapeo definida en auth_ninja.py para consistencia.
-    """
-    raw_names = {name.lower().strip() for name in user.groups.values_list("name", flat=True)}
+def roles_from_group_names(group_names, is_superuser: bool = False) -> set[str]:
+    """Normaliza nombres de grupos a roles; permite resolver roles de muchos usuarios en lote."""
+    raw_names = {name.lower().strip() for name in group_names}
     roles = set(raw_names)
     for name in raw_names:
         if name.startswith("bedel"):
@@ -307,11 +304,19 @@ def get_user_roles(user: User) -> set[str]:
         if name == "attp":
             roles.add("attp")
 
-    if user.is_superuser:
+    if is_superuser:
         roles.add("admin")
     return roles
 
 
+def get_user_roles(user: User) -> set[str]:
+    """
+    Extrae y normaliza los roles del usuario basado en sus Grupos de Django.
+    Conserva la lógica de mapeo definida en auth_ninja.py para consistencia.
+    """
+    return roles_from_group_names(user.groups.values_list("name", flat=True), user.is_superuser)
+
+
 def allowed_profesorados(user: User | None, role_filter: Iterable[str] | None = None) -> set[int] | None:
     """
     Determina la lista de IDs de Profesorado a los que el usuario tiene acceso.
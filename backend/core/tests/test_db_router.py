@@ -0,0 +1,52 @@
+import pytest
+
+from core import middleware
+from core.db_router import REPLICA, ReplicaRouter
+from core.models import InscripcionMesa
+
+router = ReplicaRouter()
+
+
+@pytest.fixture
+def con_replica(settings):
+    settings.DATABASES = {**settings.DATABASES, REPLICA: {**settings.DATABASES["default"]}}
+    settings.DB_REPLICA_ROUTES = ["/api/reportes/"]
+
+
+@pytest.fixture
+def en_request(rf):
+    def _instalar(method, path):
+        middleware._thread_locals.request = rf.generic(method, path)
+
+    yield _instalar
+    middleware._thread_locals.__dict__.pop("request", None)
+
+
+class TestReplicaRouter:
+    def test_get_de_reportes_lee_de_la_replica(self, con_replica, en_request):
+        en_request("GET", "/api/reportes/inscripciones/resumen-por-profesorado/")
+
+        assert router.db_for_read(InscripcionMesa) == REPLICA
+        assert router.db_for_write(InscripcionMesa) == "default"
+
+    @pytest.mark.parametrize(
+        ("method", "path"),
+        [("POST", "/api/reportes/x"), ("GET", "/api/estudiantes/inscripcion-materia")],
+    )
+    def test_el_resto_usa_la_primaria(self, con_replica, en_request, method, path):
+        en_request(method, path)
+
+        assert router.db_for_read(InscripcionMesa) is None
+
+    def test_sin_replica_configurada(self, settings, en_request):
+        settings.DB_REPLICA_ROUTES = ["/api/reportes/"]
+        en_request("GET", "/api/reportes/x")
+
+        assert router.db_for_read(InscripcionMesa) is None
+
+    def test_sin_request_usa_la_primaria(self, con_replica):
+        assert router.db_for_read(InscripcionMesa) is None
+
+    def test_no_migra_la_replica(self):
+        assert router.allow_migrate(REPLICA, "core") is False
+        assert router.allow_migrate("default", "core") is None
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+from django.db import OperationalError, connections
+from django.urls import resolve
+from django.utils import timezone
+
+from apps import health_api
+from apps.common.jobs import enqueue
+from apps.common.metrics import track_command
+from core.models import CommandRun
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _readiness(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.HEALTH_READY_CACHE_SECONDS = 0
+    settings.HEALTH_DB_MS = 10_000
+    settings.HEALTH_CACHE_MS = 10_000
+    settings.HEALTH_MEDIA_MS = 10_000
+    settings.HEALTH_MEDIA_MIN_FREE_PCT = 0
+    settings.HEALTH_MEDIA_CRITICAL_FREE_PCT = 0
+    settings.HEALTH_COMMAND_MAX_AGE = {"procesar_notificaciones": 900}
+    health_api._ultimo.clear()
+
+
+class _ReplicaCaida:
+    vendor = "mysql"
+
+    def cursor(self):
+        raise OperationalError("(1227, 'Access denied; you need the REPLICATION CLIENT privilege')")
+
+
+class TestReadiness:
+    def test_url_publica(self):
+        match = resolve("/api/system/health/ready")
+
+        assert match.url_name == "readiness"
+
+    def test_todo_en_orden(self, rf):
+        with track_command("procesar_notificaciones"):
+            pass
+
+        status, cuerpo = health_api.readiness(rf.get("/api/system/health/ready"))
+
+        assert status == 200
+        assert cuerpo["estado"] == "ok"
+        assert set(cuerpo["chequeos"]) == {"base", "cache", "media", "tareas", "comandos"}
+        assert cuerpo["chequeos"]["media"]["escritura_ms"] >= 0
+
+    def test_comando_atrasado_degrada_y_estricto_responde_503(self, rf):
+        with track_command("procesar_notificaciones"):
+            pass
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        CommandRun.objects.filter(command="procesar_notificaciones").update(last_success_at=hace_una_hora)
+
+        status, cuerpo = health_api.readiness(rf.get("/"))
+        assert status == 200
+        assert cuerpo["estado"] == "degradado"
+        assert cuerpo["chequeos"]["comandos"]["comandos"]["procesar_notificaciones"]["estado"] == "degradado"
+
+        status, cuerpo = health_api.readiness(rf.get("/"), estricto=True)
+        assert status == 503
+        assert cuerpo["ok"] is False
+
+    def test_corrida_fallida_conserva_la_ultima_exitosa(self):
+        with track_command("procesar_notificaciones"):
+            pass
+        exitosa = CommandRun.objects.get(command="procesar_notificaciones").last_success_at
+        with pytest.raises(RuntimeError), track_command("procesar_notificaciones"):
+            raise RuntimeError("smtp caído")
+
+        corrida = CommandRun.objects.get(command="procesar_notificaciones")
+        assert corrida.success is False
+        assert corrida.last_success_at == exitosa
+
+        chequeo = health_api.chequear_comandos()["comandos"]["procesar_notificaciones"]
+        assert chequeo["estado"] == "ok"
+        assert "smtp caído" in chequeo["ultimo_error"]
+
+    def test_cola_atrasada(self, settings):
+        settings.HEALTH_JOBS_MAX_AGE_SECONDS = 60
+        job = enqueue("test.readiness")
+        job.__class__.objects.filter(id=job.id).update(run_after=timezone.now() - timedelta(minutes=5))
+
+        chequeo = health_api.chequear_tareas()
+
+        assert chequeo["estado"] == "degradado"
+        assert chequeo["pendientes"] == 1
+        assert chequeo["antiguedad_s"] >= 300
+
+    def test_falla_de_un_chequeo_responde_503(self, rf, monkeypatch):
+        def _sin_disco():
+            raise OSError("No space left on device")
+
+        monkeypatch.setitem(health_api.CHEQUEOS, "media", _sin_disco)
+
+        status, cuerpo = health_api.readiness(rf.get("/"))
+
+        assert status == 503
+        assert cuerpo["chequeos"]["media"]["estado"] == "falla"
+        assert "No space left" in cuerpo["chequeos"]["media"]["detalle"]
+
+    def test_replica_caida_solo_degrada(self, rf, monkeypatch):
+        with track_command("procesar_notificaciones"):
+            pass
+        monkeypatch.setattr(health_api, "connections", {"default": connections["default"], "replica": _ReplicaCaida()})
+
+        status, cuerpo = health_api.readiness(rf.get("/"))
+
+        assert status == 200
+        base = cuerpo["chequeos"]["base"]
+        assert base["estado"] == "degradado"
+        assert base["conexiones"]["default"]["estado"] == "ok"
+        assert "REPLICATION CLIENT" in base["conexiones"]["replica"]["detalle"]
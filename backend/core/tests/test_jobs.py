@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from apps.common import jobs
+from apps.common.jobs import JobFile, claim_job, enqueue, job_handler, run_job, run_pending
+from apps.common.jobs_api import job_status
+from core.management.commands.run_worker import Command as RunWorker
+from core.models import BackgroundJob
+
+pytestmark = pytest.mark.django_db
+
+
+@job_handler("test.archivo")
+def _genera_archivo(job):
+    jobs.set_progress(job, 50, "Generando")
+    return JobFile("saludo.txt", f"hola {job.payload['nombre']}".encode(), "text/plain")
+
+
+@job_handler("test.lenta")
+def _lenta(job):
+    time.sleep(0.3)
+
+
+@job_handler("test.falla")
+def _falla(job):
+    raise RuntimeError("sin datos")
+
+
+class TestColaDeTareas:
+    def test_ejecuta_y_guarda_el_archivo(self, settings, tmp_path, rf):
+        settings.MEDIA_ROOT = tmp_path
+        user = User.objects.create_user(username="bedel")
+        job = enqueue("test.archivo", {"nombre": "Ana"}, user=user)
+
+        assert run_pending("w1") == 1
+
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.DONE
+        assert job.progress == 100
+        assert job.result_file.read() == b"hola Ana"
+        request = rf.get("/")
+        request.user = user
+        _, out = job_status(request, job.id)
+        assert out.has_file and out.result == {"filename": "saludo.txt", "size": 8}
+        request.user = User.objects.create_user(username="otro")
+        assert job_status(request, job.id)[0] == 404
+
+    def test_reintenta_con_espera_y_luego_falla(self):
+        job = enqueue("test.falla", max_attempts=2)
+
+        run_job(claim_job("w1"))
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.QUEUED
+        assert job.run_after > timezone.now() + timedelta(seconds=20)
+        assert claim_job("w1") is None
+
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_job(claim_job("w1"))
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.FAILED
+        assert job.attempts == 2
+        assert job.error == "sin datos"
+
+    def test_worker_devuelve_a_la_cola_las_abandonadas(self, settings):
+        settings.JOBS_LOCK_TIMEOUT_SECONDS = 60
+        job = enqueue("test.archivo", {"nombre": "Ana"})
+        claim_job("worker-muerto")
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        salida = StringIO()
+
+        RunWorker(stdout=salida).recuperar_abandonadas()
+
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.QUEUED
+        assert job.locked_by == ""
+        assert "1 tareas abandonadas" in salida.getvalue()
+
+    def test_no_devuelve_las_tareas_de_hilos_vivos(self, settings):
+        settings.JOBS_LOCK_TIMEOUT_SECONDS = 60
+        job = enqueue("test.archivo", {"nombre": "Ana"})
+        claim_job("worker:0")
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        assert jobs.requeue_stale(exclude_workers=["worker:0"]) == 0
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.RUNNING
+
+    def test_el_avance_renueva_el_bloqueo(self):
+        job = enqueue("test.archivo", {"nombre": "Ana"})
+        job = claim_job("w1")
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_at=hace_una_hora)
+
+        jobs.set_progress(job, 10)
+
+        job.refresh_from_db()
+        assert job.locked_at > hace_una_hora
+
+
+@pytest.mark.django_db(transaction=True)
+def test_latido_mantiene_viva_una_tarea_larga(settings):
+    settings.JOBS_LOCK_TIMEOUT_SECONDS = 0.2
+    enqueue("test.lenta")
+    job = claim_job("w1")
+    reclamada = job.locked_at
+
+    run_job(job)
+
+    job.refresh_from_db()
+    assert job.status == BackgroundJob.Status.DONE
+    assert job.locked_at > reclamada
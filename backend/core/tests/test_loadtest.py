@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from django.core.management import call_command
+
+from core.loadtest.cliente import Conexion, Estadisticas, percentil
+from core.loadtest.escenarios import CUPO_MESA, ESCENARIOS, Peticion, verificar_cupos
+from core.management.commands.loadtest import ejecutar
+from core.models import Estudiante, InscripcionMesa, MesaExamen
+
+pytestmark = pytest.mark.django_db
+
+RESPUESTAS = [
+    b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\nServer-Timing: db;dur=3.5;desc="2 queries"\r\n\r\nok',
+    b"HTTP/1.1 400 Bad Request\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n2\r\nde\r\n0\r\n\r\n",
+]
+
+
+async def _servidor(conexiones):
+    async def atender(reader, writer):
+        conexiones.append(writer)
+        n = 0
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(RESPUESTAS[n % 2])
+            await writer.drain()
+            n += 1
+
+    return await asyncio.start_server(atender, "127.0.0.1", 0)
+
+
+class TestCliente:
+    def test_keep_alive_chunked_y_server_timing(self):
+        async def correr():
+            conexiones = []
+            servidor = await _servidor(conexiones)
+            url = f"http://127.0.0.1:{servidor.sockets[0].getsockname()[1]}/api"
+            conexion = Conexion(url)
+            primera = await conexion.request("GET", "/x")
+            segunda = await conexion.request("POST", "/y", cuerpo={"a": 1})
+            await conexion.cerrar()
+            servidor.close()
+            return primera, segunda, len(conexiones)
+
+        primera, segunda, conexiones = asyncio.run(correr())
+
+        assert primera[0] == 200 and primera[2] == b"ok"
+        assert segunda[0] == 400 and segunda[2] == b"abcde"
+        assert conexiones == 1
+
+    def test_resumen(self):
+        stats = Estadisticas("x")
+        for ms in range(1, 101):
+            stats.registrar(float(ms), 200 if ms <= 90 else 400, {"server-timing": "db;dur=2.0"})
+        stats.registrar_error(TimeoutError())
+
+        resumen = stats.resumen()
+
+        assert percentil([1, 2, 3, 4], 50) == 2
+        assert (resumen["p50_ms"], resumen["p95_ms"], resumen["p99_ms"]) == (50, 95, 99)
+        assert resumen["requests"] == 101
+        assert resumen["error_rate"] == round(1 / 101, 4)
+        assert resumen["reject_rate"] == round(10 / 101, 4)
+        assert resumen["db_p95_ms"] == 2.0
+
+
+class TestEscenarios:
+    def test_preparan_usuarios_sobre_el_dataset(self):
+        call_command("seed_perf_dataset", scale=0.02)
+
+        for escenario in ESCENARIOS.values():
+            usuarios = escenario.preparar(5)
+            assert 0 < len(usuarios) <= 5, escenario.nombre
+            assert all(p.token and p.ruta.startswith("/") for peticiones in usuarios for p in peticiones)
+
+        assert MesaExamen.objects.filter(cupo=CUPO_MESA).exists()
+        assert verificar_cupos() == []
+
+    def test_verificar_cupos_detecta_sobreventa(self):
+        call_command("seed_perf_dataset", scale=0.02)
+        ESCENARIOS["inscribir_mesa"].preparar(5)
+        mesa = MesaExamen.objects.filter(cupo=CUPO_MESA).first()
+        InscripcionMesa.objects.filter(mesa=mesa).delete()
+        for est in Estudiante.objects.order_by("id")[: CUPO_MESA + 1]:
+            InscripcionMesa.objects.create(mesa=mesa, estudiante=est)
+
+        assert verificar_cupos() == [f"Mesa {mesa.codigo}: {CUPO_MESA + 1} inscriptos con cupo {CUPO_MESA}."]
+
+
+class TestEjecutar:
+    def test_reparte_usuarios_virtuales(self):
+        async def correr():
+            servidor = await _servidor([])
+            url = f"http://127.0.0.1:{servidor.sockets[0].getsockname()[1]}"
+            usuarios = [[Peticion("GET", "/a", "t"), Peticion("GET", "/b", "t")] for _ in range(10)]
+            stats = await ejecutar(url, usuarios, pausa=0, ramp=0, concurrencia=3, timeout=5, stats=Estadisticas("x"))
+            servidor.close()
+            return stats
+
+        stats = asyncio.run(correr())
+
+        assert stats.estados == {200: 10, 400: 10}
+        assert not stats.excepciones
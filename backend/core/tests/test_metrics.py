@@ -0,0 +1,121 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from prometheus_client import REGISTRY
+
+from apps.common.jobs import enqueue
+from apps.common.metrics import descartar_multiproceso, metrics_view, track_command, update_connection_gauge
+from core.middleware import MetricsMiddleware
+from core.models import CommandRun
+
+pytestmark = pytest.mark.django_db
+
+RUTA = "api/estudiantes/<int:estudiante_id>"
+
+
+def _vista(request):
+    request.resolver_match = SimpleNamespace(route=RUTA)
+    return HttpResponse("ok", status=201)
+
+
+def _requests(status="201"):
+    return REGISTRY.get_sample_value("ipes_http_requests_total", {"method": "GET", "route": RUTA, "status": status})
+
+
+class TestMetricsView:
+    def test_sin_token_configurado_no_existe(self, rf, settings):
+        settings.METRICS_TOKEN = ""
+
+        assert metrics_view(rf.get("/metrics")).status_code == 404
+
+    def test_token_incorrecto(self, rf, settings):
+        settings.METRICS_TOKEN = "secreto"
+
+        response = metrics_view(rf.get("/metrics", HTTP_AUTHORIZATION="Bearer otro"))
+
+        assert response.status_code == 401
+
+    def test_expone_requests_cola_y_comandos(self, rf, settings):
+        settings.METRICS_TOKEN = "secreto"
+        settings.METRICS_ENABLED = True
+        enqueue("test.metricas")
+        with track_command("cleanup_mesas_desiertas"):
+            pass
+        MetricsMiddleware(_vista)(rf.get("/api/estudiantes/7"))
+
+        response = metrics_view(rf.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto"))
+
+        assert response.status_code == 200
+        texto = response.content.decode()
+        assert f'ipes_http_request_duration_seconds_count{{method="GET",route="{RUTA}"}}' in texto
+        assert 'ipes_jobs{kind="test.metricas",status="queued"} 1.0' in texto
+        assert 'ipes_command_last_success{command="cleanup_mesas_desiertas"} 1.0' in texto
+        assert 'ipes_command_last_success_timestamp_seconds{command="cleanup_mesas_desiertas"}' in texto
+
+
+class TestMetricsMiddleware:
+    def test_registra_por_patron_de_ruta(self, rf, settings):
+        settings.METRICS_ENABLED = True
+        antes = _requests() or 0
+
+        MetricsMiddleware(_vista)(rf.get("/api/estudiantes/7"))
+        MetricsMiddleware(_vista)(rf.get("/api/estudiantes/8"))
+
+        assert _requests() == antes + 2
+
+    def test_deshabilitado(self, rf, settings):
+        settings.METRICS_ENABLED = False
+        antes = _requests() or 0
+
+        MetricsMiddleware(_vista)(rf.get("/api/estudiantes/7"))
+
+        assert (_requests() or 0) == antes
+
+
+class TestTrackCommand:
+    def test_registra_fallas(self):
+        with pytest.raises(RuntimeError), track_command("procesar_notificaciones"):
+            raise RuntimeError("sin conexión")
+
+        run = CommandRun.objects.get(command="procesar_notificaciones")
+        assert run.success is False
+        assert "sin conexión" in run.error
+
+        with track_command("procesar_notificaciones"):
+            pass
+
+        run.refresh_from_db()
+        assert run.success is True
+        assert run.error == ""
+        assert CommandRun.objects.filter(command="procesar_notificaciones").count() == 1
+
+
+class TestDatabaseConnections:
+    def test_cuenta_conexiones_abiertas_del_worker(self):
+        conexion = connections["default"]
+        conexion.ensure_connection()
+        connection_created.send(sender=conexion.__class__, connection=conexion)
+
+        update_connection_gauge()
+
+        assert REGISTRY.get_sample_value("ipes_db_connections_open", {"alias": "default"}) == 1
+        assert REGISTRY.get_sample_value("ipes_db_connections_opened_total", {"alias": "default"}) >= 1
+
+
+class TestDescartarMultiproceso:
+    def test_borra_solo_los_archivos_del_proceso(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        propio = tmp_path / f"histogram_{os.getpid()}.db"
+        ajeno = tmp_path / "histogram_1.db"
+        propio.touch()
+        ajeno.touch()
+
+        descartar_multiproceso()
+
+        assert not propio.exists()
+        assert ajeno.exists()
+        assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
@@ -0,0 +1,35 @@
+from apps.common import pdf
+
+
+class TestPdfCache:
+    def test_reutiliza_el_pdf_y_responde_304(self, settings, tmp_path, rf, monkeypatch):
+        settings.MEDIA_ROOT = tmp_path
+        renders = []
+        monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: renders.append(html) or b"%PDF-1.7")
+        contexto = {"estudiante": "Test, Ana", "dni": "40111222", "materia": "Pedagogía"}
+
+        primera = pdf.pdf_response(rf.get("/"), "core/constancia_examen_pdf.html", contexto, filename="c.pdf")
+        segunda = pdf.pdf_response(rf.get("/"), "core/constancia_examen_pdf.html", contexto, filename="c.pdf")
+        assert primera.content == segunda.content == b"%PDF-1.7"
+        assert primera["ETag"] == segunda["ETag"]
+        assert len(renders) == 1
+
+        request = rf.get("/", HTTP_IF_NONE_MATCH=primera["ETag"])
+        assert (
+            pdf.pdf_response(request, "core/constancia_examen_pdf.html", contexto, filename="c.pdf").status_code == 304
+        )
+
+        otra = pdf.pdf_response(
+            rf.get("/"), "core/constancia_examen_pdf.html", {**contexto, "dni": "1"}, filename="c.pdf"
+        )
+        assert otra["ETag"] != primera["ETag"]
+        assert len(renders) == 2
+
+    def test_desalojo_por_tamanio(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = tmp_path
+        settings.PDF_CACHE_MAX_MB = 0
+        monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: b"x" * 1024)
+
+        pdf.cached_pdf("t.html", "<p>a</p>")
+
+        assert not list((tmp_path / pdf.PDF_CACHE_DIR).rglob("*.pdf"))
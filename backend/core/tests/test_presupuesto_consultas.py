@@ -0,0 +1,294 @@
+"""
+Presupuesto de consultas y de tiempo de los endpoints más usados.
+
+Cada endpoint se mide con caché fría sobre dos tamaños de datos: N (8 materias en el
+plan, 6 estudiantes) y 2N. `PRESUPUESTOS` fija la cantidad exacta de consultas en cada
+tamaño; si el número es el mismo, el endpoint no crece con los datos. Los que hoy
+crecen (trayectoria y mesas, una o más consultas por materia) quedan documentados con
+su crecimiento actual: si cambia en cualquier sentido, el test falla y el presupuesto
+se actualiza junto con el cambio que lo explica.
+
+Los datos son realistas: `crear_plan()` arma un profesorado con materias en cadena de
+correlativas, comisiones con horario y una mesa por materia en una ventana abierta;
+`crear_estudiante()` agrega un estudiante a mitad de carrera.
+
+Los conteos medidos quedan como propiedades del test en el reporte JUnit
+(`pytest --junitxml`), para seguir cómo escalan.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from datetime import time as hora
+
+import pytest
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+
+from apps.estudiantes.api.horarios_api import materias_plan
+from apps.estudiantes.api.inscripciones_materias_api import inscripcion_materia
+from apps.estudiantes.api.mesas_api import listar_mesas_estudiante
+from apps.estudiantes.api.trayectoria_api import trayectoria_estudiante
+from apps.estudiantes.schemas.inscripciones import InscripcionMateriaIn
+from apps.management.api.dashboard import global_overview as management_overview
+from apps.mensajeria.api import _create_conversation, get_message_counts, list_conversations
+from apps.mensajeria.schemas import ConversationListQuery
+from apps.metrics.dashboard_api import global_overview as dashboard_overview
+from core.models import (
+    ActaExamen,
+    ActaExamenEstudiante,
+    Bloque,
+    Comision,
+    Conversation,
+    Correlatividad,
+    Estudiante,
+    EstudianteCarrera,
+    HorarioCatedra,
+    HorarioCatedraDetalle,
+    InscripcionMateriaEstudiante,
+    InscripcionMesa,
+    Materia,
+    MesaExamen,
+    Persona,
+    PlanDeEstudio,
+    Profesorado,
+    Regularidad,
+    Turno,
+    VentanaHabilitacion,
+)
+
+pytestmark = pytest.mark.django_db
+
+MATERIAS_POR_ESCALA = 8
+ESTUDIANTES_POR_ESCALA = 6
+
+# Tiempo máximo por request; holgado para no depender de la máquina del CI.
+MS_MAXIMO = 2000
+
+# endpoint: (consultas con N, consultas con 2N)
+PRESUPUESTOS = {
+    "trayectoria_estudiante": (41, 63),
+    "listar_mesas_estudiante": (13, 21),
+    "listar_mesas_estudiante_rendibles": (59, 111),
+    "materias_plan": (10, 10),
+    "inscripcion_materia": (33, 33),
+    "list_conversations": (1, 1),
+    "get_message_counts": (1, 1),
+    "dashboard_global_overview": (22, 22),
+    "management_global_overview": (12, 12),
+}
+
+
+@dataclass
+class Plan:
+    profesorado: Profesorado
+    plan: PlanDeEstudio
+    materias: list[Materia]
+    comisiones: list[Comision]
+    mesas: list[MesaExamen]
+    ventana_mesas: VentanaHabilitacion
+    estudiantes: list[Estudiante] = field(default_factory=list)
+
+
+def crear_staff(username: str = "bedel", rol: str = "bedel") -> User:
+    user = User.objects.create_user(username=username)
+    user.groups.add(Group.objects.get_or_create(name=rol)[0])
+    return user
+
+
+def crear_plan(materias: int = 8, nombre: str = "Profesorado de Historia") -> Plan:
+    hoy = date.today()
+    profesorado = Profesorado.objects.create(nombre=nombre, duracion_anios=4)
+    plan = PlanDeEstudio.objects.create(profesorado=profesorado, resolucion=f"R-{profesorado.id}", anio_inicio=2020)
+    turno = Turno.objects.get_or_create(nombre="Mañana")[0]
+    bloques = [
+        Bloque.objects.get_or_create(turno=turno, dia=dia, hora_desde=hora(8), hora_hasta=hora(9, 20))[0]
+        for dia in range(1, 6)
+    ]
+    ventana = VentanaHabilitacion.objects.create(
+        tipo=VentanaHabilitacion.Tipo.MESAS_FINALES,
+        desde=hoy - timedelta(days=1),
+        hasta=hoy + timedelta(days=10),
+        activo=True,
+    )
+    VentanaHabilitacion.objects.create(
+        tipo=VentanaHabilitacion.Tipo.MATERIAS,
+        desde=hoy - timedelta(days=1),
+        hasta=hoy + timedelta(days=10),
+        activo=True,
+    )
+    lista, comisiones, mesas = [], [], []
+    for i in range(materias):
+        materia = Materia.objects.create(
+            plan_de_estudio=plan,
+            nombre=f"Materia {i + 1}",
+            anio_cursada=i * 4 // materias + 1,
+            formato=Materia.FormatoMateria.ASIGNATURA,
+            regimen=Materia.TipoCursada.ANUAL,
+        )
+        if lista:
+            Correlatividad.objects.create(
+                materia_origen=materia,
+                materia_correlativa=lista[-1],
+                tipo=Correlatividad.TipoCorrelatividad.REGULAR_PARA_CURSAR,
+            )
+            Correlatividad.objects.create(
+                materia_origen=materia,
+                materia_correlativa=lista[-1],
+                tipo=Correlatividad.TipoCorrelatividad.APROBADA_PARA_RENDIR,
+            )
+        horario = HorarioCatedra.objects.create(espacio=materia, turno=turno, anio_academico=hoy.year)
+        HorarioCatedraDetalle.objects.create(horario_catedra=horario, bloque=bloques[i % len(bloques)])
+        comisiones.append(
+            Comision.objects.create(
+                materia=materia, anio_lectivo=hoy.year, codigo=f"A{i}", turno=turno, horario=horario
+            )
+        )
+        mesas.append(
+            MesaExamen.objects.create(
+                materia=materia,
+                tipo=MesaExamen.Tipo.FINAL,
+                fecha=hoy + timedelta(days=5),
+                ventana=ventana,
+            )
+        )
+        lista.append(materia)
+    return Plan(profesorado, plan, lista, comisiones, mesas, ventana)
+
+
+def crear_estudiante(datos: Plan, dni: str) -> Estudiante:
+    """Estudiante a mitad de carrera: aprobó el primer cuarto del plan, regularizó el
+    segundo y cursa el tercero, salvo su primera materia (`materia_disponible()`)."""
+    user = User.objects.create_user(username=dni)
+    user.groups.add(Group.objects.get_or_create(name="estudiante")[0])
+    persona = Persona.objects.create(dni=dni, nombre="Ana", apellido=f"Test {dni}")
+    est = Estudiante.objects.create(user=user, persona=persona)
+    est.carreras.add(datos.profesorado)
+    EstudianteCarrera.objects.filter(estudiante=est).update(
+        estado_academico=EstudianteCarrera.EstadoAcademico.ACTIVO, anio_ingreso=2023
+    )
+
+    cuarto = max(len(datos.materias) // 4, 1)
+    aprobadas = datos.materias[:cuarto]
+    regulares = datos.materias[cuarto : 2 * cuarto]
+    cursando = datos.materias[2 * cuarto + 1 : 3 * cuarto + 1]
+    cierre = date.today() - timedelta(days=200)
+    for materia in aprobadas + regulares:
+        Regularidad.objects.create(
+            estudiante=est, materia=materia, fecha_cierre=cierre, situacion=Regularidad.Situacion.REGULAR
+        )
+    for materia in aprobadas:
+        # Un acta por materia, compartida por todos los estudiantes que la aprobaron.
+        acta, _ = ActaExamen.objects.get_or_create(
+            codigo=f"ACTA-{materia.id}",
+            defaults={
+                "tipo": ActaExamen.Tipo.REGULAR,
+                "profesorado": datos.profesorado,
+                "materia": materia,
+                "plan": datos.plan,
+                "fecha": cierre + timedelta(days=30),
+                "anio_academico": cierre.year,
+                "numero": materia.id,
+            },
+        )
+        ActaExamenEstudiante.objects.create(
+            acta=acta,
+            numero_orden=acta.estudiantes.count() + 1,
+            dni=dni,
+            apellido_nombre=persona.apellido,
+            calificacion_definitiva="8",
+        )
+    for materia in regulares[:1]:
+        mesa = next(m for m in datos.mesas if m.materia_id == materia.id)
+        InscripcionMesa.objects.create(mesa=mesa, estudiante=est)
+    for materia in cursando:
+        comision = next(c for c in datos.comisiones if c.materia_id == materia.id)
+        InscripcionMateriaEstudiante.objects.create(
+            estudiante=est,
+            materia=materia,
+            comision=comision,
+            anio=date.today().year,
+            estado=InscripcionMateriaEstudiante.Estado.CONFIRMADA,
+        )
+    datos.estudiantes.append(est)
+    return est
+
+
+def materia_disponible(datos: Plan) -> Materia:
+    """Materia a la que los estudiantes de `crear_estudiante()` pueden inscribirse."""
+    return datos.materias[2 * max(len(datos.materias) // 4, 1)]
+
+
+def crear_conversaciones(remitente: User, destinatarios: list[User]) -> list[Conversation]:
+    return [
+        _create_conversation(
+            sender=remitente,
+            recipient=destinatario,
+            subject=f"Consulta {n}",
+            topic=None,
+            body=f"Mensaje inicial {n}",
+            allow_student_reply=True,
+            context_type=None,
+            context_id=None,
+            is_massive=False,
+        )
+        for n, destinatario in enumerate(destinatarios)
+    ]
+
+
+def _estudiante(datos, rf):
+    request = rf.get("/")
+    request.user = datos.estudiantes[0].user
+    return request
+
+
+def _staff(datos, rf):
+    request = rf.get("/")
+    request.user = datos.staff
+    return request
+
+
+ENDPOINTS = {
+    "trayectoria_estudiante": lambda datos, rf: trayectoria_estudiante(_estudiante(datos, rf)),
+    "listar_mesas_estudiante": lambda datos, rf: listar_mesas_estudiante(_estudiante(datos, rf)),
+    "listar_mesas_estudiante_rendibles": lambda datos, rf: listar_mesas_estudiante(
+        _estudiante(datos, rf), solo_rendibles=True
+    ),
+    "materias_plan": lambda datos, rf: materias_plan(_estudiante(datos, rf)),
+    "inscripcion_materia": lambda datos, rf: inscripcion_materia(
+        _estudiante(datos, rf), InscripcionMateriaIn(materia_id=materia_disponible(datos).id)
+    ),
+    "list_conversations": lambda datos, rf: list_conversations(_staff(datos, rf), ConversationListQuery()),
+    "get_message_counts": lambda datos, rf: get_message_counts(_staff(datos, rf)),
+    "dashboard_global_overview": lambda datos, rf: dashboard_overview(_staff(datos, rf)),
+    "management_global_overview": lambda datos, rf: management_overview(_staff(datos, rf)),
+}
+
+
+@pytest.fixture(params=[1, 2], ids=["N", "2N"])
+def datos(request):
+    escala = request.param
+    datos = crear_plan(materias=MATERIAS_POR_ESCALA * escala)
+    for n in range(ESTUDIANTES_POR_ESCALA * escala):
+        crear_estudiante(datos, f"40{escala}{n:05d}")
+    datos.staff = crear_staff("secretaria", "secretaria")
+    crear_conversaciones(datos.staff, [est.user for est in datos.estudiantes])
+    datos.escala = escala
+    return datos
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINTS))
+def test_presupuesto_de_consultas(endpoint, datos, rf, django_assert_num_queries, record_property):
+    esperadas = PRESUPUESTOS[endpoint][datos.escala - 1]
+    cache.clear()
+
+    with django_assert_num_queries(esperadas) as consultas:
+        inicio = time.perf_counter()
+        resultado = ENDPOINTS[endpoint](datos, rf)
+        ms = (time.perf_counter() - inicio) * 1000
+
+    record_property("consultas", len(consultas))
+    record_property("ms", round(ms, 1))
+    # Un error temprano haría pasar el presupuesto sin medir el camino real.
+    assert not isinstance(resultado, tuple) or resultado[0] < 300, resultado
+    assert ms < MS_MAXIMO
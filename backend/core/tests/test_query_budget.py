@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from apps.common.slow_queries import fingerprint
+from core.middleware import QueryBudgetMiddleware
+from core.models import SystemLog
+
+pytestmark = pytest.mark.django_db
+
+
+def _get(rf, path, route):
+    request = rf.get(path)
+    request.resolver_match = SimpleNamespace(route=route)
+    return request
+
+
+def _vista_n_mas_uno(request):
+    for pk in range(5):
+        User.objects.filter(pk=pk).exists()
+    return HttpResponse("ok")
+
+
+class TestQueryBudgetMiddleware:
+    def test_server_timing_y_registro_del_exceso(self, rf, settings):
+        cache.clear()
+        settings.SQL_BUDGET_QUERIES = 100
+        settings.SQL_BUDGET_DUPLICATES = 3
+        request = _get(rf, "/api/estudiantes/x", "api/estudiantes/<str:dni>")
+        request.request_id = "abc123"
+
+        response = QueryBudgetMiddleware(_vista_n_mas_uno)(request)
+
+        assert response["Server-Timing"].startswith("db;dur=")
+        assert '"5 queries"' in response["Server-Timing"]
+        log = SystemLog.objects.get(tipo="SQL_BUDGET")
+        assert log.mensaje.startswith("GET api/estudiantes/<str:dni>: 5 consultas")
+        assert log.metadata["request_id"] == "abc123"
+        assert log.metadata["queries"] == 5
+        assert log.metadata["duplicates"][0]["count"] == 5
+
+        # Un único aviso por ruta dentro del intervalo.
+        QueryBudgetMiddleware(_vista_n_mas_uno)(request)
+        assert SystemLog.objects.filter(tipo="SQL_BUDGET").count() == 1
+
+    def test_paths_sin_ruta_comparten_etiqueta(self, rf, settings):
+        cache.clear()
+        settings.SQL_BUDGET_QUERIES = 1
+
+        for path in ("/no-existe/1", "/no-existe/2"):
+            QueryBudgetMiddleware(_vista_n_mas_uno)(rf.get(path))
+
+        log = SystemLog.objects.get(tipo="SQL_BUDGET")
+        assert log.mensaje.startswith("GET <unmatched>:")
+        assert log.metadata["path"] == "/no-existe/1"
+
+    def test_presupuesto_por_ruta(self, settings):
+        settings.SQL_BUDGETS = {"api/estudiantes/": {"queries": 10}, "api/estudiantes/reportes/": {"ms": 9000}}
+
+        budget = QueryBudgetMiddleware.budget_for("api/estudiantes/reportes/auditoria")
+
+        assert budget["ms"] == 9000
+        assert budget["queries"] == settings.SQL_BUDGET_QUERIES
+
+
+def _vista_con_parametros(request):
+    User.objects.filter(username__in=["ana", "beto"]).exists()
+    User.objects.filter(username__in=["carla"]).exists()
+    return HttpResponse("ok")
+
+
+class TestConsultasLentas:
+    def test_agrupa_por_huella_con_explain(self, rf, settings):
+        cache.clear()
+        settings.SLOW_QUERY_MS = 0.0001
+        settings.SLOW_QUERY_EXPLAIN_RATE = 0
+        request = _get(rf, "/api/usuarios", "api/usuarios")
+        request.request_id = "req-lenta"
+
+        QueryBudgetMiddleware(_vista_con_parametros)(request)
+
+        log = SystemLog.objects.get(tipo="SLOW_QUERY")
+        assert log.metadata["count"] == 2
+        assert "IN (...)" in log.metadata["sql"]
+        assert log.metadata["routes"] == {"api/usuarios": 2}
+        assert log.metadata["last"]["request_id"] == "req-lenta"
+        assert "carla" in log.metadata["last"]["params"]
+        assert len(log.metadata["samples"]) == 2
+        assert log.metadata["p95_ms"] >= log.metadata["p50_ms"]
+        assert any("detail" in fila for fila in log.metadata["explain"])
+
+    def test_sin_umbral_no_captura(self, rf, settings):
+        settings.SLOW_QUERY_MS = 0
+
+        QueryBudgetMiddleware(_vista_con_parametros)(rf.get("/api/usuarios"))
+
+        assert not SystemLog.objects.filter(tipo="SLOW_QUERY").exists()
+
+    def test_huella_ignora_valores(self):
+        a, digest_a = fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND nombre = 'x' LIMIT 21")
+        b, digest_b = fingerprint("SELECT  *  FROM t WHERE id IN (%s) AND nombre = 'yy' LIMIT 5")
+
+        assert a == b == "SELECT * FROM t WHERE id IN (...) AND nombre = ? LIMIT ?"
+        assert digest_a == digest_b
@@ -0,0 +1,92 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import HttpResponse
+from ninja import NinjaAPI, Router, Schema
+from ninja.responses import NinjaJSONEncoder
+from ninja.testing import TestClient
+
+from apps.common.renderers import ORJSONRenderer, trusted_response
+
+
+class ItemOut(Schema):
+    id: int
+    nombre: str
+    alta: datetime
+
+
+class ListaOut(Schema):
+    total: int
+    items: list[ItemOut]
+
+
+class ErrorOut(Schema):
+    ok: bool
+    message: str
+
+
+ALTA = datetime(2025, 3, 10, 8, 30, 15, 123456)
+
+router = Router()
+
+
+@router.get("/lista", response={200: ListaOut, 404: ErrorOut})
+@trusted_response
+def lista(request, cantidad: int = 2):
+    if not cantidad:
+        return 404, ErrorOut(ok=False, message="Sin datos.")
+    items = [ItemOut(id=n, nombre=f"Item {n}", alta=ALTA) for n in range(cantidad)]
+    return ListaOut(total=cantidad, items=items)
+
+
+@router.get("/archivo")
+@trusted_response
+def archivo(request):
+    return HttpResponse(b"a;b", content_type="text/csv")
+
+
+api = NinjaAPI(renderer=ORJSONRenderer(), urls_namespace="test_renderers")
+api.add_router("/", router)
+client = TestClient(api)
+
+
+class TestORJSONRenderer:
+    def test_mismo_json_que_el_renderer_por_defecto(self):
+        data = {
+            "fecha": date(2025, 3, 10),
+            "momento": ALTA,
+            "monto": Decimal("10.50"),
+            "uuid": uuid.UUID(int=1),
+            "esquema": ItemOut(id=1, nombre="Ana", alta=ALTA),
+            1: "clave numérica",
+        }
+
+        rendered = ORJSONRenderer().render(None, data, response_status=200)
+
+        assert json.loads(rendered) == json.loads(json.dumps(data, cls=NinjaJSONEncoder))
+        assert b'"2025-03-10T08:30:15.123"' in rendered
+
+
+class TestTrustedResponse:
+    def test_serializa_sin_revalidar(self):
+        response = client.get("/lista?cantidad=3")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json; charset=utf-8"
+        cuerpo = response.json()
+        assert cuerpo["total"] == 3
+        assert cuerpo["items"][2] == {"id": 2, "nombre": "Item 2", "alta": "2025-03-10T08:30:15.123"}
+
+    def test_respeta_el_status_de_la_tupla(self):
+        response = client.get("/lista?cantidad=0")
+
+        assert response.status_code == 404
+        assert response.json() == {"ok": False, "message": "Sin datos."}
+
+    def test_deja_pasar_respuestas_ya_armadas(self):
+        response = client.get("/archivo")
+
+        assert response.content == b"a;b"
+        assert response["Content-Type"] == "text/csv"
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.models import (
+    ActaExamenEstudiante,
+    AuditLog,
+    Conversation,
+    Estudiante,
+    Message,
+    Persona,
+    Profesorado,
+    Regularidad,
+    SearchDocument,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def _foto():
+    return {
+        "personas": list(Persona.objects.order_by("dni").values_list("dni", "nombre", "apellido")),
+        "regularidades": sorted(
+            Regularidad.objects.values_list("estudiante__persona__dni", "materia__nombre", "situacion")
+        ),
+        "notas": sorted(ActaExamenEstudiante.objects.values_list("dni", "calificacion_definitiva")),
+        "mensajes": sorted(Message.objects.values_list("body", flat=True)),
+    }
+
+
+class TestSeedPerfDataset:
+    def test_genera_datos_deterministicos(self):
+        call_command("seed_perf_dataset", scale=0.01, seed=7)
+
+        assert Profesorado.objects.count() == 1
+        assert Estudiante.objects.count() == 40
+        assert AuditLog.objects.count() == 500
+        conv = Conversation.objects.filter(context_type="seed_perf").first()
+        assert conv.participants_cache and conv.last_message_at
+        assert SearchDocument.objects.filter(kind="message").count() == Message.objects.count()
+        foto = _foto()
+        assert foto["regularidades"] and foto["notas"]
+
+        with pytest.raises(CommandError):
+            call_command("seed_perf_dataset", scale=0.01, seed=7)
+
+        call_command("seed_perf_dataset", scale=0.01, seed=7, reset=True)
+        assert _foto() == foto
+        assert Estudiante.objects.count() == 40
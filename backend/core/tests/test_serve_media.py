@@ -3,8 +3,10 @@ import os
 import pytest
 from django.conf import settings
 from django.contrib.auth.models import Group, User
+from django.core.cache import cache
 
 from apps.preinscriptions.models_uploads import PreinscripcionArchivo
+from apps.preinscriptions.views import serve_media
 from core.models import (
     Conversation,
     ConversationParticipant,
@@ -31,6 +33,8 @@ pytestmark = pytest.mark.django_db
 def media_setup(tmp_path, settings):
     # Override MEDIA_ROOT using pytest tmp_path
     settings.MEDIA_ROOT = str(tmp_path)
+    # La decisión de acceso se cachea por (usuario, ruta); los ids se repiten entre tests.
+    cache.clear()
     return tmp_path
 
 
@@ -256,3 +260,34 @@ class TestServeMedia:
         client.force_login(other_user)
         response = client.get(f"/media/{rel_path}")
         assert response.status_code == 403
+
+
+class TestServeMediaEntrega:
+    def _admin_request(self, rf, media_setup, **headers):
+        (media_setup / "doc.pdf").write_bytes(b"0123456789")
+        request = rf.get("/media/doc.pdf", **headers)
+        request.user = User.objects.create_superuser(username="adminuser", password="password")
+        return request
+
+    def test_x_accel_redirect_y_decision_cacheada(self, rf, media_setup, settings, django_assert_num_queries):
+        settings.MEDIA_ACCEL_REDIRECT = "/protected-media/"
+        request = self._admin_request(rf, media_setup)
+
+        response = serve_media(request, "doc.pdf")
+        assert response["X-Accel-Redirect"] == "/protected-media/doc.pdf"
+        assert response["Content-Type"] == "application/pdf"
+        assert response.content == b""
+
+        with django_assert_num_queries(0):
+            assert serve_media(request, "doc.pdf").status_code == 200
+
+    def test_rango_y_peticion_condicional(self, rf, media_setup):
+        request = self._admin_request(rf, media_setup, HTTP_RANGE="bytes=2-5")
+        response = serve_media(request, "doc.pdf")
+        assert response.status_code == 206
+        assert response["Content-Range"] == "bytes 2-5/10"
+        assert b"".join(response.streaming_content) == b"2345"
+
+        request = rf.get("/media/doc.pdf", HTTP_IF_NONE_MATCH=response["ETag"])
+        request.user = User.objects.get(username="adminuser")
+        assert serve_media(request, "doc.pdf").status_code == 304
@@ -12,6 +12,9 @@ os.environ.setdefault("GIO_USE_VOLUME_MONITOR", "local")
 def main():
     """Run administrative tasks."""
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    # Las métricas multiproceso son de los workers de gunicorn (config/gunicorn.py); los
+    # comandos (cron, run_worker) no las publican ni dejan archivos en ese directorio.
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
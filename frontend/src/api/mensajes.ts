@@ -1,4 +1,4 @@
-import { client } from "@/api/client";
+import { type AppAxiosRequestConfig, client } from "@/api/client";
 
 export type ConversationStatus = "open" | "close_requested" | "closed";
 
@@ -63,6 +63,8 @@ export interface ConversationCreatePayload {
 export interface ConversationCreateResponse {
 	created_ids: number[];
 	total_recipients: number;
+	broadcast_id?: number | null;
+	status?: string | null;
 }
 
 export interface ConversationCountsDTO {
@@ -71,6 +73,12 @@ export interface ConversationCountsDTO {
 	sla_danger: number;
 }
 
+export interface MessageEventsDTO extends ConversationCountsDTO {
+	version: number;
+	changed: boolean;
+	retry_after: number;
+}
+
 export interface SimpleUserDTO {
 	id: number;
 	name: string;
@@ -165,6 +173,26 @@ export const obtenerResumenMensajes =
 		return data;
 	};
 
+/**
+ * Long-poll: el backend responde cuando cambia la versión de contadores del usuario
+ * o al agotar la espera. Sin `version` responde de inmediato con el estado actual.
+ */
+export const esperarNovedadesMensajes = async (
+	version: number | undefined,
+	signal: AbortSignal,
+): Promise<MessageEventsDTO> => {
+	const config: AppAxiosRequestConfig = {
+		params: version === undefined ? {} : { version },
+		signal,
+		suppressErrorToast: true,
+	};
+	const { data } = await client.get<MessageEventsDTO>(
+		"/mensajes/novedades",
+		config,
+	);
+	return data;
+};
+
 export const buscarUsuariosMensajes = async (
 	query: string,
 ): Promise<SimpleUserDTO[]> => {
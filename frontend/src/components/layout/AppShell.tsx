@@ -18,6 +18,7 @@ import ErrorBoundaryFallback from "@/components/ErrorBoundaryFallback";
 import ActaOralConformidadModal from "@/components/estudiantes/ActaOralConformidadModal";
 import BackButton from "@/components/ui/BackButton";
 import { useAuth } from "@/context/AuthContext";
+import { useMensajesNovedades } from "@/hooks/useMensajesNovedades";
 import { getDefaultHomeRoute, isOnlyEstudiante } from "@/utils/roles";
 import { AppSidebar } from "./app-shell/AppSidebar";
 import { AppTopBar } from "./app-shell/AppTopBar";
@@ -121,9 +122,9 @@ export default function AppShell({ children }: PropsWithChildren) {
 		queryKey: ["mensajes", "resumen"],
 		queryFn: obtenerResumenMensajes,
 		enabled: canUseMessages,
-		refetchInterval: 60_000,
 		staleTime: 60_000,
 	});
+	useMensajesNovedades(canUseMessages);
 
 	const unreadMessages = messageSummary?.unread ?? 0;
 	const badgeColor =
@@ -0,0 +1,65 @@
+import { useQueryClient } from "@tanstack/react-query";
+import { useEffect } from "react";
+import {
+	type ConversationCountsDTO,
+	esperarNovedadesMensajes,
+} from "@/api/mensajes";
+
+const ESPERA_TRAS_ERROR_MS = 60_000;
+
+const esperar = (ms: number, signal: AbortSignal) =>
+	new Promise<void>((resolve) => {
+		if (signal.aborted) return resolve();
+		const timer = setTimeout(resolve, ms);
+		signal.addEventListener("abort", () => {
+			clearTimeout(timer);
+			resolve();
+		});
+	});
+
+/**
+ * Mantiene una espera (long-poll) contra `/mensajes/novedades` y actualiza los
+ * contadores de mensajería apenas cambian, en lugar de consultarlos cada minuto.
+ */
+export function useMensajesNovedades(enabled: boolean) {
+	const queryClient = useQueryClient();
+
+	useEffect(() => {
+		if (!enabled) return;
+		const controller = new AbortController();
+		const { signal } = controller;
+
+		const escuchar = async () => {
+			let version: number | undefined;
+			while (!signal.aborted) {
+				try {
+					const novedades = await esperarNovedadesMensajes(version, signal);
+					if (novedades.changed) {
+						queryClient.setQueryData<ConversationCountsDTO>(
+							["mensajes", "resumen"],
+							{
+								unread: novedades.unread,
+								sla_warning: novedades.sla_warning,
+								sla_danger: novedades.sla_danger,
+							},
+						);
+						if (version !== undefined) {
+							void queryClient.invalidateQueries({
+								queryKey: ["mensajes", "conversaciones"],
+							});
+						}
+					}
+					version = novedades.version;
+					if (novedades.retry_after) {
+						await esperar(novedades.retry_after * 1000, signal);
+					}
+				} catch (_error) {
+					await esperar(ESPERA_TRAS_ERROR_MS, signal);
+				}
+			}
+		};
+
+		void escuchar();
+		return () => controller.abort();
+	}, [enabled, queryClient]);
+}
@@ -53,7 +53,6 @@ const MensajesInboxPage: React.FC = () => {
 		queryKey: ["mensajes", "resumen"],
 		queryFn: obtenerResumenMensajes,
 		enabled: !!user,
-		refetchInterval: 60_000,
 		staleTime: 60_000,
 	});
 
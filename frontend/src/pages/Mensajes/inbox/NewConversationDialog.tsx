@@ -34,6 +34,7 @@ import {
 } from "@/api/mensajes";
 import { useAuth } from "@/context/AuthContext";
 import { isOnlyEstudiante } from "@/utils/roles";
+import { toast } from "@/utils/toast";
 import {
 	MASS_ROLE_RULES,
 	type NewConversationDialogProps,
@@ -156,6 +157,11 @@ export const NewConversationDialog: React.FC<NewConversationDialogProps> = ({
 			await queryClient.invalidateQueries({
 				queryKey: ["mensajes", "resumen"],
 			});
+			if (data.broadcast_id) {
+				toast.info(
+					`Mensaje masivo en envío a ${data.total_recipients} destinatarios.`,
+				);
+			}
 			onCreated(data.created_ids);
 		},
 	});